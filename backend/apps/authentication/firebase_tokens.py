@@ -0,0 +1,316 @@
+"""
+Verificación local de ID tokens de Firebase.
+
+Los tokens se validan con PyJWT contra las llaves públicas de Google (RS256),
+que se descargan una vez y se refrescan según su Cache-Control. La relación
+token -> usuario verificado se guarda en memoria con TTL, así una solicitud con
+un token ya visto no consulta la base de datos.
+"""
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import jwt
+from cryptography.x509 import load_pem_x509_certificate
+
+logger = logging.getLogger(__name__)
+
+
+FIREBASE_CERTS_URL = (
+    'https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com'
+)
+FIREBASE_ISSUER_PREFIX = 'https://securetoken.google.com/'
+
+# Vigencia por defecto de las llaves si la respuesta no trae max-age
+DEFAULT_KEYS_MAX_AGE = 60 * 60
+# Intervalo mínimo entre descargas forzadas por un `kid` desconocido
+MIN_REFRESH_INTERVAL = 60
+# Tolerancia de reloj al validar exp/iat
+CLOCK_SKEW_SECONDS = 30
+
+DEFAULT_TOKEN_CACHE_TTL = 5 * 60
+DEFAULT_TOKEN_CACHE_SIZE = 10000
+
+
+class FirebaseTokenError(Exception):
+    """Token de Firebase inválido, expirado o imposible de verificar"""
+
+
+def fetch_google_certificates(url: str = FIREBASE_CERTS_URL, timeout: int = 5) -> Tuple[Dict[str, str], int]:
+    """
+    Descarga los certificados públicos de Firebase.
+
+    Returns:
+        ({kid: certificado PEM}, max_age en segundos)
+    """
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        certificates = json.loads(response.read().decode('utf-8'))
+        cache_control = response.headers.get('Cache-Control', '')
+
+    match = re.search(r'max-age=(\d+)', cache_control)
+    max_age = int(match.group(1)) if match else DEFAULT_KEYS_MAX_AGE
+    return certificates, max_age
+
+
+class FirebaseKeySet:
+    """
+    Llaves públicas de Firebase indexadas por `kid`, con refresco automático.
+
+    Args:
+        fetcher: Función que retorna ({kid: PEM}, max_age). Inyectable para
+            pruebas sin red.
+        clock: Reloj (inyectable para pruebas)
+    """
+
+    def __init__(self, fetcher: Callable[[], Tuple[Dict[str, str], int]] = fetch_google_certificates,
+                 clock: Callable[[], float] = time.time):
+        self.fetcher = fetcher
+        self.clock = clock
+        self._keys: Dict[str, Any] = {}
+        self._expires_at = 0.0
+        self._last_refresh = None
+        self._lock = threading.Lock()
+
+    def get_key(self, kid: str):
+        """Llave pública para un `kid`; refresca si expiraron o si el `kid` es nuevo"""
+        now = self.clock()
+        if now >= self._expires_at or (kid not in self._keys and self._can_force_refresh(now)):
+            self.refresh()
+
+        key = self._keys.get(kid)
+        if key is None:
+            raise FirebaseTokenError(f"Llave de firma desconocida: {kid}")
+        return key
+
+    def refresh(self):
+        """Descarga las llaves (una sola descarga aunque varios hilos lo pidan)"""
+        with self._lock:
+            now = self.clock()
+            if self._last_refresh is not None and now - self._last_refresh < 1 and now < self._expires_at:
+                return
+
+            try:
+                certificates, max_age = self.fetcher()
+            except Exception as e:
+                # Si la descarga falla se siguen usando las llaves anteriores
+                logger.error(f"No se pudieron descargar las llaves de Firebase: {str(e)}")
+                if not self._keys:
+                    raise FirebaseTokenError('Llaves de Firebase no disponibles')
+                self._expires_at = now + MIN_REFRESH_INTERVAL
+                return
+
+            self._keys = {
+                kid: load_pem_x509_certificate(pem.encode('utf-8')).public_key()
+                for kid, pem in certificates.items()
+            }
+            self._expires_at = now + max_age
+            self._last_refresh = now
+            logger.info(f"Llaves de Firebase actualizadas: {len(self._keys)} (vigencia {max_age}s)")
+
+    def _can_force_refresh(self, now: float) -> bool:
+        return self._last_refresh is None or now - self._last_refresh >= MIN_REFRESH_INTERVAL
+
+
+class StaticKeySet:
+    """Conjunto fijo de llaves públicas ({kid: llave}), para pruebas sin red"""
+
+    def __init__(self, keys: Dict[str, Any]):
+        self._keys = dict(keys)
+
+    def get_key(self, kid: str):
+        key = self._keys.get(kid)
+        if key is None:
+            raise FirebaseTokenError(f"Llave de firma desconocida: {kid}")
+        return key
+
+
+class FirebaseTokenVerifier:
+    """
+    Verifica ID tokens de Firebase sin llamar a Firebase (solo a las llaves cacheadas).
+
+    Valida firma RS256, `aud` (proyecto), `iss`, `exp`, `iat`, `auth_time` y `sub`.
+    """
+
+    def __init__(self, project_id: str, key_set=None):
+        if not project_id:
+            raise ValueError('Se requiere el ID del proyecto de Firebase')
+        self.project_id = project_id
+        self.issuer = f"{FIREBASE_ISSUER_PREFIX}{project_id}"
+        self.key_set = key_set or FirebaseKeySet()
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        """
+        Verifica el token y retorna sus claims.
+
+        Raises:
+            FirebaseTokenError: si el token no es válido
+        """
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.PyJWTError as e:
+            raise FirebaseTokenError(f"Token mal formado: {str(e)}")
+
+        if header.get('alg') != 'RS256':
+            raise FirebaseTokenError(f"Algoritmo no permitido: {header.get('alg')}")
+
+        kid = header.get('kid')
+        if not kid:
+            raise FirebaseTokenError('El token no indica la llave de firma (kid)')
+
+        try:
+            claims = jwt.decode(
+                token,
+                key=self.key_set.get_key(kid),
+                algorithms=['RS256'],
+                audience=self.project_id,
+                issuer=self.issuer,
+                leeway=CLOCK_SKEW_SECONDS,
+                options={'require': ['exp', 'iat', 'sub', 'aud', 'iss']}
+            )
+        except jwt.PyJWTError as e:
+            raise FirebaseTokenError(f"Token inválido: {str(e)}")
+
+        if not claims.get('sub'):
+            raise FirebaseTokenError('El token no tiene usuario (sub)')
+
+        auth_time = claims.get('auth_time')
+        if auth_time is not None and auth_time > time.time() + CLOCK_SKEW_SECONDS:
+            raise FirebaseTokenError('auth_time en el futuro')
+
+        return claims
+
+
+class TokenUserCache:
+    """
+    Caché en memoria token -> usuario con TTL y tamaño máximo (LRU).
+
+    La llave es el SHA-256 del token; una entrada nunca sobrevive a la
+    expiración del propio token.
+    """
+
+    def __init__(self, ttl: int = DEFAULT_TOKEN_CACHE_TTL, max_size: int = DEFAULT_TOKEN_CACHE_SIZE,
+                 clock: Callable[[], float] = time.time):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    def get(self, token: str):
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            user, expires_at = entry
+            if self.clock() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return user
+
+    def set(self, token: str, user, token_expires_at: Optional[float] = None):
+        expires_at = self.clock() + self.ttl
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+
+        with self._lock:
+            self._entries[self._key(token)] = (user, expires_at)
+            self._entries.move_to_end(self._key(token))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def resolve_user_from_claims(claims: Dict[str, Any]):
+    """
+    Obtiene (o crea) el usuario de Django para los claims verificados.
+
+    Raises:
+        FirebaseTokenError: si el token no trae email o el usuario está inactivo
+    """
+    from django.contrib.auth import get_user_model
+
+    User = get_user_model()
+    email = (claims.get('email') or '').lower()
+    if not email:
+        raise FirebaseTokenError('El token no incluye email')
+
+    name_parts = (claims.get('name') or '').split(' ', 1)
+    user, created = User.objects.get_or_create(
+        email=email,
+        defaults={
+            'username': claims['sub'][:150],
+            'first_name': name_parts[0],
+            'last_name': name_parts[1] if len(name_parts) > 1 else '',
+        }
+    )
+    if created:
+        logger.info(f"Usuario creado desde Firebase: {email}")
+
+    if not user.is_active:
+        raise FirebaseTokenError('Usuario inactivo')
+
+    return user
+
+
+_verifier = None
+_token_user_cache = None
+
+
+def get_firebase_token_verifier() -> Optional[FirebaseTokenVerifier]:
+    """Verificador del proyecto configurado (None si no hay FIREBASE_PROJECT_ID)"""
+    global _verifier
+    if _verifier is None:
+        from django.conf import settings
+
+        project_id = getattr(settings, 'FIREBASE_PROJECT_ID', '')
+        if not project_id:
+            return None
+        _verifier = FirebaseTokenVerifier(project_id)
+    return _verifier
+
+
+def get_token_user_cache() -> TokenUserCache:
+    global _token_user_cache
+    if _token_user_cache is None:
+        from django.conf import settings
+
+        _token_user_cache = TokenUserCache(
+            ttl=getattr(settings, 'FIREBASE_TOKEN_CACHE_TTL', DEFAULT_TOKEN_CACHE_TTL)
+        )
+    return _token_user_cache
+
+
+def authenticate_firebase_token(token: str, verifier: Optional[FirebaseTokenVerifier] = None,
+                                cache: Optional[TokenUserCache] = None):
+    """
+    Usuario para un ID token: desde la caché o verificando el token.
+
+    Raises:
+        FirebaseTokenError: si el token no es válido
+    """
+    verifier = verifier or get_firebase_token_verifier()
+    cache = cache or get_token_user_cache()
+
+    user = cache.get(token)
+    if user is not None:
+        return user
+
+    claims = verifier.verify(token)
+    user = resolve_user_from_claims(claims)
+    cache.set(token, user, token_expires_at=claims.get('exp'))
+    return user
@@ -7,16 +7,52 @@ from django.contrib.auth.models import AnonymousUser
 from django.contrib.auth import get_user_model
 import logging
 
+from .firebase_tokens import (
+    FirebaseTokenError,
+    authenticate_firebase_token,
+    get_firebase_token_verifier,
+    get_token_user_cache,
+)
+
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
 
 class FirebaseAuthMiddleware(MiddlewareMixin):
     """
-    Middleware simple que permite acceso a todas las rutas por ahora.
-    En el futuro implementaremos validación real de Firebase.
+    Autentica las rutas de la API con ID tokens de Firebase.
+    
+    Con FIREBASE_PROJECT_ID configurado el token se verifica localmente contra las
+    llaves públicas cacheadas; sin él (MVP/desarrollo) cualquier token Bearer se
+    asocia al usuario MVP. En ambos casos el usuario resuelto queda en caché, así
+    una solicitud con un token ya visto no consulta la base de datos.
     """
     
+    MVP_USER_CACHE_KEY = 'mvp-user'
+    
+    def authenticate_token(self, token):
+        """Usuario para el token Bearer (lanza FirebaseTokenError si es inválido)"""
+        if get_firebase_token_verifier() is not None:
+            return authenticate_firebase_token(token)
+        
+        # MVP: sin proyecto de Firebase configurado no se valida el token
+        cache = get_token_user_cache()
+        mvp_user = cache.get(self.MVP_USER_CACHE_KEY)
+        if mvp_user is None:
+            mvp_user, created = User.objects.get_or_create(
+                email='mvp-user@accountia.dev',
+                defaults={
+                    'username': 'mvp-user',
+                    'first_name': 'Usuario',
+                    'last_name': 'MVP',
+                }
+            )
+            if created:
+                logger.info("👤 Created MVP user for development")
+            cache.set(self.MVP_USER_CACHE_KEY, mvp_user)
+        
+        return mvp_user
+    
     def process_request(self, request):
         # URLs que no requieren autenticación
         public_urls = [
@@ -33,30 +69,19 @@ class FirebaseAuthMiddleware(MiddlewareMixin):
         if any(path.startswith(url) for url in public_urls):
             return None
         
-        # Para el MVP, permitir acceso si hay un token Bearer
-        # (sin validar el token real aún)
         auth_header = request.META.get('HTTP_AUTHORIZATION', '')
         
         if auth_header.startswith('Bearer '):
-            # Por ahora, cualquier token Bearer es válido
-            # TODO: Validar token real con Firebase Admin SDK
-            logger.info(f"✅ Request to {path} with Firebase token (MVP mode)")
-            
-            # CRÍTICO: Configurar request.user como autenticado
-            # Para el MVP, crear/obtener un usuario dummy real
-            mvp_user, created = User.objects.get_or_create(
-                email='mvp-user@accountia.dev',
-                defaults={
-                    'username': 'mvp-user',
-                    'first_name': 'Usuario',
-                    'last_name': 'MVP',
-                }
-            )
-            
-            if created:
-                logger.info("👤 Created MVP user for development")
+            token = auth_header[len('Bearer '):].strip()
             
-            request.user = mvp_user
+            try:
+                request.user = self.authenticate_token(token)
+            except FirebaseTokenError as e:
+                logger.warning(f"❌ Token de Firebase rechazado en {path}: {str(e)}")
+                return JsonResponse(
+                    {'detail': 'Token de autenticación inválido o expirado.'},
+                    status=401
+                )
             
             return None
         
@@ -0,0 +1,142 @@
+"""
+Tests para la verificación local de tokens de Firebase.
+"""
+import datetime
+import time
+
+import jwt
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+
+from apps.authentication.firebase_tokens import (
+    FirebaseKeySet, FirebaseTokenError, FirebaseTokenVerifier, StaticKeySet, TokenUserCache,
+    authenticate_firebase_token
+)
+
+PROJECT_ID = 'accountia-test'
+
+
+def _certificate_pem(private_key) -> str:
+    """Certificado autofirmado como los que publica Google"""
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'securetoken')])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name).issuer_name(name)
+        .public_key(private_key.public_key())
+        .serial_number(1)
+        .not_valid_before(now).not_valid_after(now + datetime.timedelta(days=1))
+        .sign(private_key, hashes.SHA256())
+    )
+    return certificate.public_bytes(serialization.Encoding.PEM).decode('utf-8')
+
+
+@pytest.fixture(scope='module')
+def private_key():
+    """Llave RSA de prueba (equivalente a la de Google)"""
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+class TestFirebaseTokens:
+    """Tests para el verificador, el conjunto de llaves y la caché de usuarios."""
+
+    @pytest.fixture
+    def verifier(self, private_key):
+        return FirebaseTokenVerifier(PROJECT_ID, StaticKeySet({'kid-1': private_key.public_key()}))
+
+    def make_token(self, private_key, kid='kid-1', **overrides):
+        now = int(time.time())
+        claims = {
+            'iss': f'https://securetoken.google.com/{PROJECT_ID}',
+            'aud': PROJECT_ID,
+            'sub': 'firebase-uid-1',
+            'email': 'contador@accountia.co',
+            'iat': now,
+            'exp': now + 3600,
+            'auth_time': now,
+        }
+        claims.update(overrides)
+        return jwt.encode(claims, private_key, algorithm='RS256', headers={'kid': kid})
+
+    def test_valid_token(self, verifier, private_key):
+        """Un token firmado por la llave del proyecto es aceptado."""
+        claims = verifier.verify(self.make_token(private_key))
+
+        assert claims['sub'] == 'firebase-uid-1'
+        assert claims['email'] == 'contador@accountia.co'
+
+    @pytest.mark.parametrize('overrides', [
+        {'aud': 'otro-proyecto'},
+        {'iss': 'https://securetoken.google.com/otro-proyecto'},
+        {'exp': int(time.time()) - 3600},
+    ])
+    def test_rejects_invalid_claims(self, verifier, private_key, overrides):
+        """Audiencia, emisor o expiración incorrectos se rechazan."""
+        with pytest.raises(FirebaseTokenError):
+            verifier.verify(self.make_token(private_key, **overrides))
+
+    def test_rejects_foreign_signature(self, verifier):
+        """Un token firmado con otra llave se rechaza."""
+        other_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+        with pytest.raises(FirebaseTokenError):
+            verifier.verify(self.make_token(other_key))
+
+    def test_rejects_unknown_kid_and_alg_none(self, verifier, private_key):
+        """Un `kid` desconocido o un token sin firma se rechazan."""
+        with pytest.raises(FirebaseTokenError):
+            verifier.verify(self.make_token(private_key, kid='kid-2'))
+
+        unsigned = jwt.encode({'sub': 'x'}, None, algorithm='none', headers={'kid': 'kid-1'})
+        with pytest.raises(FirebaseTokenError):
+            verifier.verify(unsigned)
+
+    def test_key_set_refreshes_on_expiry(self, private_key):
+        """Las llaves se descargan una vez y se refrescan al vencer su max-age."""
+        calls = []
+        clock = [1000.0]
+
+        def fetcher():
+            calls.append(clock[0])
+            return {'kid-1': _certificate_pem(private_key)}, 600
+
+        key_set = FirebaseKeySet(fetcher=fetcher, clock=lambda: clock[0])
+        verifier = FirebaseTokenVerifier(PROJECT_ID, key_set)
+        token = self.make_token(private_key)
+
+        verifier.verify(token)
+        verifier.verify(token)
+        assert len(calls) == 1
+
+        clock[0] += 601
+        verifier.verify(token)
+        assert len(calls) == 2
+
+    def test_token_user_cache_ttl(self):
+        """La caché respeta el TTL y la expiración del token."""
+        clock = [0.0]
+        cache = TokenUserCache(ttl=300, clock=lambda: clock[0])
+
+        cache.set('token-a', 'user-a')
+        cache.set('token-b', 'user-b', token_expires_at=60)
+
+        clock[0] = 100
+        assert cache.get('token-a') == 'user-a'
+        assert cache.get('token-b') is None
+
+        clock[0] = 301
+        assert cache.get('token-a') is None
+
+    def test_warm_requests_skip_verification(self, private_key):
+        """Con el token en caché no se verifica ni se resuelve el usuario de nuevo."""
+        class FailingVerifier:
+            def verify(self, token):
+                raise AssertionError('No debería verificarse un token cacheado')
+
+        cache = TokenUserCache()
+        cache.set('token', 'user')
+
+        assert authenticate_firebase_token('token', verifier=FailingVerifier(), cache=cache) == 'user'
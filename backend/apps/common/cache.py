@@ -0,0 +1,116 @@
+"""
+Caché read-through para endpoints de lectura.
+
+Cada entrada se guarda con la llave `<namespace>:<object_id>` y la versión del
+objeto (`updated_at`) junto al valor: si la versión guardada no coincide con la
+actual, la entrada se trata como fallo. Las señales de los modelos borran las
+entradas afectadas (ver `invalidate`), de modo que los cambios en objetos hijos
+(documentos, registros de ingreso) también se reflejan.
+"""
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, Tuple
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+CACHE_KEY_PREFIX = 'readcache'
+DEFAULT_TIMEOUT = 60 * 15
+
+# Cabecera con el resultado de la caché en las respuestas
+CACHE_STATUS_HEADER = 'X-Cache'
+
+# Contadores de aciertos y fallos por namespace (por proceso)
+_counters: Dict[str, Dict[str, int]] = {}
+_counters_lock = threading.Lock()
+
+
+def cache_key(namespace: str, object_id: Any) -> str:
+    return f"{CACHE_KEY_PREFIX}:{namespace}:{object_id}"
+
+
+def _version(value: Any) -> str:
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+
+def _count(namespace: str, outcome: str):
+    with _counters_lock:
+        counters = _counters.setdefault(namespace, {'hits': 0, 'misses': 0})
+        counters[outcome] += 1
+
+
+def read_through(namespace: str, object_id: Any, version: Any,
+                 compute: Callable[[], Any], timeout: int = DEFAULT_TIMEOUT) -> Tuple[Any, bool]:
+    """
+    Retorna el valor cacheado para (objeto, versión) o lo calcula y lo guarda.
+
+    Args:
+        namespace: Tipo de respuesta (p. ej. 'declaration_detail')
+        object_id: ID del objeto
+        version: `updated_at` del objeto (o cualquier valor que cambie con él)
+        compute: Función que construye el valor en caso de fallo
+
+    Returns:
+        (valor, True si vino de la caché)
+    """
+    key = cache_key(namespace, object_id)
+    current_version = _version(version)
+
+    try:
+        entry = cache.get(key)
+    except Exception as e:
+        # La caché es una optimización: si Redis no responde se calcula el valor
+        logger.warning(f"Caché no disponible leyendo {key}: {str(e)}")
+        entry = None
+
+    if entry is not None and entry.get('version') == current_version:
+        _count(namespace, 'hits')
+        return entry['value'], True
+
+    _count(namespace, 'misses')
+    value = compute()
+
+    try:
+        cache.set(key, {'version': current_version, 'value': value}, timeout)
+    except Exception as e:
+        logger.warning(f"Caché no disponible guardando {key}: {str(e)}")
+
+    return value, False
+
+
+def invalidate(namespace: str, object_ids: Iterable[Any]):
+    """Borra las entradas de un namespace para los objetos indicados"""
+    keys = [cache_key(namespace, object_id) for object_id in object_ids if object_id is not None]
+    if not keys:
+        return
+
+    try:
+        cache.delete_many(keys)
+    except Exception as e:
+        logger.warning(f"Caché no disponible invalidando {keys}: {str(e)}")
+
+
+def mark_response(response, hit: bool):
+    """Agrega la cabecera X-Cache (HIT/MISS) a la respuesta"""
+    response[CACHE_STATUS_HEADER] = 'HIT' if hit else 'MISS'
+    return response
+
+
+def get_cache_counters() -> Dict[str, Dict[str, Any]]:
+    """Aciertos, fallos y tasa de aciertos por namespace"""
+    with _counters_lock:
+        snapshot = {namespace: dict(counters) for namespace, counters in _counters.items()}
+
+    for counters in snapshot.values():
+        total = counters['hits'] + counters['misses']
+        counters['hit_rate'] = round(counters['hits'] / total, 3) if total else None
+
+    return snapshot
+
+
+def reset_cache_counters():
+    """Limpia los contadores del proceso"""
+    with _counters_lock:
+        _counters.clear()
@@ -0,0 +1,77 @@
+"""
+GET condicional (ETag / Last-Modified) para endpoints que se consultan en bucle.
+
+Los validadores se derivan de `updated_at` del objeto (que en las declaraciones
+también cambia con sus registros y documentos, ver `Declaration.touch`) o del
+último `updated_at` y la cantidad de filas de un listado, que se obtienen con
+una consulta liviana. Si el cliente ya tiene esa versión se responde 304 sin
+serializar nada.
+"""
+import hashlib
+from datetime import datetime
+from typing import Any, Callable, Iterable, Optional, Tuple
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+def _as_text(value: Any) -> str:
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+
+def build_validators(timestamps: Iterable[Optional[datetime]], *extra: Any) -> Tuple[str, Optional[datetime]]:
+    """
+    Calcula (ETag, Last-Modified) para un recurso.
+
+    Args:
+        timestamps: `updated_at` del objeto o máximos de un listado (None se ignora)
+        extra: Valores adicionales que cambian la representación (conteos,
+            parámetros de la consulta...)
+
+    Returns:
+        ETag débil (la respuesta puede ir comprimida) y la fecha más reciente
+    """
+    timestamps = list(timestamps)
+    parts = [_as_text(value) for value in timestamps] + [_as_text(value) for value in extra]
+    digest = hashlib.md5('|'.join(parts).encode('utf-8')).hexdigest()
+
+    present = [value for value in timestamps if value is not None]
+    last_modified = max(present) if present else None
+
+    return f'W/"{digest}"', last_modified
+
+
+def not_modified(request, etag: str, last_modified: Optional[datetime] = None):
+    """Respuesta 304 si el cliente ya tiene esta versión; None en otro caso"""
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None
+    )
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag: str, last_modified: Optional[datetime] = None):
+    """Agrega ETag/Last-Modified y obliga al cliente a revalidar"""
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_response(request, etag: str, last_modified: Optional[datetime], build: Callable[[], Any]):
+    """
+    Retorna 304 si nada cambió; si no, construye la respuesta con `build()` y
+    le agrega los validadores.
+    """
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        return response
+
+    response = build()
+    if 200 <= response.status_code < 300:
+        set_validators(response, etag, last_modified)
+    return response
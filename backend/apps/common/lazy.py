@@ -0,0 +1,36 @@
+"""
+Importación diferida de dependencias pesadas (pandas, numpy, openpyxl).
+
+`lazy_import('pandas')` retorna un proxy que importa el módulo en el primer
+acceso a un atributo; así los módulos que solo las usan al procesar archivos
+pueden declararlas al inicio sin que el proceso web las cargue al arrancar.
+Los atributos ya resueltos quedan en el proxy (sin costo en los accesos
+siguientes).
+
+Los módulos que anotan tipos con el proxy (p. ej. `pd.DataFrame`) deben usar
+`from __future__ import annotations` para no evaluarlos al importarse.
+"""
+import importlib
+from types import ModuleType
+
+
+class LazyModule:
+    """Proxy de un módulo que se importa en el primer uso"""
+
+    def __init__(self, name: str):
+        self.__dict__['_lazy_name'] = name
+
+    def _load(self) -> ModuleType:
+        return importlib.import_module(self.__dict__['_lazy_name'])
+
+    def __getattr__(self, attr: str):
+        value = getattr(self._load(), attr)
+        self.__dict__[attr] = value
+        return value
+
+    def __repr__(self) -> str:
+        return f"<LazyModule {self.__dict__['_lazy_name']!r}>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    return LazyModule(name)
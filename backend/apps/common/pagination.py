@@ -0,0 +1,182 @@
+"""
+Paginación por cursor (keyset) para listados grandes.
+
+A diferencia de la paginación por número de página, no usa OFFSET ni COUNT(*):
+cada página filtra por la posición del último elemento de la anterior, así que el
+costo de una página no depende de cuántas filas tenga el usuario.
+
+La condición "después de la posición" se arma para que el índice del orden pueda
+recorrerse como un rango:
+- Si todos los campos van en la misma dirección, en PostgreSQL (y SQLite) se usa
+  una comparación de filas: `(a, b, id) > (%s, %s, %s)`.
+- Con direcciones mixtas, p. ej. `(-created_at, id)`, se usa la expansión
+  `a < x OR (a = x AND b > y)` precedida de una cota sobre el primer campo
+  (`a <= x`), que es la que acota el recorrido del índice `(-created_at, id)`.
+"""
+import base64
+import binascii
+import json
+from typing import Any, List, Optional, Sequence
+
+from django.db import connections
+from django.db.models import BooleanField, Expression, F, Q, Value
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+# Motores que comparan filas completas usando el índice compuesto como rango
+ROW_VALUE_VENDORS = ('postgresql', 'sqlite')
+
+
+class RowValueComparison(Expression):
+    """`(campo1, campo2, ...) <op> (valor1, valor2, ...)` como condición de filtro"""
+    conditional = True
+    output_field = BooleanField()
+
+    def __init__(self, fields: Sequence[Any], values: Sequence[Any], operator: str):
+        super().__init__(output_field=BooleanField())
+        self.columns = [F(field.name) for field in fields]
+        self.values = [Value(value, output_field=field) for field, value in zip(fields, values)]
+        self.operator = operator
+
+    def get_source_expressions(self):
+        return self.columns + self.values
+
+    def set_source_expressions(self, expressions):
+        half = len(expressions) // 2
+        self.columns, self.values = expressions[:half], expressions[half:]
+
+    def as_sql(self, compiler, connection):
+        sql_parts = {'columns': [], 'values': []}
+        params = []
+        for side in ('columns', 'values'):
+            for expression in getattr(self, side):
+                sql, expression_params = compiler.compile(expression)
+                sql_parts[side].append(sql)
+                params.extend(expression_params)
+
+        sql = f"({', '.join(sql_parts['columns'])}) {self.operator} ({', '.join(sql_parts['values'])})"
+        return sql, params
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Codifica la posición (valores de los campos de orden) como cursor opaco"""
+    payload = json.dumps(list(values), default=str, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Decodifica un cursor; lanza NotFound si no es válido"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise NotFound('Cursor inválido')
+
+    if not isinstance(values, list):
+        raise NotFound('Cursor inválido')
+
+    return values
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginación keyset sobre un orden compuesto y estable.
+
+    El orden por defecto es `(-created_at, id)`; las vistas pueden cambiarlo con
+    el atributo `keyset_ordering`. El último campo debe ser único para que el
+    orden sea total.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering = ('-created_at', 'id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        ordering = getattr(view, 'keyset_ordering', self.ordering)
+
+        queryset = queryset.order_by(*ordering)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            position = self._to_python(queryset.model, ordering, decode_cursor(cursor))
+            queryset = queryset.filter(self._after_position(
+                queryset.model, ordering, position, connections[queryset.db].vendor
+            ))
+
+        # Una fila extra indica si existe una página siguiente
+        rows = list(queryset[:self.page_size + 1])
+        page = rows[:self.page_size]
+
+        self.next_cursor = None
+        if len(rows) > self.page_size:
+            self.next_cursor = encode_cursor(
+                getattr(page[-1], field.lstrip('-')) for field in ordering
+            )
+
+        return page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'page_size': self.page_size,
+            'results': data
+        })
+
+    def get_page_size(self, request) -> int:
+        try:
+            requested = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+
+        return max(1, min(requested, self.max_page_size))
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.next_cursor:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor
+        )
+
+    @staticmethod
+    def _to_python(model, ordering: Sequence[str], values: List[Any]) -> List[Any]:
+        """Convierte los valores del cursor al tipo de cada campo"""
+        if len(values) != len(ordering):
+            raise NotFound('Cursor inválido')
+
+        try:
+            return [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(ordering, values)
+            ]
+        except Exception:
+            raise NotFound('Cursor inválido')
+
+    @staticmethod
+    def _after_position(model, ordering: Sequence[str], position: Sequence[Any],
+                        vendor: Optional[str] = None) -> Q:
+        """
+        Condición "después de la posición" para un orden compuesto, apta para
+        recorrer el índice del orden como un rango (ver docstring del módulo).
+        """
+        descending = [field.startswith('-') for field in ordering]
+        fields = [model._meta.get_field(field.lstrip('-')) for field in ordering]
+
+        if len(set(descending)) == 1 and vendor in ROW_VALUE_VENDORS:
+            return Q(RowValueComparison(fields, position, '<' if descending[0] else '>'))
+
+        # (a > x) OR (a = x AND b > y) OR ...  respetando la dirección de cada campo
+        condition = Q()
+        equal_prefix = Q()
+        for field, is_descending, value in zip(fields, descending, position):
+            lookup = 'lt' if is_descending else 'gt'
+            condition |= equal_prefix & Q(**{f'{field.name}__{lookup}': value})
+            equal_prefix &= Q(**{field.name: value})
+
+        # Cota sobre el primer campo: el índice solo recorre desde la posición
+        first_bound = Q(**{f"{fields[0].name}__{'lte' if descending[0] else 'gte'}": position[0]})
+        return first_bound & condition
@@ -0,0 +1,177 @@
+"""
+Perfilado de solicitudes: consultas SQL, tiempo de base de datos y tiempo por
+etapa (vista, serializador, render).
+
+El perfilado se activa en tiempo de ejecución (sin reiniciar ni desplegar) con
+`set_profiling_config`, que guarda la configuración en la caché compartida; cada
+proceso la relee como máximo cada `CONFIG_REFRESH_SECONDS`. Solo se perfila una
+muestra de las solicitudes (`sample_rate`); las demás no pagan nada.
+
+Sin caché compartida (DummyCache) el cambio no llegaría a los demás procesos ni
+sobreviviría a la siguiente relectura, así que se rechaza: en ese caso la
+configuración sale solo de settings (REQUEST_PROFILING_*).
+
+Las etapas se miden con `profile_stage('serializer')` desde las vistas: fuera de
+una solicitud perfilada es un no-op.
+"""
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+
+logger = logging.getLogger(__name__)
+
+
+CONFIG_CACHE_KEY = 'request_profiling:config'
+CONFIG_REFRESH_SECONDS = 5
+
+# Perfil de la solicitud en curso (None si no se está perfilando)
+_current_profile: ContextVar[Optional['RequestProfile']] = ContextVar('request_profile', default=None)
+
+_config_lock = threading.Lock()
+_config_cache: Dict[str, Any] = {'value': None, 'loaded_at': 0.0}
+
+
+class ProfilingConfigUnavailable(Exception):
+    """La caché configurada no puede compartir la configuración entre procesos"""
+
+
+def default_profiling_config() -> Dict[str, Any]:
+    """Configuración inicial desde settings (REQUEST_PROFILING_*)"""
+    return {
+        'enabled': getattr(settings, 'REQUEST_PROFILING_ENABLED', False),
+        'sample_rate': getattr(settings, 'REQUEST_PROFILING_SAMPLE_RATE', 0.01),
+        'server_timing': getattr(settings, 'REQUEST_PROFILING_SERVER_TIMING', True),
+    }
+
+
+def get_profiling_config(refresh: bool = False) -> Dict[str, Any]:
+    """Configuración vigente (caché compartida con respaldo en settings)"""
+    now = time.monotonic()
+    with _config_lock:
+        if not refresh and _config_cache['value'] is not None \
+                and now - _config_cache['loaded_at'] < CONFIG_REFRESH_SECONDS:
+            return _config_cache['value']
+
+    config = default_profiling_config()
+    try:
+        config.update(cache.get(CONFIG_CACHE_KEY) or {})
+    except Exception as e:  # sin caché se usa la configuración de settings
+        logger.warning(f"No se pudo leer la configuración de perfilado: {str(e)}")
+
+    with _config_lock:
+        _config_cache['value'] = config
+        _config_cache['loaded_at'] = now
+    return config
+
+
+def set_profiling_config(**changes) -> Dict[str, Any]:
+    """
+    Cambia la configuración para todos los procesos (`enabled`, `sample_rate`,
+    `server_timing`) y retorna la configuración resultante.
+
+    Raises:
+        ProfilingConfigUnavailable: Si la caché es DummyCache (el cambio se perdería)
+    """
+    if isinstance(caches['default'], DummyCache):
+        raise ProfilingConfigUnavailable(
+            'Sin caché compartida la configuración no se conserva; '
+            'use REQUEST_PROFILING_ENABLED / REQUEST_PROFILING_SAMPLE_RATE en settings'
+        )
+
+    config = get_profiling_config(refresh=True)
+    config = {**config, **{key: value for key, value in changes.items() if value is not None}}
+    config['sample_rate'] = min(max(float(config['sample_rate']), 0.0), 1.0)
+
+    cache.set(CONFIG_CACHE_KEY, config, timeout=None)
+    with _config_lock:
+        _config_cache['value'] = config
+        _config_cache['loaded_at'] = time.monotonic()
+    return config
+
+
+def should_profile(request) -> bool:
+    """Decide si se perfila la solicitud (muestreo o cabecera en DEBUG)"""
+    if settings.DEBUG and request.META.get('HTTP_X_PROFILE') == '1':
+        return True
+
+    config = get_profiling_config()
+    return config['enabled'] and random.random() < config['sample_rate']
+
+
+class RequestProfile:
+    """Mediciones de una solicitud"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_ms = 0.0
+        self.stages: Dict[str, float] = {}
+        self.token = None
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        """Wrapper de `connection.execute_wrapper` que cuenta y mide las consultas"""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_ms += (time.perf_counter() - start) * 1000
+            self.queries += 1
+
+    def add_stage(self, name: str, elapsed_ms: float):
+        self.stages[name] = self.stages.get(name, 0.0) + elapsed_ms
+
+    @property
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.start) * 1000
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'queries': self.queries,
+            'db_ms': round(self.db_ms, 2),
+            **{f'{name}_ms': round(elapsed, 2) for name, elapsed in self.stages.items()},
+            'total_ms': round(self.total_ms, 2),
+        }
+
+    def server_timing(self) -> str:
+        """Valor de la cabecera Server-Timing"""
+        metrics = [f'db;dur={self.db_ms:.2f};desc="{self.queries} queries"']
+        metrics += [f'{name};dur={elapsed:.2f}' for name, elapsed in self.stages.items()]
+        metrics.append(f'total;dur={self.total_ms:.2f}')
+        return ', '.join(metrics)
+
+
+def start_profile() -> RequestProfile:
+    profile = RequestProfile()
+    profile.token = _current_profile.set(profile)
+    return profile
+
+
+def finish_profile(profile: RequestProfile):
+    _current_profile.reset(profile.token)
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _current_profile.get()
+
+
+@contextmanager
+def profile_stage(name: str):
+    """Mide una etapa de la solicitud perfilada en curso (no-op si no hay)"""
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_stage(name, (time.perf_counter() - start) * 1000)
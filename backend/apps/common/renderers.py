@@ -0,0 +1,78 @@
+"""
+Renderer y parser JSON basados en orjson.
+
+orjson serializa UUID, datetime/date y arreglos de NumPy de forma nativa y es
+varias veces más rápido que `json.dumps` en respuestas grandes (resultados de
+análisis, `processed_data`, detalles con miles de registros). Los tipos que no
+soporta (Decimal, textos lazy, QuerySets...) se convierten igual que con el
+encoder de DRF.
+"""
+from decimal import Decimal
+
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+ORJSON_OPTIONS = (
+    orjson.OPT_UTC_Z
+    | orjson.OPT_NON_STR_KEYS
+    | orjson.OPT_SERIALIZE_NUMPY
+)
+
+_drf_encoder = JSONEncoder()
+
+
+def _default(obj):
+    """Tipos que orjson no serializa por sí mismo"""
+    if isinstance(obj, Decimal):
+        # Igual que el encoder de DRF (COERCE_DECIMAL_TO_STRING aplica en los serializers)
+        return float(obj)
+    return _drf_encoder.default(obj)
+
+
+def dumps(data, indent: bool = False) -> bytes:
+    """Serializa `data` a JSON (bytes UTF-8)"""
+    options = ORJSON_OPTIONS | orjson.OPT_INDENT_2 if indent else ORJSON_OPTIONS
+    return orjson.dumps(data, default=_default, option=options)
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    Renderer JSON con orjson. Acepta `indent` en el media type
+    (`Accept: application/json; indent=2`) o en el contexto del renderer.
+    """
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        indent = renderer_context.get('indent') or self._requested_indent(accepted_media_type)
+        return dumps(data, indent=bool(indent))
+
+    @staticmethod
+    def _requested_indent(accepted_media_type):
+        if not accepted_media_type:
+            return False
+        for param in accepted_media_type.split(';')[1:]:
+            key, _, value = param.strip().partition('=')
+            if key == 'indent':
+                return value.strip() not in ('', '0')
+        return False
+
+
+class ORJSONParser(BaseParser):
+    """Parser JSON con orjson"""
+    media_type = 'application/json'
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as e:
+            raise ParseError(f'JSON inválido: {str(e)}')
@@ -0,0 +1,139 @@
+"""
+Utilidades para los tests de rendimiento de los endpoints.
+
+`measure` ejecuta una solicitud varias veces contando las consultas SQL y el
+tiempo de cada corrida; `assert_budget` falla si se supera el presupuesto de
+consultas (o el de latencia p95, si `ENFORCE_LATENCY_BUDGETS` está activo).
+Los presupuestos se fijan con volúmenes distintos de datos (`seed_declarations`)
+para que un N+1 aparezca como una diferencia en la cantidad de consultas.
+
+Las mediciones quedan en `recorded_measurements` y el conftest las imprime al
+final de la corrida de pytest.
+"""
+import statistics
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import List, Optional
+
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+DEFAULT_RUNS = 5
+
+# Mediciones de la corrida actual (para el resumen de pytest)
+recorded_measurements: List['Measurement'] = []
+
+
+@dataclass
+class Measurement:
+    """Resultado de medir un endpoint"""
+    label: str
+    status_code: int
+    query_counts: List[int] = field(default_factory=list)
+    timings_ms: List[float] = field(default_factory=list)
+    last_queries: List[str] = field(default_factory=list)
+
+    @property
+    def queries(self) -> int:
+        """Máximo de consultas entre las corridas"""
+        return max(self.query_counts) if self.query_counts else 0
+
+    @property
+    def p50_ms(self) -> float:
+        return statistics.median(self.timings_ms) if self.timings_ms else 0.0
+
+    @property
+    def p95_ms(self) -> float:
+        if len(self.timings_ms) < 2:
+            return self.timings_ms[0] if self.timings_ms else 0.0
+        return statistics.quantiles(self.timings_ms, n=20, method='inclusive')[18]
+
+
+def measure(client, url: str, method: str = 'get', runs: int = DEFAULT_RUNS,
+            label: Optional[str] = None, **kwargs) -> Measurement:
+    """
+    Ejecuta `client.<method>(url, **kwargs)` `runs` veces (más una de
+    calentamiento que no se cuenta) y registra consultas y tiempos.
+    """
+    request = getattr(client, method)
+    measurement = Measurement(label=label or f"{method.upper()} {url}", status_code=0)
+
+    request(url, **kwargs)  # calentamiento: imports, caché de URLs, etc.
+
+    for _ in range(runs):
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            response = request(url, **kwargs)
+            measurement.timings_ms.append((time.perf_counter() - start) * 1000)
+        measurement.query_counts.append(len(context.captured_queries))
+        measurement.last_queries = [query['sql'] for query in context.captured_queries]
+        measurement.status_code = response.status_code
+
+    recorded_measurements.append(measurement)
+    return measurement
+
+
+def assert_budget(measurement: Measurement, max_queries: int, max_p95_ms: Optional[float] = None):
+    """Falla si la medición supera el presupuesto de consultas o de latencia"""
+    assert measurement.queries <= max_queries, (
+        f"{measurement.label}: {measurement.queries} consultas (presupuesto {max_queries})\n"
+        + '\n'.join(measurement.last_queries)
+    )
+
+    if max_p95_ms is not None and getattr(settings, 'ENFORCE_LATENCY_BUDGETS', False):
+        assert measurement.p95_ms <= max_p95_ms, (
+            f"{measurement.label}: p95 {measurement.p95_ms:.1f} ms (presupuesto {max_p95_ms} ms)"
+        )
+
+
+def seed_declarations(user, declarations: int = 1, records: int = 0, documents: int = 0,
+                      fiscal_year: int = 2024):
+    """
+    Crea `declarations` declaraciones del usuario, cada una con `records`
+    registros de ingreso y `documents` documentos procesados.
+
+    Returns:
+        Lista de declaraciones creadas
+    """
+    from apps.declarations.models import Declaration, IncomeRecord
+    from apps.documents.models import Document
+
+    created = []
+    for index in range(declarations):
+        declaration = Declaration.objects.create(
+            user=user,
+            title=f"Declaración {fiscal_year} #{index + 1}",
+            fiscal_year=fiscal_year,
+            declaration_data={'source': 'seed'}
+        )
+        IncomeRecord.objects.bulk_create([
+            IncomeRecord(
+                declaration=declaration,
+                third_party_nit=str(800000000 + number),
+                third_party_name=f"TERCERO {number:05d} S.A.S.",
+                concept_code=str(5000 + number % 60),
+                concept_description='Pagos por salarios',
+                income_type='salary',
+                tax_schedule='labor',
+                gross_amount=Decimal('1500000.00'),
+                withholding_amount=Decimal('60000.00'),
+                period=f"{fiscal_year}-12"
+            )
+            for number in range(records)
+        ])
+        for number in range(documents):
+            Document.objects.create(
+                declaration=declaration,
+                file_name=f"exogena_{number}.xlsx",
+                original_file_name=f"exogena_{number}.xlsx",
+                file_type='exogena_report',
+                storage_path=f"users/{user.pk}/exogena_{number}.xlsx",
+                file_size=2048,
+                uploaded_by=user,
+                upload_status='processed',
+                processed_data={'success': True, 'records': [{'gross_amount': 1500000}] * 3}
+            )
+        created.append(declaration)
+    return created
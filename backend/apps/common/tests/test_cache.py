@@ -0,0 +1,186 @@
+"""
+Tests para la caché read-through (apps.common.cache) y su invalidación por señales.
+"""
+import pytest
+from django.core.cache import cache
+from django.test import override_settings
+
+from apps.common.cache import (
+    cache_key, get_cache_counters, invalidate, read_through, reset_cache_counters
+)
+from apps.common.testing import seed_declarations
+
+LOCMEM_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'read-cache-tests',
+    }
+}
+
+NAMESPACES = ('declaration_detail', 'declaration_documents', 'declaration_documents_full')
+
+
+@pytest.fixture
+def locmem_cache():
+    with override_settings(CACHES=LOCMEM_CACHE):
+        cache.clear()
+        reset_cache_counters()
+        yield cache
+        cache.clear()
+    reset_cache_counters()
+
+
+def prime(namespace, object_id):
+    """Guarda una entrada para poder verificar que se invalida"""
+    read_through(namespace, object_id, 'v1', lambda: {'id': str(object_id)})
+    assert cache.get(cache_key(namespace, object_id)) is not None
+
+
+def is_cached(namespace, object_id):
+    return cache.get(cache_key(namespace, object_id)) is not None
+
+
+class TestReadThrough:
+    """Tests para read_through e invalidate."""
+
+    def test_hit_after_miss(self, locmem_cache):
+        """La primera lectura calcula y la segunda viene de la caché."""
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {'total': 10}
+
+        first = read_through('declaration_detail', 1, 'v1', compute)
+        second = read_through('declaration_detail', 1, 'v1', compute)
+
+        assert first == ({'total': 10}, False)
+        assert second == ({'total': 10}, True)
+        assert len(calls) == 1
+        assert get_cache_counters()['declaration_detail'] == {'hits': 1, 'misses': 1, 'hit_rate': 0.5}
+
+    def test_version_mismatch_is_a_miss(self, locmem_cache):
+        """Una versión distinta recalcula y reemplaza la entrada."""
+        read_through('declaration_detail', 1, 'v1', lambda: 'viejo')
+
+        value, hit = read_through('declaration_detail', 1, 'v2', lambda: 'nuevo')
+
+        assert (value, hit) == ('nuevo', False)
+        assert read_through('declaration_detail', 1, 'v2', lambda: 'otro') == ('nuevo', True)
+        assert get_cache_counters()['declaration_detail']['misses'] == 2
+
+    def test_invalidate(self, locmem_cache):
+        """`invalidate` borra solo las entradas indicadas."""
+        prime('declaration_detail', 1)
+        prime('declaration_detail', 2)
+
+        invalidate('declaration_detail', [1, None])
+
+        assert not is_cached('declaration_detail', 1)
+        assert is_cached('declaration_detail', 2)
+
+    def test_without_cache_always_computes(self):
+        """Con DummyCache (settings de test) todo es fallo, sin errores."""
+        reset_cache_counters()
+
+        assert read_through('declaration_detail', 1, 'v1', lambda: 'a') == ('a', False)
+        assert read_through('declaration_detail', 1, 'v1', lambda: 'b') == ('b', False)
+
+
+@pytest.mark.django_db
+class TestSignalInvalidation:
+    """Guardar o eliminar declaraciones, documentos o registros borra las entradas afectadas."""
+
+    @pytest.fixture
+    def declaration(self, user, locmem_cache):
+        declaration = seed_declarations(user, records=2, documents=1)[0]
+        for namespace in NAMESPACES:
+            prime(namespace, declaration.pk)
+        return declaration
+
+    def test_declaration_save(self, declaration):
+        declaration.title = 'Nuevo título'
+        declaration.save()
+
+        assert not any(is_cached(namespace, declaration.pk) for namespace in NAMESPACES)
+
+    def test_declaration_delete(self, declaration):
+        declaration_id = declaration.pk
+        declaration.delete()
+
+        assert not any(is_cached(namespace, declaration_id) for namespace in NAMESPACES)
+
+    def test_document_save_and_delete(self, declaration):
+        document = declaration.documents.get()
+        prime('document_processed_data', document.pk)
+
+        document.file_name = 'renombrado.xlsx'
+        document.save()
+
+        assert not is_cached('document_processed_data', document.pk)
+        assert not any(is_cached(namespace, declaration.pk) for namespace in NAMESPACES)
+
+        for namespace in NAMESPACES:
+            prime(namespace, declaration.pk)
+        document.delete()
+
+        assert not any(is_cached(namespace, declaration.pk) for namespace in NAMESPACES)
+
+    def test_income_record_save_and_delete(self, declaration, django_capture_on_commit_callbacks):
+        record = declaration.income_records.first()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            record.gross_amount = 1
+            record.save()
+        assert not is_cached('declaration_detail', declaration.pk)
+
+        prime('declaration_detail', declaration.pk)
+        with django_capture_on_commit_callbacks(execute=True):
+            record.delete()
+        assert not is_cached('declaration_detail', declaration.pk)
+
+    def test_other_declarations_keep_their_entries(self, declaration, user):
+        other = seed_declarations(user)[0]
+        prime('declaration_detail', other.pk)
+
+        declaration.save()
+
+        assert is_cached('declaration_detail', other.pk)
+
+
+@pytest.mark.django_db
+class TestDetailEndpointCache:
+    """El detalle de la declaración responde MISS y luego HIT hasta que algo cambia."""
+
+    def test_miss_hit_and_invalidation(self, api_client, user, locmem_cache):
+        declaration = seed_declarations(user, records=2)[0]
+        url = f'/api/v1/declarations/{declaration.pk}/'
+
+        assert api_client.get(url)['X-Cache'] == 'MISS'
+        assert api_client.get(url)['X-Cache'] == 'HIT'
+
+        record = declaration.income_records.first()
+        record.gross_amount = 1
+        record.save()
+
+        response = api_client.get(url)
+        assert response['X-Cache'] == 'MISS'
+        assert api_client.get(url)['X-Cache'] == 'HIT'
+
+    def test_etag_follows_child_changes(self, api_client, user):
+        """El ETag sale solo de `updated_at`, que cambia con registros y documentos."""
+        declaration = seed_declarations(user, records=2, documents=1)[0]
+        url = f'/api/v1/declarations/{declaration.pk}/'
+        etag = api_client.get(url)['ETag']
+
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        declaration.income_records.first().delete()
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        etag = response['ETag']
+
+        document = declaration.documents.get()
+        document.file_name = 'renombrado.xlsx'
+        document.save()
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
@@ -0,0 +1,33 @@
+"""
+Tests para la negociación de compresión de respuestas.
+"""
+import gzip
+
+import pytest
+
+from config.middleware import compression
+from config.middleware.compression import choose_encoding, compress
+
+
+class TestCompressionNegotiation:
+    """Tests para la elección de codificación según Accept-Encoding."""
+
+    def test_gzip_when_brotli_unavailable(self, monkeypatch):
+        """Sin brotli instalado se usa gzip aunque el cliente acepte br."""
+        monkeypatch.setattr(compression, 'brotli', None)
+
+        assert choose_encoding('gzip, deflate, br') == 'gzip'
+
+    @pytest.mark.parametrize('header', ['', 'identity', 'gzip;q=0', 'deflate'])
+    def test_no_encoding(self, header):
+        """Sin una codificación aceptada la respuesta va sin comprimir."""
+        assert choose_encoding(header) is None
+
+    def test_wildcard_and_roundtrip(self):
+        """`*` habilita la compresión y el contenido se recupera intacto."""
+        encoding = choose_encoding('*')
+        content = b'{"records": []}' * 100
+
+        assert encoding in ('br', 'gzip')
+        if encoding == 'gzip':
+            assert gzip.decompress(compress(content, encoding)) == content
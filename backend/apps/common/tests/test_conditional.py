@@ -0,0 +1,39 @@
+"""
+Tests para los validadores de GET condicional.
+"""
+from datetime import datetime, timezone
+
+from apps.common.conditional import build_validators
+
+
+class TestBuildValidators:
+    """Tests para el cálculo de ETag y Last-Modified."""
+
+    def test_same_state_same_etag(self):
+        """La misma versión produce el mismo ETag débil."""
+        updated_at = datetime(2024, 5, 1, 10, 0, tzinfo=timezone.utc)
+
+        etag, last_modified = build_validators([updated_at, None], 3)
+
+        assert etag.startswith('W/"')
+        assert etag == build_validators([updated_at, None], 3)[0]
+        assert last_modified == updated_at
+
+    def test_child_changes_change_etag(self):
+        """Un hijo más reciente o una cantidad distinta cambian el ETag."""
+        parent = datetime(2024, 5, 1, 10, 0, tzinfo=timezone.utc)
+        child = datetime(2024, 5, 2, 8, 30, tzinfo=timezone.utc)
+
+        base_etag, _ = build_validators([parent, None], 0)
+        child_etag, last_modified = build_validators([parent, child], 1)
+        deleted_etag, _ = build_validators([parent, child], 0)
+
+        assert len({base_etag, child_etag, deleted_etag}) == 3
+        assert last_modified == child
+
+    def test_without_timestamps(self):
+        """Sin fechas no hay Last-Modified pero sí ETag."""
+        etag, last_modified = build_validators([None], 0)
+
+        assert etag
+        assert last_modified is None
@@ -0,0 +1,177 @@
+"""
+Tests para la exportación en streaming (apps.common.exports) y los endpoints
+que la usan.
+"""
+import csv
+import io
+import uuid
+from decimal import Decimal
+
+import pytest
+from openpyxl import load_workbook
+
+from apps.common.exports import iter_csv, iter_xlsx
+from apps.common.testing import seed_declarations
+from apps.declarations.models import IncomeRecord
+
+
+def read_csv(chunks):
+    content = ''.join(chunks)
+    assert content.startswith('\ufeff')
+    return list(csv.reader(io.StringIO(content[1:])))
+
+
+def read_xlsx(chunks):
+    workbook = load_workbook(io.BytesIO(b''.join(chunks)), read_only=True)
+    sheet = workbook.worksheets[0]
+    return sheet.title, [list(row) for row in sheet.iter_rows(values_only=True)]
+
+
+def streamed(response):
+    """Contenido de una StreamingHttpResponse, bloque por bloque"""
+    assert response.streaming
+    return [chunk.decode('utf-8') if response['Content-Type'].startswith('text/csv') else chunk
+            for chunk in response.streaming_content]
+
+
+class TestIterators:
+    """Tests para iter_csv e iter_xlsx."""
+
+    def test_csv_header_and_rows(self):
+        """Una línea por fila, con BOM y escape de comas y comillas."""
+        rows = [(1, 'EMPRESA, S.A.S.', Decimal('1500.50')), (2, 'Dice "hola"', None)]
+
+        chunks = list(iter_csv(['ID', 'Nombre', 'Valor'], iter(rows)))
+
+        assert len(chunks) == 3
+        assert read_csv(chunks) == [
+            ['ID', 'Nombre', 'Valor'],
+            ['1', 'EMPRESA, S.A.S.', '1500.50'],
+            ['2', 'Dice "hola"', ''],
+        ]
+
+    def test_csv_consumes_rows_lazily(self):
+        """Las filas se leen a medida que se pide el contenido."""
+        consumed = []
+
+        def rows():
+            for number in range(3):
+                consumed.append(number)
+                yield (number,)
+
+        chunks = iter_csv(['n'], rows())
+        next(chunks)
+        next(chunks)
+
+        assert consumed == [0]
+
+    def test_xlsx_header_and_rows(self):
+        """El libro tiene el encabezado, las filas y el nombre de hoja (máx. 31)."""
+        rows = ((number, f'TERCERO {number}', number * 1.5) for number in range(250))
+
+        title, values = read_xlsx(list(iter_xlsx(['ID', 'Nombre', 'Valor'], rows, sheet_title='R' * 40)))
+
+        assert title == 'R' * 31
+        assert values[0] == ['ID', 'Nombre', 'Valor']
+        assert len(values) == 251
+        assert values[-1] == [249, 'TERCERO 249', 373.5]
+
+
+@pytest.mark.django_db
+class TestIncomeRecordExport:
+    """Tests para IncomeRecordViewSet.export."""
+
+    @pytest.fixture
+    def declaration(self, user):
+        declaration = seed_declarations(user, records=5)[0]
+        IncomeRecord.objects.filter(third_party_nit='800000004').update(
+            income_type='interest', tax_schedule='capital', gross_amount=Decimal('99.00')
+        )
+        return declaration
+
+    def url(self, declaration, query=''):
+        return f'/api/v1/declarations/{declaration.id}/income-records/export/{query}'
+
+    def test_csv(self, api_client, declaration):
+        response = api_client.get(self.url(declaration))
+
+        assert response.status_code == 200
+        assert response['Content-Disposition'] == (
+            f'attachment; filename="registros_ingresos_{declaration.id}.csv"'
+        )
+        rows = read_csv(streamed(response))
+        assert rows[0][:3] == ['ID', 'NIT tercero', 'Nombre tercero']
+        assert len(rows) == 6
+        assert [row[1] for row in rows[1:]] == [str(800000000 + number) for number in range(5)]
+
+    def test_xlsx(self, api_client, declaration):
+        response = api_client.get(self.url(declaration, '?file_format=xlsx'))
+
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('application/vnd.openxmlformats')
+        title, values = read_xlsx(streamed(response))
+        assert title == 'Registros de ingresos'
+        assert values[0][-1] == 'Deducible'
+        assert len(values) == 6
+
+    def test_filters_apply(self, api_client, declaration):
+        """La exportación usa los mismos filtros que el listado."""
+        rows = read_csv(streamed(api_client.get(self.url(declaration, '?income_type=interest'))))
+        assert [row[1] for row in rows[1:]] == ['800000004']
+
+        rows = read_csv(streamed(api_client.get(self.url(declaration, '?min_amount=1000'))))
+        assert len(rows) == 5
+
+    def test_invalid_format(self, api_client, declaration):
+        response = api_client.get(self.url(declaration, '?file_format=pdf'))
+
+        assert response.status_code == 400
+        assert 'file_format' in response.json()
+
+
+@pytest.mark.django_db
+class TestAnalysisSessionExport:
+    """Tests para export_analysis_session."""
+
+    @pytest.fixture
+    def session(self, user):
+        from apps.fiscal.models import FiscalAnalysisSession
+
+        records = [
+            {'third_party_nit': '900123456', 'gross_amount': 1000, 'details': {'mes': 1}},
+            {'third_party_nit': '800555111', 'gross_amount': 2000, 'extra': 'x'},
+        ]
+        return FiscalAnalysisSession.objects.create(
+            user=user, session_id=uuid.uuid4(), status='completed',
+            analysis_results={'parser_results': {'records': records}}
+        )
+
+    def test_csv(self, api_client, session):
+        response = api_client.get(f'/api/v1/fiscal/sessions/{session.session_id}/export/')
+
+        assert response.status_code == 200
+        rows = read_csv(streamed(response))
+        # Columnas en orden de aparición, valores anidados como JSON
+        assert rows == [
+            ['record_index', 'third_party_nit', 'gross_amount', 'details', 'extra'],
+            ['0', '900123456', '1000', '{"mes": 1}', ''],
+            ['1', '800555111', '2000', '', 'x'],
+        ]
+
+    def test_xlsx(self, api_client, session):
+        response = api_client.get(f'/api/v1/fiscal/sessions/{session.session_id}/export/?file_format=xlsx')
+
+        title, values = read_xlsx(streamed(response))
+        assert title == 'Registros analizados'
+        assert values[1][:3] == [0, '900123456', 1000]
+
+    def test_other_users_session(self, api_client, session, django_user_model):
+        stranger = django_user_model.objects.create_user(
+            username='otro', email='otro@example.com', password='clave-segura-123'
+        )
+        session.user = stranger
+        session.save()
+
+        response = api_client.get(f'/api/v1/fiscal/sessions/{session.session_id}/export/')
+
+        assert response.status_code == 404
@@ -0,0 +1,75 @@
+"""
+Tests para la paginación keyset (apps.common.pagination).
+"""
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.common.pagination import KeysetPagination
+from apps.common.testing import seed_declarations
+from apps.declarations.models import Declaration, IncomeRecord
+
+
+def collect_pages(client, url):
+    """Sigue `next` hasta el final y retorna los IDs y las consultas de cada página"""
+    ids, queries = [], []
+    while url:
+        with CaptureQueriesContext(connection) as context:
+            data = client.get(url).json()
+        ids.extend(item['id'] for item in data['results'])
+        queries.append([query['sql'] for query in context.captured_queries])
+        url = data['next']
+    return ids, queries
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+    """Recorrer todas las páginas devuelve cada fila una vez y en orden."""
+
+    def test_same_direction_uses_row_value_comparison(self, api_client, user):
+        """Registros (third_party_name, concept_code, id): comparación de filas."""
+        declaration = seed_declarations(user, records=45)[0]
+        # Empates en nombre y código para que decida el ID
+        IncomeRecord.objects.filter(third_party_nit__endswith='1').update(
+            third_party_name='EMPATE', concept_code='5001'
+        )
+
+        ids, queries = collect_pages(
+            api_client, f'/api/v1/declarations/{declaration.id}/income-records/?page_size=10'
+        )
+
+        expected = list(IncomeRecord.objects.filter(declaration=declaration).order_by(
+            'third_party_name', 'concept_code', 'id'
+        ).values_list('id', flat=True))
+        assert ids == expected
+        page_two = ' '.join(queries[1])
+        assert '("declarations_incomerecord"."third_party_name", ' in page_two
+        assert ') > (' in page_two
+
+    def test_mixed_direction_bounds_first_field(self, api_client, user):
+        """Declaraciones (-created_at, id): cota sobre created_at más la expansión."""
+        declarations = seed_declarations(user, declarations=25)
+        # Varias declaraciones con el mismo created_at
+        same_time = timezone.now() - timedelta(days=1)
+        Declaration.objects.filter(pk__in=[d.pk for d in declarations[5:12]]).update(created_at=same_time)
+
+        ids, queries = collect_pages(api_client, '/api/v1/declarations/?page_size=4')
+
+        expected = list(Declaration.objects.order_by('-created_at', 'id').values_list('id', flat=True))
+        assert ids == expected
+        page_two = ' '.join(queries[1])
+        assert '"declarations_declaration"."created_at" <= ' in page_two
+
+    def test_fallback_expansion(self, user):
+        """Sin comparación de filas se usa la expansión con OR (otros motores)."""
+        declarations = seed_declarations(user, declarations=6)
+        ordering = ('fiscal_year', 'id')
+        position = [2024, declarations[2].id]
+
+        condition = KeysetPagination._after_position(Declaration, ordering, position, vendor='oracle')
+
+        after = list(Declaration.objects.filter(condition).order_by(*ordering).values_list('id', flat=True))
+        assert after == [declaration.id for declaration in declarations[3:]]
@@ -0,0 +1,119 @@
+"""
+Tests para el perfilado de solicitudes (middleware y configuración en caliente).
+"""
+import logging
+
+import pytest
+from django.test import override_settings
+
+from apps.common.profiling import ProfilingConfigUnavailable, get_profiling_config, set_profiling_config
+from apps.common.testing import seed_declarations
+
+LOCMEM_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'profiling-tests',
+    }
+}
+
+
+@pytest.fixture(autouse=True)
+def shared_cache():
+    """La configuración en caliente necesita una caché real (los settings de test usan DummyCache)"""
+    with override_settings(CACHES=LOCMEM_CACHE):
+        yield
+
+
+@pytest.fixture
+def profiling():
+    """Perfila todas las solicitudes y restaura la configuración al terminar"""
+    set_profiling_config(enabled=True, sample_rate=1.0, server_timing=True)
+    yield
+    set_profiling_config(enabled=False, sample_rate=0.01)
+
+
+@pytest.mark.django_db
+class TestRequestProfilingMiddleware:
+    """Tests para las mediciones por solicitud."""
+
+    def test_profiled_request(self, api_client, user, profiling, caplog):
+        """La respuesta trae Server-Timing y queda un evento estructurado."""
+        seed_declarations(user, declarations=3)
+
+        with caplog.at_level(logging.INFO, logger='apps.common.profiling'):
+            response = api_client.get('/api/v1/declarations/')
+
+        assert response.status_code == 200
+        server_timing = response['Server-Timing']
+        for metric in ('db;dur=', 'view;dur=', 'serializer;dur=', 'render;dur=', 'total;dur='):
+            assert metric in server_timing
+        assert 'desc="1 queries"' in server_timing
+
+        events = [record.getMessage() for record in caplog.records if 'request_profile' in record.getMessage()]
+        assert len(events) == 1
+        assert '"view": "declarations:declaration-list"' in events[0]
+        assert '"queries": 1' in events[0]
+
+    def test_disabled(self, api_client, user):
+        """Sin perfilado activo no se agregan cabeceras."""
+        set_profiling_config(enabled=False)
+
+        response = api_client.get('/api/v1/declarations/')
+
+        assert response.status_code == 200
+        assert not response.has_header('Server-Timing')
+
+    def test_server_timing_off(self, api_client, user, profiling):
+        """Se puede perfilar solo hacia el log."""
+        set_profiling_config(server_timing=False)
+
+        response = api_client.get('/api/v1/declarations/')
+
+        assert not response.has_header('Server-Timing')
+
+
+@pytest.mark.django_db
+class TestProfilingConfigEndpoint:
+    """Tests para el cambio de configuración en caliente."""
+
+    URL = '/api/v1/common/ops/profiling/'
+
+    def test_requires_admin(self, api_client):
+        assert api_client.post(self.URL, {'enabled': True}, format='json').status_code == 403
+
+    def test_update(self, api_client, user):
+        user.is_staff = True
+        user.save()
+
+        response = api_client.post(self.URL, {'enabled': True, 'sample_rate': 5}, format='json')
+
+        assert response.status_code == 200
+        assert response.json()['config']['enabled'] is True
+        assert response.json()['config']['sample_rate'] == 1.0
+        assert get_profiling_config()['enabled'] is True
+
+        set_profiling_config(enabled=False, sample_rate=0.01)
+
+    def test_invalid_sample_rate(self, api_client, user):
+        user.is_staff = True
+        user.save()
+
+        response = api_client.post(self.URL, {'sample_rate': 'mucho'}, format='json')
+
+        assert response.status_code == 400
+        assert 'error' in response.json()
+
+    def test_rejected_without_shared_cache(self, api_client, user):
+        """Con DummyCache el cambio se perdería: se rechaza y sigue la configuración de settings."""
+        user.is_staff = True
+        user.save()
+
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}):
+            with pytest.raises(ProfilingConfigUnavailable):
+                set_profiling_config(enabled=True)
+
+            response = api_client.post(self.URL, {'enabled': True}, format='json')
+
+            assert response.status_code == 409
+            assert 'REQUEST_PROFILING_ENABLED' in response.json()['error']
+            assert get_profiling_config(refresh=True)['enabled'] is False
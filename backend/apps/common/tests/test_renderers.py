@@ -0,0 +1,92 @@
+"""
+Tests para el renderer y el parser JSON basados en orjson.
+"""
+import datetime
+import io
+import json
+import uuid
+from decimal import Decimal
+
+import pytest
+from rest_framework.exceptions import ParseError
+
+from apps.common.renderers import ORJSONParser, ORJSONRenderer
+
+
+def render(data, **kwargs):
+    return ORJSONRenderer().render(data, **kwargs)
+
+
+def parse(content: bytes):
+    return ORJSONParser().parse(io.BytesIO(content))
+
+
+class TestORJSONRenderer:
+    """Tests para ORJSONRenderer."""
+
+    def test_decimal_as_number(self):
+        """Decimal se serializa como número, igual que el encoder de DRF."""
+        assert render({'amount': Decimal('1234.50')}) == b'{"amount":1234.5}'
+
+    def test_uuid(self):
+        value = uuid.UUID('12345678-1234-5678-1234-567812345678')
+
+        assert render({'id': value}) == b'{"id":"12345678-1234-5678-1234-567812345678"}'
+
+    def test_datetime_and_date(self):
+        """Fechas en ISO 8601; las horas en UTC terminan en Z."""
+        data = {
+            'created_at': datetime.datetime(2024, 3, 1, 12, 30, tzinfo=datetime.timezone.utc),
+            'due_date': datetime.date(2024, 4, 15),
+        }
+
+        assert json.loads(render(data)) == {'created_at': '2024-03-01T12:30:00Z', 'due_date': '2024-04-15'}
+
+    def test_non_ascii_round_trip(self):
+        """Los textos no ASCII se escriben en UTF-8 sin escapar y se leen intactos."""
+        data = {'concepto': 'Retención en la fuente — año gravable ñandú 💰'}
+
+        content = render(data)
+
+        assert 'ñandú'.encode('utf-8') in content
+        assert parse(content) == data
+
+    def test_indent_from_media_type(self):
+        assert render({'a': 1}, accepted_media_type='application/json; indent=2') == b'{\n  "a": 1\n}'
+        assert render({'a': 1}, accepted_media_type='application/json; indent=0') == b'{"a":1}'
+
+    def test_none_renders_empty_body(self):
+        assert render(None) == b''
+
+
+class TestORJSONParser:
+    """Tests para ORJSONParser."""
+
+    def test_parses_json(self):
+        assert parse(b'{"ids": [1, 2], "active": true}') == {'ids': [1, 2], 'active': True}
+
+    @pytest.mark.parametrize('content', [b'{"a": ', b'{a: 1}', b'', b'\xff\xfe'])
+    def test_malformed_json_raises_parse_error(self, content):
+        with pytest.raises(ParseError, match='JSON inválido'):
+            parse(content)
+
+    @pytest.mark.django_db
+    def test_malformed_json_is_400(self, api_client):
+        """Un cuerpo JSON inválido responde 400 con el mensaje del parser."""
+        response = api_client.post(
+            '/api/v1/declarations/bulk-action/', data=b'{"action": ', content_type='application/json'
+        )
+
+        assert response.status_code == 400
+        assert response.json()['detail'].startswith('JSON inválido')
+
+    @pytest.mark.django_db
+    def test_malformed_json_in_function_view_is_400(self, api_client):
+        """Las vistas que capturan sus errores no convierten el ParseError en 500."""
+        response = api_client.post(
+            '/api/v1/fiscal/simulate-deductions/', data=b'{"deductions": ', content_type='application/json'
+        )
+
+        assert response.status_code == 400
+        assert response.json()['success'] is False
+        assert response.json()['error'].startswith('JSON inválido')
@@ -0,0 +1,43 @@
+"""
+Tests para el arranque liviano del proceso web.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from apps.common.lazy import lazy_import
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+
+
+class TestLazyImport:
+    """Tests para el proxy de importación diferida."""
+
+    def test_resolves_and_caches_attributes(self):
+        json_module = lazy_import('json')
+
+        assert json_module.dumps({'a': 1}) == '{"a": 1}'
+        assert 'dumps' in vars(json_module)
+
+
+class TestStartupImports:
+    """El URLconf completo no carga las dependencias de procesamiento de archivos."""
+
+    def test_heavy_modules_not_loaded(self):
+        code = (
+            "import contextlib, io, sys\n"
+            "with contextlib.redirect_stdout(io.StringIO()):\n"
+            "    import django\n"
+            "    django.setup()\n"
+            "    from django.urls import get_resolver\n"
+            "    get_resolver().url_patterns\n"
+            "print(','.join(name for name in ('pandas', 'numpy', 'openpyxl', 'xlrd') if name in sys.modules))\n"
+        )
+
+        result = subprocess.run(
+            [sys.executable, '-c', code], capture_output=True, text=True, check=True, cwd=BACKEND_DIR,
+            env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'config.settings.test'}
+        )
+
+        assert result.stdout.strip() == ''
@@ -2,8 +2,14 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
+from . import views
+
+app_name = 'common'
+
 router = DefaultRouter()
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('ops/cache-metrics/', views.cache_metrics, name='cache_metrics'),
+    path('ops/profiling/', views.profiling_config, name='profiling_config'),
 ]
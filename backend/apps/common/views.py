@@ -1,4 +1,85 @@
-# common views
-from rest_framework import viewsets
+"""
+Vistas comunes de operación.
+"""
+import logging
 
-# Create your views here.
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def cache_metrics(request):
+    """
+    Aciertos y fallos de la caché read-through (proceso actual)
+    
+    GET /api/v1/common/ops/cache-metrics/
+    """
+    try:
+        from .cache import get_cache_counters
+        
+        return Response({
+            'success': True,
+            'metrics': get_cache_counters()
+        }, status=status.HTTP_200_OK)
+        
+    except Exception as e:
+        logger.error(f"Error obteniendo métricas de caché: {str(e)}")
+        return Response({
+            'success': False,
+            'error': f'Error obteniendo métricas: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAdminUser])
+def profiling_config(request):
+    """
+    Consulta o cambia en caliente el perfilado de solicitudes
+    
+    GET  /api/v1/common/ops/profiling/
+    POST /api/v1/common/ops/profiling/
+    {"enabled": true, "sample_rate": 0.05, "server_timing": true}
+    
+    Sin caché compartida (DummyCache) el cambio se rechaza con 409.
+    """
+    from .profiling import ProfilingConfigUnavailable, get_profiling_config, set_profiling_config
+    
+    if request.method == 'GET':
+        return Response({
+            'success': True,
+            'config': get_profiling_config(refresh=True)
+        }, status=status.HTTP_200_OK)
+    
+    changes = {}
+    for flag in ('enabled', 'server_timing'):
+        if flag in request.data:
+            changes[flag] = str(request.data[flag]).lower() in ('1', 'true', 'yes')
+    
+    if 'sample_rate' in request.data:
+        try:
+            changes['sample_rate'] = float(request.data['sample_rate'])
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'sample_rate debe ser un número entre 0 y 1'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    
+    try:
+        config = set_profiling_config(**changes)
+    except ProfilingConfigUnavailable as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_409_CONFLICT
+        )
+    
+    logger.info(f"Perfilado de solicitudes actualizado: {config}")
+    
+    return Response({
+        'success': True,
+        'config': config
+    }, status=status.HTTP_200_OK)
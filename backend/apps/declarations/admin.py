@@ -5,7 +5,7 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
 from django.db.models import Count, Sum
-from .models import Declaration, IncomeRecord
+from .models import Declaration, DeclarationStats, IncomeRecord
 
 
 @admin.register(Declaration)
@@ -244,6 +244,16 @@ class IncomeRecordAdmin(admin.ModelAdmin):
         qs = super().get_queryset(request)
         return qs.select_related('declaration', 'declaration__user')
     
+    def delete_queryset(self, request, queryset):
+        """
+        Borrado en lote: un DELETE directo y una sola notificación por declaración.
+        """
+        from .signals import income_records_changed
+        
+        declaration_ids = set(queryset.values_list('declaration_id', flat=True))
+        queryset.delete()
+        income_records_changed.send(sender=IncomeRecord, declaration_ids=declaration_ids)
+    
     def declaration_link(self, obj):
         """Link a la declaración."""
         url = reverse('admin:declarations_declaration_change', args=[obj.declaration.id])
@@ -309,3 +319,47 @@ class IncomeRecordAdmin(admin.ModelAdmin):
         return f"${obj.withholding_amount:,.0f}"
     withholding_amount_formatted.short_description = 'Retención'
     withholding_amount_formatted.admin_order_field = 'withholding_amount'
+
+
+@admin.register(DeclarationStats)
+class DeclarationStatsAdmin(admin.ModelAdmin):
+    """
+    Admin para estadísticas materializadas (solo lectura).
+    """
+    list_display = [
+        'user',
+        'total_declarations',
+        'completed_declarations',
+        'draft_declarations',
+        'updated_at'
+    ]
+    search_fields = ['user__email']
+    raw_id_fields = ['user', 'last_declaration']
+    list_select_related = ['user']
+    readonly_fields = [
+        'total_declarations',
+        'completed_declarations',
+        'draft_declarations',
+        'declarations_by_year',
+        'declarations_by_status',
+        'total_income_all',
+        'total_withholdings_all',
+        'last_declaration',
+        'updated_at'
+    ]
+    
+    actions = ['recalculate_stats']
+    
+    def recalculate_stats(self, request, queryset):
+        """Recalcula desde cero las estadísticas seleccionadas (reparación)."""
+        count = 0
+        for user_id in queryset.values_list('user_id', flat=True):
+            DeclarationStats.refresh_for_user(user_id)
+            count += 1
+        
+        self.message_user(
+            request,
+            f'{count} estadística(s) recalculada(s).'
+        )
+    
+    recalculate_stats.short_description = "Recalcular estadísticas"
@@ -0,0 +1,105 @@
+"""
+Archivo de registros de ingreso de años cerrados.
+
+Los registros de las declaraciones completadas o pagadas de años anteriores se
+mueven de `IncomeRecord` a `ArchivedIncomeRecord` con un INSERT ... SELECT y un
+DELETE en la misma transacción (SQL estándar: funciona en PostgreSQL y en el
+SQLite de desarrollo). Así las consultas del año en curso recorren una tabla
+que solo contiene los años abiertos.
+"""
+import logging
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import AbstractIncomeRecord, ArchivedIncomeRecord, Declaration, IncomeRecord
+
+logger = logging.getLogger(__name__)
+
+
+def _record_columns():
+    """Columnas comunes de ambas tablas (ID y declaración incluidos)"""
+    return ['id', 'declaration_id'] + [field.column for field in AbstractIncomeRecord._meta.concrete_fields]
+
+
+def archivable_declarations(before_year: int):
+    """Declaraciones cerradas anteriores a `before_year` con registros sin archivar"""
+    return Declaration.objects.filter(
+        fiscal_year__lt=before_year,
+        status__in=Declaration.CLOSED_STATUSES,
+        records_archived=False
+    ).order_by('fiscal_year', 'id')
+
+
+def archive_declaration_records(declaration_id) -> int:
+    """
+    Mueve los registros de una declaración a la tabla de archivo.
+
+    Returns:
+        Cantidad de registros movidos (0 si ya estaban archivados)
+    """
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(column) for column in _record_columns())
+    hot_table = quote(IncomeRecord._meta.db_table)
+    archive_table = quote(ArchivedIncomeRecord._meta.db_table)
+
+    with transaction.atomic():
+        declaration = Declaration.objects.select_for_update().filter(
+            pk=declaration_id, records_archived=False
+        ).only('id', 'fiscal_year').first()
+        if declaration is None:
+            return 0
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {archive_table} ({columns}, {quote('fiscal_year')}, {quote('archived_at')}) "
+                f"SELECT {columns}, %s, %s FROM {hot_table} WHERE {quote('declaration_id')} = %s",
+                [declaration.fiscal_year, timezone.now(), declaration.pk]
+            )
+            moved = cursor.rowcount
+            cursor.execute(
+                f"DELETE FROM {hot_table} WHERE {quote('declaration_id')} = %s",
+                [declaration.pk]
+            )
+
+        Declaration.objects.filter(pk=declaration.pk).update(records_archived=True, updated_at=timezone.now())
+
+    logger.info(f"Archivados {moved} registros de la declaración {declaration_id}")
+    return moved
+
+
+def restore_declaration_records(declaration_id) -> int:
+    """
+    Devuelve los registros archivados de una declaración a la tabla activa.
+
+    Returns:
+        Cantidad de registros restaurados (0 si no estaban archivados)
+    """
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(column) for column in _record_columns())
+    hot_table = quote(IncomeRecord._meta.db_table)
+    archive_table = quote(ArchivedIncomeRecord._meta.db_table)
+
+    with transaction.atomic():
+        declaration = Declaration.objects.select_for_update().filter(
+            pk=declaration_id, records_archived=True
+        ).only('id').first()
+        if declaration is None:
+            return 0
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {hot_table} ({columns}) "
+                f"SELECT {columns} FROM {archive_table} WHERE {quote('declaration_id')} = %s",
+                [declaration.pk]
+            )
+            restored = cursor.rowcount
+            cursor.execute(
+                f"DELETE FROM {archive_table} WHERE {quote('declaration_id')} = %s",
+                [declaration.pk]
+            )
+
+        Declaration.objects.filter(pk=declaration.pk).update(records_archived=False, updated_at=timezone.now())
+
+    logger.info(f"Restaurados {restored} registros de la declaración {declaration_id}")
+    return restored
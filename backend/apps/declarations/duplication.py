@@ -0,0 +1,125 @@
+"""
+Copia en bloque de los datos de una declaración (usada por `Declaration.duplicate`).
+
+En PostgreSQL los registros de ingreso y los resultados procesados se copian
+con INSERT ... SELECT, sin pasar las filas por Python; en otros motores (el
+SQLite de desarrollo) se usa `bulk_create` por lotes. Los documentos copiados
+apuntan al mismo archivo en el storage (`storage_path`): no se vuelve a subir
+nada.
+"""
+import uuid
+
+from django.db import connection
+from django.utils import timezone
+
+from .models import AbstractIncomeRecord, IncomeRecord
+
+COPY_BATCH_SIZE = 2000
+
+# Campos de un registro que se copian tal cual (las fechas se renuevan)
+RECORD_COPY_FIELDS = [
+    field.attname for field in AbstractIncomeRecord._meta.concrete_fields
+    if field.name not in ('created_at', 'updated_at')
+]
+
+# Campos de un documento que no se copian
+DOCUMENT_SKIP_FIELDS = ('id', 'declaration', 'created_at', 'updated_at')
+
+
+def supports_insert_select() -> bool:
+    """INSERT ... SELECT con parámetros para el motor actual"""
+    return connection.vendor == 'postgresql'
+
+
+def copy_income_records(source, target) -> int:
+    """
+    Copia los registros de ingreso de `source` (activos o archivados) a la
+    tabla activa para `target`.
+
+    Returns:
+        Cantidad de registros copiados
+    """
+    source_records = source.get_income_records()
+
+    if supports_insert_select():
+        quote = connection.ops.quote_name
+        columns = [IncomeRecord._meta.get_field(name).column for name in RECORD_COPY_FIELDS]
+        column_list = ', '.join(quote(column) for column in columns)
+        now = timezone.now()
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {quote(IncomeRecord._meta.db_table)} "
+                f"({quote('declaration_id')}, {column_list}, {quote('created_at')}, {quote('updated_at')}) "
+                f"SELECT %s, {column_list}, %s, %s FROM {quote(source_records.model._meta.db_table)} "
+                f"WHERE {quote('declaration_id')} = %s ORDER BY {quote('id')}",
+                [target.pk, now, now, source.pk]
+            )
+            return cursor.rowcount
+
+    copied = 0
+    batch = []
+    rows = source_records.order_by('id').values_list(*RECORD_COPY_FIELDS).iterator(chunk_size=COPY_BATCH_SIZE)
+    for row in rows:
+        batch.append(IncomeRecord(declaration_id=target.pk, **dict(zip(RECORD_COPY_FIELDS, row))))
+        if len(batch) >= COPY_BATCH_SIZE:
+            IncomeRecord.objects.bulk_create(batch)
+            copied += len(batch)
+            batch = []
+
+    if batch:
+        IncomeRecord.objects.bulk_create(batch)
+        copied += len(batch)
+
+    return copied
+
+
+def copy_documents(source, target) -> int:
+    """
+    Copia las referencias de los documentos activos de `source` a `target`.
+
+    Los documentos nuevos comparten `storage_path` con los originales y
+    conservan su resultado procesado (copiado en la base, no reprocesado).
+
+    Returns:
+        Cantidad de documentos copiados
+    """
+    from apps.documents.models import Document, DocumentProcessedData
+
+    copy_fields = [
+        field.attname for field in Document._meta.concrete_fields
+        if field.name not in DOCUMENT_SKIP_FIELDS
+    ]
+
+    id_map = {}
+    new_documents = []
+    for row in Document.objects.filter(declaration=source, is_active=True).values('id', *copy_fields):
+        new_id = uuid.uuid4()
+        id_map[row.pop('id')] = new_id
+        new_documents.append(Document(id=new_id, declaration_id=target.pk, **row))
+
+    if not new_documents:
+        return 0
+
+    Document.objects.bulk_create(new_documents)
+
+    # Resultados procesados: se copian en la base sin cargarlos en memoria (PostgreSQL)
+    payloads = DocumentProcessedData.objects.filter(document_id__in=id_map)
+    if supports_insert_select():
+        quote = connection.ops.quote_name
+        table = quote(DocumentProcessedData._meta.db_table)
+        now = timezone.now()
+        with connection.cursor() as cursor:
+            for source_id in payloads.values_list('document_id', flat=True):
+                cursor.execute(
+                    f"INSERT INTO {table} ({quote('document_id')}, {quote('data')}, {quote('updated_at')}) "
+                    f"SELECT %s, {quote('data')}, %s FROM {table} WHERE {quote('document_id')} = %s",
+                    [id_map[source_id], now, source_id]
+                )
+    else:
+        DocumentProcessedData.objects.bulk_create([
+            DocumentProcessedData(document_id=id_map[source_id], data=data)
+            for source_id, data in payloads.values_list('document_id', 'data').iterator(chunk_size=50)
+        ])
+
+    return len(new_documents)
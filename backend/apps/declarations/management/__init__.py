@@ -0,0 +1 @@
+# Python package
@@ -0,0 +1,74 @@
+"""
+Mueve los registros de ingreso de años cerrados a la tabla de archivo.
+
+Uso:
+    python manage.py archive_income_records                   # años < año actual - 1
+    python manage.py archive_income_records --before-year 2023
+    python manage.py archive_income_records --declaration 42 --restore
+    python manage.py archive_income_records --dry-run
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.declarations.archive import (
+    archivable_declarations, archive_declaration_records, restore_declaration_records
+)
+from apps.declarations.models import Declaration, IncomeRecord
+
+
+class Command(BaseCommand):
+    help = 'Archiva los registros de ingreso de las declaraciones cerradas de años anteriores'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--before-year', type=int,
+            help='Archivar declaraciones de años fiscales anteriores a este (por defecto: año actual - 1)'
+        )
+        parser.add_argument('--declaration', type=int, help='Archivar (o restaurar) solo esta declaración')
+        parser.add_argument('--restore', action='store_true', help='Devolver los registros a la tabla activa')
+        parser.add_argument('--dry-run', action='store_true', help='Solo listar lo que se movería')
+
+    def handle(self, *args, **options):
+        if options['restore']:
+            return self.restore(options)
+
+        if options['declaration']:
+            declarations = Declaration.objects.filter(
+                pk=options['declaration'],
+                status__in=Declaration.CLOSED_STATUSES,
+                records_archived=False
+            )
+        else:
+            before_year = options['before_year'] or timezone.now().year - 1
+            declarations = archivable_declarations(before_year)
+            self.stdout.write(f"Declaraciones cerradas de años anteriores a {before_year}")
+
+        total_declarations = 0
+        total_records = 0
+        for declaration_id, fiscal_year in declarations.values_list('id', 'fiscal_year'):
+            if options['dry_run']:
+                count = IncomeRecord.objects.filter(declaration_id=declaration_id).count()
+                self.stdout.write(f"  [dry-run] Declaración {declaration_id} ({fiscal_year}): {count} registros")
+            else:
+                count = archive_declaration_records(declaration_id)
+                self.stdout.write(f"  Declaración {declaration_id} ({fiscal_year}): {count} registros archivados")
+            total_declarations += 1
+            total_records += count
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{total_declarations} declaraciones, {total_records} registros"
+            f"{' (sin cambios, dry-run)' if options['dry_run'] else ' archivados'}"
+        ))
+
+    def restore(self, options):
+        if not options['declaration']:
+            raise CommandError('--restore requiere --declaration')
+
+        if options['dry_run']:
+            self.stdout.write(f"[dry-run] Se restauraría la declaración {options['declaration']}")
+            return
+
+        count = restore_declaration_records(options['declaration'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Declaración {options['declaration']}: {count} registros restaurados"
+        ))
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-19 07:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('declarations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='declaration',
+            index=models.Index(fields=['is_active', '-created_at', 'id'], name='declaration_is_acti_6640b6_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.16 on 2026-10-19 07:09
+
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('declarations', '0002_declaration_keyset_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeclarationStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_declarations', models.PositiveIntegerField(default=0, verbose_name='Declaraciones activas')),
+                ('completed_declarations', models.PositiveIntegerField(default=0, verbose_name='Declaraciones completadas')),
+                ('draft_declarations', models.PositiveIntegerField(default=0, verbose_name='Declaraciones en borrador')),
+                ('declarations_by_year', models.JSONField(blank=True, default=dict, verbose_name='Declaraciones por año')),
+                ('declarations_by_status', models.JSONField(blank=True, default=dict, verbose_name='Declaraciones por estado')),
+                ('total_income_all', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=18, verbose_name='Ingresos totales')),
+                ('total_withholdings_all', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=18, verbose_name='Retenciones totales')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Última actualización')),
+                ('last_declaration', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='declarations.declaration', verbose_name='Última declaración')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='declaration_stats', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Estadísticas de Declaraciones',
+                'verbose_name_plural': 'Estadísticas de Declaraciones',
+            },
+        ),
+    ]
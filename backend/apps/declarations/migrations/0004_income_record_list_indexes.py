@@ -0,0 +1,33 @@
+# Generated by Django 4.2.16 on 2026-10-19 07:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('declarations', '0003_declaration_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='incomerecord',
+            index=models.Index(fields=['declaration', 'third_party_name', 'concept_code', 'id'], name='declaration_declara_15f063_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='incomerecord',
+            index=models.Index(fields=['declaration', 'tax_schedule'], name='declaration_declara_d43dd8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='incomerecord',
+            index=models.Index(fields=['declaration', 'third_party_nit'], name='declaration_declara_45143c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='incomerecord',
+            index=models.Index(fields=['declaration', 'period'], name='declaration_declara_47aa1a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='incomerecord',
+            index=models.Index(fields=['declaration', 'gross_amount'], name='declaration_declara_d3d927_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.16 on 2026-10-19 07:22
+
+from decimal import Decimal
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('declarations', '0004_income_record_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='declaration',
+            name='records_archived',
+            field=models.BooleanField(default=False, help_text='Los registros de ingreso están en la tabla de años cerrados', verbose_name='Registros archivados'),
+        ),
+        migrations.CreateModel(
+            name='ArchivedIncomeRecord',
+            fields=[
+                ('third_party_nit', models.CharField(max_length=20, verbose_name='NIT del tercero')),
+                ('third_party_name', models.CharField(max_length=255, verbose_name='Nombre del tercero')),
+                ('concept_code', models.CharField(help_text='Código del concepto según la DIAN', max_length=10, verbose_name='Código del concepto')),
+                ('concept_description', models.CharField(max_length=255, verbose_name='Descripción del concepto')),
+                ('income_type', models.CharField(choices=[('salary', 'Salarios'), ('honorarios', 'Honorarios'), ('services', 'Servicios'), ('dividends', 'Dividendos'), ('interests', 'Intereses'), ('rental', 'Arrendamientos'), ('other', 'Otros')], default='other', max_length=20, verbose_name='Tipo de ingreso')),
+                ('gross_amount', models.DecimalField(decimal_places=2, max_digits=15, verbose_name='Valor bruto')),
+                ('withholding_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15, verbose_name='Retención practicada')),
+                ('tax_schedule', models.CharField(blank=True, choices=[('labor', 'Rentas de Trabajo'), ('capital', 'Rentas de Capital'), ('non_labor', 'Rentas No Laborales'), ('pensions', 'Pensiones'), ('dividends', 'Dividendos y Participaciones')], help_text='Clasificación según cédulas del Estatuto Tributario', max_length=20, null=True, verbose_name='Cédula tributaria')),
+                ('period', models.CharField(blank=True, help_text='Período del ingreso (ej: 2024-01)', max_length=10, null=True, verbose_name='Período')),
+                ('is_deductible', models.BooleanField(default=False, verbose_name='Es deducible')),
+                ('notes', models.TextField(blank=True, verbose_name='Notas adicionales')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Última actualización')),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID original')),
+                ('fiscal_year', models.IntegerField(verbose_name='Año fiscal')),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Fecha de archivo')),
+                ('declaration', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_income_records', to='declarations.declaration', verbose_name='Declaración')),
+            ],
+            options={
+                'verbose_name': 'Registro de Ingreso Archivado',
+                'verbose_name_plural': 'Registros de Ingresos Archivados',
+                'ordering': ['third_party_name', 'concept_code'],
+                'indexes': [models.Index(fields=['fiscal_year'], name='declaration_fiscal__1f27ef_idx'), models.Index(fields=['declaration', 'third_party_name', 'concept_code', 'id'], name='declaration_declara_8a39b8_idx'), models.Index(fields=['declaration', 'income_type'], name='declaration_declara_68394a_idx')],
+            },
+        ),
+    ]
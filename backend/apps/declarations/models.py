@@ -3,6 +3,8 @@ Modelos de declaraciones fiscales.
 """
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
 from django.utils import timezone
 from decimal import Decimal
 
@@ -47,6 +49,11 @@ class Declaration(models.Model):
         verbose_name='Activa',
         help_text='Indica si esta declaración está activa (soft delete)'
     )
+    records_archived = models.BooleanField(
+        default=False,
+        verbose_name='Registros archivados',
+        help_text='Los registros de ingreso están en la tabla de años cerrados'
+    )
     
     # Datos del resumen
     total_income = models.DecimalField(
@@ -128,13 +135,43 @@ class Declaration(models.Model):
             models.Index(fields=['user', 'status']),
             # Índice para declaraciones activas
             models.Index(fields=['user', 'is_active', '-created_at']),
+            # Índice para la paginación keyset del listado (-created_at, id)
+            models.Index(fields=['is_active', '-created_at', 'id']),
         ]
     
     def __str__(self):
         return f"{self.title} ({self.fiscal_year}) - {self.user.email}"
     
+    # Campos que alimentan DeclarationStats (ver DeclarationStats.apply_changes)
+    STATS_FIELDS = ('is_active', 'fiscal_year', 'status', 'total_income', 'total_withholdings')
+    
+    # Valores de STATS_FIELDS tal como están en la base (None si no se conocen)
+    _stats_state = None
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._stats_state = instance.get_stats_state()
+        return instance
+    
+    def get_stats_state(self):
+        """Valores actuales de STATS_FIELDS, o None si alguno está diferido."""
+        deferred = self.get_deferred_fields()
+        if any(field in deferred for field in self.STATS_FIELDS):
+            return None
+        return {field: getattr(self, field) for field in self.STATS_FIELDS}
+    
+    def clean(self):
+        super().clean()
+        if self._reopens_archived_records():
+            raise ValidationError({'status': self.ARCHIVED_REOPEN_ERROR})
+    
     def save(self, *args, **kwargs):
         """Override save para generar título automático si no se proporciona."""
+        update_fields = kwargs.get('update_fields')
+        if (update_fields is None or 'status' in update_fields) and self._reopens_archived_records():
+            raise ValidationError({'status': self.ARCHIVED_REOPEN_ERROR})
+        
         if not self.title:
             # Generar título automático basado en el año fiscal
             existing_count = Declaration.objects.filter(
@@ -174,35 +211,84 @@ class Declaration(models.Model):
         self.deleted_at = None
         self.save(update_fields=['is_active', 'deleted_at', 'updated_at'])
     
-    def duplicate(self, new_title=None):
-        """Crea una copia de esta declaración."""
+    def duplicate(self, new_title=None, copy_income_records=True, copy_documents=True):
+        """
+        Crea una copia de esta declaración.
+        
+        Los registros de ingreso y los documentos se copian en bloque en la base
+        (ver duplication.py); los documentos comparten el archivo del original.
+        """
+        from django.db import transaction
+        from apps.common.cache import invalidate
+        from .duplication import copy_documents as copy_declaration_documents
+        from .duplication import copy_income_records as copy_declaration_records
+        
         duplicate_title = new_title or f"{self.title} (Copia)"
         
-        # Crear nueva declaración
-        new_declaration = Declaration.objects.create(
-            user=self.user,
-            title=duplicate_title,
-            fiscal_year=self.fiscal_year,
-            status='draft',
-            declaration_data=self.declaration_data.copy() if self.declaration_data else {}
-        )
+        with transaction.atomic():
+            # Crear nueva declaración
+            new_declaration = Declaration.objects.create(
+                user=self.user,
+                title=duplicate_title,
+                fiscal_year=self.fiscal_year,
+                status='draft',
+                declaration_data=self.declaration_data.copy() if self.declaration_data else {}
+            )
+            
+            if copy_income_records:
+                copy_declaration_records(self, new_declaration)
+            if copy_documents:
+                copy_declaration_documents(self, new_declaration)
         
-        # Copiar registros de ingresos si existen
-        for income_record in self.income_records.all():
-            income_record.pk = None
-            income_record.declaration = new_declaration
-            income_record.save()
+        # Las copias en bloque no emiten post_save por fila
+        Declaration.invalidate_income_summary(new_declaration.pk)
+        invalidate('declaration_detail', [new_declaration.pk])
         
         return new_declaration
     
+    # Estados de una declaración cerrada (sus registros se pueden archivar)
+    CLOSED_STATUSES = ('completed', 'paid')
+    # Estados en los que la declaración se puede editar o eliminar
+    EDITABLE_STATUSES = ('draft', 'processing', 'error')
+    
+    ARCHIVED_REOPEN_ERROR = (
+        'Los registros de ingreso de esta declaración están archivados; '
+        'restáurelos antes de sacarla de un estado cerrado'
+    )
+    
+    def _reopens_archived_records(self):
+        """
+        Indica si el estado nuevo saca de CLOSED_STATUSES una declaración con los
+        registros archivados: sus lecturas vendrían de la tabla activa (vacía) y
+        los registros nuevos quedarían mezclados con los archivados.
+        """
+        if self.pk is None or self.status in self.CLOSED_STATUSES:
+            return False
+        if self.records_archived:
+            return True
+        previous_status = (self._stats_state or {}).get('status')
+        if previous_status is not None and previous_status not in self.CLOSED_STATUSES:
+            return False
+        # La instancia puede ser anterior al archivo: se consulta la base
+        return Declaration.objects.filter(pk=self.pk, records_archived=True).exists()
+    
+    def get_income_records(self):
+        """Registros de ingreso, desde la tabla activa o la de archivo según corresponda."""
+        if self.records_archived:
+            return ArchivedIncomeRecord.objects.filter(declaration=self)
+        return self.income_records.all()
+    
     @property
     def is_editable(self):
         """Verifica si la declaración se puede editar."""
-        return self.status in ['draft', 'processing', 'error']
+        return self.status in self.EDITABLE_STATUSES
     
     @property
     def has_documents(self):
         """Verifica si la declaración tiene documentos asociados."""
+        # Los listados anotan el conteo para evitar una consulta por fila
+        if hasattr(self, 'any_documents'):
+            return self.any_documents
         return self.documents.exists()
     
     @property
@@ -215,6 +301,8 @@ class Declaration(models.Model):
     @property
     def documents_count(self):
         """Cuenta los documentos activos asociados."""
+        if hasattr(self, 'active_documents_total'):
+            return self.active_documents_total
         return self.documents.filter(is_active=True).count()
     
     @property
@@ -222,12 +310,16 @@ class Declaration(models.Model):
         """Calcula el porcentaje de progreso de la declaración."""
         if self.status == 'draft':
             # Calcular basado en documentos y datos disponibles
+            has_data = (
+                self.has_declaration_data if hasattr(self, 'has_declaration_data')
+                else bool(self.declaration_data)
+            )
             progress = 0
             if self.has_documents:
                 progress += 40
             if self.total_income > 0:
                 progress += 30
-            if self.declaration_data:
+            if has_data:
                 progress += 30
             return min(progress, 90)  # Máximo 90% en draft
         elif self.status == 'processing':
@@ -237,6 +329,61 @@ class Declaration(models.Model):
         else:
             return 0
     
+    # Resumen de ingresos cacheado; se invalida al escribir registros (signals.py)
+    INCOME_SUMMARY_CACHE_TIMEOUT = 60 * 60
+    
+    @staticmethod
+    def income_summary_cache_key(declaration_id):
+        return f"declarations:{declaration_id}:income_summary"
+    
+    def get_income_summary(self):
+        """
+        Resumen de ingresos por tipo y cédula calculado con GROUP BY en la base.
+        """
+        cache_key = self.income_summary_cache_key(self.pk)
+        summary = cache.get(cache_key)
+        if summary is not None:
+            return summary
+        
+        rows = self.get_income_records().order_by().values('income_type', 'tax_schedule').annotate(
+            count=models.Count('id'),
+            gross_amount=models.Sum('gross_amount'),
+            withholding_amount=models.Sum('withholding_amount')
+        )
+        
+        summary = {'by_type': {}, 'by_schedule': {}}
+        for row in rows:
+            groups = [('by_type', row['income_type'])]
+            if row['tax_schedule']:
+                groups.append(('by_schedule', row['tax_schedule']))
+            
+            for section, key in groups:
+                totals = summary[section].setdefault(key, {
+                    'count': 0,
+                    'gross_amount': 0,
+                    'withholding_amount': 0
+                })
+                totals['count'] += row['count']
+                totals['gross_amount'] += float(row['gross_amount'] or 0)
+                totals['withholding_amount'] += float(row['withholding_amount'] or 0)
+        
+        cache.set(cache_key, summary, self.INCOME_SUMMARY_CACHE_TIMEOUT)
+        return summary
+    
+    @classmethod
+    def invalidate_income_summary(cls, declaration_id):
+        """Descarta el resumen de ingresos cacheado de una declaración."""
+        cache.delete(cls.income_summary_cache_key(declaration_id))
+    
+    @classmethod
+    def touch(cls, declaration_ids):
+        """
+        Actualiza `updated_at` sin pasar por save() (ni sus señales). Se llama
+        cuando cambian registros o documentos, así `updated_at` es la versión
+        de la declaración con sus hijos.
+        """
+        cls.objects.filter(pk__in=declaration_ids).update(updated_at=timezone.now())
+    
     @classmethod
     def get_active_for_user(cls, user):
         """Obtiene todas las declaraciones activas de un usuario."""
@@ -252,9 +399,10 @@ class Declaration(models.Model):
         )
 
 
-class IncomeRecord(models.Model):
+class AbstractIncomeRecord(models.Model):
     """
-    Representa un registro de ingreso individual extraído de la información exógena.
+    Campos de un registro de ingreso, compartidos por la tabla activa
+    (IncomeRecord) y la de años cerrados (ArchivedIncomeRecord).
     """
     INCOME_TYPE_CHOICES = [
         ('salary', 'Salarios'),
@@ -274,13 +422,6 @@ class IncomeRecord(models.Model):
         ('dividends', 'Dividendos y Participaciones'),
     ]
     
-    declaration = models.ForeignKey(
-        Declaration,
-        on_delete=models.CASCADE,
-        related_name='income_records',
-        verbose_name='Declaración'
-    )
-    
     # Información del tercero
     third_party_nit = models.CharField(
         max_length=20,
@@ -358,6 +499,29 @@ class IncomeRecord(models.Model):
         verbose_name='Última actualización'
     )
     
+    class Meta:
+        abstract = True
+    
+    def __str__(self):
+        return f"{self.third_party_name} - {self.concept_description}: ${self.gross_amount:,.0f}"
+    
+    @property
+    def net_amount(self):
+        """Calcula el valor neto (bruto - retenciones)."""
+        return self.gross_amount - self.withholding_amount
+
+
+class IncomeRecord(AbstractIncomeRecord):
+    """
+    Representa un registro de ingreso individual extraído de la información exógena.
+    """
+    declaration = models.ForeignKey(
+        Declaration,
+        on_delete=models.CASCADE,
+        related_name='income_records',
+        verbose_name='Declaración'
+    )
+    
     class Meta:
         verbose_name = 'Registro de Ingreso'
         verbose_name_plural = 'Registros de Ingresos'
@@ -366,12 +530,279 @@ class IncomeRecord(models.Model):
             models.Index(fields=['declaration', 'income_type']),
             models.Index(fields=['tax_schedule']),
             models.Index(fields=['concept_code']),
+            # Orden por defecto del listado paginado por cursor
+            models.Index(fields=['declaration', 'third_party_name', 'concept_code', 'id']),
+            # Filtros del listado de registros de una declaración
+            models.Index(fields=['declaration', 'tax_schedule']),
+            models.Index(fields=['declaration', 'third_party_nit']),
+            models.Index(fields=['declaration', 'period']),
+            models.Index(fields=['declaration', 'gross_amount']),
+        ]
+    
+    def delete(self, *args, **kwargs):
+        """
+        Elimina el registro y envía `income_records_changed`: no hay receptor
+        post_delete para que los borrados en lote no carguen cada fila.
+        """
+        from .signals import income_records_changed
+        
+        declaration_id = self.declaration_id
+        result = super().delete(*args, **kwargs)
+        income_records_changed.send(sender=IncomeRecord, declaration_ids=[declaration_id])
+        return result
+
+
+class ArchivedIncomeRecord(AbstractIncomeRecord):
+    """
+    Registro de ingreso de una declaración cerrada de un año anterior.
+    
+    El comando `archive_income_records` mueve aquí los registros de las
+    declaraciones completadas o pagadas, así la tabla activa solo crece con los
+    años en curso. Conserva el ID original para poder restaurarlos.
+    """
+    id = models.BigIntegerField(
+        primary_key=True,
+        verbose_name='ID original'
+    )
+    declaration = models.ForeignKey(
+        Declaration,
+        on_delete=models.CASCADE,
+        related_name='archived_income_records',
+        verbose_name='Declaración'
+    )
+    fiscal_year = models.IntegerField(
+        verbose_name='Año fiscal'
+    )
+    archived_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Fecha de archivo'
+    )
+    
+    class Meta:
+        verbose_name = 'Registro de Ingreso Archivado'
+        verbose_name_plural = 'Registros de Ingresos Archivados'
+        ordering = ['third_party_name', 'concept_code']
+        indexes = [
+            models.Index(fields=['fiscal_year']),
+            models.Index(fields=['declaration', 'third_party_name', 'concept_code', 'id']),
+            models.Index(fields=['declaration', 'income_type']),
         ]
+
+
+class DeclarationStats(models.Model):
+    """
+    Estadísticas materializadas de las declaraciones activas de un usuario.
+    
+    Cada cambio de una declaración aplica solo su diferencia (estado, año y
+    montos antes y después) con `apply_changes` (ver signals.py), así el
+    dashboard las lee en O(1). `refresh_for_user` recalcula todo con una
+    consulta agrupada y queda como camino de reparación y de carga inicial.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='declaration_stats',
+        verbose_name='Usuario'
+    )
+    total_declarations = models.PositiveIntegerField(default=0, verbose_name='Declaraciones activas')
+    completed_declarations = models.PositiveIntegerField(default=0, verbose_name='Declaraciones completadas')
+    draft_declarations = models.PositiveIntegerField(default=0, verbose_name='Declaraciones en borrador')
+    declarations_by_year = models.JSONField(default=dict, blank=True, verbose_name='Declaraciones por año')
+    declarations_by_status = models.JSONField(default=dict, blank=True, verbose_name='Declaraciones por estado')
+    total_income_all = models.DecimalField(
+        max_digits=18,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name='Ingresos totales'
+    )
+    total_withholdings_all = models.DecimalField(
+        max_digits=18,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name='Retenciones totales'
+    )
+    last_declaration = models.ForeignKey(
+        Declaration,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Última declaración'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Última actualización'
+    )
+    
+    class Meta:
+        verbose_name = 'Estadísticas de Declaraciones'
+        verbose_name_plural = 'Estadísticas de Declaraciones'
     
     def __str__(self):
-        return f"{self.third_party_name} - {self.concept_description}: ${self.gross_amount:,.0f}"
+        return f"Estadísticas de {self.user.email}: {self.total_declarations} declaraciones"
     
-    @property
-    def net_amount(self):
-        """Calcula el valor neto (bruto - retenciones)."""
-        return self.gross_amount - self.withholding_amount
+    @staticmethod
+    def aggregate(queryset):
+        """
+        Calcula las estadísticas de un queryset de declaraciones con una sola
+        consulta agrupada por año y estado (más la de la última declaración).
+        """
+        rows = queryset.order_by().values('fiscal_year', 'status').annotate(
+            count=models.Count('id'),
+            income=models.Sum('total_income'),
+            withholdings=models.Sum('total_withholdings')
+        )
+        
+        stats = {
+            'total_declarations': 0,
+            'completed_declarations': 0,
+            'draft_declarations': 0,
+            'declarations_by_year': {},
+            'declarations_by_status': {},
+            'total_income_all': Decimal('0.00'),
+            'total_withholdings_all': Decimal('0.00'),
+        }
+        
+        for row in rows:
+            year = str(row['fiscal_year'])
+            stats['total_declarations'] += row['count']
+            stats['declarations_by_year'][year] = stats['declarations_by_year'].get(year, 0) + row['count']
+            stats['declarations_by_status'][row['status']] = (
+                stats['declarations_by_status'].get(row['status'], 0) + row['count']
+            )
+            stats['total_income_all'] += row['income'] or Decimal('0.00')
+            stats['total_withholdings_all'] += row['withholdings'] or Decimal('0.00')
+        
+        stats['completed_declarations'] = stats['declarations_by_status'].get('completed', 0)
+        stats['draft_declarations'] = stats['declarations_by_status'].get('draft', 0)
+        stats['last_declaration_id'] = queryset.order_by(
+            '-fiscal_year', '-created_at'
+        ).values_list('id', flat=True).first()
+        
+        return stats
+    
+    @classmethod
+    def refresh_for_user(cls, user_id):
+        """Recalcula y guarda las estadísticas de un usuario"""
+        if not User.objects.filter(pk=user_id).exists():
+            return None
+        
+        stats = cls.aggregate(Declaration.objects.filter(user_id=user_id, is_active=True))
+        instance, _ = cls.objects.update_or_create(user_id=user_id, defaults=stats)
+        return instance
+    
+    @staticmethod
+    def _contribution(state):
+        """Aporte de una declaración (STATS_FIELDS) a las estadísticas"""
+        if not state or not state['is_active']:
+            return None
+        return {
+            'year': str(state['fiscal_year']),
+            'status': state['status'],
+            'income': Decimal(state['total_income'] or 0),
+            'withholdings': Decimal(state['total_withholdings'] or 0),
+        }
+    
+    @classmethod
+    def apply_changes(cls, user_id, changes):
+        """
+        Aplica a la fila del usuario la diferencia de una o más declaraciones.
+        
+        Args:
+            user_id: Usuario dueño de las declaraciones
+            changes: Lista de (estado anterior, estado nuevo) con los valores de
+                `Declaration.STATS_FIELDS`; None si la fila no existía o se eliminó
+        
+        Los contadores y montos se actualizan con F() y los conteos por año y
+        estado bajo el bloqueo de la fila. Si la fila no existe o los conteos
+        quedarían negativos (estadísticas desincronizadas) se recalcula todo.
+        """
+        from django.db import transaction
+        
+        total = completed = draft = 0
+        income = withholdings = Decimal('0.00')
+        by_year, by_status = {}, {}
+        recompute_last = False
+        
+        for previous, current in changes:
+            for state, sign in ((previous, -1), (current, 1)):
+                contribution = cls._contribution(state)
+                if contribution is None:
+                    continue
+                total += sign
+                completed += sign if contribution['status'] == 'completed' else 0
+                draft += sign if contribution['status'] == 'draft' else 0
+                income += sign * contribution['income']
+                withholdings += sign * contribution['withholdings']
+                by_year[contribution['year']] = by_year.get(contribution['year'], 0) + sign
+                by_status[contribution['status']] = by_status.get(contribution['status'], 0) + sign
+            
+            # La última declaración solo cambia si cambia la actividad o el año
+            if previous is None or current is None or any(
+                previous[field] != current[field] for field in ('is_active', 'fiscal_year')
+            ):
+                recompute_last = True
+        
+        with transaction.atomic():
+            stats = cls.objects.select_for_update().filter(user_id=user_id).only(
+                'id', 'total_declarations', 'completed_declarations', 'draft_declarations',
+                'declarations_by_year', 'declarations_by_status'
+            ).first()
+            if stats is None:
+                cls.refresh_for_user(user_id)
+                return
+            
+            declarations_by_year = cls._merge_counts(stats.declarations_by_year, by_year)
+            declarations_by_status = cls._merge_counts(stats.declarations_by_status, by_status)
+            if declarations_by_year is None or declarations_by_status is None or min(
+                stats.total_declarations + total,
+                stats.completed_declarations + completed,
+                stats.draft_declarations + draft
+            ) < 0:
+                cls.refresh_for_user(user_id)
+                return
+            
+            values = {
+                'total_declarations': models.F('total_declarations') + total,
+                'completed_declarations': models.F('completed_declarations') + completed,
+                'draft_declarations': models.F('draft_declarations') + draft,
+                'total_income_all': models.F('total_income_all') + income,
+                'total_withholdings_all': models.F('total_withholdings_all') + withholdings,
+                'declarations_by_year': declarations_by_year,
+                'declarations_by_status': declarations_by_status,
+                'updated_at': timezone.now(),
+            }
+            if recompute_last:
+                values['last_declaration_id'] = Declaration.objects.filter(
+                    user_id=user_id, is_active=True
+                ).order_by('-fiscal_year', '-created_at').values_list('id', flat=True).first()
+            
+            cls.objects.filter(pk=stats.pk).update(**values)
+    
+    @staticmethod
+    def _merge_counts(counts, deltas):
+        """Suma las diferencias a un conteo por llave; None si alguno queda negativo"""
+        merged = dict(counts or {})
+        for key, delta in deltas.items():
+            value = merged.get(key, 0) + delta
+            if value < 0:
+                return None
+            if value:
+                merged[key] = value
+            else:
+                merged.pop(key, None)
+        return merged
+    
+    def as_dict(self):
+        """Estadísticas en el formato de DeclarationStatsSerializer"""
+        return {
+            'total_declarations': self.total_declarations,
+            'active_declarations': self.total_declarations,
+            'completed_declarations': self.completed_declarations,
+            'draft_declarations': self.draft_declarations,
+            'declarations_by_year': self.declarations_by_year,
+            'declarations_by_status': self.declarations_by_status,
+            'total_income_all': self.total_income_all,
+            'total_withholdings_all': self.total_withholdings_all,
+            'last_declaration_id': self.last_declaration_id,
+        }
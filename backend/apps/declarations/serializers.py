@@ -5,6 +5,9 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from .models import Declaration, IncomeRecord
 from decimal import Decimal
+import logging
+
+logger = logging.getLogger(__name__)
 
 User = get_user_model()
 
@@ -100,7 +103,7 @@ class DeclarationDetailSerializer(serializers.ModelSerializer):
     """
     Serializador detallado para una declaración completa.
     """
-    income_records = IncomeRecordSerializer(many=True, read_only=True)
+    income_records = IncomeRecordSerializer(many=True, read_only=True, source='get_income_records')
     balance = serializers.DecimalField(
         max_digits=15, 
         decimal_places=2, 
@@ -171,39 +174,7 @@ class DeclarationDetailSerializer(serializers.ModelSerializer):
         """
         Genera un resumen de ingresos por tipo y cédula.
         """
-        income_by_type = {}
-        income_by_schedule = {}
-        
-        for record in obj.income_records.all():
-            # Por tipo
-            if record.income_type not in income_by_type:
-                income_by_type[record.income_type] = {
-                    'count': 0,
-                    'gross_amount': 0,
-                    'withholding_amount': 0
-                }
-            
-            income_by_type[record.income_type]['count'] += 1
-            income_by_type[record.income_type]['gross_amount'] += float(record.gross_amount)
-            income_by_type[record.income_type]['withholding_amount'] += float(record.withholding_amount)
-            
-            # Por cédula
-            if record.tax_schedule:
-                if record.tax_schedule not in income_by_schedule:
-                    income_by_schedule[record.tax_schedule] = {
-                        'count': 0,
-                        'gross_amount': 0,
-                        'withholding_amount': 0
-                    }
-                
-                income_by_schedule[record.tax_schedule]['count'] += 1
-                income_by_schedule[record.tax_schedule]['gross_amount'] += float(record.gross_amount)
-                income_by_schedule[record.tax_schedule]['withholding_amount'] += float(record.withholding_amount)
-        
-        return {
-            'by_type': income_by_type,
-            'by_schedule': income_by_schedule
-        }
+        return obj.get_income_summary()
 
 
 class CreateDeclarationSerializer(serializers.ModelSerializer):
@@ -254,8 +225,6 @@ class CreateDeclarationSerializer(serializers.ModelSerializer):
         """
         Crea una nueva declaración - SIMPLIFICADO PARA DESARROLLO.
         """
-        print(f"[DEBUG] CreateDeclarationSerializer.create()")
-        
         # SIMPLIFICADO: Crear o usar usuario demo
         from apps.users.models import User
         
@@ -268,13 +237,13 @@ class CreateDeclarationSerializer(serializers.ModelSerializer):
                 'is_active': True
             }
         )
-        print(f"[DEBUG] Usuario {'creado' if created else 'obtenido'}: {user.email}")
+        if created:
+            logger.info(f"Usuario demo creado: {user.email}")
         
         declaration = Declaration.objects.create(
             user=user,
             **validated_data
         )
-        print(f"[DEBUG] Declaración creada: {declaration.id} - {declaration.title}")
         return declaration
 
 
@@ -284,6 +253,20 @@ class UpdateDeclarationStatusSerializer(serializers.Serializer):
     """
     status = serializers.ChoiceField(choices=Declaration.STATUS_CHOICES)
     
+    # Transiciones de estado permitidas
+    ALLOWED_TRANSITIONS = {
+        'draft': ['processing', 'completed'],
+        'processing': ['completed', 'error', 'draft'],
+        'completed': ['paid'],
+        'error': ['draft', 'processing'],
+        'paid': []  # Estado final
+    }
+    
+    @classmethod
+    def source_statuses(cls, target_status):
+        """Estados desde los que se puede pasar a `target_status`"""
+        return [source for source, targets in cls.ALLOWED_TRANSITIONS.items() if target_status in targets]
+    
     def validate_status(self, value):
         """
         Valida las transiciones de estado permitidas.
@@ -294,16 +277,7 @@ class UpdateDeclarationStatusSerializer(serializers.Serializer):
         
         current_status = instance.status
         
-        # Definir transiciones permitidas
-        allowed_transitions = {
-            'draft': ['processing', 'completed'],
-            'processing': ['completed', 'error', 'draft'],
-            'completed': ['paid'],
-            'error': ['draft', 'processing'],
-            'paid': []  # Estado final
-        }
-        
-        if value not in allowed_transitions.get(current_status, []):
+        if value not in self.ALLOWED_TRANSITIONS.get(current_status, []):
             raise serializers.ValidationError(
                 f"No se puede cambiar de '{current_status}' a '{value}'"
             )
@@ -325,6 +299,10 @@ class DuplicateDeclarationSerializer(serializers.Serializer):
         default=True,
         help_text='Si se deben copiar los registros de ingresos'
     )
+    copy_documents = serializers.BooleanField(
+        default=True,
+        help_text='Si se deben copiar los documentos (comparten el archivo original)'
+    )
     
     def validate_new_title(self, value):
         """Valida el nuevo título."""
@@ -336,40 +314,60 @@ class DuplicateDeclarationSerializer(serializers.Serializer):
 class BulkDeclarationActionSerializer(serializers.Serializer):
     """
     Serializador para acciones en lote sobre declaraciones.
+    
+    El contexto puede traer `queryset` con las declaraciones a las que el
+    usuario tiene acceso; si no, se usan las del usuario de la solicitud.
     """
     ACTION_CHOICES = [
         ('delete', 'Eliminar'),
         ('restore', 'Restaurar'),
         ('archive', 'Archivar'),
+        ('change_status', 'Cambiar estado'),
     ]
+    MAX_DECLARATIONS = 500
     
     declaration_ids = serializers.ListField(
-        child=serializers.UUIDField(),
+        child=serializers.IntegerField(min_value=1),
         min_length=1,
+        max_length=MAX_DECLARATIONS,
         help_text='Lista de IDs de declaraciones'
     )
     action = serializers.ChoiceField(
         choices=ACTION_CHOICES,
         help_text='Acción a realizar'
     )
+    status = serializers.ChoiceField(
+        choices=Declaration.STATUS_CHOICES,
+        required=False,
+        help_text='Nuevo estado (solo para change_status)'
+    )
     
     def validate_declaration_ids(self, value):
         """Valida que las declaraciones existan y pertenezcan al usuario."""
-        user = self.context['request'].user
+        value = list(dict.fromkeys(value))
+        
+        queryset = self.context.get('queryset')
+        if queryset is None:
+            queryset = Declaration.objects.filter(user=self.context['request'].user)
         
         # Verificar que todas las declaraciones existen y pertenecen al usuario
-        existing_declarations = Declaration.objects.filter(
-            id__in=value,
-            user=user
+        existing_declarations = queryset.filter(
+            id__in=value
         ).values_list('id', flat=True)
         
         missing_ids = set(value) - set(existing_declarations)
         if missing_ids:
             raise serializers.ValidationError(
-                f"Declaraciones no encontradas: {list(missing_ids)}"
+                f"Declaraciones no encontradas: {sorted(missing_ids)}"
             )
         
         return value
+    
+    def validate(self, data):
+        """El cambio de estado requiere el estado destino."""
+        if data['action'] == 'change_status' and not data.get('status'):
+            raise serializers.ValidationError({'status': 'Se requiere el nuevo estado para change_status'})
+        return data
 
 
 class DeclarationStatsSerializer(serializers.Serializer):
@@ -0,0 +1,147 @@
+"""
+Señales de la aplicación de declaraciones.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from apps.common.cache import invalidate
+
+from .models import Declaration, DeclarationStats, IncomeRecord
+
+# Enviada tras un UPDATE en lote (sin post_save por fila).
+# Argumentos: declaration_ids, user_ids, action y, opcional, stats_changes
+# ({user_id: [(estado anterior, estado nuevo), ...]} para DeclarationStats)
+declarations_bulk_updated = Signal()
+
+# Enviada tras borrar o escribir en lote registros de ingreso. IncomeRecord no
+# tiene receptor post_delete para que `queryset.delete()` siga siendo un DELETE
+# directo (sin cargar ni señalar cada fila); IncomeRecord.delete() la envía.
+# Argumentos: declaration_ids
+income_records_changed = Signal()
+
+
+def _schedule_stats_update(user_id, previous, current):
+    """Aplica la diferencia al confirmar la transacción (o recalcula si no se conoce)"""
+    if previous is None and current is None:
+        transaction.on_commit(lambda: DeclarationStats.refresh_for_user(user_id))
+    elif previous != current:
+        transaction.on_commit(lambda: DeclarationStats.apply_changes(user_id, [(previous, current)]))
+
+
+@receiver(post_save, sender=Declaration)
+def update_declaration_stats(sender, instance, created, update_fields=None, **kwargs):
+    """Mantiene al día las estadísticas materializadas del usuario"""
+    if update_fields is not None and not set(update_fields) & set(Declaration.STATS_FIELDS):
+        return
+    
+    previous = None if created else instance._stats_state
+    current = instance.get_stats_state()
+    
+    if not created and (previous is None or current is None):
+        # Estado anterior desconocido (p. ej. campos diferidos): recálculo completo
+        instance._stats_state = current
+        _schedule_stats_update(instance.user_id, None, None)
+        return
+    
+    if update_fields is not None:
+        # Solo cambian en la base los campos guardados
+        current = {
+            field: current[field] if field in update_fields else previous[field]
+            for field in Declaration.STATS_FIELDS
+        }
+    
+    instance._stats_state = current
+    _schedule_stats_update(instance.user_id, previous, current)
+
+
+@receiver(post_delete, sender=Declaration)
+def remove_declaration_stats(sender, instance, **kwargs):
+    """Descuenta la declaración eliminada de las estadísticas del usuario"""
+    previous = instance._stats_state or instance.get_stats_state()
+    _schedule_stats_update(instance.user_id, previous, None)
+
+
+@receiver(post_save, sender=Declaration)
+@receiver(post_delete, sender=Declaration)
+def invalidate_declaration_cache(sender, instance, **kwargs):
+    """Invalida las respuestas cacheadas de la declaración"""
+    invalidate('declaration_detail', [instance.pk])
+    invalidate('declaration_documents', [instance.pk])
+    invalidate('declaration_documents_full', [instance.pk])
+
+
+class _ChangedDeclarations:
+    """
+    Declaraciones con registros de ingreso modificados en la transacción en
+    curso. Se registra una sola vez con `on_commit` e invalida cada declaración
+    una vez al confirmar.
+    """
+    
+    def __init__(self):
+        self.ids = set()
+    
+    def __call__(self):
+        ids, self.ids = self.ids, set()
+        for declaration_id in ids:
+            Declaration.invalidate_income_summary(declaration_id)
+        invalidate('declaration_detail', ids)
+
+
+def mark_income_records_changed(declaration_ids):
+    """
+    Actualiza `updated_at` (la versión del ETag) e invalida el resumen de
+    ingresos y el detalle de las declaraciones, una vez por transacción.
+    """
+    connection = transaction.get_connection()
+    pending = getattr(connection, 'changed_income_declarations', None)
+    # Un rollback descarta el callback: entonces se empieza un conjunto nuevo
+    registered = pending is not None and any(pending in entry for entry in connection.run_on_commit)
+    if not registered:
+        pending = connection.changed_income_declarations = _ChangedDeclarations()
+    
+    new_ids = {declaration_id for declaration_id in declaration_ids if declaration_id} - pending.ids
+    if not new_ids:
+        return
+    
+    pending.ids |= new_ids
+    Declaration.touch(new_ids)
+    # Otra solicitud pudo cachear datos previos al commit: se invalida ahora y al confirmar
+    for declaration_id in new_ids:
+        Declaration.invalidate_income_summary(declaration_id)
+    invalidate('declaration_detail', new_ids)
+    
+    if not registered:
+        transaction.on_commit(pending)
+
+
+@receiver(post_save, sender=IncomeRecord)
+def income_record_saved(sender, instance, **kwargs):
+    """Registra el cambio de la declaración del registro guardado"""
+    mark_income_records_changed([instance.declaration_id])
+
+
+@receiver(income_records_changed)
+def handle_income_records_changed(sender, declaration_ids, **kwargs):
+    """Equivalente en lote de `income_record_saved` (borrados y escrituras en lote)"""
+    mark_income_records_changed(declaration_ids)
+
+
+@receiver(declarations_bulk_updated)
+def handle_bulk_update(sender, declaration_ids, user_ids, stats_changes=None, **kwargs):
+    """Equivalente en lote de las señales por fila: cachés y estadísticas"""
+    invalidate('declaration_detail', declaration_ids)
+    invalidate('declaration_documents', declaration_ids)
+    invalidate('declaration_documents_full', declaration_ids)
+    
+    def update_stats():
+        if stats_changes is None:
+            # Sin los estados anteriores solo queda el recálculo completo
+            for user_id in user_ids:
+                DeclarationStats.refresh_for_user(user_id)
+            return
+        
+        for user_id, changes in stats_changes.items():
+            DeclarationStats.apply_changes(user_id, changes)
+    
+    transaction.on_commit(update_stats)
@@ -0,0 +1,226 @@
+"""
+Tests para el archivo de registros de ingreso (archive.py y el comando
+archive_income_records).
+"""
+from io import StringIO
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+
+from apps.common.testing import seed_declarations
+from apps.declarations.archive import (
+    archivable_declarations, archive_declaration_records, restore_declaration_records
+)
+from apps.declarations.models import ArchivedIncomeRecord, Declaration, IncomeRecord
+
+RECORD_FIELDS = ('id', 'third_party_nit', 'concept_code', 'gross_amount', 'withholding_amount', 'period')
+
+
+def closed_declaration(user, fiscal_year=2022, records=4, status='completed'):
+    """Declaración cerrada de un año anterior con registros"""
+    declaration = seed_declarations(user, records=records, fiscal_year=fiscal_year)[0]
+    Declaration.objects.filter(pk=declaration.pk).update(status=status)
+    declaration.refresh_from_db()
+    return declaration
+
+
+def record_rows(declaration):
+    return list(declaration.get_income_records().order_by('id').values_list(*RECORD_FIELDS))
+
+
+def run_command(*args):
+    stdout = StringIO()
+    call_command('archive_income_records', *args, stdout=stdout)
+    return stdout.getvalue()
+
+
+@pytest.mark.django_db
+class TestArchiveRecords:
+    """Tests para archive_declaration_records y restore_declaration_records."""
+
+    def test_archive_and_restore_round_trip(self, user):
+        """Los registros se mueven, se leen con get_income_records y vuelven intactos."""
+        declaration = closed_declaration(user)
+        rows_before = record_rows(declaration)
+
+        assert archive_declaration_records(declaration.pk) == 4
+
+        declaration.refresh_from_db()
+        assert declaration.records_archived is True
+        assert not IncomeRecord.objects.filter(declaration=declaration).exists()
+        assert declaration.get_income_records().model is ArchivedIncomeRecord
+        assert record_rows(declaration) == rows_before
+        assert set(ArchivedIncomeRecord.objects.values_list('fiscal_year', flat=True)) == {2022}
+
+        assert restore_declaration_records(declaration.pk) == 4
+
+        declaration.refresh_from_db()
+        assert declaration.records_archived is False
+        assert not ArchivedIncomeRecord.objects.exists()
+        assert declaration.get_income_records().model is IncomeRecord
+        assert record_rows(declaration) == rows_before
+
+    def test_income_summary_round_trip(self, user):
+        """El resumen de ingresos se lee igual desde el archivo y tras restaurar."""
+        declaration = closed_declaration(user)
+        summary = declaration.get_income_summary()
+        assert summary['by_type']['salary']['count'] == 4
+
+        archive_declaration_records(declaration.pk)
+        declaration.refresh_from_db()
+        assert declaration.get_income_summary() == summary
+
+        restore_declaration_records(declaration.pk)
+        declaration.refresh_from_db()
+        assert declaration.get_income_summary() == summary
+
+    def test_archive_is_idempotent(self, user):
+        """Archivar o restaurar dos veces no mueve nada la segunda vez."""
+        declaration = closed_declaration(user)
+
+        assert archive_declaration_records(declaration.pk) == 4
+        assert archive_declaration_records(declaration.pk) == 0
+        assert ArchivedIncomeRecord.objects.count() == 4
+
+        assert restore_declaration_records(declaration.pk) == 4
+        assert restore_declaration_records(declaration.pk) == 0
+        assert IncomeRecord.objects.count() == 4
+
+    def test_other_declarations_untouched(self, user):
+        """Solo se mueven los registros de la declaración indicada."""
+        declaration = closed_declaration(user)
+        other = closed_declaration(user, records=3)
+
+        archive_declaration_records(declaration.pk)
+
+        other.refresh_from_db()
+        assert other.records_archived is False
+        assert IncomeRecord.objects.filter(declaration=other).count() == 3
+
+    def test_archivable_declarations(self, user):
+        """Solo declaraciones cerradas, anteriores al año y sin archivar."""
+        completed = closed_declaration(user, fiscal_year=2021)
+        paid = closed_declaration(user, fiscal_year=2022, status='paid')
+        closed_declaration(user, fiscal_year=2022, status='draft')
+        closed_declaration(user, fiscal_year=2024)
+        archived = closed_declaration(user, fiscal_year=2020)
+        archive_declaration_records(archived.pk)
+
+        assert list(archivable_declarations(2023)) == [completed, paid]
+
+
+@pytest.mark.django_db
+class TestArchivedStatusGuard:
+    """Una declaración con registros archivados no sale de un estado cerrado."""
+
+    def test_reopening_is_blocked(self, user):
+        declaration = closed_declaration(user)
+        archive_declaration_records(declaration.pk)
+        declaration.refresh_from_db()
+
+        declaration.status = 'draft'
+        with pytest.raises(ValidationError) as excinfo:
+            declaration.full_clean()
+        assert 'status' in excinfo.value.message_dict
+        with pytest.raises(ValidationError):
+            declaration.save()
+
+        assert Declaration.objects.get(pk=declaration.pk).status == 'completed'
+
+    def test_stale_instance_is_blocked(self, user):
+        """Una instancia cargada antes de archivar tampoco puede reabrir la declaración."""
+        declaration = Declaration.objects.get(pk=closed_declaration(user).pk)
+        archive_declaration_records(declaration.pk)
+
+        declaration.status = 'processing'
+        with pytest.raises(ValidationError):
+            declaration.save(update_fields=['status', 'updated_at'])
+
+    def test_closed_transitions_and_other_fields_allowed(self, user):
+        declaration = closed_declaration(user)
+        archive_declaration_records(declaration.pk)
+        declaration.refresh_from_db()
+
+        declaration.title = 'Renombrada'
+        declaration.save()
+        declaration.mark_as_paid()
+
+        declaration.refresh_from_db()
+        assert (declaration.title, declaration.status) == ('Renombrada', 'paid')
+
+    def test_reopening_after_restore(self, user):
+        declaration = closed_declaration(user)
+        archive_declaration_records(declaration.pk)
+        restore_declaration_records(declaration.pk)
+        declaration.refresh_from_db()
+
+        declaration.status = 'draft'
+        declaration.save()
+
+        assert declaration.get_income_records().count() == 4
+
+
+@pytest.mark.django_db
+class TestArchiveCommand:
+    """Tests para el comando archive_income_records."""
+
+    def test_before_year(self, user):
+        """`--before-year` archiva solo las declaraciones cerradas de años anteriores."""
+        old = closed_declaration(user, fiscal_year=2021)
+        recent = closed_declaration(user, fiscal_year=2023)
+
+        output = run_command('--before-year', '2023')
+
+        old.refresh_from_db()
+        recent.refresh_from_db()
+        assert old.records_archived is True
+        assert recent.records_archived is False
+        assert '1 declaraciones, 4 registros archivados' in output
+
+    def test_dry_run(self, user):
+        """`--dry-run` reporta lo que movería sin mover nada."""
+        declaration = closed_declaration(user, fiscal_year=2021)
+
+        output = run_command('--before-year', '2023', '--dry-run')
+
+        declaration.refresh_from_db()
+        assert declaration.records_archived is False
+        assert IncomeRecord.objects.filter(declaration=declaration).count() == 4
+        assert not ArchivedIncomeRecord.objects.exists()
+        assert f'[dry-run] Declaración {declaration.pk} (2021): 4 registros' in output
+        assert 'sin cambios, dry-run' in output
+
+    def test_single_declaration_and_restore(self, user):
+        """`--declaration` archiva una sola declaración y `--restore` la devuelve."""
+        declaration = closed_declaration(user)
+        other = closed_declaration(user)
+
+        run_command('--declaration', str(declaration.pk))
+
+        declaration.refresh_from_db()
+        other.refresh_from_db()
+        assert declaration.records_archived is True
+        assert other.records_archived is False
+
+        output = run_command('--declaration', str(declaration.pk), '--restore')
+
+        declaration.refresh_from_db()
+        assert declaration.records_archived is False
+        assert IncomeRecord.objects.filter(declaration=declaration).count() == 4
+        assert '4 registros restaurados' in output
+
+    def test_restore_dry_run(self, user):
+        """`--restore --dry-run` no devuelve los registros."""
+        declaration = closed_declaration(user)
+        archive_declaration_records(declaration.pk)
+
+        run_command('--declaration', str(declaration.pk), '--restore', '--dry-run')
+
+        declaration.refresh_from_db()
+        assert declaration.records_archived is True
+
+    def test_restore_requires_declaration(self):
+        """`--restore` sin `--declaration` es un error."""
+        with pytest.raises(CommandError, match='--restore requiere --declaration'):
+            run_command('--restore')
@@ -0,0 +1,181 @@
+"""
+Tests para las acciones en lote sobre declaraciones (POST /api/v1/declarations/bulk-action/).
+"""
+import pytest
+from django.core.cache import cache
+from django.test import override_settings
+
+from apps.common.cache import cache_key, read_through
+from apps.common.testing import seed_declarations
+from apps.declarations.models import Declaration, DeclarationStats
+from apps.declarations.signals import declarations_bulk_updated
+
+BULK_URL = '/api/v1/declarations/bulk-action/'
+
+LOCMEM_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'bulk-action-tests',
+    }
+}
+
+
+def with_status(declaration, status, **fields):
+    Declaration.objects.filter(pk=declaration.pk).update(status=status, **fields)
+    declaration.refresh_from_db()
+    return declaration
+
+
+@pytest.mark.django_db
+class TestBulkAction:
+    """Tests para la acción `bulk_action` del DeclarationViewSet."""
+
+    @pytest.fixture
+    def declarations(self, user):
+        return seed_declarations(user, declarations=3)
+
+    @pytest.fixture
+    def sent_signals(self):
+        received = []
+
+        def receiver(sender, **kwargs):
+            received.append(kwargs)
+
+        declarations_bulk_updated.connect(receiver)
+        yield received
+        declarations_bulk_updated.disconnect(receiver)
+
+    def post(self, api_client, **data):
+        return api_client.post(BULK_URL, data, format='json')
+
+    def test_delete_skips_completed(self, api_client, declarations):
+        """Eliminar omite las declaraciones completadas y las reporta en `skipped_ids`."""
+        draft, other_draft, completed = declarations
+        with_status(completed, 'completed')
+        ids = [draft.id, other_draft.id, completed.id]
+
+        response = self.post(api_client, action='delete', declaration_ids=ids)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data['requested'] == 3
+        assert data['affected'] == 2
+        assert data['affected_ids'] == sorted([draft.id, other_draft.id])
+        assert data['skipped_ids'] == [completed.id]
+        assert list(Declaration.objects.filter(is_active=True).values_list('id', flat=True)) == [completed.id]
+        assert Declaration.objects.get(pk=draft.id).deleted_at is not None
+
+    def test_restore(self, api_client, declarations):
+        """Restaurar solo afecta a las eliminadas."""
+        deleted, active, _ = declarations
+        Declaration.objects.filter(pk=deleted.pk).update(is_active=False)
+
+        data = self.post(api_client, action='restore', declaration_ids=[deleted.id, active.id]).json()
+
+        assert data['affected_ids'] == [deleted.id]
+        assert data['skipped_ids'] == [active.id]
+        assert Declaration.objects.get(pk=deleted.id).is_active is True
+
+    def test_change_status_skips_invalid_transitions(self, api_client, declarations):
+        """Solo cambian las declaraciones cuyo estado admite la transición."""
+        draft, completed, paid = declarations
+        with_status(completed, 'completed')
+        with_status(paid, 'paid')
+
+        data = self.post(
+            api_client, action='change_status', status='completed',
+            declaration_ids=[draft.id, completed.id, paid.id]
+        ).json()
+
+        assert data['affected_ids'] == [draft.id]
+        assert data['skipped_ids'] == [completed.id, paid.id]
+        draft.refresh_from_db()
+        assert draft.status == 'completed'
+        assert draft.completed_at is not None
+        assert Declaration.objects.get(pk=paid.id).status == 'paid'
+
+    def test_change_status_skips_deleted(self, api_client, declarations):
+        """Las declaraciones eliminadas no cambian de estado."""
+        active, deleted, _ = declarations
+        Declaration.objects.filter(pk=deleted.pk).update(is_active=False)
+
+        data = self.post(
+            api_client, action='change_status', status='processing',
+            declaration_ids=[active.id, deleted.id]
+        ).json()
+
+        assert data['affected_ids'] == [active.id]
+        assert data['skipped_ids'] == [deleted.id]
+        assert Declaration.objects.get(pk=deleted.id).status == 'draft'
+
+    def test_change_status_requires_status(self, api_client, declarations):
+        """`change_status` sin `status` es un 400."""
+        response = self.post(api_client, action='change_status', declaration_ids=[declarations[0].id])
+
+        assert response.status_code == 400
+        assert 'status' in response.json()
+
+    def test_unknown_ids_are_rejected(self, api_client, declarations):
+        """IDs inexistentes invalidan toda la solicitud."""
+        response = self.post(api_client, action='delete', declaration_ids=[declarations[0].id, 999999])
+
+        assert response.status_code == 400
+        assert Declaration.objects.filter(is_active=True).count() == 3
+
+    @override_settings(DEV_SKIP_AUTH_FOR_TESTING=False)
+    def test_rejects_declarations_of_other_users(self, api_client, declarations, django_user_model):
+        """Con autenticación real no se aceptan declaraciones de otro usuario."""
+        stranger = django_user_model.objects.create_user(
+            username='otro', email='otro@example.com', password='clave-segura-123'
+        )
+        foreign = seed_declarations(stranger)[0]
+
+        response = self.post(api_client, action='delete', declaration_ids=[declarations[0].id, foreign.id])
+
+        assert response.status_code == 400
+        assert str(foreign.id) in str(response.json()['declaration_ids'])
+        assert Declaration.objects.get(pk=foreign.id).is_active is True
+        assert Declaration.objects.get(pk=declarations[0].id).is_active is True
+
+    def test_signal_sent_once_for_affected(self, api_client, declarations, user, sent_signals):
+        """Una sola señal con los IDs afectados y sus usuarios."""
+        draft, other_draft, completed = declarations
+        with_status(completed, 'completed')
+
+        self.post(api_client, action='delete', declaration_ids=[draft.id, other_draft.id, completed.id])
+
+        assert len(sent_signals) == 1
+        assert sent_signals[0]['declaration_ids'] == sorted([draft.id, other_draft.id])
+        assert sent_signals[0]['user_ids'] == {user.pk}
+        assert sent_signals[0]['action'] == 'delete'
+
+    def test_no_signal_when_nothing_changes(self, api_client, declarations, sent_signals):
+        """Si todas se omiten no se emite la señal."""
+        completed = with_status(declarations[0], 'completed')
+
+        data = self.post(api_client, action='delete', declaration_ids=[completed.id]).json()
+
+        assert data['affected'] == 0
+        assert sent_signals == []
+
+    def test_invalidates_cache_and_refreshes_stats(self, api_client, declarations, user,
+                                                   django_capture_on_commit_callbacks):
+        """Las entradas cacheadas se borran y las estadísticas se recalculan."""
+        draft, kept, _ = declarations
+        DeclarationStats.refresh_for_user(user.pk)
+        assert DeclarationStats.objects.get(user=user).total_declarations == 3
+
+        with override_settings(CACHES=LOCMEM_CACHE):
+            cache.clear()
+            read_through('declaration_detail', draft.id, 'v1', lambda: {'id': draft.id})
+            read_through('declaration_detail', kept.id, 'v1', lambda: {'id': kept.id})
+
+            with django_capture_on_commit_callbacks(execute=True):
+                self.post(api_client, action='delete', declaration_ids=[draft.id])
+
+            assert cache.get(cache_key('declaration_detail', draft.id)) is None
+            assert cache.get(cache_key('declaration_detail', kept.id)) is not None
+
+        stats = DeclarationStats.objects.get(user=user)
+        assert stats.total_declarations == 2
+        assert stats.draft_declarations == 2
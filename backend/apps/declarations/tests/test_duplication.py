@@ -0,0 +1,145 @@
+"""
+Tests para la duplicación de declaraciones (Declaration.duplicate y duplication.py).
+"""
+import pytest
+
+from apps.common.testing import seed_declarations
+from apps.declarations.archive import archive_declaration_records
+from apps.declarations.duplication import copy_documents, copy_income_records
+from apps.declarations.models import Declaration, IncomeRecord
+from apps.documents.models import Document
+
+RECORD_FIELDS = ('third_party_nit', 'third_party_name', 'concept_code', 'gross_amount', 'withholding_amount')
+
+
+def record_rows(declaration):
+    """Contenido de los registros de una declaración, sin IDs ni fechas"""
+    return list(declaration.get_income_records().order_by('id').values_list(*RECORD_FIELDS))
+
+
+@pytest.mark.django_db
+class TestDeclarationDuplicate:
+    """Tests para Declaration.duplicate."""
+
+    @pytest.fixture
+    def source(self, user):
+        declaration = seed_declarations(user, records=5, documents=2)[0]
+        Declaration.objects.filter(pk=declaration.pk).update(status='completed')
+        declaration.refresh_from_db()
+        return declaration
+
+    def test_copies_records_and_documents_with_new_ids(self, source):
+        """Los registros y documentos se copian con IDs nuevos y el mismo contenido."""
+        copy = source.duplicate()
+
+        assert copy.pk != source.pk
+        assert copy.title == f"{source.title} (Copia)"
+        assert copy.status == 'draft'
+        assert record_rows(copy) == record_rows(source)
+
+        source_record_ids = set(source.income_records.values_list('id', flat=True))
+        copy_record_ids = set(copy.income_records.values_list('id', flat=True))
+        assert len(copy_record_ids) == 5
+        assert not source_record_ids & copy_record_ids
+
+        source_documents = {document.original_file_name: document for document in source.documents.all()}
+        copied_documents = list(copy.documents.all())
+        assert len(copied_documents) == 2
+        for document in copied_documents:
+            original = source_documents[document.original_file_name]
+            assert document.id != original.id
+            # Comparten el archivo y conservan el resultado procesado
+            assert document.storage_path == original.storage_path
+            assert document.processed_data == original.processed_data
+
+    def test_source_is_untouched(self, source):
+        """La declaración original conserva sus registros, documentos y estado."""
+        records_before = record_rows(source)
+        document_ids = set(source.documents.values_list('id', flat=True))
+
+        source.duplicate(new_title='Borrador 2024')
+
+        source.refresh_from_db()
+        assert source.status == 'completed'
+        assert record_rows(source) == records_before
+        assert set(source.documents.values_list('id', flat=True)) == document_ids
+        assert IncomeRecord.objects.count() == 10
+        assert Document.objects.filter(declaration__title='Borrador 2024').count() == 2
+
+    def test_without_records_or_documents(self, source):
+        """`copy_income_records=False` y `copy_documents=False` crean solo la declaración."""
+        copy = source.duplicate(copy_income_records=False, copy_documents=False)
+
+        assert copy.declaration_data == source.declaration_data
+        assert not copy.income_records.exists()
+        assert not copy.documents.exists()
+
+    def test_copy_only_documents(self, source):
+        """Cada opción se respeta por separado."""
+        copy = source.duplicate(copy_income_records=False)
+
+        assert not copy.income_records.exists()
+        assert copy.documents.count() == 2
+
+    def test_inactive_documents_are_not_copied(self, source):
+        """Solo se copian los documentos activos."""
+        source.documents.filter(original_file_name='exogena_0.xlsx').update(is_active=False)
+
+        copy = source.duplicate()
+
+        assert list(copy.documents.values_list('original_file_name', flat=True)) == ['exogena_1.xlsx']
+
+    def test_duplicate_archived_declaration(self, source):
+        """Los registros archivados se copian a la tabla activa de la copia."""
+        records_before = record_rows(source)
+        assert archive_declaration_records(source.pk) == 5
+        source.refresh_from_db()
+
+        copy = source.duplicate()
+
+        assert copy.records_archived is False
+        assert copy.income_records.count() == 5
+        assert record_rows(copy) == records_before
+        # El original sigue archivado
+        source.refresh_from_db()
+        assert source.records_archived is True
+        assert not source.income_records.exists()
+        assert record_rows(source) == records_before
+
+
+@pytest.mark.django_db
+class TestCopyHelpers:
+    """Tests para las funciones de copia en bloque."""
+
+    def test_copy_income_records_in_batches(self, user, monkeypatch):
+        """El respaldo con bulk_create copia todos los lotes."""
+        monkeypatch.setattr('apps.declarations.duplication.COPY_BATCH_SIZE', 3)
+        source, target = seed_declarations(user, declarations=2)
+        seed_records = seed_declarations(user, records=7)[0]
+
+        assert copy_income_records(seed_records, target) == 7
+        assert target.income_records.count() == 7
+        assert copy_income_records(source, target) == 0
+
+    def test_copy_documents_without_documents(self, user):
+        """Sin documentos activos no se crea nada."""
+        source, target = seed_declarations(user, declarations=2)
+
+        assert copy_documents(source, target) == 0
+        assert not target.documents.exists()
+
+    def test_duplicate_endpoint(self, api_client, user):
+        """La acción `duplicate` crea la copia y respeta `copy_documents`."""
+        source = seed_declarations(user, records=3, documents=1)[0]
+
+        response = api_client.post(
+            f'/api/v1/declarations/{source.id}/duplicate/',
+            {'new_title': 'Copia API', 'copy_documents': False},
+            format='json'
+        )
+
+        assert response.status_code == 201
+        copy = Declaration.objects.get(pk=response.json()['id'])
+        assert copy.title == 'Copia API'
+        assert copy.income_records.count() == 3
+        assert not copy.documents.exists()
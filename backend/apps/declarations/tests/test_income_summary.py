@@ -0,0 +1,154 @@
+"""
+Tests para el resumen de ingresos agrupado (Declaration.get_income_summary) y
+su invalidación al escribir registros de ingreso.
+"""
+from decimal import Decimal
+
+import pytest
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from apps.common.testing import seed_declarations
+from apps.declarations.models import Declaration, IncomeRecord
+from apps.declarations.signals import income_records_changed
+
+LOCMEM_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'income-summary-tests',
+    }
+}
+
+
+@pytest.fixture
+def locmem_cache():
+    with override_settings(CACHES=LOCMEM_CACHE):
+        cache.clear()
+        yield cache
+        cache.clear()
+
+
+@pytest.fixture
+def declaration(user, locmem_cache, django_capture_on_commit_callbacks):
+    # Se ejecutan los callbacks como si la creación se hubiera confirmado
+    with django_capture_on_commit_callbacks(execute=True):
+        return create_declaration(user)
+
+
+def create_declaration(user):
+    declaration = seed_declarations(user, records=3)[0]
+    IncomeRecord.objects.create(
+        declaration=declaration, third_party_nit='900111222', third_party_name='BANCO S.A.',
+        concept_code='5003', income_type='interest', tax_schedule='capital',
+        gross_amount=Decimal('250000.50'), withholding_amount=Decimal('17500.00')
+    )
+    IncomeRecord.objects.create(
+        declaration=declaration, third_party_nit='900333444', third_party_name='OTRO S.A.',
+        concept_code='5004', income_type='other', tax_schedule='',
+        gross_amount=Decimal('100000.00'), withholding_amount=Decimal('0.00')
+    )
+    return declaration
+
+
+def is_cached(declaration):
+    return cache.get(Declaration.income_summary_cache_key(declaration.pk)) is not None
+
+
+@pytest.mark.django_db
+class TestIncomeSummary:
+    """Tests para get_income_summary."""
+
+    def test_totals_by_type_and_schedule(self, declaration):
+        summary = declaration.get_income_summary()
+
+        assert summary['by_type'] == {
+            'salary': {'count': 3, 'gross_amount': 4500000.0, 'withholding_amount': 180000.0},
+            'interest': {'count': 1, 'gross_amount': 250000.5, 'withholding_amount': 17500.0},
+            'other': {'count': 1, 'gross_amount': 100000.0, 'withholding_amount': 0.0},
+        }
+        # Los registros sin cédula solo cuentan por tipo
+        assert summary['by_schedule'] == {
+            'labor': {'count': 3, 'gross_amount': 4500000.0, 'withholding_amount': 180000.0},
+            'capital': {'count': 1, 'gross_amount': 250000.5, 'withholding_amount': 17500.0},
+        }
+
+    def test_cached_until_records_change(self, declaration, django_capture_on_commit_callbacks):
+        declaration.get_income_summary()
+        assert is_cached(declaration)
+
+        with CaptureQueriesContext(connection) as context:
+            declaration.get_income_summary()
+        assert len(context.captured_queries) == 0
+
+        record = declaration.income_records.get(income_type='interest')
+        with django_capture_on_commit_callbacks(execute=True):
+            record.gross_amount = Decimal('1000.00')
+            record.save()
+
+        assert not is_cached(declaration)
+        assert declaration.get_income_summary()['by_type']['interest']['gross_amount'] == 1000.0
+
+    def test_delete_makes_summary_stale(self, declaration):
+        declaration.get_income_summary()
+
+        declaration.income_records.get(income_type='other').delete()
+
+        assert not is_cached(declaration)
+        assert 'other' not in declaration.get_income_summary()['by_type']
+
+    def test_bulk_delete_signal(self, declaration):
+        declaration.get_income_summary()
+
+        declaration.income_records.all().delete()
+        income_records_changed.send(sender=IncomeRecord, declaration_ids=[declaration.pk])
+
+        assert not is_cached(declaration)
+        assert declaration.get_income_summary() == {'by_type': {}, 'by_schedule': {}}
+
+
+@pytest.mark.django_db
+class TestIncomeRecordChangeCoalescing:
+    """Las escrituras de registros se notifican una vez por declaración y transacción."""
+
+    def test_one_touch_and_callback_per_transaction(self, user, django_capture_on_commit_callbacks):
+        declaration = seed_declarations(user, records=3)[0]
+        updated_at = Declaration.objects.get(pk=declaration.pk).updated_at
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            with CaptureQueriesContext(connection) as context:
+                with transaction.atomic():
+                    for record in declaration.income_records.all():
+                        record.gross_amount = Decimal('1.00')
+                        record.save()
+
+        touches = [query for query in context.captured_queries
+                   if query['sql'].startswith('UPDATE "declarations_declaration"')]
+        assert len(touches) == 1
+        assert len(callbacks) == 1
+        assert Declaration.objects.get(pk=declaration.pk).updated_at > updated_at
+
+    def test_rolled_back_transaction_does_not_swallow_changes(self, user, django_capture_on_commit_callbacks):
+        declaration = seed_declarations(user, records=1)[0]
+        record = declaration.income_records.get()
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            with pytest.raises(RuntimeError):
+                with transaction.atomic():
+                    record.save()
+                    raise RuntimeError('rollback')
+            with transaction.atomic():
+                record.save()
+
+        assert len(callbacks) == 1
+
+    def test_queryset_delete_is_a_fast_delete(self, user):
+        """Sin receptor post_delete el borrado en lote no carga las filas."""
+        declaration = seed_declarations(user, records=20)[0]
+
+        with CaptureQueriesContext(connection) as context:
+            declaration.income_records.all().delete()
+
+        assert [query['sql'].split()[0] for query in context.captured_queries] == ['DELETE']
+        assert not IncomeRecord.objects.filter(declaration=declaration).exists()
@@ -0,0 +1,90 @@
+"""
+Presupuestos de consultas y latencia de los endpoints de declaraciones.
+
+Cada endpoint se mide con un volumen pequeño y uno grande de datos: la cantidad
+de consultas debe ser la misma (sin N+1) y no superar el presupuesto.
+"""
+import pytest
+
+from apps.common.testing import assert_budget, measure, seed_declarations
+
+VOLUMES = {
+    'pequeño': {'declarations': 2, 'records': 2, 'documents': 1},
+    'grande': {'declarations': 25, 'records': 40, 'documents': 4},
+}
+
+
+@pytest.mark.django_db
+class TestDeclarationQueryBudgets:
+    """Consultas por endpoint independientes del volumen de datos."""
+
+    @pytest.mark.parametrize('volume', list(VOLUMES))
+    def test_list(self, api_client, user, volume):
+        """El listado paginado cuesta una consulta por página."""
+        seed_declarations(user, **VOLUMES[volume])
+
+        measurement = measure(api_client, '/api/v1/declarations/', label=f"declarations list [{volume}]")
+
+        assert measurement.status_code == 200
+        assert_budget(measurement, max_queries=1, max_p95_ms=250)
+
+    @pytest.mark.parametrize('volume', list(VOLUMES))
+    def test_detail(self, api_client, user, volume):
+        """El detalle no consulta por cada registro o documento."""
+        declaration = seed_declarations(user, **VOLUMES[volume])[0]
+
+        measurement = measure(
+            api_client, f'/api/v1/declarations/{declaration.id}/',
+            label=f"declaration detail [{volume}]"
+        )
+
+        assert measurement.status_code == 200
+        assert_budget(measurement, max_queries=4, max_p95_ms=250)
+
+    @pytest.mark.parametrize('volume', list(VOLUMES))
+    def test_income_records(self, api_client, user, volume):
+        """Los registros de ingreso se listan sin consultas por fila."""
+        declaration = seed_declarations(user, **VOLUMES[volume])[0]
+
+        measurement = measure(
+            api_client, f'/api/v1/declarations/{declaration.id}/income-records/',
+            label=f"income records [{volume}]"
+        )
+
+        assert measurement.status_code == 200
+        assert_budget(measurement, max_queries=2, max_p95_ms=250)
+
+    def test_list_pages_cost_the_same(self, api_client, user):
+        """Seguir el cursor no agrega consultas ni repite filas."""
+        seed_declarations(user, declarations=45)
+
+        first_page = api_client.get('/api/v1/declarations/').json()
+        measurement = measure(api_client, first_page['next'], label='declarations list (página 2)')
+        second_page = api_client.get(first_page['next']).json()
+
+        assert_budget(measurement, max_queries=1)
+        first_ids = {item['id'] for item in first_page['results']}
+        second_ids = {item['id'] for item in second_page['results']}
+        assert first_ids and second_ids and not first_ids & second_ids
+
+
+@pytest.mark.django_db
+class TestDeclarationAdminQueryBudgets:
+    """Listados del admin sin consultas por fila."""
+
+    @pytest.mark.parametrize('volume', list(VOLUMES))
+    @pytest.mark.parametrize('url', [
+        '/admin/declarations/declaration/',
+        '/admin/declarations/incomerecord/',
+        '/admin/declarations/declarationstats/',
+    ])
+    def test_changelist(self, client, user, volume, url):
+        user.is_staff = user.is_superuser = True
+        user.save()
+        client.force_login(user)
+        seed_declarations(user, **VOLUMES[volume])
+
+        measurement = measure(client, url, runs=2, label=f"admin {url} [{volume}]")
+
+        assert measurement.status_code == 200
+        assert_budget(measurement, max_queries=6)
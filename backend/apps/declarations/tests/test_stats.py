@@ -0,0 +1,149 @@
+"""
+Tests para las estadísticas materializadas (DeclarationStats) y su
+actualización incremental desde las señales.
+"""
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.declarations.models import Declaration, DeclarationStats
+
+
+def aggregated(user):
+    """Estadísticas recalculadas desde cero, para comparar"""
+    return DeclarationStats.aggregate(Declaration.objects.filter(user=user, is_active=True))
+
+
+def stored(user):
+    stats = DeclarationStats.objects.get(user=user)
+    return {key: getattr(stats, key) for key in aggregated(user)}
+
+
+@pytest.mark.django_db
+class TestIncrementalStats:
+    """Las señales aplican diferencias que coinciden con el recálculo completo."""
+
+    @pytest.fixture
+    def create(self, user, django_capture_on_commit_callbacks):
+        def create_declaration(**fields):
+            values = {'title': 'Declaración', 'fiscal_year': 2024, 'total_income': Decimal('1000.00'),
+                      'total_withholdings': Decimal('100.00'), **fields}
+            with django_capture_on_commit_callbacks(execute=True):
+                return Declaration.objects.create(user=user, **values)
+        return create_declaration
+
+    def test_create_and_update(self, user, create, django_capture_on_commit_callbacks):
+        """Crear, cambiar estado, año y montos mantiene las estadísticas exactas."""
+        first = create()
+        create(fiscal_year=2023, status='completed', total_income=Decimal('500.50'))
+        assert stored(user) == aggregated(user)
+        assert stored(user)['total_declarations'] == 2
+
+        with django_capture_on_commit_callbacks(execute=True):
+            first.status = 'processing'
+            first.fiscal_year = 2022
+            first.total_income = Decimal('2500.00')
+            first.save()
+
+        assert stored(user) == aggregated(user)
+        assert stored(user)['declarations_by_year'] == {'2022': 1, '2023': 1}
+        assert stored(user)['total_income_all'] == Decimal('3000.50')
+
+    def test_update_fields_and_soft_delete(self, user, create, django_capture_on_commit_callbacks):
+        """`save(update_fields=...)` y el soft delete aplican solo lo guardado."""
+        declaration = create()
+        other = create(fiscal_year=2025)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            declaration.mark_as_completed()
+        assert stored(user)['completed_declarations'] == 1
+        assert stored(user) == aggregated(user)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            # `fiscal_year` cambia en memoria pero no se guarda
+            other.fiscal_year = 2030
+            other.soft_delete()
+
+        assert stored(user) == aggregated(user)
+        assert stored(user)['declarations_by_year'] == {'2024': 1}
+        assert stored(user)['last_declaration_id'] == declaration.id
+
+        with django_capture_on_commit_callbacks(execute=True):
+            other.restore()
+        assert stored(user)['last_declaration_id'] == other.id
+        assert stored(user) == aggregated(user)
+
+    def test_delete(self, user, create, django_capture_on_commit_callbacks):
+        """Eliminar la fila descuenta su aporte."""
+        declaration = create(status='completed')
+        create()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Declaration.objects.get(pk=declaration.pk).delete()
+
+        assert stored(user) == aggregated(user)
+        assert stored(user)['completed_declarations'] == 0
+
+    def test_save_does_not_regroup(self, user, create, django_capture_on_commit_callbacks):
+        """Un cambio de estado no ejecuta la consulta agrupada del recálculo."""
+        declaration = create()
+
+        with CaptureQueriesContext(connection) as context:
+            with django_capture_on_commit_callbacks(execute=True):
+                declaration.status = 'processing'
+                declaration.save(update_fields=['status', 'updated_at'])
+
+        assert not [query for query in context.captured_queries if 'GROUP BY' in query['sql']]
+        assert stored(user)['declarations_by_status'] == {'processing': 1}
+
+    def test_unrelated_save_is_skipped(self, user, create, django_capture_on_commit_callbacks):
+        """Guardar campos que no afectan las estadísticas no las toca."""
+        declaration = create()
+        updated_at = DeclarationStats.objects.get(user=user).updated_at
+
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            declaration.title = 'Otro título'
+            declaration.save(update_fields=['title'])
+
+        assert callbacks == []
+        assert DeclarationStats.objects.get(user=user).updated_at == updated_at
+
+    def test_deferred_fields_fall_back_to_recompute(self, user, create, django_capture_on_commit_callbacks):
+        """Sin el estado anterior (campos diferidos) se recalcula todo."""
+        create()
+        declaration = Declaration.objects.only('id', 'user_id', 'title').get()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            declaration.status = 'completed'
+            declaration.save()
+
+        assert stored(user) == aggregated(user)
+        assert stored(user)['completed_declarations'] == 1
+
+    def test_out_of_sync_stats_are_repaired(self, user, create, django_capture_on_commit_callbacks):
+        """Si la diferencia dejaría conteos negativos se recalcula desde cero."""
+        declaration = create()
+        DeclarationStats.objects.filter(user=user).update(
+            total_declarations=0, draft_declarations=0, declarations_by_status={}, declarations_by_year={}
+        )
+
+        with django_capture_on_commit_callbacks(execute=True):
+            declaration.soft_delete()
+
+        assert stored(user) == aggregated(user)
+        assert stored(user)['total_declarations'] == 0
+
+    def test_missing_row_is_backfilled(self, user, create, django_capture_on_commit_callbacks):
+        """Sin fila de estadísticas se crea con el recálculo completo."""
+        declaration = create()
+        create(fiscal_year=2023)
+        DeclarationStats.objects.filter(user=user).delete()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            declaration.status = 'completed'
+            declaration.save()
+
+        assert stored(user) == aggregated(user)
+        assert stored(user)['total_declarations'] == 2
@@ -3,14 +3,20 @@ Vistas API para declaraciones - SIMPLIFICADAS PARA DESARROLLO.
 """
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.db import transaction
 from django.utils import timezone
 from django.db import models
+from django.db.models import Exists, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 
-from .models import Declaration, IncomeRecord
+from apps.common.pagination import KeysetPagination
+from apps.common.profiling import profile_stage
+from .models import Declaration, DeclarationStats, IncomeRecord
 from .serializers import (
     DeclarationSummarySerializer,
     DeclarationDetailSerializer,
@@ -23,6 +29,7 @@ from .serializers import (
     IncomeRecordSerializer
 )
 
+from decimal import Decimal, InvalidOperation
 import logging
 
 logger = logging.getLogger(__name__)
@@ -33,19 +40,23 @@ class DeclarationViewSet(viewsets.ModelViewSet):
     ViewSet para gestión de declaraciones - SIMPLIFICADO PARA DESARROLLO.
     """
     permission_classes = [AllowAny]  # Sin permisos para desarrollo
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-created_at', 'id')
+    
+    # Campos que necesita DeclarationSummarySerializer
+    LIST_FIELDS = (
+        'id', 'title', 'fiscal_year', 'status', 'is_active',
+        'total_income', 'total_withholdings', 'preliminary_tax',
+        'created_at', 'updated_at', 'user__email'
+    )
     
     def get_queryset(self):
         """
         Retorna declaraciones con optimizaciones.
         SIMPLIFICADO: Sin filtros de usuario para desarrollo.
         """
-        print(f"[DEBUG] DeclarationViewSet.get_queryset()")
-        
-        # Base queryset con optimizaciones
-        queryset = Declaration.objects.select_related('user').prefetch_related('documents', 'income_records')
-        
         # SIMPLIFICADO: En desarrollo, retornar todas las declaraciones activas
-        queryset = queryset.filter(is_active=True)
+        queryset = Declaration.objects.filter(is_active=True)
         
         # Filtros por parámetros de consulta
         fiscal_year = self.request.query_params.get('fiscal_year')
@@ -57,8 +68,54 @@ class DeclarationViewSet(viewsets.ModelViewSet):
         if status_filter:
             queryset = queryset.filter(status=status_filter)
         
-        print(f"[DEBUG] Queryset final: {queryset.count()} declaraciones")
-        return queryset.order_by('-created_at')
+        if self.action == 'list':
+            return self.get_list_queryset(queryset)
+        
+        return queryset.select_related('user').prefetch_related('income_records').annotate(
+            **self.get_document_annotations()
+        ).order_by('-created_at')
+    
+    def get_document_annotations(self):
+        """
+        Datos de documentos que usa el progreso de la declaración, como
+        subconsultas correlacionadas (evita consultarlos por cada declaración).
+        """
+        from apps.documents.models import Document
+        
+        documents = Document.objects.filter(declaration=OuterRef('pk'))
+        active_documents_count = documents.filter(is_active=True).order_by().values(
+            'declaration'
+        ).annotate(total=models.Count('id')).values('total')
+        
+        return {
+            'any_documents': Exists(documents),
+            'active_documents_total': Coalesce(
+                Subquery(active_documents_count, output_field=models.IntegerField()), 0
+            ),
+        }
+    
+    def get_list_queryset(self, queryset):
+        """
+        Consulta liviana para el listado: solo las columnas del resumen y los
+        datos del progreso como subconsultas correlacionadas, sin prefetch ni
+        GROUP BY (solo se evalúan para las filas de la página).
+        """
+        return queryset.select_related('user').only(*self.LIST_FIELDS).annotate(
+            **self.get_document_annotations(),
+            has_declaration_data=models.Case(
+                models.When(declaration_data={}, then=models.Value(False)),
+                default=models.Value(True),
+                output_field=models.BooleanField()
+            )
+        )
+    
+    def get_detail_state(self, declaration_id):
+        """
+        `updated_at` de la declaración: es la versión del detalle para la caché
+        y el ETag, porque cambiar registros o documentos también lo actualiza
+        (ver `Declaration.touch`). None si la declaración no existe.
+        """
+        return Declaration.objects.filter(pk=declaration_id, is_active=True).values('updated_at').first()
     
     def get_serializer_class(self):
         """
@@ -72,29 +129,27 @@ class DeclarationViewSet(viewsets.ModelViewSet):
             return DeclarationDetailSerializer
         elif self.action in ['update', 'partial_update']:
             return UpdateDeclarationSerializer
+        elif self.action == 'bulk_action':
+            return BulkDeclarationActionSerializer
+        elif self.action == 'duplicate':
+            return DuplicateDeclarationSerializer
         return DeclarationSummarySerializer
     
     def list(self, request, *args, **kwargs):
         """
-        Lista declaraciones - SIMPLIFICADO.
+        Lista declaraciones paginadas por cursor (`?cursor=...&page_size=...`).
         """
-        print(f"[DEBUG] DeclarationViewSet.list() - START")
         try:
             queryset = self.get_queryset()
-            serializer = self.get_serializer(queryset, many=True)
-            
-            response_data = {
-                'results': serializer.data,
-                'count': queryset.count()
-            }
-            
-            print(f"[DEBUG] Lista exitosa: {len(serializer.data)} declaraciones")
-            return Response(response_data)
+            page = self.paginate_queryset(queryset)
+            with profile_stage('serializer'):
+                data = self.get_serializer(page, many=True).data
+            return self.get_paginated_response(data)
             
+        except NotFound:
+            raise
         except Exception as e:
-            print(f"[ERROR] Error en list(): {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.error(f"Error listando declaraciones: {str(e)}", exc_info=True)
             return Response(
                 {'error': f'Error listando declaraciones: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -104,28 +159,21 @@ class DeclarationViewSet(viewsets.ModelViewSet):
         """
         Crea una nueva declaración - SIMPLIFICADO.
         """
-        print(f"[DEBUG] DeclarationViewSet.create() - START")
-        print(f"[DEBUG] Request data: {request.data}")
-        
         try:
             serializer = self.get_serializer(data=request.data)
             serializer.is_valid(raise_exception=True)
             
             with transaction.atomic():
                 declaration = serializer.save()
-                print(f"[DEBUG] Declaración creada: {declaration.id} - {declaration.title}")
+            logger.info(f"Declaración creada: {declaration.id}")
             
             # Serializar la respuesta con el serializador detallado
-            response_serializer = DeclarationDetailSerializer(declaration)
-            return Response(
-                response_serializer.data,
-                status=status.HTTP_201_CREATED
-            )
+            with profile_stage('serializer'):
+                data = DeclarationDetailSerializer(declaration).data
+            return Response(data, status=status.HTTP_201_CREATED)
             
         except Exception as e:
-            print(f"[ERROR] Error en create(): {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.error(f"Error creando declaración: {str(e)}", exc_info=True)
             return Response(
                 {'error': f'Error creando declaración: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -134,14 +182,39 @@ class DeclarationViewSet(viewsets.ModelViewSet):
     def retrieve(self, request, *args, **kwargs):
         """
         Obtiene una declaración específica - SIMPLIFICADO.
+        
+        GET condicional: el ETag sale de `updated_at` de la declaración, que
+        también cambia con sus hijos (ver `get_detail_state`); si el cliente ya lo tiene se responde 304
+        sin serializar. En otro caso la respuesta se lee de la caché por esa
+        misma versión.
         """
-        print(f"[DEBUG] DeclarationViewSet.retrieve() - START")
+        from apps.common.cache import mark_response, read_through
+        from apps.common.conditional import build_validators, conditional_response
+        
         try:
-            instance = self.get_object()
-            serializer = self.get_serializer(instance)
-            return Response(serializer.data)
+            declaration_id = kwargs[self.lookup_field]
+            state = self.get_detail_state(declaration_id)
+            
+            if state is None:
+                raise Http404
+            
+            etag, last_modified = build_validators([state['updated_at']])
+            
+            def serialize():
+                instance = self.get_object()
+                with profile_stage('serializer'):
+                    return self.get_serializer(instance).data
+            
+            def build():
+                data, hit = read_through('declaration_detail', declaration_id, etag, serialize)
+                return mark_response(Response(data), hit)
+            
+            return conditional_response(request, etag, last_modified, build)
+            
+        except Http404:
+            raise
         except Exception as e:
-            print(f"[ERROR] Error en retrieve(): {str(e)}")
+            logger.error(f"Error obteniendo declaración: {str(e)}", exc_info=True)
             return Response(
                 {'error': f'Error obteniendo declaración: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -151,7 +224,6 @@ class DeclarationViewSet(viewsets.ModelViewSet):
         """
         Actualiza una declaración - SIMPLIFICADO.
         """
-        print(f"[DEBUG] DeclarationViewSet.update() - START")
         try:
             partial = kwargs.pop('partial', False)
             instance = self.get_object()
@@ -167,11 +239,12 @@ class DeclarationViewSet(viewsets.ModelViewSet):
             self.perform_update(serializer)
             
             # Retornar con serializador detallado
-            response_serializer = DeclarationDetailSerializer(instance)
-            return Response(response_serializer.data)
+            with profile_stage('serializer'):
+                data = DeclarationDetailSerializer(instance).data
+            return Response(data)
             
         except Exception as e:
-            print(f"[ERROR] Error en update(): {str(e)}")
+            logger.error(f"Error actualizando declaración: {str(e)}", exc_info=True)
             return Response(
                 {'error': f'Error actualizando declaración: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -181,7 +254,6 @@ class DeclarationViewSet(viewsets.ModelViewSet):
         """
         Elimina una declaración (soft delete) - SIMPLIFICADO.
         """
-        print(f"[DEBUG] DeclarationViewSet.destroy() - START")
         try:
             instance = self.get_object()
             
@@ -200,61 +272,199 @@ class DeclarationViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_200_OK)
             
         except Exception as e:
-            print(f"[ERROR] Error en destroy(): {str(e)}")
+            logger.error(f"Error eliminando declaración: {str(e)}", exc_info=True)
             return Response(
                 {'error': f'Error eliminando declaración: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
+    @action(detail=True, methods=['post'])
+    def duplicate(self, request, pk=None):
+        """
+        Duplica una declaración con sus registros de ingreso y documentos.
+        
+        POST /api/v1/declarations/<id>/duplicate/
+        {"new_title": "...", "copy_income_records": true, "copy_documents": true}
+        """
+        instance = self.get_object()
+        serializer = DuplicateDeclarationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        new_declaration = instance.duplicate(
+            new_title=serializer.validated_data.get('new_title') or None,
+            copy_income_records=serializer.validated_data['copy_income_records'],
+            copy_documents=serializer.validated_data['copy_documents']
+        )
+        logger.info(f"Declaración {instance.id} duplicada como {new_declaration.id}")
+        
+        new_declaration = self.get_queryset().get(pk=new_declaration.pk)
+        return Response(DeclarationDetailSerializer(new_declaration).data, status=status.HTTP_201_CREATED)
+    
+    def get_permissions(self):
+        """Las acciones en lote requieren usuario salvo en modo testing."""
+        if self.action == 'bulk_action':
+            from apps.common.permissions import get_testing_permission_classes
+            return [permission() for permission in get_testing_permission_classes()]
+        return super().get_permissions()
+    
+    def get_owned_queryset(self):
+        """Declaraciones del usuario (todas en modo testing, como `stats`)."""
+        from django.conf import settings
+        
+        if self.request.user.is_authenticated and not getattr(settings, 'DEV_SKIP_AUTH_FOR_TESTING', False):
+            return Declaration.objects.filter(user=self.request.user)
+        return Declaration.objects.all()
+    
+    @action(detail=False, methods=['post'], url_path='bulk-action')
+    def bulk_action(self, request):
+        """
+        Aplica una acción a varias declaraciones con un solo UPDATE.
+        
+        POST /api/v1/declarations/bulk-action/
+        {"action": "delete|restore|archive|change_status", "declaration_ids": [...], "status": "..."}
+        
+        Las declaraciones que no admiten la acción (p. ej. eliminar una
+        completada) se omiten y se reportan en `skipped_ids`. Las cachés y las
+        estadísticas se actualizan con una sola señal para todo el lote.
+        """
+        from .signals import declarations_bulk_updated
+        
+        owned = self.get_owned_queryset()
+        serializer = BulkDeclarationActionSerializer(
+            data=request.data, context={'request': request, 'queryset': owned}
+        )
+        serializer.is_valid(raise_exception=True)
+        
+        bulk_action = serializer.validated_data['action']
+        declaration_ids = serializer.validated_data['declaration_ids']
+        target_status = serializer.validated_data.get('status')
+        
+        with transaction.atomic():
+            if bulk_action == 'archive':
+                # Archivar no cambia los campos de las estadísticas
+                affected_ids, records_moved = self._bulk_archive(owned, declaration_ids)
+                stats_changes = {}
+            else:
+                affected_ids, stats_changes = self._bulk_update(
+                    owned, declaration_ids, bulk_action, target_status
+                )
+                records_moved = None
+            
+            user_ids = set(
+                Declaration.objects.filter(id__in=affected_ids).values_list('user_id', flat=True)
+            ) if affected_ids else set()
+            
+            if affected_ids:
+                declarations_bulk_updated.send(
+                    sender=Declaration,
+                    declaration_ids=affected_ids,
+                    user_ids=user_ids,
+                    action=bulk_action,
+                    stats_changes=stats_changes
+                )
+        
+        logger.info(f"Acción en lote '{bulk_action}': {len(affected_ids)} de {len(declaration_ids)} declaraciones")
+        
+        affected = set(affected_ids)
+        response_data = {
+            'action': bulk_action,
+            'requested': len(declaration_ids),
+            'affected': len(affected_ids),
+            'affected_ids': affected_ids,
+            'skipped_ids': [pk for pk in declaration_ids if pk not in affected],
+        }
+        if records_moved is not None:
+            response_data['records_archived'] = records_moved
+        return Response(response_data)
+    
+    def _bulk_update(self, owned, declaration_ids, bulk_action, target_status=None):
+        """
+        Un UPDATE ... WHERE id IN (...) con las condiciones de la acción.
+        
+        Retorna los IDs afectados (bloqueados antes para reportarlos con
+        exactitud) y, por usuario, los cambios de los campos de estadísticas
+        (ver DeclarationStats.apply_changes).
+        """
+        now = timezone.now()
+        queryset = owned.filter(id__in=declaration_ids)
+        
+        if bulk_action == 'delete':
+            queryset = queryset.filter(is_active=True, status__in=Declaration.EDITABLE_STATUSES)
+            values = {'is_active': False, 'deleted_at': now}
+        elif bulk_action == 'restore':
+            queryset = queryset.filter(is_active=False)
+            values = {'is_active': True, 'deleted_at': None}
+        else:
+            sources = UpdateDeclarationStatusSerializer.source_statuses(target_status)
+            queryset = queryset.filter(is_active=True, status__in=sources)
+            if target_status not in Declaration.CLOSED_STATUSES:
+                # Reabrir dejaría invisibles los registros archivados
+                queryset = queryset.filter(records_archived=False)
+            values = {'status': target_status}
+            if target_status == 'completed':
+                values['completed_at'] = now
+            elif target_status == 'paid':
+                values['paid_at'] = now
+        
+        rows = queryset.select_for_update().order_by('id').values('id', 'user_id', *Declaration.STATS_FIELDS)
+        affected_ids = []
+        stats_changes = {}
+        for row in rows:
+            affected_ids.append(row.pop('id'))
+            user_id = row.pop('user_id')
+            changed = {**row, **{field: values[field] for field in Declaration.STATS_FIELDS if field in values}}
+            stats_changes.setdefault(user_id, []).append((row, changed))
+        
+        if affected_ids:
+            Declaration.objects.filter(id__in=affected_ids).update(updated_at=now, **values)
+        return affected_ids, stats_changes
+    
+    def _bulk_archive(self, owned, declaration_ids):
+        """Mueve los registros de las declaraciones cerradas a la tabla de archivo."""
+        from .archive import archive_declaration_records
+        
+        archivable_ids = sorted(owned.filter(
+            id__in=declaration_ids,
+            status__in=Declaration.CLOSED_STATUSES,
+            records_archived=False
+        ).values_list('id', flat=True))
+        
+        records_moved = sum(archive_declaration_records(pk) for pk in archivable_ids)
+        return archivable_ids, records_moved
+    
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """
-        Obtiene estadísticas de declaraciones - SIMPLIFICADO.
+        Obtiene estadísticas de declaraciones.
+        
+        Los usuarios autenticados leen su fila materializada (DeclarationStats);
+        en modo SIMPLIFICADO se agregan todas las declaraciones activas con una
+        sola consulta agrupada.
         """
-        print(f"[DEBUG] DeclarationViewSet.stats() - START")
         try:
-            # SIMPLIFICADO: Estadísticas de todas las declaraciones activas
-            active_declarations = Declaration.objects.filter(is_active=True)
+            from django.conf import settings
             
-            # Calcular estadísticas básicas
-            stats = {
-                'total_declarations': active_declarations.count(),
-                'active_declarations': active_declarations.filter(is_active=True).count(),
-                'completed_declarations': active_declarations.filter(status='completed').count(),
-                'draft_declarations': active_declarations.filter(status='draft').count(),
-                'declarations_by_year': {},
-                'declarations_by_status': {},
-                'total_income_all': 0,
-                'total_withholdings_all': 0,
-                'last_declaration': None
-            }
-            
-            # Agrupar por año y acumular totales
-            for declaration in active_declarations:
-                year = str(declaration.fiscal_year)
-                stats['declarations_by_year'][year] = stats['declarations_by_year'].get(year, 0) + 1
-                
-                # Acumular totales
-                stats['total_income_all'] += float(declaration.total_income)
-                stats['total_withholdings_all'] += float(declaration.total_withholdings)
-            
-            # Agrupar por estado
-            status_counts = active_declarations.values('status').annotate(
-                count=models.Count('id')
-            )
-            for item in status_counts:
-                stats['declarations_by_status'][item['status']] = item['count']
+            if request.user.is_authenticated and not getattr(settings, 'DEV_SKIP_AUTH_FOR_TESTING', False):
+                user_stats = DeclarationStats.objects.filter(user=request.user).first()
+                if user_stats is None:
+                    user_stats = DeclarationStats.refresh_for_user(request.user.pk)
+                stats = user_stats.as_dict()
+            else:
+                stats = DeclarationStats.aggregate(Declaration.objects.filter(is_active=True))
+                stats['active_declarations'] = stats['total_declarations']
             
             # Última declaración
-            last_declaration = active_declarations.first()
-            if last_declaration:
-                stats['last_declaration'] = DeclarationSummarySerializer(last_declaration).data
+            last_declaration_id = stats.pop('last_declaration_id', None)
+            stats['last_declaration'] = self.get_list_queryset(
+                Declaration.objects.filter(pk=last_declaration_id)
+            ).first() if last_declaration_id else None
             
-            serializer = DeclarationStatsSerializer(stats)
-            return Response(serializer.data)
+            with profile_stage('serializer'):
+                data = DeclarationStatsSerializer(stats).data
+            return Response(data)
             
         except Exception as e:
-            print(f"[ERROR] Error en stats(): {str(e)}")
+            logger.error(f"Error obteniendo estadísticas: {str(e)}", exc_info=True)
             return Response(
                 {'error': f'Error obteniendo estadísticas: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -264,22 +474,104 @@ class DeclarationViewSet(viewsets.ModelViewSet):
 class IncomeRecordViewSet(viewsets.ReadOnlyModelViewSet):
     """
     ViewSet para consultar registros de ingresos - SIMPLIFICADO.
+    
+    Paginado por cursor sobre el orden por defecto (tercero, concepto, id) y con
+    filtros en el servidor respaldados por índices compuestos por declaración.
     """
     serializer_class = IncomeRecordSerializer
     permission_classes = [AllowAny]  # Sin permisos para desarrollo
+    pagination_class = KeysetPagination
+    keyset_ordering = ('third_party_name', 'concept_code', 'id')
+    
+    # Parámetro de consulta -> campo (admite varios valores separados por coma)
+    CHOICE_FILTERS = {
+        'income_type': 'income_type',
+        'tax_schedule': 'tax_schedule',
+        'nit': 'third_party_nit',
+        'period': 'period',
+    }
     
     def get_queryset(self):
         """
         Filtra los registros por declaración - SIMPLIFICADO.
         """
-        print(f"[DEBUG] IncomeRecordViewSet.get_queryset()")
-        
         declaration_id = self.kwargs.get('declaration_pk')
         
         if declaration_id:
             # SIMPLIFICADO: Sin verificar usuario
-            declaration = get_object_or_404(Declaration, id=declaration_id)
-            return IncomeRecord.objects.filter(declaration=declaration)
+            declaration = get_object_or_404(Declaration.objects.only('id', 'records_archived'), id=declaration_id)
+            queryset = declaration.get_income_records()
+        else:
+            # SIMPLIFICADO: Retornar todos los registros
+            queryset = IncomeRecord.objects.all()
+        
+        return self.filter_records(queryset)
+    
+    def filter_records(self, queryset):
+        """
+        Aplica los filtros de la consulta:
+        income_type, tax_schedule, nit, period, min_amount y max_amount (valor bruto).
+        """
+        params = self.request.query_params
+        
+        for param, field in self.CHOICE_FILTERS.items():
+            values = [value.strip() for value in params.get(param, '').split(',') if value.strip()]
+            if len(values) == 1:
+                queryset = queryset.filter(**{field: values[0]})
+            elif values:
+                queryset = queryset.filter(**{f'{field}__in': values})
+        
+        for param, lookup in (('min_amount', 'gross_amount__gte'), ('max_amount', 'gross_amount__lte')):
+            value = params.get(param)
+            if value in (None, ''):
+                continue
+            try:
+                amount = Decimal(value)
+            except InvalidOperation:
+                amount = None
+            if amount is None or not amount.is_finite():
+                raise ValidationError({param: 'Debe ser un valor numérico'})
+            queryset = queryset.filter(**{lookup: amount})
+        
+        return queryset
+    
+    # Columnas de la exportación (campo del modelo, encabezado)
+    EXPORT_COLUMNS = (
+        ('id', 'ID'),
+        ('third_party_nit', 'NIT tercero'),
+        ('third_party_name', 'Nombre tercero'),
+        ('concept_code', 'Código concepto'),
+        ('concept_description', 'Descripción concepto'),
+        ('income_type', 'Tipo de ingreso'),
+        ('tax_schedule', 'Cédula'),
+        ('period', 'Período'),
+        ('gross_amount', 'Valor bruto'),
+        ('withholding_amount', 'Retención'),
+        ('is_deductible', 'Deducible'),
+    )
+    EXPORT_CHUNK_SIZE = 2000
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request, *args, **kwargs):
+        """
+        Exporta los registros (con los mismos filtros del listado) en streaming.
+        
+        GET /api/v1/declarations/<id>/income-records/export/?file_format=csv|xlsx
+        """
+        from apps.common.exports import get_export_format, streaming_export_response
+        
+        file_format = get_export_format(request)
+        fields = [field for field, _ in self.EXPORT_COLUMNS]
+        
+        rows = self.get_queryset().order_by(*self.keyset_ordering).values_list(*fields).iterator(
+            chunk_size=self.EXPORT_CHUNK_SIZE
+        )
         
-        # SIMPLIFICADO: Retornar todos los registros
-        return IncomeRecord.objects.all().select_related('declaration')
+        declaration_id = self.kwargs.get('declaration_pk', 'todas')
+        return streaming_export_response(
+            f"registros_ingresos_{declaration_id}",
+            file_format,
+            [header for _, header in self.EXPORT_COLUMNS],
+            rows,
+            sheet_title='Registros de ingresos'
+        )
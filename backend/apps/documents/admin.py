@@ -3,7 +3,7 @@ Configuración del admin para documentos.
 """
 from django.contrib import admin
 from django.utils.html import format_html
-from django.urls import reverse
+from django.urls import NoReverseMatch, reverse
 from django.utils import timezone
 from .models import Document, DocumentTemplate
 
@@ -116,7 +116,7 @@ class DocumentAdmin(admin.ModelAdmin):
             'declaration',
             'declaration__user',
             'uploaded_by'
-        )
+        ).defer(*Document.LIST_DEFERRED_FIELDS)
     
     def id_short(self, obj):
         """Muestra una versión corta del UUID."""
@@ -206,18 +206,21 @@ class DocumentAdmin(admin.ModelAdmin):
         if not obj.uploaded_by:
             return '-'
         
-        url = reverse('admin:auth_user_change', args=[obj.uploaded_by.id])
+        try:
+            url = reverse('admin:users_user_change', args=[obj.uploaded_by_id])
+        except NoReverseMatch:  # el modelo de usuarios no está registrado en el admin
+            return obj.uploaded_by.email
         return format_html('<a href="{}">{}</a>', url, obj.uploaded_by.email)
     uploaded_by_link.short_description = 'Subido por'
     
     def processed_data_display(self, obj):
         """Muestra los datos procesados de forma legible."""
-        if not obj.processed_data:
+        summary = obj.processed_summary
+        if not summary:
             return 'Sin datos procesados'
         
-        # Para archivos de exógena, mostrar resumen
-        if obj.file_type == 'exogena_report' and 'stats' in obj.processed_data:
-            stats = obj.processed_data['stats']
+        # Para archivos de exógena, mostrar el resumen precalculado
+        if obj.file_type == 'exogena_report' and 'total_income' in summary:
             return format_html(
                 '<div>'
                 '<strong>Registros:</strong> {} procesados de {}<br>'
@@ -226,12 +229,12 @@ class DocumentAdmin(admin.ModelAdmin):
                 '<strong>Errores:</strong> {}<br>'
                 '<strong>Advertencias:</strong> {}'
                 '</div>',
-                stats.get('processed_records', 0),
-                stats.get('total_records', 0),
-                stats.get('total_income', '0'),
-                stats.get('total_withholdings', '0'),
-                len(obj.processed_data.get('errors', [])),
-                len(obj.processed_data.get('warnings', []))
+                summary.get('processed_records', summary.get('records_count', 0)),
+                summary.get('total_records', 0),
+                summary.get('total_income', '0'),
+                summary.get('total_withholdings', '0'),
+                summary.get('errors_count', 0),
+                summary.get('warnings_count', 0)
             )
         
         # Para otros tipos, mostrar JSON formateado
@@ -271,7 +274,14 @@ class DocumentAdmin(admin.ModelAdmin):
     
     def soft_delete_documents(self, request, queryset):
         """Acción para hacer soft delete de documentos."""
+        from .signals import invalidate_documents
+        
+        documents = list(queryset.values_list('pk', 'declaration_id'))
         count = queryset.update(is_active=False)
+        # El UPDATE en lote no emite post_save: se invalidan las cachés y ETags
+        if documents:
+            document_ids, declaration_ids = zip(*documents)
+            invalidate_documents(document_ids, declaration_ids)
         self.message_user(
             request,
             f'{count} documento(s) marcado(s) como inactivo(s).'
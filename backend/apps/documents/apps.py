@@ -8,4 +8,4 @@ class DocumentsConfig(AppConfig):
 
     def ready(self):
         # Import signal handlers
-        pass
+        from . import signals  # noqa: F401
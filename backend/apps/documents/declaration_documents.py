@@ -9,6 +9,9 @@ from django.shortcuts import get_object_or_404
 from django.conf import settings
 import logging
 
+from apps.common.cache import mark_response, read_through
+from apps.common.conditional import build_validators, conditional_response
+
 from apps.declarations.models import Declaration
 from apps.documents.models import Document
 
@@ -19,6 +22,9 @@ logger = logging.getLogger(__name__)
 def get_declaration_documents(request, declaration_id):
     """
     Lista los documentos de una declaración específica
+    
+    Por defecto cada documento trae solo `processed_summary`; con
+    `?include=processed_data` se agrega el resultado completo del procesamiento.
     """
     # Solo en modo testing por ahora
     if not getattr(settings, 'DEV_SKIP_AUTH_FOR_TESTING', False):
@@ -45,43 +51,60 @@ def get_declaration_documents(request, declaration_id):
         else:
             # Buscar declaración específica
             declaration = get_object_or_404(Declaration, id=declaration_id)
-            logger.info(f"Declaración encontrada: {declaration}")
+            logger.info(f"Declaración encontrada: {declaration.id}")
         
-        # Obtener documentos de la declaración
+        # Versión de la lista: cambiar un documento actualiza `updated_at` de la declaración
         documents = Document.objects.filter(declaration=declaration)
-        logger.info(f"Documentos encontrados: {documents.count()}")
+        version = declaration.updated_at.isoformat()
+        
+        include_processed_data = 'processed_data' in request.query_params.get('include', '').split(',')
         
-        # Serializar documentos
-        documents_data = []
-        for doc in documents:
-            logger.info(f"Documento: {doc.id} - {doc.file_name} - {doc.upload_status}")
-            documents_data.append({
-                'id': str(doc.id),
-                'declaration_id': str(doc.declaration.id),
-                'file_name': doc.file_name,
-                'original_file_name': doc.original_file_name,
-                'file_size': doc.file_size,
-                'file_type': doc.file_type,
-                'mime_type': doc.mime_type,
-                'description': doc.description,
-                'upload_status': doc.upload_status,
-                'processing_errors': doc.processing_errors,
-                'processed_data': doc.processed_data,
-                'storage_path': doc.storage_path,
-                'uploaded_by': str(doc.uploaded_by.id) if doc.uploaded_by else None,
-                'created_at': doc.created_at.isoformat(),
-                'updated_at': doc.updated_at.isoformat()
-            })
+        def serialize():
+            queryset = documents
+            if include_processed_data:
+                queryset = queryset.select_related('processed_payload')
+            
+            documents_data = []
+            for doc in queryset:
+                document_data = {
+                    'id': str(doc.id),
+                    'declaration_id': str(doc.declaration_id),
+                    'file_name': doc.file_name,
+                    'original_file_name': doc.original_file_name,
+                    'file_size': doc.file_size,
+                    'file_type': doc.file_type,
+                    'mime_type': doc.mime_type,
+                    'description': doc.description,
+                    'upload_status': doc.upload_status,
+                    'processing_errors': doc.processing_errors,
+                    'processed_summary': doc.processed_summary,
+                    'storage_path': doc.storage_path,
+                    'uploaded_by': str(doc.uploaded_by_id) if doc.uploaded_by_id else None,
+                    'created_at': doc.created_at.isoformat(),
+                    'updated_at': doc.updated_at.isoformat()
+                }
+                if include_processed_data:
+                    document_data['processed_data'] = doc.processed_data
+                documents_data.append(document_data)
+            
+            return {
+                'results': documents_data,
+                'count': len(documents_data)
+            }
         
-        response_data = {
-            'results': documents_data,
-            'count': len(documents_data)
-        }
+        namespace = 'declaration_documents_full' if include_processed_data else 'declaration_documents'
         
-        logger.info(f"=== GET DOCUMENTS SUCCESS ===")
-        logger.info(f"Returning {len(documents_data)} documents")
+        def build():
+            response_data, hit = read_through(namespace, declaration.id, version, serialize)
+            
+            logger.info(f"=== GET DOCUMENTS SUCCESS ===")
+            logger.info(f"Returning {response_data['count']} documents (cache {'hit' if hit else 'miss'})")
+            
+            return mark_response(Response(response_data), hit)
         
-        return Response(response_data)
+        # GET condicional: 304 sin serializar si la lista no cambió
+        etag, last_modified = build_validators([declaration.updated_at], namespace)
+        return conditional_response(request, etag, last_modified, build)
         
     except Exception as e:
         logger.error(f"❌ Error en get_declaration_documents: {str(e)}")
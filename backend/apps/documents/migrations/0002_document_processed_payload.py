@@ -0,0 +1,31 @@
+# Generated by Django 4.2.16 on 2026-10-19 12:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='processed_summary',
+            field=models.JSONField(blank=True, default=dict, help_text='Totales y conteos precalculados del resultado del procesamiento', verbose_name='Resumen de datos procesados'),
+        ),
+        migrations.CreateModel(
+            name='DocumentProcessedData',
+            fields=[
+                ('document', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='processed_payload', serialize=False, to='documents.document', verbose_name='Documento')),
+                ('data', models.JSONField(blank=True, default=dict, help_text='Datos extraídos del documento', verbose_name='Datos procesados')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Última actualización')),
+            ],
+            options={
+                'verbose_name': 'Datos procesados de documento',
+                'verbose_name_plural': 'Datos procesados de documentos',
+            },
+        ),
+    ]
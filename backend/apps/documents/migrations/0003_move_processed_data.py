@@ -0,0 +1,87 @@
+"""
+Mueve `Document.processed_data` a `DocumentProcessedData` y llena
+`processed_summary`.
+
+Solo datos: el esquema se crea en 0002 y la columna vieja se elimina en 0004.
+En PostgreSQL un ALTER TABLE en la misma transacción que estas escrituras falla
+con "pending trigger events".
+"""
+
+from django.db import migrations
+
+
+def build_processed_summary(data):
+    """
+    Copia congelada de `apps.documents.models.build_processed_summary` al momento
+    de esta migración (la función del modelo puede cambiar después).
+    """
+    if not data:
+        return {}
+
+    errors = data.get('errors') or []
+    warnings = data.get('warnings') or []
+    summary = {
+        'success': bool(data.get('success', True)),
+        'records_count': len(data.get('records') or []),
+        'errors_count': len(errors),
+        'warnings_count': len(warnings),
+        'has_errors': bool(errors),
+        'has_warnings': bool(warnings),
+    }
+
+    stats = data.get('stats')
+    if isinstance(stats, dict):
+        summary.update({
+            'total_records': stats.get('total_records', 0),
+            'processed_records': stats.get('processed_records', 0),
+            'total_income': stats.get('total_income', 0),
+            'total_withholdings': stats.get('total_withholdings', 0),
+        })
+
+    metadata = data.get('metadata')
+    if isinstance(metadata, dict):
+        summary.update({
+            'total_records': metadata.get('total_registros', summary.get('total_records', summary['records_count'])),
+            'total_income': metadata.get('total_ingresos', summary.get('total_income', 0)),
+            'total_withholdings': metadata.get('total_retenciones', summary.get('total_withholdings', 0)),
+        })
+
+    for key in ('total_income', 'total_withholdings'):
+        if key in summary and not isinstance(summary[key], (int, float, str)):
+            summary[key] = str(summary[key])
+
+    return summary
+
+
+def move_processed_data_out(apps, schema_editor):
+    """Copia `processed_data` a la tabla nueva y precalcula el resumen"""
+    Document = apps.get_model('documents', 'Document')
+    DocumentProcessedData = apps.get_model('documents', 'DocumentProcessedData')
+
+    documents = Document.objects.exclude(processed_data={}).only('id', 'processed_data')
+    for document in documents.iterator(chunk_size=200):
+        if not document.processed_data:
+            continue
+        DocumentProcessedData.objects.create(document_id=document.id, data=document.processed_data)
+        Document.objects.filter(pk=document.id).update(
+            processed_summary=build_processed_summary(document.processed_data)
+        )
+
+
+def move_processed_data_back(apps, schema_editor):
+    Document = apps.get_model('documents', 'Document')
+    DocumentProcessedData = apps.get_model('documents', 'DocumentProcessedData')
+
+    for payload in DocumentProcessedData.objects.iterator(chunk_size=200):
+        Document.objects.filter(pk=payload.document_id).update(processed_data=payload.data)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0002_document_processed_payload'),
+    ]
+
+    operations = [
+        migrations.RunPython(move_processed_data_out, move_processed_data_back),
+    ]
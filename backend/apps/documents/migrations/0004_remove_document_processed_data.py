@@ -0,0 +1,22 @@
+"""
+Elimina `Document.processed_data` (ya copiado a DocumentProcessedData en 0003).
+
+Va en una migración aparte de la copia de datos: en PostgreSQL el ALTER TABLE
+no puede correr en la misma transacción que las escrituras de 0003.
+"""
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0003_move_processed_data'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='document',
+            name='processed_data',
+        ),
+    ]
@@ -1,7 +1,7 @@
 """
 Modelos de documentos y archivos de soporte.
 """
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from django.core.validators import FileExtensionValidator
 from apps.declarations.models import Declaration
@@ -97,12 +97,12 @@ class Document(models.Model):
         verbose_name='Estado de carga'
     )
     
-    # Datos procesados
-    processed_data = models.JSONField(
+    # Resumen de los datos procesados (el resultado completo vive en DocumentProcessedData)
+    processed_summary = models.JSONField(
         default=dict,
         blank=True,
-        verbose_name='Datos procesados',
-        help_text='Datos extraídos del documento'
+        verbose_name='Resumen de datos procesados',
+        help_text='Totales y conteos precalculados del resultado del procesamiento'
     )
     
     # Metadatos de procesamiento
@@ -172,6 +172,13 @@ class Document(models.Model):
         verbose_name='Etiquetas'
     )
     
+    # Campos que los listados no necesitan cargar
+    LIST_DEFERRED_FIELDS = ('processed_summary',)
+    
+    # Resultado completo cargado o asignado en memoria (ver `processed_data`)
+    _processed_data = None
+    _processed_data_changed = False
+    
     class Meta:
         verbose_name = 'Documento'
         verbose_name_plural = 'Documentos'
@@ -187,8 +194,8 @@ class Document(models.Model):
     
     def get_storage_key(self):
         """Genera la clave de almacenamiento en GCS."""
-        user_id = self.declaration.user.id
-        declaration_id = self.declaration.id
+        user_id = self.declaration.user_id
+        declaration_id = self.declaration_id
         return f"users/{user_id}/declarations/{declaration_id}/documents/{self.id}/{self.file_name}"
     
     @property
@@ -206,6 +213,56 @@ class Document(models.Model):
         """Obtiene la extensión del archivo."""
         return os.path.splitext(self.file_name)[1].lower()
     
+    @property
+    def processed_data(self):
+        """
+        Resultado completo del procesamiento.
+        
+        Se guarda en `DocumentProcessedData` para que los listados no carguen el
+        JSON pesado; se lee (una consulta, o ninguna con
+        `select_related('processed_payload')`) solo cuando se accede.
+        """
+        if self._processed_data is None:
+            try:
+                self._processed_data = self.processed_payload.data
+            except DocumentProcessedData.DoesNotExist:
+                self._processed_data = {}
+        return self._processed_data
+    
+    @processed_data.setter
+    def processed_data(self, data):
+        """Asigna el resultado y recalcula el resumen; se persiste en `save()`."""
+        self._processed_data = data or {}
+        self._processed_data_changed = True
+        self.processed_summary = build_processed_summary(self._processed_data)
+    
+    def save(self, *args, **kwargs):
+        """Guarda el documento y, si cambió, el resultado completo en su tabla."""
+        if not self._processed_data_changed:
+            return super().save(*args, **kwargs)
+        
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = [field for field in update_fields if field != 'processed_data']
+            if 'processed_summary' not in update_fields:
+                update_fields.append('processed_summary')
+            kwargs['update_fields'] = update_fields
+        
+        # En la misma transacción para que nadie vea el resumen nuevo con el resultado viejo
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            payload, _ = DocumentProcessedData.objects.update_or_create(
+                document=self,
+                defaults={'data': self._processed_data}
+            )
+        self.processed_payload = payload
+        self._processed_data_changed = False
+    
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._processed_data = None
+        self._processed_data_changed = False
+    
     def mark_as_processing(self):
         """Marca el documento como en procesamiento."""
         from django.utils import timezone
@@ -218,9 +275,11 @@ class Document(models.Model):
         from django.utils import timezone
         self.upload_status = 'processed'
         self.processing_completed_at = timezone.now()
+        update_fields = ['upload_status', 'processing_completed_at', 'updated_at']
         if data:
             self.processed_data = data
-        self.save(update_fields=['upload_status', 'processing_completed_at', 'processed_data', 'updated_at'])
+            update_fields.append('processed_summary')
+        self.save(update_fields=update_fields)
     
     def mark_as_error(self, errors):
         """Marca el documento con error."""
@@ -233,6 +292,83 @@ class Document(models.Model):
         self.save(update_fields=['upload_status', 'processing_completed_at', 'processing_errors', 'updated_at'])
 
 
+def build_processed_summary(data):
+    """
+    Resumen liviano del resultado de un parser (se guarda en la fila del documento).
+    
+    Incluye los totales de `stats` (o de `metadata` en los datos demo) y los
+    conteos de registros, errores y advertencias.
+    """
+    if not data:
+        return {}
+    
+    errors = data.get('errors') or []
+    warnings = data.get('warnings') or []
+    summary = {
+        'success': bool(data.get('success', True)),
+        'records_count': len(data.get('records') or []),
+        'errors_count': len(errors),
+        'warnings_count': len(warnings),
+        'has_errors': bool(errors),
+        'has_warnings': bool(warnings),
+    }
+    
+    stats = data.get('stats')
+    if isinstance(stats, dict):
+        summary.update({
+            'total_records': stats.get('total_records', 0),
+            'processed_records': stats.get('processed_records', 0),
+            'total_income': stats.get('total_income', 0),
+            'total_withholdings': stats.get('total_withholdings', 0),
+        })
+    
+    metadata = data.get('metadata')
+    if isinstance(metadata, dict):
+        summary.update({
+            'total_records': metadata.get('total_registros', summary.get('total_records', summary['records_count'])),
+            'total_income': metadata.get('total_ingresos', summary.get('total_income', 0)),
+            'total_withholdings': metadata.get('total_retenciones', summary.get('total_withholdings', 0)),
+        })
+    
+    # Los totales pueden venir como Decimal desde los parsers
+    for key in ('total_income', 'total_withholdings'):
+        if key in summary and not isinstance(summary[key], (int, float, str)):
+            summary[key] = str(summary[key])
+    
+    return summary
+
+
+class DocumentProcessedData(models.Model):
+    """
+    Resultado completo del procesamiento de un documento (registros, file_info,
+    column_mapping...). Separado de `Document` para que los listados no lo carguen.
+    """
+    document = models.OneToOneField(
+        Document,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='processed_payload',
+        verbose_name='Documento'
+    )
+    data = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Datos procesados',
+        help_text='Datos extraídos del documento'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Última actualización'
+    )
+    
+    class Meta:
+        verbose_name = 'Datos procesados de documento'
+        verbose_name_plural = 'Datos procesados de documentos'
+    
+    def __str__(self):
+        return f"Datos procesados - {self.document_id}"
+
+
 class DocumentTemplate(models.Model):
     """
     Plantillas de documentos que el sistema puede generar.
@@ -1,18 +1,127 @@
 """
 Parser robusto y flexible para archivos Excel de información exógena.
 Maneja inconsistencias comunes en formato, estructura y datos.
+
+pandas y openpyxl se importan al procesar el primer archivo (no al importar el
+módulo): el proceso web carga este parser a través de las tareas y las vistas.
 """
-import pandas as pd
-import openpyxl
+from __future__ import annotations
+
 from typing import Dict, List, Any, Tuple, Optional
 import logging
 import re
+from types import MappingProxyType
 from datetime import datetime
-import numpy as np
+
+from apps.common.lazy import lazy_import
+
+pd = lazy_import('pandas')
+openpyxl = lazy_import('openpyxl')
 
 logger = logging.getLogger(__name__)
 
 
+# Mapeo de aliases para columnas comunes (MEJORADO con conocimiento del contador)
+COLUMN_ALIASES = MappingProxyType({
+    # Columnas fundamentales según análisis profesional
+    'nit_informante': (
+        'nit del tercero', 'nit_tercero', 'nit tercero', 'identificacion', 
+        'documento', 'cedula', 'persona que reporta', 'tercero informante'
+    ),
+    'nombre_informante': (
+        'nombre del tercero', 'nombre_tercero', 'nombre tercero', 
+        'razon social', 'tercero', 'persona que reporta'
+    ),
+    'detalle': (
+        'detalle', 'descripcion', 'concepto', 'tipo de ingreso', 
+        'descripcion del concepto', 'naturaleza'
+    ),
+    'valor': (
+        'valor', 'monto', 'importe', 'cantidad', 'valor del pago o abono en cuenta', 
+        'valor_pago', 'valor bruto', 'valor_bruto'
+    ),
+    'uso_declaracion': (
+        'uso declaracion sugerida', 'casilla sugerida', 'formulario', 
+        'donde reportar', 'uso_declaracion'
+    ),
+    'info_adicional': (
+        'informacion adicional', 'observaciones', 'notas', 
+        'detalle adicional', 'contexto'
+    ),
+    'withholding': (
+        'retencion practicada', 'retencion_practicada', 'valor retencion', 
+        'retencion', 'ret_fuente', 'retencion en la fuente'
+    )
+})
+
+# Clasificación inteligente basada en conocimiento profesional
+FISCAL_CATEGORIES = MappingProxyType({
+    'INGRESOS': {
+        'keywords': (
+            'ingreso', 'pago', 'salario', 'prestaciones', 'cesantías', 
+            'rendimientos', 'venta', 'honorarios', 'comisiones',
+            'ingresos brutos', 'remuneración', 'bonificación'
+        ),
+        'priority': 1
+    },
+    'PATRIMONIO_ACTIVOS': {
+        'keywords': (
+            'saldo final', 'valor adquisición', 'cartera colectiva',
+            'cuentas de ahorro', 'depósitos', 'inversiones',
+            'inmueble', 'vivienda', 'propiedad'
+        ),
+        'priority': 2
+    },
+    'DEUDAS_PASIVOS': {
+        'keywords': (
+            'deudas', 'préstamo consumo', 'crédito', 'obligación financiera',
+            'tarjeta de crédito', 'financiación', 'cuentas por cobrar clientes'
+        ),
+        'priority': 2
+    },
+    'BENEFICIOS_DEDUCCIONES': {
+        'keywords': (
+            'aporte obligatorio salud', 'aporte obligatorio fondos pensiones',
+            'aportes seguridad social', 'cotización salud', 'cotización pensión'
+        ),
+        'priority': 1
+    },
+    'RETENCIONES': {
+        'keywords': (
+            'retención practicada', 'retención en la fuente',
+            'retefuente', 'retención aplicada'
+        ),
+        'priority': 1
+    },
+    'EXCLUIR': {
+        'keywords': (
+            'tope 1', 'tope 2', 'advertencia', 'importante',
+            'información', 'nota aclaratoria'
+        ),
+        'priority': 3
+    }
+})
+
+# Clasificación de conceptos por código (mantener compatibilidad)
+CONCEPT_MAPPING = MappingProxyType({
+    # Rentas de trabajo
+    '5001': {'type': 'salary', 'schedule': 'labor', 'description': 'Salarios'},
+    '5002': {'type': 'honorarios', 'schedule': 'labor', 'description': 'Honorarios'},
+    '5003': {'type': 'services', 'schedule': 'labor', 'description': 'Servicios'},
+    '5004': {'type': 'commissions', 'schedule': 'labor', 'description': 'Comisiones'},
+
+    # Rentas de capital
+    '5005': {'type': 'rental', 'schedule': 'capital', 'description': 'Arrendamientos'},
+    '5006': {'type': 'interests', 'schedule': 'capital', 'description': 'Rendimientos financieros'},
+    '5007': {'type': 'interests', 'schedule': 'capital', 'description': 'Intereses'},
+    '5008': {'type': 'dividends', 'schedule': 'capital', 'description': 'Dividendos'},
+
+    # Otros
+    '5009': {'type': 'other', 'schedule': 'other', 'description': 'Otros ingresos'},
+    '5010': {'type': 'prizes', 'schedule': 'other', 'description': 'Premios y rifas'}
+})
+
+
 class RobustExogenaParser:
     """
     Parser robusto para archivos Excel de información exógena que maneja:
@@ -38,105 +147,10 @@ class RobustExogenaParser:
             'concepts_count': 0
         }
         
-        # Mapeo de aliases para columnas comunes (MEJORADO con conocimiento del contador)
-        self.column_aliases = {
-            # Columnas fundamentales según análisis profesional
-            'nit_informante': [
-                'nit del tercero', 'nit_tercero', 'nit tercero', 'identificacion', 
-                'documento', 'cedula', 'persona que reporta', 'tercero informante'
-            ],
-            'nombre_informante': [
-                'nombre del tercero', 'nombre_tercero', 'nombre tercero', 
-                'razon social', 'tercero', 'persona que reporta'
-            ],
-            'detalle': [
-                'detalle', 'descripcion', 'concepto', 'tipo de ingreso', 
-                'descripcion del concepto', 'naturaleza'
-            ],
-            'valor': [
-                'valor', 'monto', 'importe', 'cantidad', 'valor del pago o abono en cuenta', 
-                'valor_pago', 'valor bruto', 'valor_bruto'
-            ],
-            'uso_declaracion': [
-                'uso declaracion sugerida', 'casilla sugerida', 'formulario', 
-                'donde reportar', 'uso_declaracion'
-            ],
-            'info_adicional': [
-                'informacion adicional', 'observaciones', 'notas', 
-                'detalle adicional', 'contexto'
-            ],
-            'withholding': [
-                'retencion practicada', 'retencion_practicada', 'valor retencion', 
-                'retencion', 'ret_fuente', 'retencion en la fuente'
-            ]
-        }
-        
-        # Clasificación inteligente basada en conocimiento profesional
-        self.fiscal_categories = {
-            'INGRESOS': {
-                'keywords': [
-                    'ingreso', 'pago', 'salario', 'prestaciones', 'cesantías', 
-                    'rendimientos', 'venta', 'honorarios', 'comisiones',
-                    'ingresos brutos', 'remuneración', 'bonificación'
-                ],
-                'priority': 1
-            },
-            'PATRIMONIO_ACTIVOS': {
-                'keywords': [
-                    'saldo final', 'valor adquisición', 'cartera colectiva',
-                    'cuentas de ahorro', 'depósitos', 'inversiones',
-                    'inmueble', 'vivienda', 'propiedad'
-                ],
-                'priority': 2
-            },
-            'DEUDAS_PASIVOS': {
-                'keywords': [
-                    'deudas', 'préstamo consumo', 'crédito', 'obligación financiera',
-                    'tarjeta de crédito', 'financiación', 'cuentas por cobrar clientes'
-                ],
-                'priority': 2
-            },
-            'BENEFICIOS_DEDUCCIONES': {
-                'keywords': [
-                    'aporte obligatorio salud', 'aporte obligatorio fondos pensiones',
-                    'aportes seguridad social', 'cotización salud', 'cotización pensión'
-                ],
-                'priority': 1
-            },
-            'RETENCIONES': {
-                'keywords': [
-                    'retención practicada', 'retención en la fuente',
-                    'retefuente', 'retención aplicada'
-                ],
-                'priority': 1
-            },
-            'EXCLUIR': {
-                'keywords': [
-                    'tope 1', 'tope 2', 'advertencia', 'importante',
-                    'información', 'nota aclaratoria'
-                ],
-                'priority': 3
-            }
-        }
-        
-        # Clasificación de conceptos por código (mantener compatibilidad)
-        self.concept_mapping = {
-            # Rentas de trabajo
-            '5001': {'type': 'salary', 'schedule': 'labor', 'description': 'Salarios'},
-            '5002': {'type': 'honorarios', 'schedule': 'labor', 'description': 'Honorarios'},
-            '5003': {'type': 'services', 'schedule': 'labor', 'description': 'Servicios'},
-            '5004': {'type': 'commissions', 'schedule': 'labor', 'description': 'Comisiones'},
-            
-            # Rentas de capital
-            '5005': {'type': 'rental', 'schedule': 'capital', 'description': 'Arrendamientos'},
-            '5006': {'type': 'interests', 'schedule': 'capital', 'description': 'Rendimientos financieros'},
-            '5007': {'type': 'interests', 'schedule': 'capital', 'description': 'Intereses'},
-            '5008': {'type': 'dividends', 'schedule': 'capital', 'description': 'Dividendos'},
-            
-            # Otros
-            '5009': {'type': 'other', 'schedule': 'other', 'description': 'Otros ingresos'},
-            '5010': {'type': 'prizes', 'schedule': 'other', 'description': 'Premios y rifas'}
-        }
+        # Tablas de clasificación compartidas por el proceso (módulo, inmutables)
+        self.column_aliases = COLUMN_ALIASES
+        self.fiscal_categories = FISCAL_CATEGORIES
+        self.concept_mapping = CONCEPT_MAPPING
     
     def _classify_fiscal_category(self, detalle: str, informante: str = "", 
                                  valor: float = 0, info_adicional: str = "") -> dict:
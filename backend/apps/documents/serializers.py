@@ -114,7 +114,11 @@ class DocumentStatusUpdateSerializer(serializers.Serializer):
 class DocumentProcessedDataSerializer(serializers.ModelSerializer):
     """
     Serializador para mostrar datos procesados de un documento.
+    
+    `processed_data` se lee de DocumentProcessedData (usar
+    `select_related('processed_payload')`); el resumen ya viene precalculado.
     """
+    processed_data = serializers.JSONField(read_only=True)
     processed_summary = serializers.SerializerMethodField()
     
     class Meta:
@@ -133,24 +137,9 @@ class DocumentProcessedDataSerializer(serializers.ModelSerializer):
     
     def get_processed_summary(self, obj):
         """
-        Genera un resumen de los datos procesados.
+        Resumen precalculado de los datos procesados.
         """
-        if not obj.processed_data:
-            return None
-        
-        # Para archivos de exógena
-        if obj.file_type == 'exogena_report' and 'stats' in obj.processed_data:
-            stats = obj.processed_data['stats']
-            return {
-                'total_records': stats.get('total_records', 0),
-                'processed_records': stats.get('processed_records', 0),
-                'total_income': stats.get('total_income', 0),
-                'total_withholdings': stats.get('total_withholdings', 0),
-                'has_errors': bool(obj.processed_data.get('errors', [])),
-                'has_warnings': bool(obj.processed_data.get('warnings', []))
-            }
-        
-        return None
+        return obj.processed_summary or None
 
 
 class DocumentTemplateSerializer(serializers.ModelSerializer):
@@ -0,0 +1,32 @@
+"""
+Señales de la aplicación de documentos.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.common.cache import invalidate
+from apps.declarations.models import Declaration
+
+from .models import Document
+
+
+def invalidate_documents(document_ids, declaration_ids):
+    """
+    Actualiza `updated_at` de las declaraciones (su versión para el ETag) e
+    invalida las respuestas cacheadas de los documentos y de sus declaraciones.
+    También la usan las escrituras en lote, que no emiten post_save por fila.
+    """
+    declaration_ids = [declaration_id for declaration_id in set(declaration_ids) if declaration_id is not None]
+    if declaration_ids:
+        Declaration.touch(declaration_ids)
+    invalidate('document_processed_data', document_ids)
+    invalidate('declaration_detail', declaration_ids)
+    invalidate('declaration_documents', declaration_ids)
+    invalidate('declaration_documents_full', declaration_ids)
+
+
+@receiver(post_save, sender=Document)
+@receiver(post_delete, sender=Document)
+def invalidate_document_cache(sender, instance, **kwargs):
+    """Invalida las cachés del documento guardado o borrado y de su declaración"""
+    invalidate_documents([instance.pk], [instance.declaration_id])
@@ -13,6 +13,7 @@ from .models import Document
 from .parsers.excel_parser import ExogenaParser
 from .services.storage_service import get_storage_service
 from apps.declarations.models import Declaration, IncomeRecord
+from apps.declarations.signals import income_records_changed
 
 logger = logging.getLogger(__name__)
 
@@ -119,8 +120,9 @@ def process_exogena_document(document: Document) -> dict:
                 declaration = document.declaration
                 records_created = 0
                 
-                # Limpiar registros anteriores si existen
+                # Limpiar registros anteriores si existen (DELETE directo, sin señales por fila)
                 declaration.income_records.all().delete()
+                income_records_changed.send(sender=IncomeRecord, declaration_ids=[declaration.id])
                 
                 # Crear nuevos registros
                 for record_data in parse_result['records']:
@@ -198,23 +200,23 @@ def process_declaration_documents(self, declaration_id: str):
     try:
         logger.info(f"Procesando documentos de declaración: {declaration_id}")
         
-        declaration = Declaration.objects.prefetch_related('documents').get(id=declaration_id)
+        declaration = Declaration.objects.only('id').get(id=declaration_id)
         
-        # Obtener documentos pendientes de procesar
-        pending_documents = declaration.documents.filter(
+        # Obtener documentos pendientes de procesar (solo los IDs)
+        pending_document_ids = list(declaration.documents.filter(
             upload_status__in=['uploaded', 'error'],
             is_active=True
-        )
+        ).values_list('id', flat=True))
         
-        if not pending_documents.exists():
+        if not pending_document_ids:
             logger.info(f"No hay documentos pendientes para declaración {declaration_id}")
             return
         
         # Procesar cada documento
-        for document in pending_documents:
-            process_document.delay(str(document.id))
+        for document_id in pending_document_ids:
+            process_document.delay(str(document_id))
         
-        logger.info(f"Lanzadas {pending_documents.count()} tareas de procesamiento para declaración {declaration_id}")
+        logger.info(f"Lanzadas {len(pending_document_ids)} tareas de procesamiento para declaración {declaration_id}")
         
     except Declaration.DoesNotExist:
         logger.error(f"Declaración {declaration_id} no encontrada")
@@ -244,7 +246,8 @@ def cleanup_old_documents():
             )
             logger.info(f"Marcados {count} documentos como error por tiempo de carga expirado")
             
-        # TODO: Limpiar archivos huérfanos en storage
+        # TODO: Limpiar archivos huérfanos en storage (las declaraciones duplicadas
+        # comparten storage_path: un archivo solo es huérfano si ningún documento lo referencia)
         
     except Exception as e:
         logger.error(f"Error en limpieza de documentos: {str(e)}", exc_info=True)
@@ -268,7 +271,7 @@ def generate_declaration_summary(declaration_id: str):
         # Por ahora, solo actualizar estadísticas básicas
         
         summary = {
-            'total_income_sources': declaration.income_records.values('third_party_nit').distinct().count(),
+            'total_income_sources': declaration.get_income_records().values('third_party_nit').distinct().count(),
             'document_count': declaration.documents.filter(is_active=True).count(),
             'processed_documents': declaration.documents.filter(
                 upload_status='processed',
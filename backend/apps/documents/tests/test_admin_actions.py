@@ -0,0 +1,64 @@
+"""
+Tests para las acciones en lote del admin de documentos.
+"""
+import pytest
+from django.core.cache import cache
+from django.test import override_settings
+
+from apps.common.cache import cache_key
+from apps.common.testing import seed_declarations
+from apps.declarations.models import Declaration
+from apps.documents.models import Document
+
+LOCMEM_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'document-admin-tests',
+    }
+}
+
+
+@pytest.fixture
+def locmem_cache():
+    with override_settings(CACHES=LOCMEM_CACHE):
+        cache.clear()
+        yield cache
+        cache.clear()
+
+
+@pytest.fixture
+def admin_client(client, user):
+    user.is_staff = user.is_superuser = True
+    user.save()
+    client.force_login(user)
+    return client
+
+
+@pytest.mark.django_db
+class TestSoftDeleteDocuments:
+    """Tests para la acción soft_delete_documents."""
+
+    def test_invalidates_caches_and_bumps_version(self, admin_client, user, locmem_cache):
+        declarations = seed_declarations(user, declarations=2, documents=2)
+        declaration, untouched = declarations
+        documents = list(declaration.documents.all())
+        versions = {d.pk: Declaration.objects.get(pk=d.pk).updated_at for d in declarations}
+
+        cached_keys = [cache_key(namespace, declaration.pk) for namespace in (
+            'declaration_detail', 'declaration_documents', 'declaration_documents_full'
+        )] + [cache_key('document_processed_data', document.pk) for document in documents]
+        other_key = cache_key('declaration_detail', untouched.pk)
+        for key in cached_keys + [other_key]:
+            cache.set(key, {'version': 'v1', 'value': {}})
+
+        response = admin_client.post('/admin/documents/document/', {
+            'action': 'soft_delete_documents',
+            '_selected_action': [document.pk for document in documents],
+        })
+
+        assert response.status_code == 302
+        assert not Document.objects.filter(pk__in=[d.pk for d in documents], is_active=True).exists()
+        assert cache.get_many(cached_keys) == {}
+        assert cache.get(other_key) is not None
+        assert Declaration.objects.get(pk=declaration.pk).updated_at > versions[declaration.pk]
+        assert Declaration.objects.get(pk=untouched.pk).updated_at == versions[untouched.pk]
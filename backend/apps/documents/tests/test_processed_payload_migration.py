@@ -0,0 +1,70 @@
+"""
+Tests para las migraciones que mueven `Document.processed_data` a
+DocumentProcessedData (0002 a 0004).
+"""
+import pytest
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+from apps.common.testing import seed_declarations
+
+BEFORE = [('documents', '0001_initial')]
+AFTER = [('documents', '0004_remove_document_processed_data')]
+
+PROCESSED_DATA = {
+    'success': True,
+    'records': [{'gross_amount': 1500000}] * 3,
+    'warnings': ['columna vacía'],
+    'stats': {'total_records': 3, 'processed_records': 3, 'total_income': 4500000, 'total_withholdings': 0},
+}
+
+
+def migrate(targets):
+    executor = MigrationExecutor(connection)
+    executor.loader.build_graph()
+    executor.migrate(targets)
+    return executor.loader.project_state(targets).apps
+
+
+@pytest.mark.django_db(transaction=True)
+class TestProcessedPayloadMigration:
+    """La copia de datos funciona hacia adelante y hacia atrás."""
+
+    @pytest.fixture
+    def old_document(self, user):
+        # Solo se revierte la app documents: la declaración usa el modelo actual
+        declaration = seed_declarations(user)[0]
+        apps = migrate(BEFORE)
+        Document = apps.get_model('documents', 'Document')
+
+        common = {
+            'declaration_id': declaration.pk, 'uploaded_by_id': user.pk,
+            'file_type': 'exogena_report', 'file_size': 10
+        }
+        document = Document.objects.create(
+            file_name='a.xlsx', original_file_name='a.xlsx', storage_path='a.xlsx',
+            processed_data=PROCESSED_DATA, **common
+        )
+        Document.objects.create(file_name='b.xlsx', original_file_name='b.xlsx', storage_path='b.xlsx', **common)
+
+        yield document.pk
+        migrate(AFTER)
+
+    def test_forward_and_backward(self, old_document):
+        apps = migrate(AFTER)
+        Document = apps.get_model('documents', 'Document')
+        DocumentProcessedData = apps.get_model('documents', 'DocumentProcessedData')
+
+        assert list(DocumentProcessedData.objects.values_list('document_id', flat=True)) == [old_document]
+        assert DocumentProcessedData.objects.get().data == PROCESSED_DATA
+
+        summary = Document.objects.get(pk=old_document).processed_summary
+        assert summary['records_count'] == 3
+        assert summary['warnings_count'] == 1
+        assert summary['total_income'] == 4500000
+        assert Document.objects.exclude(pk=old_document).get().processed_summary == {}
+
+        apps = migrate(BEFORE)
+        Document = apps.get_model('documents', 'Document')
+
+        assert Document.objects.get(pk=old_document).processed_data == PROCESSED_DATA
@@ -0,0 +1,71 @@
+"""
+Presupuestos de consultas y latencia de los endpoints de documentos.
+"""
+import pytest
+
+from apps.common.testing import assert_budget, measure, seed_declarations
+
+VOLUMES = {
+    'pequeño': {'declarations': 1, 'documents': 1},
+    'grande': {'declarations': 3, 'documents': 30},
+}
+
+
+@pytest.mark.django_db
+class TestDocumentQueryBudgets:
+    """Consultas por endpoint independientes de la cantidad de documentos."""
+
+    @pytest.mark.parametrize('volume', list(VOLUMES))
+    def test_list(self, api_client, user, volume):
+        seed_declarations(user, **VOLUMES[volume])
+
+        measurement = measure(api_client, '/api/v1/documents/', label=f"documents list [{volume}]")
+
+        assert measurement.status_code == 200
+        assert_budget(measurement, max_queries=3, max_p95_ms=250)
+
+    @pytest.mark.parametrize('volume', list(VOLUMES))
+    @pytest.mark.parametrize('include', ['', 'processed_data'])
+    def test_declaration_documents(self, api_client, user, volume, include):
+        """Sin consultas por documento (declaración, usuario ni resultado)."""
+        declaration = seed_declarations(user, **VOLUMES[volume])[0]
+
+        measurement = measure(
+            api_client, f'/api/v1/declarations/{declaration.id}/documents/',
+            data={'include': include} if include else None,
+            label=f"declaration documents include={include or '-'} [{volume}]"
+        )
+
+        assert measurement.status_code == 200
+        assert_budget(measurement, max_queries=3, max_p95_ms=250)
+
+    def test_processed_data(self, api_client, user):
+        declaration = seed_declarations(user, documents=1)[0]
+        document = declaration.documents.get()
+
+        measurement = measure(
+            api_client, f'/api/v1/documents/{document.id}/processed_data/',
+            label='document processed_data'
+        )
+
+        assert measurement.status_code == 200
+        assert_budget(measurement, max_queries=2, max_p95_ms=250)
+
+
+@pytest.mark.django_db
+class TestDocumentAdminQueryBudgets:
+    """Listado del admin sin consultas por fila."""
+
+    @pytest.mark.parametrize('volume', list(VOLUMES))
+    def test_changelist(self, client, user, volume):
+        user.is_staff = user.is_superuser = True
+        user.save()
+        client.force_login(user)
+        seed_declarations(user, **VOLUMES[volume])
+
+        measurement = measure(
+            client, '/admin/documents/document/', runs=2, label=f"admin documents [{volume}]"
+        )
+
+        assert measurement.status_code == 200
+        assert_budget(measurement, max_queries=5)
@@ -41,8 +41,6 @@ class DocumentViewSet(viewsets.ModelViewSet):
         Filtra documentos por declaración y usuario.
         """
         # TESTING: Simplificar para testing
-        print(f"[DEBUG] Documents: self.request.user = {self.request.user}")
-        
         # Si viene en el contexto de una declaración específica
         declaration_id = self.kwargs.get('declaration_pk')
         
@@ -52,12 +50,30 @@ class DocumentViewSet(viewsets.ModelViewSet):
             return Document.objects.filter(
                 declaration=declaration,
                 is_active=True
-            ).order_by('-created_at')
+            ).select_related('declaration').defer(*Document.LIST_DEFERRED_FIELDS).order_by('-created_at')
         
         # TESTING: Retornar todos los documentos
         return Document.objects.filter(
             is_active=True
-        ).select_related('declaration').order_by('-created_at')
+        ).select_related('declaration').defer(*Document.LIST_DEFERRED_FIELDS).order_by('-created_at')
+    
+    def list(self, request, *args, **kwargs):
+        """
+        Lista documentos con GET condicional: el ETag sale del último
+        `updated_at` y la cantidad de documentos, así un sondeo sin cambios
+        recibe 304 sin serializar.
+        """
+        from django.db.models import Count, Max
+        from apps.common.conditional import build_validators, conditional_response
+        
+        queryset = self.filter_queryset(self.get_queryset())
+        state = queryset.order_by().aggregate(last_update=Max('updated_at'), total=Count('id'))
+        etag, last_modified = build_validators([state['last_update']], state['total'])
+        
+        return conditional_response(
+            request, etag, last_modified,
+            lambda: super(DocumentViewSet, self).list(request, *args, **kwargs)
+        )
     
     @action(detail=False, methods=['post'])
     def initiate_upload(self, request, declaration_pk=None):
@@ -139,7 +155,7 @@ class DocumentViewSet(viewsets.ModelViewSet):
                         from apps.documents.parsers.excel_parser import ExogenaParser
                         parser = ExogenaParser()
                         
-                        print(f"[REAL PROCESSING] Procesando archivo real: {uploaded_file.name}")
+                        logger.info(f"Procesando archivo real: {uploaded_file.name}")
                         real_data = parser.parse_excel_file(temp_file_path)
                         
                         # Limpiar archivo temporal
@@ -156,8 +172,6 @@ class DocumentViewSet(viewsets.ModelViewSet):
                                 declaration.total_income = str(float(stats.get('total_income', 0)))
                                 declaration.total_withholdings = str(float(stats.get('total_withholdings', 0)))
                                 declaration.save()
-                                
-                                print(f"[REAL DATA] Ingresos: {declaration.total_income}, Retenciones: {declaration.total_withholdings}")
                             
                             logger.info(f"Archivo REAL procesado exitosamente: {document.id}")
                             
@@ -171,8 +185,9 @@ class DocumentViewSet(viewsets.ModelViewSet):
                             }, status=status.HTTP_201_CREATED)
                         else:
                             # Si falla el procesamiento real, usar datos demo como fallback
-                            print(f"[FALLBACK] Procesamiento real falló, usando datos demo")
-                            print(f"[ERRORS] {real_data.get('errors', [])}")
+                            logger.warning(
+                                f"Procesamiento real falló, usando datos demo: {real_data.get('errors', [])}"
+                            )
                             
                             demo_data = parser.parse_demo_data()
                             document.processed_data = demo_data
@@ -195,7 +210,6 @@ class DocumentViewSet(viewsets.ModelViewSet):
                             }, status=status.HTTP_201_CREATED)
                             
                     except Exception as e:
-                        print(f"[ERROR] Error en procesamiento real: {str(e)}")
                         logger.error(f"Error en procesamiento real: {str(e)}")
                         
                         # Fallback a datos demo en caso de error
@@ -471,8 +485,16 @@ class DocumentViewSet(viewsets.ModelViewSet):
     def processed_data(self, request, pk=None, declaration_pk=None):
         """
         Obtiene los datos procesados de un documento.
+        
+        GET condicional por `updated_at` (el resultado se guarda junto con el
+        documento); si cambió, read-through por ID del documento y `updated_at`.
         """
-        document = self.get_object()
+        from apps.common.cache import mark_response, read_through
+        from apps.common.conditional import build_validators, conditional_response
+        
+        document = get_object_or_404(
+            self.get_queryset().select_related(None).only('id', 'upload_status', 'updated_at'), pk=pk
+        )
         
         if not document.is_processed:
             return Response(
@@ -480,8 +502,16 @@ class DocumentViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        serializer = DocumentProcessedDataSerializer(document)
-        return Response(serializer.data)
+        def serialize():
+            full_document = Document.objects.select_related('processed_payload').get(pk=document.pk)
+            return DocumentProcessedDataSerializer(full_document).data
+        
+        def build():
+            data, hit = read_through('document_processed_data', document.pk, document.updated_at, serialize)
+            return mark_response(Response(data), hit)
+        
+        etag, last_modified = build_validators([document.updated_at], document.pk)
+        return conditional_response(request, etag, last_modified, build)
     
     @action(detail=True, methods=['post'])
     def reprocess(self, request, pk=None, declaration_pk=None):
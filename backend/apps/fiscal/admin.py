@@ -2,7 +2,19 @@
 Configuración del admin para el módulo fiscal
 """
 from django.contrib import admin
-from .models import FiscalAnalysisSession, UserFiscalProfile, FiscalOptimizationRecommendation
+from .models import (
+    FiscalAnalysisBatch, FiscalAnalysisSession, UserFiscalProfile, FiscalOptimizationRecommendation
+)
+
+
+@admin.register(FiscalAnalysisBatch)
+class FiscalAnalysisBatchAdmin(admin.ModelAdmin):
+    """Admin para lotes de análisis fiscal"""
+    list_display = ['batch_id', 'user', 'status', 'total_items', 'completed_items', 'failed_items', 'created_at']
+    list_filter = ['status', 'fiscal_year', 'created_at']
+    search_fields = ['user__username', 'batch_id']
+    readonly_fields = ['batch_id', 'created_at', 'updated_at', 'finished_at']
+    list_select_related = ['user']
 
 
 @admin.register(FiscalAnalysisSession)
@@ -12,16 +24,18 @@ class FiscalAnalysisSessionAdmin(admin.ModelAdmin):
     list_filter = ['status', 'created_at']
     search_fields = ['user__username', 'session_id', 'original_filename']
     readonly_fields = ['session_id', 'created_at', 'updated_at']
+    raw_id_fields = ['batch', 'declaration']
+    list_select_related = ['user']
     
     fieldsets = (
         ('Información Básica', {
             'fields': ('user', 'session_id', 'status')
         }),
         ('Archivo de Entrada', {
-            'fields': ('original_filename', 'file_size')
+            'fields': ('original_filename', 'file_size', 'source_storage_path', 'batch', 'declaration', 'fiscal_year')
         }),
         ('Resultados', {
-            'fields': ('processing_time', 'analysis_results'),
+            'fields': ('processing_time', 'result_summary', 'analysis_results'),
             'classes': ('collapse',)
         }),
         ('Fechas', {
@@ -38,6 +52,7 @@ class UserFiscalProfileAdmin(admin.ModelAdmin):
                    'has_health_insurance', 'has_mortgage', 'updated_at']
     list_filter = ['has_dependents', 'has_health_insurance', 'has_mortgage', 'has_afc_account']
     search_fields = ['user__username', 'user__email']
+    list_select_related = ['user']
     
     fieldsets = (
         ('Usuario', {
@@ -62,6 +77,7 @@ class FiscalOptimizationRecommendationAdmin(admin.ModelAdmin):
                    'potential_saving', 'effort_level', 'is_implemented']
     list_filter = ['recommendation_type', 'priority', 'effort_level', 'is_implemented']
     search_fields = ['title', 'description', 'session__user__username']
+    list_select_related = ['session__user']
     
     fieldsets = (
         ('Información Básica', {
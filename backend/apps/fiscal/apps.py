@@ -12,5 +12,6 @@ class FiscalConfig(AppConfig):
     
     def ready(self):
         """Inicialización cuando la app está lista"""
-        # Importar señales si las hay
-        pass
+        # Precalcular reglas fiscales por año gravable una sola vez por proceso
+        from .services.rules_registry import load_fiscal_rules
+        load_fiscal_rules()
@@ -0,0 +1,71 @@
+# Generated by Django 4.2.16 on 2026-10-19 07:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('declarations', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('fiscal', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fiscalanalysissession',
+            name='declaration',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='fiscal_sessions', to='declarations.declaration'),
+        ),
+        migrations.AddField(
+            model_name='fiscalanalysissession',
+            name='fiscal_year',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='fiscalanalysissession',
+            name='result_summary',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='fiscalanalysissession',
+            name='source_storage_path',
+            field=models.CharField(blank=True, max_length=500),
+        ),
+        migrations.AlterField(
+            model_name='fiscalanalysissession',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pendiente'), ('processing', 'Procesando'), ('completed', 'Completado'), ('error', 'Error')], default='processing', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='FiscalAnalysisBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('batch_id', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('fiscal_year', models.PositiveIntegerField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('processing', 'Procesando'), ('completed', 'Completado'), ('completed_with_errors', 'Completado con errores'), ('error', 'Error')], default='pending', max_length=25)),
+                ('total_items', models.PositiveIntegerField(default=0)),
+                ('completed_items', models.PositiveIntegerField(default=0)),
+                ('failed_items', models.PositiveIntegerField(default=0)),
+                ('summary', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fiscal_batches', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Lote de Análisis Fiscal',
+                'verbose_name_plural': 'Lotes de Análisis Fiscal',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='fiscalanalysissession',
+            name='batch',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='sessions', to='fiscal.fiscalanalysisbatch'),
+        ),
+    ]
@@ -5,6 +5,58 @@ from django.db import models
 from django.contrib.auth import get_user_model
 from django.conf import settings
 from django.utils import timezone
+import uuid
+
+
+class FiscalAnalysisBatch(models.Model):
+    """
+    Lote de análisis fiscales de varios clientes (uso de contadores)
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pendiente'),
+        ('processing', 'Procesando'),
+        ('completed', 'Completado'),
+        ('completed_with_errors', 'Completado con errores'),
+        ('error', 'Error'),
+    ]
+    
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='fiscal_batches')
+    batch_id = models.UUIDField(unique=True, default=uuid.uuid4, editable=False)
+    fiscal_year = models.PositiveIntegerField(null=True, blank=True)
+    
+    # Progreso
+    status = models.CharField(max_length=25, choices=STATUS_CHOICES, default='pending')
+    total_items = models.PositiveIntegerField(default=0)
+    completed_items = models.PositiveIntegerField(default=0)
+    failed_items = models.PositiveIntegerField(default=0)
+    
+    # Resumen consolidado al terminar
+    summary = models.JSONField(default=dict, blank=True)
+    
+    # Metadatos
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Lote de Análisis Fiscal'
+        verbose_name_plural = 'Lotes de Análisis Fiscal'
+    
+    def __str__(self):
+        return f"Lote {self.batch_id} - {self.user.username} ({self.total_items} clientes)"
+    
+    @property
+    def processed_items(self):
+        """Clientes terminados (exitosos o con error)"""
+        return self.completed_items + self.failed_items
+    
+    @property
+    def progress_percentage(self):
+        """Porcentaje de avance del lote"""
+        if not self.total_items:
+            return 0
+        return int(self.processed_items * 100 / self.total_items)
 
 
 class FiscalAnalysisSession(models.Model):
@@ -14,16 +66,26 @@ class FiscalAnalysisSession(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='fiscal_sessions')
     session_id = models.UUIDField(unique=True)
     
+    # Lote y declaración de origen (análisis por lotes)
+    batch = models.ForeignKey(FiscalAnalysisBatch, on_delete=models.CASCADE, null=True, blank=True,
+                              related_name='sessions')
+    declaration = models.ForeignKey('declarations.Declaration', on_delete=models.SET_NULL, null=True, blank=True,
+                                    related_name='fiscal_sessions')
+    fiscal_year = models.PositiveIntegerField(null=True, blank=True)
+    
     # Datos de entrada
     original_filename = models.CharField(max_length=255, blank=True)
     file_size = models.PositiveIntegerField(null=True, blank=True)
+    source_storage_path = models.CharField(max_length=500, blank=True)
     
     # Resultados del análisis
     analysis_results = models.JSONField(default=dict)
+    result_summary = models.JSONField(default=dict, blank=True)
     processing_time = models.FloatField(null=True, blank=True)
     
     # Estados
     status = models.CharField(max_length=20, choices=[
+        ('pending', 'Pendiente'),
         ('processing', 'Procesando'),
         ('completed', 'Completado'),
         ('error', 'Error'),
@@ -2,7 +2,9 @@
 Serializadores para la API fiscal
 """
 from rest_framework import serializers
-from .models import FiscalAnalysisSession, UserFiscalProfile, FiscalOptimizationRecommendation
+from .models import (
+    FiscalAnalysisBatch, FiscalAnalysisSession, UserFiscalProfile, FiscalOptimizationRecommendation
+)
 
 
 class UserFiscalProfileSerializer(serializers.ModelSerializer):
@@ -43,6 +45,36 @@ class FiscalAnalysisSessionSerializer(serializers.ModelSerializer):
         read_only_fields = ['session_id', 'created_at', 'updated_at']
 
 
+class BatchSessionSummarySerializer(serializers.ModelSerializer):
+    """Serializador liviano de las sesiones de un lote (sin resultados completos)"""
+    declaration_id = serializers.IntegerField(read_only=True)
+    
+    class Meta:
+        model = FiscalAnalysisSession
+        fields = [
+            'session_id', 'original_filename', 'declaration_id', 'fiscal_year',
+            'status', 'processing_time', 'result_summary', 'updated_at'
+        ]
+        read_only_fields = fields
+
+
+class FiscalAnalysisBatchSerializer(serializers.ModelSerializer):
+    """Serializador del estado y resumen de un lote de análisis"""
+    processed_items = serializers.IntegerField(read_only=True)
+    progress_percentage = serializers.IntegerField(read_only=True)
+    sessions = BatchSessionSummarySerializer(many=True, read_only=True)
+    
+    class Meta:
+        model = FiscalAnalysisBatch
+        fields = [
+            'batch_id', 'fiscal_year', 'status',
+            'total_items', 'completed_items', 'failed_items',
+            'processed_items', 'progress_percentage',
+            'summary', 'sessions', 'created_at', 'updated_at', 'finished_at'
+        ]
+        read_only_fields = fields
+
+
 class FiscalAnalysisRequestSerializer(serializers.Serializer):
     """Serializador para solicitud de análisis fiscal"""
     exogena_file = serializers.FileField(required=False)
@@ -61,7 +93,10 @@ class FiscalAnalysisRequestSerializer(serializers.Serializer):
 class DeductionSimulationSerializer(serializers.Serializer):
     """Serializador para simulación de deducciones"""
     base_income = serializers.DecimalField(max_digits=15, decimal_places=2)
-    deductions = serializers.JSONField()
+    deductions = serializers.JSONField(required=False, default=dict)
+    fiscal_year = serializers.IntegerField(required=False, allow_null=True)
+    dependents_count = serializers.IntegerField(required=False, allow_null=True, min_value=0)
+    steps = serializers.IntegerField(required=False, allow_null=True, min_value=2)
     
     def validate_base_income(self, value):
         """Validar que el ingreso base sea positivo"""
@@ -75,7 +110,7 @@ class DeductionSimulationSerializer(serializers.Serializer):
             raise serializers.ValidationError("Las deducciones deben ser un objeto")
         
         for key, amount in value.items():
-            if not isinstance(amount, (int, float)) or amount < 0:
+            if isinstance(amount, bool) or not isinstance(amount, (int, float)) or amount < 0:
                 raise serializers.ValidationError(
                     f"La deducción '{key}' debe ser un monto positivo"
                 )
@@ -85,8 +120,10 @@ class DeductionSimulationSerializer(serializers.Serializer):
 
 class FiscalLimitsResponseSerializer(serializers.Serializer):
     """Serializador para respuesta de límites fiscales"""
-    uvt_2024 = serializers.IntegerField()
+    fiscal_year = serializers.IntegerField()
+    uvt = serializers.IntegerField()
     fiscal_limits = serializers.JSONField()
+    legal_limits = serializers.JSONField()
     deduction_categories = serializers.JSONField()
     tax_brackets = serializers.JSONField()
 
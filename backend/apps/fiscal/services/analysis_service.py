@@ -8,10 +8,69 @@ from typing import Dict, List, Any, Tuple, Optional
 from decimal import Decimal, ROUND_HALF_UP
 from datetime import datetime
 import math
+from functools import lru_cache
+
+from .instrumentation import NULL_PROFILER, PipelineProfiler
+from .rules_registry import get_fiscal_rules, resolve_fiscal_year
 
 logger = logging.getLogger(__name__)
 
 
+# Cédulas tributarias en el orden en que se reportan
+CEDULAS = (
+    'rentas_trabajo',  # Cédula laboral
+    'rentas_capital',  # Cédula capital
+    'rentas_no_laborales',  # Cédula no laboral
+    'ganancias_ocasionales',  # Ganancias ocasionales
+    'otros'
+)
+
+TRABAJO_INCOME_TYPES = frozenset(['salary', 'honorarios', 'services', 'commissions'])
+TRABAJO_KEYWORDS = ('salario', 'honorario', 'comision', 'prestacion')
+CAPITAL_INCOME_TYPES = frozenset(['interests', 'rental', 'dividends'])
+CAPITAL_KEYWORDS = ('interes', 'rendimiento', 'arrendamiento', 'dividendo')
+GANANCIAS_INCOME_TYPES = frozenset(['prizes', 'lottery'])
+GANANCIAS_KEYWORDS = ('premio', 'rifa', 'loteria', 'chance')
+
+
+@lru_cache(maxsize=4096)
+def classify_cedula(income_type: str, tax_schedule: str, concept_description: str) -> str:
+    """
+    Determina la cédula tributaria según el tipo de ingreso.
+    
+    Memoizada por tupla (income_type, tax_schedule, concept_description): un archivo
+    de exógena repite pocas combinaciones distintas en miles de registros.
+    """
+    income_type = income_type.lower()
+    tax_schedule = tax_schedule.lower()
+    concept_description = concept_description.lower()
+    
+    # Rentas de trabajo (salarios, honorarios, servicios)
+    if (income_type in TRABAJO_INCOME_TYPES or
+        tax_schedule == 'labor' or
+        any(keyword in concept_description for keyword in TRABAJO_KEYWORDS)):
+        return 'rentas_trabajo'
+    
+    # Rentas de capital (intereses, arrendamientos, dividendos)
+    elif (income_type in CAPITAL_INCOME_TYPES or
+          tax_schedule == 'capital' or
+          any(keyword in concept_description for keyword in CAPITAL_KEYWORDS)):
+        return 'rentas_capital'
+    
+    # Ganancias ocasionales (premios, rifas, loterías)
+    elif (income_type in GANANCIAS_INCOME_TYPES or
+          any(keyword in concept_description for keyword in GANANCIAS_KEYWORDS)):
+        return 'ganancias_ocasionales'
+    
+    # Rentas no laborales (otros ingresos)
+    elif income_type == 'other':
+        return 'rentas_no_laborales'
+    
+    # Default a rentas de trabajo si no se puede clasificar
+    else:
+        return 'rentas_trabajo'
+
+
 class FiscalAnalysisService:
     """
     Replica la lógica del contador para análisis fiscal inteligente.
@@ -23,65 +82,24 @@ class FiscalAnalysisService:
     - Generar sugerencias paso a paso
     """
     
-    def __init__(self):
-        # Valores UVT para 2024 (actualizable por configuración)
-        self.UVT_2024 = 47065  # Valor UVT vigente
-        
-        # Tarifas y límites fiscales para 2024
-        self.FISCAL_LIMITS = {
-            'limite_no_declarante': 47 * self.UVT_2024,  # 47 UVT
-            'tope_renta_exenta_trabajo': 240 * self.UVT_2024,  # 240 UVT
-            'limite_deducciones_dependientes': 32 * self.UVT_2024,  # 32 UVT por dependiente
-            'limite_deduccion_salud': 16 * self.UVT_2024,  # 16 UVT medicina prepagada
-            'limite_deduccion_vivienda': 1200 * self.UVT_2024,  # 1200 UVT intereses vivienda
-            'limite_deduccion_afc': 2800 * self.UVT_2024,  # 2800 UVT AFC
-        }
-        
-        # Tarifa progresiva renta 2024 (personas naturales)
-        self.TARIFA_RENTA = [
-            (0, 1090 * self.UVT_2024, 0, 0),  # 0%
-            (1090 * self.UVT_2024, 1700 * self.UVT_2024, 0.19, 0),  # 19%
-            (1700 * self.UVT_2024, 4100 * self.UVT_2024, 0.28, 153 * self.UVT_2024),  # 28%
-            (4100 * self.UVT_2024, 8670 * self.UVT_2024, 0.33, 357 * self.UVT_2024),  # 33%
-            (8670 * self.UVT_2024, 18970 * self.UVT_2024, 0.35, 531 * self.UVT_2024),  # 35%
-            (18970 * self.UVT_2024, float('inf'), 0.37, 911 * self.UVT_2024),  # 37%
-        ]
-        
-        # Categorías de deducciones con sus límites
-        self.DEDUCTION_CATEGORIES = {
-            'salud': {
-                'limite_prepagada': 16 * self.UVT_2024,
-                'keywords': ['medicina prepagada', 'seguro salud', 'eps'],
-                'descripcion': 'Medicina prepagada y seguros de salud'
-            },
-            'educacion': {
-                'limite': None,  # Sin límite específico
-                'keywords': ['educacion', 'universidad', 'colegio', 'matricula'],
-                'descripcion': 'Gastos de educación propia, cónyuge e hijos'
-            },
-            'dependientes': {
-                'limite_por_dependiente': 32 * self.UVT_2024,
-                'keywords': ['dependiente', 'hijo', 'padre', 'madre'],
-                'descripcion': 'Dependientes económicos'
-            },
-            'vivienda': {
-                'limite_interes': 1200 * self.UVT_2024,
-                'keywords': ['interes vivienda', 'credito hipotecario', 'vivienda'],
-                'descripcion': 'Intereses de crédito de vivienda'
-            },
-            'afc': {
-                'limite': 2800 * self.UVT_2024,
-                'keywords': ['afc', 'ahorro programado', 'cesantias'],
-                'descripcion': 'Aportes a AFC y ahorro programado'
-            }
-        }
+    def __init__(self, fiscal_year: Optional[int] = None):
+        # Reglas del año gravable (UVT, tarifas y límites) compartidas por el proceso
+        self.rules = get_fiscal_rules(fiscal_year)
+        self.fiscal_year = self.rules.fiscal_year
+        self.UVT = self.rules.uvt
+        
+        self.FISCAL_LIMITS = self.rules.fiscal_limits
+        self.TARIFA_RENTA = self.rules.tax_brackets
+        self.DEDUCTION_CATEGORIES = self.rules.deduction_categories
     
-    def analyze_exogena_data(self, processed_data: Dict[str, Any]) -> Dict[str, Any]:
+    def analyze_exogena_data(self, processed_data: Dict[str, Any],
+                             profiler: Optional[PipelineProfiler] = None) -> Dict[str, Any]:
         """
         Análisis completo estilo contador profesional
         
         Args:
             processed_data: Datos procesados por el ExogenaParser
+            profiler: Perfilador opcional para medir las etapas classify y analyze
             
         Returns:
             Dict con análisis fiscal completo
@@ -96,36 +114,37 @@ class FiscalAnalysisService:
             if not records:
                 return self._error_response("No hay registros para analizar")
             
-            # 1. Clasificar por cédulas tributarias
-            cedulas_classification = self._classify_by_cedulas(records)
+            profiler = profiler or NULL_PROFILER
             
-            # 2. Calcular totales por cédula
-            cedulas_totals = self._calculate_cedulas_totals(cedulas_classification)
+            # 1-2. Clasificar por cédulas tributarias y calcular totales en una pasada
+            with profiler.stage('classify', records=len(records)):
+                cedulas_classification, cedulas_totals = self._aggregate_by_cedulas(records)
             
-            # 3. Detectar deducciones aplicables
-            potential_deductions = self._detect_potential_deductions(records, cedulas_totals)
-            
-            # 4. Calcular renta líquida gravable
-            renta_liquida = self._calculate_renta_liquida(cedulas_totals, potential_deductions)
-            
-            # 5. Calcular impuesto de renta
-            tax_calculation = self._calculate_income_tax(renta_liquida)
-            
-            # 6. Detectar anomalías y optimizaciones
-            anomalies = self._detect_anomalies(records, cedulas_totals)
-            optimizations = self._suggest_optimizations(cedulas_totals, potential_deductions, tax_calculation)
-            
-            # 7. Generar recomendaciones paso a paso
-            step_by_step = self._generate_step_by_step_analysis(
-                cedulas_totals, potential_deductions, tax_calculation, optimizations
-            )
+            with profiler.stage('analyze', records=len(records)):
+                # 3. Detectar deducciones aplicables
+                potential_deductions = self._detect_potential_deductions(records, cedulas_totals)
+                
+                # 4. Calcular renta líquida gravable
+                renta_liquida = self._calculate_renta_liquida(cedulas_totals, potential_deductions)
+                
+                # 5. Calcular impuesto de renta
+                tax_calculation = self._calculate_income_tax(renta_liquida)
+                
+                # 6. Detectar anomalías y optimizaciones
+                anomalies = self._detect_anomalies(records, cedulas_totals)
+                optimizations = self._suggest_optimizations(cedulas_totals, potential_deductions, tax_calculation)
+                
+                # 7. Generar recomendaciones paso a paso
+                step_by_step = self._generate_step_by_step_analysis(
+                    cedulas_totals, potential_deductions, tax_calculation, optimizations
+                )
             
             logger.info("Análisis fiscal completado exitosamente")
             
             return {
                 'success': True,
                 'analysis_date': datetime.now().isoformat(),
-                'fiscal_year': 2024,
+                'fiscal_year': self.fiscal_year,
                 'cedulas_classification': cedulas_classification,
                 'cedulas_totals': cedulas_totals,
                 'potential_deductions': potential_deductions,
@@ -143,60 +162,32 @@ class FiscalAnalysisService:
             logger.error(f"Error en análisis fiscal: {str(e)}")
             return self._error_response(f"Error en análisis: {str(e)}")
     
-    def _classify_by_cedulas(self, records: List[Dict[str, Any]]) -> Dict[str, List[Dict]]:
-        """Clasifica registros por cédulas tributarias"""
-        classification = {
-            'rentas_trabajo': [],  # Cédula laboral
-            'rentas_capital': [],  # Cédula capital
-            'rentas_no_laborales': [],  # Cédula no laboral
-            'ganancias_ocasionales': [],  # Ganancias ocasionales
-            'otros': []
-        }
+    def _aggregate_by_cedulas(self, records: List[Dict[str, Any]]) -> Tuple[Dict[str, List[Dict]], Dict[str, Dict]]:
+        """
+        Clasifica los registros por cédula y acumula sus totales en una sola pasada
+        
+        Returns:
+            Tupla (clasificación por cédula, totales por cédula)
+        """
+        classification = {cedula: [] for cedula in CEDULAS}
+        accumulators = {cedula: [0, 0, set()] for cedula in CEDULAS}
         
         for record in records:
-            cedula = self._determine_cedula(record)
+            cedula = classify_cedula(
+                record.get('income_type') or '',
+                record.get('tax_schedule') or '',
+                record.get('concept_description') or ''
+            )
             classification[cedula].append(record)
+            
+            accumulator = accumulators[cedula]
+            accumulator[0] += record.get('gross_amount', 0)
+            accumulator[1] += record.get('withholding_amount', 0)
+            accumulator[2].add(record.get('third_party_nit', ''))
         
-        return classification
-    
-    def _determine_cedula(self, record: Dict[str, Any]) -> str:
-        """Determina la cédula tributaria según el tipo de ingreso"""
-        income_type = record.get('income_type', '').lower()
-        tax_schedule = record.get('tax_schedule', '').lower()
-        third_party_name = record.get('third_party_name', '').lower()
-        concept_description = record.get('concept_description', '').lower()
-        
-        # Rentas de trabajo (salarios, honorarios, servicios)
-        if (income_type in ['salary', 'honorarios', 'services', 'commissions'] or
-            tax_schedule == 'labor' or
-            any(keyword in concept_description for keyword in ['salario', 'honorario', 'comision', 'prestacion'])):
-            return 'rentas_trabajo'
-        
-        # Rentas de capital (intereses, arrendamientos, dividendos)
-        elif (income_type in ['interests', 'rental', 'dividends'] or
-              tax_schedule == 'capital' or
-              any(keyword in concept_description for keyword in ['interes', 'rendimiento', 'arrendamiento', 'dividendo'])):
-            return 'rentas_capital'
-        
-        # Ganancias ocasionales (premios, rifas, loterías)
-        elif (income_type in ['prizes', 'lottery'] or
-              any(keyword in concept_description for keyword in ['premio', 'rifa', 'loteria', 'chance'])):
-            return 'ganancias_ocasionales'
-        
-        # Rentas no laborales (otros ingresos)
-        elif income_type == 'other':
-            return 'rentas_no_laborales'
-        
-        # Default a rentas de trabajo si no se puede clasificar
-        else:
-            return 'rentas_trabajo'
-    
-    def _calculate_cedulas_totals(self, classification: Dict[str, List[Dict]]) -> Dict[str, Dict]:
-        """Calcula totales por cada cédula tributaria"""
         totals = {}
-        
-        for cedula, records in classification.items():
-            if not records:
+        for cedula, cedula_records in classification.items():
+            if not cedula_records:
                 totals[cedula] = {
                     'ingresos_brutos': 0.0,
                     'retenciones': 0.0,
@@ -205,18 +196,16 @@ class FiscalAnalysisService:
                 }
                 continue
             
-            ingresos_brutos = sum(record.get('gross_amount', 0) for record in records)
-            retenciones = sum(record.get('withholding_amount', 0) for record in records)
-            
+            ingresos_brutos, retenciones, third_parties = accumulators[cedula]
             totals[cedula] = {
                 'ingresos_brutos': ingresos_brutos,
                 'retenciones': retenciones,
                 'ingresos_netos': ingresos_brutos - retenciones,
-                'registros_count': len(records),
-                'third_parties': len(set(record.get('third_party_nit', '') for record in records))
+                'registros_count': len(cedula_records),
+                'third_parties': len(third_parties)
             }
         
-        return totals
+        return classification, totals
     
     def _detect_potential_deductions(self, records: List[Dict], cedulas_totals: Dict) -> Dict[str, Any]:
         """Detecta deducciones potenciales basándose en los ingresos"""
@@ -335,13 +324,8 @@ class FiscalAnalysisService:
                 'no_declarante': True
             }
         
-        # Aplicar tarifa progresiva
-        impuesto = 0.0
-        for min_range, max_range, rate, fixed_amount in self.TARIFA_RENTA:
-            if base_gravable > min_range:
-                taxable_in_range = min(base_gravable, max_range) - min_range
-                impuesto += (taxable_in_range * rate) + fixed_amount
-                break
+        # Aplicar tarifa progresiva (tramo que contiene la base gravable)
+        impuesto = self.rules.income_tax(base_gravable)
         
         # Por ahora, usar retenciones estimadas (luego serán reales del parser)
         retenciones_totales = base_gravable * 0.10  # Estimado 10%
@@ -399,7 +383,10 @@ class FiscalAnalysisService:
                 'type': 'pension_voluntary',
                 'title': 'Aportes Voluntarios a Pensión',
                 'description': 'Considera hacer aportes voluntarios a tu fondo de pensiones para reducir la base gravable',
-                'potential_saving': min(total_ingresos * 0.30, 4500 * self.UVT_2024) * 0.33,
+                'potential_saving': min(
+                    total_ingresos * self.rules.legal_limits['aporte_voluntario_pension_max_percentage'],
+                    self.rules.legal_limits['aporte_voluntario_pension_max_uvt']
+                ) * 0.33,
                 'effort': 'medium',
                 'deadline': 'Hasta abril del siguiente año',
                 'legal_base': 'Artículo 126-1 del Estatuto Tributario'
@@ -504,14 +491,14 @@ class FiscalAnalysisService:
         }
 
 
-# Instancia singleton del servicio
-_fiscal_analysis_service = None
+# Instancias singleton del servicio por año gravable
+_fiscal_analysis_services: Dict[int, FiscalAnalysisService] = {}
 
-def get_fiscal_analysis_service() -> FiscalAnalysisService:
+def get_fiscal_analysis_service(fiscal_year: Optional[int] = None) -> FiscalAnalysisService:
     """Factory function para obtener instancia del servicio"""
-    global _fiscal_analysis_service
+    year = resolve_fiscal_year(fiscal_year)
     
-    if _fiscal_analysis_service is None:
-        _fiscal_analysis_service = FiscalAnalysisService()
+    if year not in _fiscal_analysis_services:
+        _fiscal_analysis_services[year] = FiscalAnalysisService(year)
     
-    return _fiscal_analysis_service
+    return _fiscal_analysis_services[year]
@@ -8,10 +8,28 @@ from collections import Counter, defaultdict
 import statistics
 import re
 from datetime import datetime
+from types import MappingProxyType
 
 logger = logging.getLogger(__name__)
 
 
+# Niveles de severidad compartidos por el proceso
+SEVERITY_LEVELS = MappingProxyType({
+    'low': {'weight': 1, 'color': 'yellow'},
+    'medium': {'weight': 2, 'color': 'orange'}, 
+    'high': {'weight': 3, 'color': 'red'},
+    'critical': {'weight': 4, 'color': 'dark-red'}
+})
+
+# Patrones conocidos de problemas (conjuntos para búsqueda directa)
+KNOWN_PATTERNS = MappingProxyType({
+    'round_numbers': frozenset([1000000, 5000000, 10000000, 50000000, 100000000]),
+    'suspicious_nits': frozenset(['123456789', '000000000', '999999999']),
+    'test_companies': ('TEST', 'PRUEBA', 'EJEMPLO', 'DEMO'),
+    'incomplete_data_indicators': frozenset(['N/A', 'NO APLICA', 'SIN INFORMACION', ''])
+})
+
+
 class AnomalyDetector:
     """
     Detecta inconsistencias que un contador profesional notaría:
@@ -23,20 +41,10 @@ class AnomalyDetector:
     
     def __init__(self):
         self.anomalies_found = []
-        self.severity_levels = {
-            'low': {'weight': 1, 'color': 'yellow'},
-            'medium': {'weight': 2, 'color': 'orange'}, 
-            'high': {'weight': 3, 'color': 'red'},
-            'critical': {'weight': 4, 'color': 'dark-red'}
-        }
+        self.severity_levels = SEVERITY_LEVELS
         
         # Patrones conocidos de problemas
-        self.known_patterns = {
-            'round_numbers': [1000000, 5000000, 10000000, 50000000, 100000000],
-            'suspicious_nits': ['123456789', '000000000', '999999999'],
-            'test_companies': ['TEST', 'PRUEBA', 'EJEMPLO', 'DEMO'],
-            'incomplete_data_indicators': ['N/A', 'NO APLICA', 'SIN INFORMACION', '']
-        }
+        self.known_patterns = KNOWN_PATTERNS
     
     def detect_anomalies(self, records: List[Dict[str, Any]], 
                         cedulas_totals: Dict[str, Dict]) -> Dict[str, Any]:
@@ -0,0 +1,253 @@
+"""
+Optimizador de Escenarios de Deducciones - Evalúa miles de combinaciones en un solo lote
+Calcula con NumPy el impuesto de todas las combinaciones de deducciones (dependientes,
+medicina prepagada, intereses de vivienda, AFC y pensión voluntaria) respetando el tope
+en UVT de cada una, y retorna la frontera de Pareto con el ahorro marginal por peso.
+"""
+import logging
+import time
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from .rules_registry import get_fiscal_rules, resolve_fiscal_year
+
+logger = logging.getLogger(__name__)
+
+
+class DeductionScenarioOptimizer:
+    """
+    Motor de escenarios de deducciones pensado para sliders interactivos.
+
+    Cada palanca (dependientes, prepagada, vivienda, AFC, pensión voluntaria) se
+    discretiza en `steps` niveles entre 0 y el monto deducible (mínimo entre lo que
+    el usuario reporta y el tope legal). Todas las combinaciones se evalúan en una
+    sola operación vectorizada sobre la tarifa progresiva.
+    """
+
+    # Palancas soportadas y los nombres aceptados en la solicitud
+    LEVER_ALIASES = {
+        'dependientes': ('dependientes', 'deducciones_dependientes', 'dependents'),
+        'prepagada': ('prepagada', 'medicina_prepagada', 'salud', 'deducciones_salud'),
+        'vivienda': ('vivienda', 'intereses_vivienda', 'deducciones_vivienda'),
+        'afc': ('afc', 'deducciones_afc'),
+        'pension_voluntaria': ('pension_voluntaria', 'aportes_voluntarios', 'pension'),
+    }
+
+    DEFAULT_STEPS = 5
+    MAX_STEPS = 11
+    MAX_FRONT_POINTS = 25
+
+    def __init__(self, fiscal_year: Optional[int] = None):
+        rules = get_fiscal_rules(fiscal_year)
+
+        self.fiscal_year = rules.fiscal_year
+        self.uvt = rules.uvt
+        self.fiscal_limits = rules.fiscal_limits
+        self.legal_limits = rules.legal_limits
+        self.limite_no_declarante = rules.fiscal_limits['limite_no_declarante']
+
+        # Tarifa progresiva como arreglos para búsqueda vectorizada del tramo
+        self._bracket_floors = np.array(rules.bracket_floors, dtype=float)
+        self._bracket_rates = np.array(rules.bracket_rates, dtype=float)
+        self._bracket_fixed = np.array(rules.bracket_fixed, dtype=float)
+
+    def optimize(self, base_income: float, deductions: Dict[str, float],
+                 dependents_count: Optional[int] = None,
+                 steps: int = DEFAULT_STEPS) -> Dict[str, Any]:
+        """
+        Evalúa todas las combinaciones de deducciones y retorna la frontera de Pareto
+
+        Args:
+            base_income: Base gravable antes de las deducciones simuladas
+            deductions: Montos disponibles por deducción (pesos)
+            dependents_count: Número de dependientes (por defecto 1 si se reporta monto)
+            steps: Niveles evaluados por palanca (entre 2 y MAX_STEPS)
+
+        Returns:
+            Dict con frontera de Pareto, ahorro marginal por peso y métricas del lote
+        """
+        start = time.perf_counter()
+
+        base_income = max(0.0, float(base_income or 0))
+        steps = int(min(max(int(steps or self.DEFAULT_STEPS), 2), self.MAX_STEPS))
+
+        levers, fixed_deductions = self._build_levers(base_income, deductions or {}, dependents_count)
+
+        # Niveles por palanca: las palancas sin monto solo aportan el nivel 0
+        levels = [
+            np.linspace(0.0, lever['claimable'], steps) if lever['claimable'] > 0 else np.zeros(1)
+            for lever in levers
+        ]
+        grid = np.stack(np.meshgrid(*levels, indexing='ij'), axis=-1).reshape(-1, len(levers))
+
+        cost = grid.sum(axis=1)
+        taxes = self.tax_batch(base_income - fixed_deductions - cost)
+        base_tax = float(self.tax_batch(np.array([base_income]))[0])
+        savings = base_tax - taxes
+
+        front_idx = self._pareto_front(cost, taxes)
+        pareto_front = self._describe_front(grid, cost, taxes, savings, front_idx, levers)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.info(f"Optimizador de deducciones: {len(grid)} combinaciones en {elapsed_ms:.1f} ms")
+
+        best = int(front_idx[-1])
+        return {
+            'success': True,
+            'fiscal_year': self.fiscal_year,
+            'base_income': base_income,
+            'base_tax': base_tax,
+            'fixed_deductions': fixed_deductions,
+            'levers': levers,
+            'evaluated_combinations': int(len(grid)),
+            'pareto_front': pareto_front,
+            'best_scenario': self._describe_point(grid[best], cost[best], taxes[best], savings[best], levers),
+            'marginal_savings_per_peso': self._lever_marginal_savings(base_income - fixed_deductions, levers),
+            'computation_ms': round(elapsed_ms, 2)
+        }
+
+    def tax_batch(self, base_gravable: np.ndarray) -> np.ndarray:
+        """Calcula el impuesto de renta para un arreglo de bases gravables"""
+        base = np.maximum(np.asarray(base_gravable, dtype=float), 0.0)
+
+        # Último tramo cuyo piso es menor que la base
+        idx = np.clip(np.searchsorted(self._bracket_floors, base, side='left') - 1, 0, None)
+        tax = (base - self._bracket_floors[idx]) * self._bracket_rates[idx] + self._bracket_fixed[idx]
+
+        return np.where(base <= self.limite_no_declarante, 0.0, tax)
+
+    def tax_for(self, base_gravable: float) -> float:
+        """Calcula el impuesto de renta para una sola base gravable"""
+        return float(self.tax_batch(np.array([base_gravable]))[0])
+
+    def _build_levers(self, base_income: float, deductions: Dict[str, float],
+                      dependents_count: Optional[int]) -> Tuple[List[Dict], float]:
+        """Normaliza las deducciones de la solicitud en palancas con su tope legal"""
+        amounts = {key: 0.0 for key in self.LEVER_ALIASES}
+        fixed_deductions = 0.0
+
+        for name, value in deductions.items():
+            amount = max(0.0, float(value or 0))
+            lever_key = next(
+                (key for key, aliases in self.LEVER_ALIASES.items() if name in aliases),
+                None
+            )
+            if lever_key:
+                amounts[lever_key] += amount
+            else:
+                # Deducciones sin palanca se aplican igual en todos los escenarios
+                fixed_deductions += amount
+
+        if dependents_count is None:
+            dependents_count = 1 if amounts['dependientes'] > 0 else 0
+
+        caps = {
+            'dependientes': self.fiscal_limits['limite_deducciones_dependientes'] * max(int(dependents_count), 0),
+            'prepagada': self.fiscal_limits['limite_deduccion_salud'],
+            'vivienda': self.fiscal_limits['limite_deduccion_vivienda'],
+            'afc': self.fiscal_limits['limite_deduccion_afc'],
+            # Aportes voluntarios: 30% del ingreso hasta 4500 UVT (Art. 126-1 E.T.)
+            'pension_voluntaria': min(
+                base_income * self.legal_limits['aporte_voluntario_pension_max_percentage'],
+                self.legal_limits['aporte_voluntario_pension_max_uvt']
+            ),
+        }
+
+        levers = [
+            {
+                'key': key,
+                'available': amounts[key],
+                'cap': float(caps[key]),
+                'claimable': float(min(amounts[key], caps[key]))
+            }
+            for key in self.LEVER_ALIASES
+        ]
+
+        return levers, fixed_deductions
+
+    def _pareto_front(self, cost: np.ndarray, taxes: np.ndarray) -> np.ndarray:
+        """Índices de las combinaciones no dominadas (menor costo y menor impuesto)"""
+        # Ordenar por costo y, en empate, por impuesto
+        order = np.lexsort((taxes, cost))
+        sorted_taxes = taxes[order]
+
+        # Una combinación entra a la frontera si mejora el menor impuesto visto con menor costo
+        running_min = np.minimum.accumulate(sorted_taxes)
+        keep = np.empty(len(order), dtype=bool)
+        keep[0] = True
+        keep[1:] = sorted_taxes[1:] < running_min[:-1]
+
+        return order[keep]
+
+    def _describe_front(self, grid: np.ndarray, cost: np.ndarray, taxes: np.ndarray,
+                        savings: np.ndarray, front_idx: np.ndarray,
+                        levers: List[Dict]) -> List[Dict]:
+        """Convierte la frontera en escenarios legibles con ahorro marginal por peso"""
+        front_cost = cost[front_idx]
+        front_savings = savings[front_idx]
+
+        # Ahorro marginal entre puntos consecutivos de la frontera
+        marginal = np.zeros(len(front_idx))
+        if len(front_idx) > 1:
+            delta_cost = np.diff(front_cost)
+            marginal[1:] = np.divide(
+                np.diff(front_savings), delta_cost,
+                out=np.zeros_like(delta_cost), where=delta_cost > 0
+            )
+
+        # Limitar la cantidad de puntos retornados conservando los extremos
+        positions = np.arange(len(front_idx))
+        if len(front_idx) > self.MAX_FRONT_POINTS:
+            positions = np.unique(np.linspace(0, len(front_idx) - 1, self.MAX_FRONT_POINTS).round().astype(int))
+
+        front = []
+        for pos in positions:
+            idx = front_idx[pos]
+            scenario = self._describe_point(grid[idx], cost[idx], taxes[idx], savings[idx], levers)
+            scenario['marginal_savings_per_peso'] = round(float(marginal[pos]), 4)
+            front.append(scenario)
+
+        return front
+
+    def _describe_point(self, row: np.ndarray, cost: float, tax: float,
+                        saving: float, levers: List[Dict]) -> Dict[str, Any]:
+        """Describe una combinación evaluada"""
+        cost = float(cost)
+        saving = float(saving)
+        return {
+            'deductions': {lever['key']: float(amount) for lever, amount in zip(levers, row)},
+            'total_deductions': cost,
+            'tax_amount': float(tax),
+            'savings': saving,
+            'savings_per_peso': round(saving / cost, 4) if cost > 0 else 0.0
+        }
+
+    def _lever_marginal_savings(self, base_income: float, levers: List[Dict]) -> Dict[str, float]:
+        """Ahorro por peso del último UVT de cada palanca aplicada al máximo"""
+        claimable = np.array([lever['claimable'] for lever in levers])
+        full_tax = self.tax_for(base_income - claimable.sum())
+
+        # Retirar un UVT (o lo disponible) de cada palanca en un solo lote
+        deltas = np.minimum(claimable, self.uvt)
+        reduced_taxes = self.tax_batch(base_income - claimable.sum() + deltas)
+
+        marginal = np.divide(
+            reduced_taxes - full_tax, deltas,
+            out=np.zeros_like(deltas), where=deltas > 0
+        )
+
+        return {lever['key']: round(float(value), 4) for lever, value in zip(levers, marginal)}
+
+
+# Instancias singleton del optimizador por año gravable
+_deduction_optimizers: Dict[int, DeductionScenarioOptimizer] = {}
+
+def get_deduction_optimizer(fiscal_year: Optional[int] = None) -> DeductionScenarioOptimizer:
+    """Factory function para obtener instancia del optimizador"""
+    year = resolve_fiscal_year(fiscal_year)
+
+    if year not in _deduction_optimizers:
+        _deduction_optimizers[year] = DeductionScenarioOptimizer(year)
+
+    return _deduction_optimizers[year]
@@ -0,0 +1,229 @@
+"""
+Instrumentación del Pipeline Fiscal - Tiempos y memoria por etapa
+Mide cada etapa (parse, classify, analyze, anomaly, validate) con tiempo de pared,
+tiempo de CPU, pico de memoria (tracemalloc) y cantidad de registros. Cada medición
+se registra como evento estructurado y alimenta dos histogramas móviles: uno del
+proceso actual y uno compartido en la caché (Redis), que reúne las muestras de los
+procesos web y de los workers de Celery. Las muestras compartidas se escriben en
+lote al terminar cada ejecución para no sumar viajes a Redis dentro de las etapas.
+"""
+import json
+import logging
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Any, Deque, Optional
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+PIPELINE_STAGES = ('parse', 'classify', 'analyze', 'anomaly', 'validate')
+
+# Muestras recientes conservadas por etapa para los histogramas
+HISTOGRAM_WINDOW = 500
+HISTOGRAM_METRICS = ('wall_ms', 'cpu_ms', 'peak_memory_kb', 'records')
+
+# Ventana compartida: un contador y un anillo de HISTOGRAM_WINDOW posiciones por etapa
+# (todas las etapas comparten el anillo) en la caché
+SHARED_SAMPLES_PREFIX = 'fiscal_pipeline:samples'
+SHARED_SAMPLES_TIMEOUT = 60 * 60 * 24
+
+
+class PipelineProfiler:
+    """
+    Perfilador de una ejecución del pipeline fiscal.
+
+    Uso:
+        with PipelineProfiler(trace_memory=True) as profiler:
+            with profiler.stage('parse') as stage:
+                ...
+                stage['records'] = len(records)
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.stages: List[Dict[str, Any]] = []
+        self._started_tracing = False
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        _record_shared_samples(self.stages)
+        return False
+
+    @contextmanager
+    def stage(self, name: str, records: Optional[int] = None):
+        """Mide una etapa; el bloque puede completar `records` en el dict entregado"""
+        event = {'stage': name, 'records': records}
+
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            memory_start = tracemalloc.get_traced_memory()[0]
+
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield event
+        finally:
+            event['wall_ms'] = round((time.perf_counter() - wall_start) * 1000, 3)
+            event['cpu_ms'] = round((time.thread_time() - cpu_start) * 1000, 3)
+            event['peak_memory_kb'] = (
+                round((tracemalloc.get_traced_memory()[1] - memory_start) / 1024, 1) if tracing else None
+            )
+
+            self.stages.append(event)
+            record_stage_event(event)
+
+    def summary(self) -> Dict[str, Any]:
+        """Resumen de la ejecución para el modo debug de la respuesta"""
+        total_ms = round((time.perf_counter() - self._start) * 1000, 3) if self._start else None
+        return {
+            'stages': self.stages,
+            'total_wall_ms': total_ms,
+            'memory_traced': self.trace_memory
+        }
+
+
+class _NullProfiler:
+    """Perfilador sin efecto para llamadas sin instrumentación"""
+
+    @contextmanager
+    def stage(self, name: str, records: Optional[int] = None):
+        yield {'stage': name, 'records': records}
+
+
+NULL_PROFILER = _NullProfiler()
+
+
+# Histogramas móviles del proceso
+_stage_samples: Dict[str, Deque[Dict[str, Any]]] = {}
+_samples_lock = threading.Lock()
+
+
+def record_stage_event(event: Dict[str, Any]):
+    """Registra el evento estructurado y lo agrega a los histogramas del proceso"""
+    logger.info(f"fiscal_pipeline_stage {json.dumps(event, default=str)}")
+
+    with _samples_lock:
+        samples = _stage_samples.setdefault(event['stage'], deque(maxlen=HISTOGRAM_WINDOW))
+        samples.append(event)
+
+
+def _shared_key(suffix: Any) -> str:
+    return f"{SHARED_SAMPLES_PREFIX}:{suffix}"
+
+
+def _shared_window_size() -> int:
+    return HISTOGRAM_WINDOW * len(PIPELINE_STAGES)
+
+
+def _record_shared_samples(events: List[Dict[str, Any]]):
+    """
+    Guarda las muestras de una ejecución en la ventana compartida con dos viajes a
+    la caché: un `incr` atómico que reserva tantas posiciones como etapas y un
+    `set_many` (pipeline en Redis) que las escribe.
+    """
+    if not events:
+        return
+
+    samples = [
+        {'stage': event['stage'], **{metric: event.get(metric) for metric in HISTOGRAM_METRICS}}
+        for event in events
+    ]
+    window = _shared_window_size()
+    try:
+        try:
+            sequence = cache.incr(_shared_key('seq'), len(samples))
+        except ValueError:
+            # Primera ejecución: se crea el contador
+            cache.add(_shared_key('seq'), 0, timeout=None)
+            sequence = cache.incr(_shared_key('seq'), len(samples))
+
+        first = sequence - len(samples) + 1
+        cache.set_many({
+            _shared_key(position % window): sample
+            for position, sample in zip(range(first, sequence + 1), samples)
+        }, SHARED_SAMPLES_TIMEOUT)
+    except ValueError:
+        # Caché sin almacenamiento (DummyCache en desarrollo): solo histograma del proceso
+        pass
+    except Exception as e:
+        logger.warning(f"No se pudieron guardar las muestras compartidas: {str(e)}")
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> float:
+    """Percentil por rango más cercano sobre valores ordenados"""
+    index = max(int(round(percentile / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+def _histograms(snapshot: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Percentiles p50/p95/p99 por etapa y métrica de las muestras dadas"""
+    histograms = {}
+    for stage, samples in snapshot.items():
+        metrics = {}
+        for metric in HISTOGRAM_METRICS:
+            values = sorted(sample[metric] for sample in samples if sample.get(metric) is not None)
+            if not values:
+                continue
+            metrics[metric] = {
+                'count': len(values),
+                'mean': round(sum(values) / len(values), 3),
+                'p50': _percentile(values, 50),
+                'p95': _percentile(values, 95),
+                'p99': _percentile(values, 99),
+                'max': values[-1]
+            }
+        histograms[stage] = metrics
+
+    return {
+        'window_size': HISTOGRAM_WINDOW,
+        'stages': histograms
+    }
+
+
+def get_stage_histograms() -> Dict[str, Any]:
+    """Histogramas de la ventana móvil del proceso actual"""
+    with _samples_lock:
+        snapshot = {stage: list(samples) for stage, samples in _stage_samples.items()}
+
+    return _histograms(snapshot)
+
+
+def get_shared_stage_histograms() -> Dict[str, Any]:
+    """
+    Histogramas de la ventana compartida (todos los procesos que escriben en la
+    misma caché). Con una caché local o sin caché solo hay muestras del proceso.
+    """
+    keys = [_shared_key(position) for position in range(_shared_window_size())]
+    try:
+        samples = cache.get_many(keys).values()
+    except Exception as e:
+        logger.warning(f"No se pudieron leer las muestras compartidas: {str(e)}")
+        samples = []
+
+    snapshot = {}
+    for sample in samples:
+        snapshot.setdefault(sample['stage'], []).append(sample)
+
+    return _histograms(snapshot)
+
+
+def reset_stage_histograms():
+    """Limpia los histogramas del proceso"""
+    with _samples_lock:
+        _stage_samples.clear()
@@ -6,11 +6,12 @@ import logging
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
-# TEMPORALMENTE COMENTADO - Requiere pandas
 from apps.documents.parsers.excel_parser import ExogenaParser
 from .analysis_service import get_fiscal_analysis_service
 from .anomaly_detector import get_anomaly_detector
 from .consistency_validator import get_consistency_validator
+from .instrumentation import PipelineProfiler
+from .rules_registry import resolve_fiscal_year
 
 logger = logging.getLogger(__name__)
 
@@ -21,52 +22,89 @@ class IntelligentFiscalProcessor:
     Orquesta todo el pipeline de análisis desde el Excel hasta las recomendaciones finales.
     """
     
-    def __init__(self):
-        # TEMPORALMENTE COMENTADO - Requiere pandas
-        # self.parser = ExogenaParser()
-        self.parser = None  # Parser temporalmente deshabilitado
-        self.fiscal_analyzer = get_fiscal_analysis_service()
+    def __init__(self, fiscal_year: Optional[int] = None):
+        self.parser = ExogenaParser()
+        
+        # Servicios del año gravable (comparten el registro de reglas fiscales)
+        self.fiscal_year = resolve_fiscal_year(fiscal_year)
+        self.fiscal_analyzer = get_fiscal_analysis_service(self.fiscal_year)
         self.anomaly_detector = get_anomaly_detector()
-        self.consistency_validator = get_consistency_validator()
+        self.consistency_validator = get_consistency_validator(self.fiscal_year)
         
         self.processing_steps = []
         self.total_processing_time = 0
     
-    def process_complete_analysis(self, file_path_or_bytes, user_context: Dict = None) -> Dict[str, Any]:
+    def process_complete_analysis(self, file_path_or_bytes, user_context: Dict = None,
+                                  debug: bool = False) -> Dict[str, Any]:
         """
         Procesamiento completo estilo contador profesional
         
         Args:
             file_path_or_bytes: Archivo Excel de exógena o datos binarios
             user_context: Contexto adicional del usuario (dependientes, etc.)
+            debug: Incluye en la respuesta la instrumentación por etapa (con memoria)
+            
+        Returns:
+            Dict con análisis fiscal completo
+        """
+        return self._run_pipeline(
+            lambda: self._step1_intelligent_parsing(file_path_or_bytes),
+            user_context, debug
+        )
+    
+    def process_parsed_data(self, parsed_data: Dict[str, Any], user_context: Dict = None,
+                            debug: bool = False) -> Dict[str, Any]:
+        """
+        Procesamiento completo a partir de registros ya parseados
+        (por ejemplo, los registros de ingreso guardados de una declaración)
+        
+        Args:
+            parsed_data: Dict con 'success' y 'records' en el formato del parser
+            user_context: Contexto adicional del usuario (dependientes, etc.)
+            debug: Incluye en la respuesta la instrumentación por etapa (con memoria)
             
         Returns:
             Dict con análisis fiscal completo
         """
+        return self._run_pipeline(
+            lambda: self._step1_parsed_input(parsed_data),
+            user_context, debug
+        )
+    
+    def _run_pipeline(self, parse_step, user_context: Dict = None, debug: bool = False) -> Dict[str, Any]:
+        """Ejecuta los pasos 1 a 5 del pipeline fiscal"""
         try:
             start_time = datetime.now()
             logger.info("🚀 Iniciando procesamiento fiscal inteligente")
             
             self.processing_steps = []
             
-            # PASO 1: Parser inteligente de Excel
-            step1_result = self._step1_intelligent_parsing(file_path_or_bytes)
-            if not step1_result['success']:
-                return step1_result
-            
-            # PASO 2: Análisis fiscal profesional
-            step2_result = self._step2_fiscal_analysis(step1_result['data'])
-            if not step2_result['success']:
-                return step2_result
-            
-            # PASO 3: Detección de anomalías
-            step3_result = self._step3_anomaly_detection(
-                step1_result['data']['records'],
-                step2_result['data']['cedulas_totals']
-            )
-            
-            # PASO 4: Validación de consistencia
-            step4_result = self._step4_consistency_validation(step2_result['data'])
+            # Instrumentación por etapa (la memoria solo se traza en modo debug)
+            with PipelineProfiler(trace_memory=debug) as profiler:
+                # PASO 1: Parser inteligente de Excel
+                with profiler.stage('parse') as stage:
+                    step1_result = parse_step()
+                    stage['records'] = len((step1_result.get('data') or {}).get('records', []))
+                if not step1_result['success']:
+                    return step1_result
+                
+                # PASO 2: Análisis fiscal profesional
+                step2_result = self._step2_fiscal_analysis(step1_result['data'], profiler)
+                if not step2_result['success']:
+                    return step2_result
+                
+                records = step1_result['data']['records']
+                
+                # PASO 3: Detección de anomalías
+                with profiler.stage('anomaly', records=len(records)):
+                    step3_result = self._step3_anomaly_detection(
+                        records,
+                        step2_result['data']['cedulas_totals']
+                    )
+                
+                # PASO 4: Validación de consistencia
+                with profiler.stage('validate', records=len(records)):
+                    step4_result = self._step4_consistency_validation(step2_result['data'])
             
             # PASO 5: Síntesis final y recomendaciones
             final_result = self._step5_final_synthesis(
@@ -83,7 +121,7 @@ class IntelligentFiscalProcessor:
             
             logger.info(f"✅ Procesamiento completado en {self.total_processing_time:.2f} segundos")
             
-            return {
+            result = {
                 'success': True,
                 'processing_time': self.total_processing_time,
                 'processing_steps': self.processing_steps,
@@ -96,6 +134,11 @@ class IntelligentFiscalProcessor:
                 'user_friendly_summary': self._generate_user_summary(final_result)
             }
             
+            if debug:
+                result['debug'] = {'instrumentation': profiler.summary()}
+            
+            return result
+            
         except Exception as e:
             logger.error(f"❌ Error en procesamiento fiscal: {str(e)}")
             return {
@@ -110,15 +153,6 @@ class IntelligentFiscalProcessor:
         try:
             self._log_step("Paso 1: Analizando archivo de información exógena...")
             
-            # TEMPORALMENTE DESHABILITADO - Requiere pandas
-            if self.parser is None:
-                self._log_step("❌ Parser de Excel temporalmente deshabilitado - pandas no instalado")
-                return {
-                    'success': False,
-                    'error': 'Parser de Excel temporalmente deshabilitado. Instalar pandas para habilitar.',
-                    'step_summary': 'Parser no disponible'
-                }
-            
             if isinstance(file_path_or_bytes, str) and file_path_or_bytes == 'demo':
                 # Usar datos demo para testing
                 result = self.parser.parse_demo_data()
@@ -157,12 +191,35 @@ class IntelligentFiscalProcessor:
                 'error': error_msg
             }
     
-    def _step2_fiscal_analysis(self, parser_data: Dict) -> Dict[str, Any]:
+    def _step1_parsed_input(self, parsed_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Paso 1 (datos ya parseados): valida registros y aplica reglas del contador"""
+        self._log_step("Paso 1: Cargando registros de ingreso ya procesados...")
+        
+        records = parsed_data.get('records', []) if parsed_data else []
+        if not parsed_data or not parsed_data.get('success', False) or not records:
+            error_msg = "No hay registros de ingreso para analizar"
+            self._log_step(f"❌ {error_msg}")
+            return {
+                'success': False,
+                'error': error_msg,
+                'data': parsed_data
+            }
+        
+        self._log_step(f"✅ Registros cargados: {len(records)}")
+        
+        return {
+            'success': True,
+            'data': self._apply_contador_rules(parsed_data),
+            'step_summary': f"{len(records)} registros cargados"
+        }
+    
+    def _step2_fiscal_analysis(self, parser_data: Dict,
+                               profiler: Optional[PipelineProfiler] = None) -> Dict[str, Any]:
         """Paso 2: Análisis fiscal profesional"""
         try:
             self._log_step("Paso 2: Realizando análisis fiscal profesional...")
             
-            analysis_result = self.fiscal_analyzer.analyze_exogena_data(parser_data)
+            analysis_result = self.fiscal_analyzer.analyze_exogena_data(parser_data, profiler)
             
             if analysis_result['success']:
                 base_gravable = analysis_result['tax_calculation']['base_gravable']
@@ -621,14 +678,34 @@ class IntelligentFiscalProcessor:
         logger.info(step_entry)
 
 
-# Instancia singleton del procesador
-_fiscal_processor = None
+def summarize_analysis_result(result: dict) -> dict:
+    """Resumen liviano de un análisis para listados y estados de lote"""
+    if not result.get('success'):
+        return {'error': result.get('error', 'Error desconocido')}
+
+    fiscal_analysis = result.get('fiscal_analysis', {})
+    final_recommendations = result.get('final_recommendations', {})
+
+    return {
+        'fiscal_year': fiscal_analysis.get('fiscal_year'),
+        'requires_declaration': fiscal_analysis.get('requires_declaration'),
+        'base_gravable': fiscal_analysis.get('tax_calculation', {}).get('base_gravable'),
+        'estimated_payment': fiscal_analysis.get('estimated_payment'),
+        'estimated_refund': fiscal_analysis.get('estimated_refund'),
+        'overall_score': final_recommendations.get('overall_score', {}).get('score'),
+        'critical_issues_count': len(final_recommendations.get('critical_issues', [])),
+        'records_count': len(result.get('parser_results', {}).get('records', []))
+    }
+
+
+# Instancias singleton del procesador por año gravable
+_fiscal_processors: Dict[int, IntelligentFiscalProcessor] = {}
 
-def get_intelligent_fiscal_processor() -> IntelligentFiscalProcessor:
+def get_intelligent_fiscal_processor(fiscal_year: Optional[int] = None) -> IntelligentFiscalProcessor:
     """Factory function para obtener instancia del procesador"""
-    global _fiscal_processor
+    year = resolve_fiscal_year(fiscal_year)
     
-    if _fiscal_processor is None:
-        _fiscal_processor = IntelligentFiscalProcessor()
+    if year not in _fiscal_processors:
+        _fiscal_processors[year] = IntelligentFiscalProcessor(year)
     
-    return _fiscal_processor
+    return _fiscal_processors[year]
@@ -0,0 +1,163 @@
+"""
+Modelado de Respuestas del Análisis Fiscal
+Reduce el tamaño de la respuesta del pipeline: selección de campos (`fields=`) y
+modo compacto, donde los registros se referencian por índice en lugar de repetirse
+en `parser_results`, `cedulas_classification` y los detalles de anomalías.
+"""
+from typing import Dict, List, Any, Iterable, Optional
+
+# Campos que siempre acompañan una respuesta filtrada
+ALWAYS_INCLUDED_FIELDS = ('success', 'error')
+
+# Llaves de detalle de anomalía que ya están en el registro referenciado
+RECORD_DETAIL_KEYS = ('nit', 'name', 'amount', 'gross_amount')
+
+
+class UnknownFieldsError(ValueError):
+    """Rutas de `fields=` que no existen en el resultado"""
+
+    def __init__(self, paths: List[str]):
+        self.paths = paths
+        super().__init__(f"Campos desconocidos: {', '.join(paths)}")
+
+
+def parse_fields_param(value: Optional[str]) -> List[str]:
+    """Convierte `fields=a,b.c` en una lista de rutas"""
+    if not value:
+        return []
+    return [path.strip() for path in value.split(',') if path.strip()]
+
+
+def select_fields(result: Dict[str, Any], paths: Iterable[str]) -> Dict[str, Any]:
+    """
+    Retorna solo las rutas pedidas (admite rutas anidadas con punto)
+
+    Ejemplo: ['fiscal_analysis.tax_calculation', 'user_friendly_summary']
+
+    Raises:
+        UnknownFieldsError: Si alguna ruta no existe en un resultado exitoso (un
+            resultado fallido solo trae `success` y `error`, así que no se valida)
+    """
+    paths = list(paths)
+    if not paths:
+        return result
+
+    selected = {key: result[key] for key in ALWAYS_INCLUDED_FIELDS if key in result}
+    unknown = []
+
+    for path in paths:
+        source = result
+        parts = path.split('.')
+        for part in parts:
+            if not isinstance(source, dict) or part not in source:
+                unknown.append(path)
+                break
+            source = source[part]
+        else:
+            target = selected
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = source
+
+    if unknown and result.get('success'):
+        raise UnknownFieldsError(unknown)
+
+    return selected
+
+
+def compact_analysis_result(result: Dict[str, Any], records_url: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Versión compacta del resultado del pipeline
+
+    - `parser_results.records` se reemplaza por `records_count` (y `records_url`).
+    - `fiscal_analysis.cedulas_classification` lista índices de registros.
+    - Los detalles de anomalías referencian `record_index` sin repetir NIT/nombre/monto.
+
+    El resultado original no se modifica.
+    """
+    parser_results = result.get('parser_results')
+    if not isinstance(parser_results, dict) or 'records' not in parser_results:
+        return result
+
+    records = parser_results.get('records') or []
+    compacted = dict(result)
+
+    compacted['parser_results'] = {key: value for key, value in parser_results.items() if key != 'records'}
+    compacted['parser_results']['records_count'] = len(records)
+    if records_url:
+        compacted['parser_results']['records_url'] = records_url
+
+    fiscal_analysis = result.get('fiscal_analysis')
+    if isinstance(fiscal_analysis, dict) and 'cedulas_classification' in fiscal_analysis:
+        compacted['fiscal_analysis'] = dict(fiscal_analysis)
+        compacted['fiscal_analysis']['cedulas_classification'] = _classification_indices(
+            fiscal_analysis['cedulas_classification'], records
+        )
+
+    anomaly_detection = result.get('anomaly_detection')
+    if isinstance(anomaly_detection, dict) and anomaly_detection.get('anomalies'):
+        compacted['anomaly_detection'] = dict(anomaly_detection)
+        compacted['anomaly_detection']['anomalies'] = _compact_anomalies(
+            anomaly_detection['anomalies'], records
+        )
+
+    return compacted
+
+
+def _classification_indices(classification: Dict[str, List[Dict]],
+                            records: List[Dict[str, Any]]) -> Dict[str, List[int]]:
+    """
+    Índices de los registros de cada cédula según su posición en la lista original
+
+    La cédula de un registro depende solo de sus campos (`classify_cedula`), así que
+    se recorre `records` una vez en lugar de buscar cada registro clasificado; sirve
+    igual para resultados recién calculados y para resultados guardados.
+    """
+    from .analysis_service import classify_cedula
+
+    indices = {cedula: [] for cedula in classification}
+    for position, record in enumerate(records):
+        cedula = classify_cedula(
+            record.get('income_type') or '',
+            record.get('tax_schedule') or '',
+            record.get('concept_description') or ''
+        )
+        indices.setdefault(cedula, []).append(position)
+
+    return indices
+
+
+def _compact_anomalies(anomalies: List[Dict], records: List[Dict[str, Any]]) -> List[Dict]:
+    """Referencia los registros de las anomalías por índice"""
+    lookup = {}
+    for i, record in enumerate(records):
+        lookup.setdefault((record.get('third_party_nit', ''), record.get('gross_amount', 0)), i)
+
+    compacted = []
+    for anomaly in anomalies:
+        details = anomaly.get('record_details')
+        if not isinstance(details, dict):
+            compacted.append(anomaly)
+            continue
+
+        index = details.get('record_index')
+        if index is None and 'amount' in details and 'nit' in details and 'occurrences' not in details:
+            index = lookup.get((details['nit'], details['amount']))
+
+        if index is None:
+            compacted.append(anomaly)
+            continue
+
+        slim_details = {key: value for key, value in details.items() if key not in RECORD_DETAIL_KEYS}
+        slim_details['record_index'] = index
+        compacted.append(dict(anomaly, record_details=slim_details))
+
+    return compacted
+
+
+def shape_analysis_response(result: Dict[str, Any], fields: Optional[str] = None,
+                            compact: bool = False, records_url: Optional[str] = None) -> Dict[str, Any]:
+    """Aplica modo compacto y selección de campos a un resultado del pipeline"""
+    if compact:
+        result = compact_analysis_result(result, records_url)
+    return select_fields(result, parse_fields_param(fields))
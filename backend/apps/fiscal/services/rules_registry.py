@@ -0,0 +1,230 @@
+"""
+Registro de Reglas Fiscales por Año Gravable
+Centraliza UVT, tarifa progresiva, topes de deducciones y límites legales por
+`Declaration.fiscal_year`. Las reglas se calculan una sola vez por proceso, son
+inmutables y las comparten todos los servicios fiscales.
+"""
+import logging
+from bisect import bisect_left
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Valor de la UVT por año gravable (resoluciones DIAN)
+UVT_BY_YEAR = MappingProxyType({
+    2022: 38004,
+    2023: 42412,
+    2024: 47065,
+    2025: 49799,
+})
+
+DEFAULT_FISCAL_YEAR = 2024
+
+# Tarifa progresiva renta personas naturales en UVT: (desde, hasta, tarifa, impuesto fijo)
+TARIFA_RENTA_UVT = (
+    (0, 1090, 0.00, 0),
+    (1090, 1700, 0.19, 0),
+    (1700, 4100, 0.28, 153),
+    (4100, 8670, 0.33, 357),
+    (8670, 18970, 0.35, 531),
+    (18970, None, 0.37, 911),
+)
+
+
+class InvalidFiscalYear(ValueError):
+    """El año gravable recibido no es un entero o no tiene reglas registradas"""
+
+
+@dataclass(frozen=True)
+class FiscalYearRules:
+    """
+    Reglas fiscales inmutables de un año gravable.
+
+    Los tramos de la tarifa se guardan como tuplas paralelas (pisos, tarifas y
+    valores fijos) para ubicar el tramo con `bisect` sin recorrer la tabla.
+    """
+    fiscal_year: int
+    uvt: int
+    fiscal_limits: Mapping[str, float]
+    legal_limits: Mapping[str, Optional[float]]
+    deduction_categories: Mapping[str, Mapping[str, Any]]
+    tax_brackets: Tuple[Tuple[float, float, float, float], ...]
+    bracket_floors: Tuple[float, ...]
+    bracket_rates: Tuple[float, ...]
+    bracket_fixed: Tuple[float, ...]
+
+    def bracket_index(self, base_gravable: float) -> int:
+        """Índice del tramo que contiene la base gravable"""
+        return max(bisect_left(self.bracket_floors, base_gravable) - 1, 0)
+
+    def income_tax(self, base_gravable: float) -> float:
+        """Impuesto según la tarifa progresiva para una base gravable"""
+        if base_gravable <= 0:
+            return 0.0
+
+        idx = self.bracket_index(base_gravable)
+        return (base_gravable - self.bracket_floors[idx]) * self.bracket_rates[idx] + self.bracket_fixed[idx]
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Representación serializable (JSON) de las reglas"""
+        return {
+            'fiscal_year': self.fiscal_year,
+            'uvt': self.uvt,
+            'fiscal_limits': dict(self.fiscal_limits),
+            'legal_limits': dict(self.legal_limits),
+            'deduction_categories': {
+                key: {
+                    field: list(value) if isinstance(value, tuple) else value
+                    for field, value in category.items()
+                }
+                for key, category in self.deduction_categories.items()
+            },
+            'tax_brackets': [
+                {
+                    'min_income': min_range,
+                    'max_income': max_range if max_range != float('inf') else None,
+                    'rate': rate,
+                    'fixed_amount': fixed_amount
+                }
+                for min_range, max_range, rate, fixed_amount in self.tax_brackets
+            ]
+        }
+
+
+def build_fiscal_rules(fiscal_year: int, uvt: int) -> FiscalYearRules:
+    """Construye las reglas de un año gravable a partir de su UVT"""
+    fiscal_limits = {
+        'limite_no_declarante': 47 * uvt,  # 47 UVT
+        'tope_renta_exenta_trabajo': 240 * uvt,  # 240 UVT
+        'limite_deducciones_dependientes': 32 * uvt,  # 32 UVT por dependiente
+        'limite_deduccion_salud': 16 * uvt,  # 16 UVT medicina prepagada
+        'limite_deduccion_vivienda': 1200 * uvt,  # 1200 UVT intereses vivienda
+        'limite_deduccion_afc': 2800 * uvt,  # 2800 UVT AFC
+    }
+
+    # Límites legales según Estatuto Tributario
+    legal_limits = {
+        # Límites de deducciones
+        'deduccion_dependientes_max': 32 * uvt,  # Art. 387 E.T.
+        'deduccion_salud_max': 16 * uvt,  # Art. 387 E.T.
+        'deduccion_educacion_max': None,  # Sin límite específico
+        'deduccion_vivienda_max': 1200 * uvt,  # Art. 119 E.T.
+        'deduccion_afc_max': 2800 * uvt,  # Art. 126-4 E.T.
+
+        # Renta exenta de trabajo
+        'renta_exenta_trabajo_max': 240 * uvt,  # Art. 206 E.T.
+        'renta_exenta_trabajo_percentage': 0.25,  # 25% de ingresos laborales
+
+        # Límites para declarar
+        'patrimonio_bruto_limite': 154 * uvt,  # Art. 594-1 E.T.
+        'ingresos_brutos_limite': 47 * uvt,  # Art. 594-1 E.T.
+
+        # Límites de retención
+        'retencion_trabajo_min': 4 * uvt,  # Art. 383 E.T.
+        'retencion_honorarios_rate': 0.10,  # 10% para honorarios
+        'retencion_intereses_rate': 0.07,  # 7% para intereses
+
+        # Límites de aportes voluntarios
+        'aporte_voluntario_pension_max_percentage': 0.30,  # 30% del ingreso
+        'aporte_voluntario_pension_max_uvt': 4500 * uvt,  # 4500 UVT
+    }
+
+    # Categorías de deducciones con sus límites
+    deduction_categories = {
+        'salud': {
+            'limite_prepagada': 16 * uvt,
+            'keywords': ('medicina prepagada', 'seguro salud', 'eps'),
+            'descripcion': 'Medicina prepagada y seguros de salud'
+        },
+        'educacion': {
+            'limite': None,  # Sin límite específico
+            'keywords': ('educacion', 'universidad', 'colegio', 'matricula'),
+            'descripcion': 'Gastos de educación propia, cónyuge e hijos'
+        },
+        'dependientes': {
+            'limite_por_dependiente': 32 * uvt,
+            'keywords': ('dependiente', 'hijo', 'padre', 'madre'),
+            'descripcion': 'Dependientes económicos'
+        },
+        'vivienda': {
+            'limite_interes': 1200 * uvt,
+            'keywords': ('interes vivienda', 'credito hipotecario', 'vivienda'),
+            'descripcion': 'Intereses de crédito de vivienda'
+        },
+        'afc': {
+            'limite': 2800 * uvt,
+            'keywords': ('afc', 'ahorro programado', 'cesantias'),
+            'descripcion': 'Aportes a AFC y ahorro programado'
+        }
+    }
+
+    tax_brackets = tuple(
+        (
+            min_uvt * uvt,
+            max_uvt * uvt if max_uvt is not None else float('inf'),
+            rate,
+            fixed_uvt * uvt
+        )
+        for min_uvt, max_uvt, rate, fixed_uvt in TARIFA_RENTA_UVT
+    )
+
+    return FiscalYearRules(
+        fiscal_year=fiscal_year,
+        uvt=uvt,
+        fiscal_limits=MappingProxyType(fiscal_limits),
+        legal_limits=MappingProxyType(legal_limits),
+        deduction_categories=MappingProxyType({
+            key: MappingProxyType(category) for key, category in deduction_categories.items()
+        }),
+        tax_brackets=tax_brackets,
+        bracket_floors=tuple(float(bracket[0]) for bracket in tax_brackets),
+        bracket_rates=tuple(float(bracket[2]) for bracket in tax_brackets),
+        bracket_fixed=tuple(float(bracket[3]) for bracket in tax_brackets),
+    )
+
+
+# Registro del proceso (se llena una sola vez)
+_fiscal_rules: Optional[Mapping[int, FiscalYearRules]] = None
+
+def load_fiscal_rules() -> Mapping[int, FiscalYearRules]:
+    """Precalcula las reglas de todos los años conocidos (idempotente)"""
+    global _fiscal_rules
+
+    if _fiscal_rules is None:
+        _fiscal_rules = MappingProxyType({
+            year: build_fiscal_rules(year, uvt) for year, uvt in UVT_BY_YEAR.items()
+        })
+        logger.info(f"Reglas fiscales cargadas para los años {sorted(_fiscal_rules)}")
+
+    return _fiscal_rules
+
+
+def resolve_fiscal_year(fiscal_year: Optional[Any] = None) -> int:
+    """
+    Normaliza el año gravable (None o '' es el año por defecto).
+
+    Raises:
+        InvalidFiscalYear: Si el valor no es un año entero (p. ej. '?fiscal_year=abc')
+            o si no hay UVT registrada para ese año: no se usan las reglas de otro año
+    """
+    if fiscal_year in (None, ''):
+        return DEFAULT_FISCAL_YEAR
+
+    try:
+        year = int(fiscal_year)
+    except (TypeError, ValueError):
+        raise InvalidFiscalYear(f"Año gravable inválido: {fiscal_year!r}") from None
+
+    if year not in UVT_BY_YEAR:
+        raise InvalidFiscalYear(
+            f"Año gravable no soportado: {year} (disponibles: {min(UVT_BY_YEAR)}-{max(UVT_BY_YEAR)})"
+        )
+    return year
+
+
+def get_fiscal_rules(fiscal_year: Optional[Any] = None) -> FiscalYearRules:
+    """Obtiene las reglas fiscales del año gravable indicado"""
+    return load_fiscal_rules()[resolve_fiscal_year(fiscal_year)]
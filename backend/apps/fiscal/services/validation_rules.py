@@ -0,0 +1,376 @@
+"""
+Reglas de Validación Declarativas - Motor compilado del validador de consistencia
+Cada regla DIAN se declara como datos (condición, severidad, plantillas de mensaje y
+parámetros del año gravable). Las reglas se compilan una vez por año y se evalúan en
+una sola pasada sobre una tabla de hechos aplanada del análisis fiscal.
+"""
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Callable, Mapping, Optional, Tuple, Union
+
+from .rules_registry import FiscalYearRules
+
+logger = logging.getLogger(__name__)
+
+
+Template = Union[str, Callable[[Mapping[str, Any]], str]]
+
+
+@dataclass(frozen=True)
+class ValidationRule:
+    """
+    Definición declarativa de una regla de validación.
+
+    - `condition` recibe el contexto (hechos + parámetros del año) y decide si aplica.
+    - `title`, `description` y `category` son plantillas `str.format` sobre el contexto.
+    - `fields` mapea llaves de la validación a nombres del contexto.
+    - `params` mapea nombres del contexto a llaves de `legal_limits` del año gravable.
+    - `scope='cedula'` evalúa la regla una vez por cada cédula de la tabla de hechos.
+    """
+    code: str
+    type: str
+    severity: str
+    title: Template
+    description: Template
+    condition: Callable[[Mapping[str, Any]], bool]
+    scope: str = 'global'
+    category: Optional[Template] = None
+    legal_reference: Optional[str] = None
+    fields: Mapping[str, str] = field(default_factory=dict)
+    extra: Mapping[str, Any] = field(default_factory=dict)
+    params: Mapping[str, str] = field(default_factory=dict)
+    correction_required: bool = False
+
+    def build(self, context: Mapping[str, Any]) -> Dict[str, Any]:
+        """Construye el dict de validación con el formato del validador"""
+        validation = {'type': self.type}
+        if self.category is not None:
+            validation['category'] = _render(self.category, context)
+        validation['severity'] = self.severity
+        validation['title'] = _render(self.title, context)
+        validation['description'] = _render(self.description, context)
+        if self.legal_reference:
+            validation['legal_reference'] = self.legal_reference
+        for key, fact in self.fields.items():
+            validation[key] = context.get(fact)
+        validation.update(self.extra)
+        validation['correction_required'] = self.correction_required
+        return validation
+
+
+def _render(template: Template, context: Mapping[str, Any]) -> str:
+    """Renderiza una plantilla de mensaje sobre el contexto"""
+    if callable(template):
+        return template(context)
+    return template.format_map(context)
+
+
+def _ratio(numerator: float, denominator: float) -> float:
+    """División segura para tasas"""
+    return numerator / denominator if denominator > 0 else 0.0
+
+
+# Hechos derivados (se calculan en orden sobre los hechos base y parámetros del año)
+DERIVED_FACTS: Tuple[Tuple[str, Callable[[Mapping[str, Any]], Any]], ...] = (
+    ('trabajo_withholding_rate', lambda f: _ratio(f['trabajo_withholdings'], f['trabajo_income'])),
+    ('capital_withholding_rate', lambda f: _ratio(f['capital_withholdings'], f['capital_income'])),
+    ('must_declare', lambda f: f['total_income'] > f['income_threshold']),
+    ('max_exempt_by_percentage', lambda f: f['trabajo_income'] * f['exempt_percentage']),
+    ('max_exempt_allowed', lambda f: min(f['max_exempt_by_percentage'], f['max_exempt_by_limit'])),
+    ('tax_variance_percentage', lambda f: _ratio(
+        abs(f['impuesto_calculado'] - f['expected_tax']), f['expected_tax']
+    ) * 100),
+)
+
+
+def _deduction_limit_rule(code: str, category: str, label: str, fact: str,
+                          limit: str, article: str) -> ValidationRule:
+    """Regla de tope de deducción (Arts. 119, 126-4 y 387 E.T.)"""
+    return ValidationRule(
+        code=code,
+        type='deduction_limit_exceeded',
+        category=category,
+        severity='error',
+        title=f'Límite de Deducción {label} Excedido',
+        description='Deducción de ${' + fact + ':,.0f} excede el límite de ${' + limit + ':,.0f}',
+        legal_reference=f'Artículo {article} del Estatuto Tributario',
+        condition=lambda f: f[fact] > f[limit],
+        fields={'current_value': fact, 'max_allowed': limit},
+        params={limit: limit},
+        correction_required=True,
+    )
+
+
+# Reglas en el orden en que se reportan las validaciones
+VALIDATION_RULES: Tuple[ValidationRule, ...] = (
+    # 1. Límites de deducciones
+    _deduction_limit_rule('DED-001', 'dependientes', 'por Dependientes',
+                          'deducciones_dependientes', 'deduccion_dependientes_max', '387'),
+    _deduction_limit_rule('DED-002', 'salud', 'por Salud',
+                          'deducciones_salud', 'deduccion_salud_max', '387'),
+    _deduction_limit_rule('DED-003', 'vivienda', 'por Vivienda',
+                          'deducciones_vivienda', 'deduccion_vivienda_max', '119'),
+    _deduction_limit_rule('DED-004', 'afc', 'AFC',
+                          'deducciones_afc', 'deduccion_afc_max', '126-4'),
+
+    # 2. Coherencia entre cédulas
+    ValidationRule(
+        code='CED-001',
+        type='no_income_detected',
+        severity='critical',
+        title='No se Detectaron Ingresos Válidos',
+        description='No hay ingresos registrados en ninguna cédula tributaria',
+        legal_reference='Artículo 594-1 del Estatuto Tributario',
+        condition=lambda f: f['total_income'] <= 0,
+        correction_required=True,
+    ),
+    ValidationRule(
+        code='CED-002',
+        type='excessive_withholding_rate',
+        category='rentas_trabajo',
+        severity='warning',
+        title='Tasa de Retención Excesiva en Rentas de Trabajo',
+        description=lambda f: f"Retención del {f['trabajo_withholding_rate'] * 100:.1f}% parece excesiva para rentas de trabajo",
+        condition=lambda f: f['total_income'] > 0 and f['trabajo_income'] > 0 and f['trabajo_withholding_rate'] > 0.40,
+        fields={'current_value': 'trabajo_withholding_rate'},
+        extra={'expected_range': '5% - 35%'},
+    ),
+    ValidationRule(
+        code='CED-003',
+        type='unexpected_withholding_rate',
+        category='rentas_capital',
+        severity='info',
+        title='Tasa de Retención Atípica en Rentas de Capital',
+        description=lambda f: f"Retención del {f['capital_withholding_rate'] * 100:.1f}% difiere de la tasa típica del 7%",
+        condition=lambda f: (
+            f['total_income'] > 0 and f['capital_income'] > 0 and f['capital_withholdings'] > 0 and
+            abs(f['capital_withholding_rate'] - f['retencion_intereses_rate']) > 0.05
+        ),
+        fields={'current_value': 'capital_withholding_rate', 'expected_value': 'retencion_intereses_rate'},
+        params={'retencion_intereses_rate': 'retencion_intereses_rate'},
+    ),
+
+    # 3. Obligación de declarar
+    ValidationRule(
+        code='OBL-001',
+        type='declaration_obligation',
+        severity='info',
+        title='Obligación de Declarar Renta',
+        description='Ingresos de ${total_income:,.0f} superan el límite de ${income_threshold:,.0f}',
+        legal_reference='Artículo 594-1 del Estatuto Tributario',
+        condition=lambda f: f['must_declare'],
+        fields={'must_declare': 'must_declare', 'income_amount': 'total_income',
+                'income_threshold': 'income_threshold'},
+        params={'income_threshold': 'ingresos_brutos_limite'},
+    ),
+    ValidationRule(
+        code='OBL-002',
+        type='declaration_obligation',
+        severity='info',
+        title='Obligación de Declarar Renta',
+        description='Ingresos de ${total_income:,.0f} están por debajo del límite',
+        legal_reference='Artículo 594-1 del Estatuto Tributario',
+        condition=lambda f: not f['must_declare'],
+        fields={'must_declare': 'must_declare', 'income_amount': 'total_income',
+                'income_threshold': 'income_threshold'},
+        params={'income_threshold': 'ingresos_brutos_limite'},
+    ),
+    ValidationRule(
+        code='OBL-003',
+        type='inconsistent_tax_base',
+        severity='warning',
+        title='Base Gravable Inconsistente',
+        description='Debe declarar pero la base gravable es cero o negativa',
+        condition=lambda f: f['must_declare'] and f['base_gravable'] <= 0,
+        fields={'total_income': 'total_income', 'base_gravable': 'base_gravable'},
+        correction_required=True,
+    ),
+
+    # 4. Retenciones por cédula
+    ValidationRule(
+        code='RET-001',
+        scope='cedula',
+        type='missing_withholdings',
+        category='{cedula}',
+        severity='warning',
+        title='Retenciones Faltantes en {cedula_label}',
+        description='Ingresos de ${income:,.0f} deberían tener retenciones en la fuente',
+        condition=lambda f: f['income'] > 0 and f['income'] > f['retencion_trabajo_min'] and f['withholdings'] == 0,
+        fields={'income_amount': 'income', 'withholding_threshold': 'retencion_trabajo_min'},
+        params={'retencion_trabajo_min': 'retencion_trabajo_min'},
+    ),
+    ValidationRule(
+        code='RET-002',
+        scope='cedula',
+        type='withholding_exceeds_income',
+        category='{cedula}',
+        severity='error',
+        title='Retenciones Exceden Ingresos en {cedula_label}',
+        description='Retenciones de ${withholdings:,.0f} superan ingresos de ${income:,.0f}',
+        condition=lambda f: f['income'] > 0 and f['withholdings'] > f['income'],
+        fields={'income_amount': 'income', 'withholding_amount': 'withholdings'},
+        correction_required=True,
+    ),
+
+    # 5. Renta exenta de trabajo
+    ValidationRule(
+        code='EXE-001',
+        type='exempt_income_exceeded',
+        severity='error',
+        title='Renta Exenta Excede Límite Legal',
+        description='Renta exenta de ${renta_exenta_trabajo:,.0f} excede el máximo de ${max_exempt_allowed:,.0f}',
+        legal_reference='Artículo 206 del Estatuto Tributario',
+        condition=lambda f: f['trabajo_income'] > 0 and f['renta_exenta_trabajo'] > f['max_exempt_allowed'],
+        fields={'current_value': 'renta_exenta_trabajo', 'max_allowed': 'max_exempt_allowed',
+                'max_by_percentage': 'max_exempt_by_percentage', 'max_by_limit': 'max_exempt_by_limit'},
+        params={'exempt_percentage': 'renta_exenta_trabajo_percentage',
+                'max_exempt_by_limit': 'renta_exenta_trabajo_max'},
+        correction_required=True,
+    ),
+    ValidationRule(
+        code='EXE-002',
+        type='exempt_income_miscalculated',
+        severity='warning',
+        title='Renta Exenta Mal Calculada',
+        description='Renta exenta debería ser ${max_exempt_allowed:,.0f}',
+        condition=lambda f: f['trabajo_income'] > 0 and abs(f['renta_exenta_trabajo'] - f['max_exempt_allowed']) > 1000,
+        fields={'current_value': 'renta_exenta_trabajo', 'expected_value': 'max_exempt_allowed'},
+        params={'exempt_percentage': 'renta_exenta_trabajo_percentage',
+                'max_exempt_by_limit': 'renta_exenta_trabajo_max'},
+        correction_required=True,
+    ),
+
+    # 6. Tarifa progresiva
+    ValidationRule(
+        code='TAR-001',
+        type='tax_calculation_variance',
+        severity='warning',
+        title='Variación en Cálculo de Impuesto',
+        description='Impuesto calculado difiere significativamente del esperado',
+        condition=lambda f: f['base_gravable'] > 0 and f['expected_tax'] > 0 and f['tax_variance_percentage'] > 10,
+        fields={'calculated_tax': 'impuesto_calculado', 'expected_tax': 'expected_tax',
+                'variance_percentage': 'tax_variance_percentage', 'applicable_bracket': 'applicable_bracket'},
+    ),
+)
+
+
+class CompiledRuleSet:
+    """
+    Reglas compiladas para un año gravable.
+
+    La compilación resuelve los parámetros del año una sola vez y agrupa las reglas
+    consecutivas por cédula en bloques, de modo que la evaluación recorre la tabla
+    de hechos una vez y conserva el orden en que se reportan las validaciones.
+    """
+
+    def __init__(self, rules: Tuple[ValidationRule, ...], fiscal_rules: FiscalYearRules):
+        self.fiscal_rules = fiscal_rules
+        self.rules = rules
+
+        # Parámetros del año gravable resueltos una vez
+        self.params = {
+            name: fiscal_rules.legal_limits[limit_key]
+            for rule in rules
+            for name, limit_key in rule.params.items()
+        }
+
+        # Plan de evaluación: reglas globales o bloques de reglas por cédula
+        self.plan: List[Tuple[str, List[ValidationRule]]] = []
+        for rule in rules:
+            if self.plan and rule.scope == 'cedula' and self.plan[-1][0] == 'cedula':
+                self.plan[-1][1].append(rule)
+            else:
+                self.plan.append((rule.scope, [rule]))
+
+    def build_facts(self, analysis_result: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Aplana el resultado del análisis en hechos globales y filas por cédula"""
+        deductions = analysis_result.get('potential_deductions', {}) or {}
+        cedulas_totals = analysis_result.get('cedulas_totals', {}) or {}
+        tax_calc = analysis_result.get('tax_calculation', {}) or {}
+
+        trabajo = cedulas_totals.get('rentas_trabajo', {})
+        capital = cedulas_totals.get('rentas_capital', {})
+        base_gravable = tax_calc.get('base_gravable', 0)
+
+        facts = dict(self.params)
+        facts.update({
+            'deducciones_dependientes': deductions.get('deducciones_dependientes', 0),
+            'deducciones_salud': deductions.get('deducciones_salud', 0),
+            'deducciones_vivienda': deductions.get('deducciones_vivienda', 0),
+            'deducciones_afc': deductions.get('deducciones_afc', 0),
+            'renta_exenta_trabajo': deductions.get('renta_exenta_trabajo', 0),
+            'trabajo_income': trabajo.get('ingresos_brutos', 0),
+            'trabajo_withholdings': trabajo.get('retenciones', 0),
+            'capital_income': capital.get('ingresos_brutos', 0),
+            'capital_withholdings': capital.get('retenciones', 0),
+            'base_gravable': base_gravable,
+            'impuesto_calculado': tax_calc.get('impuesto_calculado', 0),
+            'expected_tax': self.fiscal_rules.income_tax(base_gravable) if base_gravable > 0 else 0.0,
+            'applicable_bracket': self.fiscal_rules.bracket_index(base_gravable),
+        })
+
+        cedula_rows = []
+        total_income = 0
+        for cedula_name, cedula_data in cedulas_totals.items():
+            income = cedula_data.get('ingresos_brutos', 0)
+            total_income += income
+            cedula_rows.append({
+                'cedula': cedula_name,
+                'cedula_label': cedula_name.replace('_', ' ').title(),
+                'income': income,
+                'withholdings': cedula_data.get('retenciones', 0),
+            })
+        facts['total_income'] = total_income
+
+        for name, derive in DERIVED_FACTS:
+            facts[name] = derive(facts)
+
+        return facts, cedula_rows
+
+    def evaluate(self, analysis_result: Dict[str, Any]) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Evalúa todas las reglas en una pasada
+
+        Returns:
+            Tupla (validaciones, reporte de tiempos por regla)
+        """
+        facts, cedula_rows = self.build_facts(analysis_result)
+
+        validations = []
+        timings = {rule.code: [0, 0, 0] for rule in self.rules}  # evaluaciones, coincidencias, ns
+
+        for scope, block in self.plan:
+            contexts = [facts] if scope == 'global' else [{**facts, **row} for row in cedula_rows]
+
+            for context in contexts:
+                for rule in block:
+                    start = time.perf_counter_ns()
+                    matched = rule.condition(context)
+                    if matched:
+                        validations.append(rule.build(context))
+                    timing = timings[rule.code]
+                    timing[0] += 1
+                    timing[1] += 1 if matched else 0
+                    timing[2] += time.perf_counter_ns() - start
+
+        report = [
+            {
+                'rule': rule.code,
+                'type': rule.type,
+                'evaluations': timings[rule.code][0],
+                'matches': timings[rule.code][1],
+                'elapsed_us': round(timings[rule.code][2] / 1000, 2)
+            }
+            for rule in self.rules
+        ]
+
+        return validations, report
+
+
+def compile_validation_rules(fiscal_rules: FiscalYearRules,
+                             rules: Tuple[ValidationRule, ...] = VALIDATION_RULES) -> CompiledRuleSet:
+    """Compila las reglas declarativas para un año gravable"""
+    compiled = CompiledRuleSet(rules, fiscal_rules)
+    logger.info(f"Reglas de validación compiladas: {len(rules)} reglas para {fiscal_rules.fiscal_year}")
+    return compiled
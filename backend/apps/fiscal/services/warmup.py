@@ -0,0 +1,108 @@
+"""
+Calentamiento de los procesos worker de Celery.
+
+`warm_up_worker` se ejecuta en `worker_process_init` (ver config/celery.py):
+importa los módulos pesados (pandas, openpyxl, numpy y el parser de exógena) y
+construye una vez por proceso las reglas fiscales, las reglas de validación
+compiladas y los servicios singleton de cada año gravable. Así la primera tarea
+del proceso no paga ese costo.
+
+La latencia de la primera tarea de cada proceso (caliente o no) se registra como
+evento estructurado `celery_first_task {...}` para comparar antes y después.
+"""
+import importlib
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Módulos con costo de importación alto que usan las tareas
+HEAVY_MODULES = (
+    'numpy',
+    'pandas',
+    'openpyxl',
+    'apps.documents.parsers.excel_parser',
+    'apps.fiscal.services.intelligent_processor',
+)
+
+# Estado del proceso actual
+_worker_state: Dict[str, Any] = {
+    'warmed_up': False,
+    'warmup_ms': None,
+    'first_task_done': False,
+    'task_starts': {},
+}
+
+
+def warm_up_worker(fiscal_years: Optional[Iterable[int]] = None) -> Dict[str, Any]:
+    """
+    Precarga módulos y servicios del pipeline fiscal en el proceso actual.
+
+    Args:
+        fiscal_years: Años gravables a preparar (por defecto todos los registrados)
+
+    Returns:
+        Dict con el tiempo total y por paso en ms
+    """
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+
+    step_start = time.perf_counter()
+    for module in HEAVY_MODULES:
+        importlib.import_module(module)
+    timings['imports_ms'] = _elapsed_ms(step_start)
+
+    from .intelligent_processor import get_intelligent_fiscal_processor
+    from .rules_registry import UVT_BY_YEAR, load_fiscal_rules
+
+    step_start = time.perf_counter()
+    load_fiscal_rules()
+    timings['rules_ms'] = _elapsed_ms(step_start)
+
+    # El procesador construye el análisis, el detector y el validador (con sus reglas compiladas)
+    step_start = time.perf_counter()
+    years = sorted(fiscal_years or UVT_BY_YEAR)
+    for year in years:
+        get_intelligent_fiscal_processor(year)
+    timings['services_ms'] = _elapsed_ms(step_start)
+
+    total_ms = _elapsed_ms(start)
+    _worker_state['warmed_up'] = True
+    _worker_state['warmup_ms'] = total_ms
+
+    result = {'pid': os.getpid(), 'fiscal_years': years, 'total_ms': total_ms, **timings}
+    logger.info(f"celery_worker_warmup {json.dumps(result)}")
+    return result
+
+
+def record_task_start(task_id: str):
+    """Marca el inicio de una tarea (solo interesa la primera del proceso)"""
+    if not _worker_state['first_task_done']:
+        _worker_state['task_starts'][task_id] = time.perf_counter()
+
+
+def record_task_end(task_id: str, task_name: str):
+    """Registra la latencia de la primera tarea del proceso"""
+    started = _worker_state['task_starts'].pop(task_id, None)
+    if started is None or _worker_state['first_task_done']:
+        return
+
+    _worker_state['first_task_done'] = True
+    _worker_state['task_starts'].clear()
+
+    event = {
+        'pid': os.getpid(),
+        'task': task_name,
+        'latency_ms': _elapsed_ms(started),
+        'warmed_up': _worker_state['warmed_up'],
+        'warmup_ms': _worker_state['warmup_ms'],
+    }
+    logger.info(f"celery_first_task {json.dumps(event)}")
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 2)
@@ -0,0 +1,260 @@
+"""
+Tareas asíncronas para análisis fiscal (individual asíncrono y por lotes).
+
+Cada sesión de análisis se procesa en su propia tarea; los clientes de un lote se
+reparten así sobre el pool de procesos del worker de Celery. Las reglas fiscales,
+los clasificadores y el procesador son singletons por proceso: se cargan una vez
+por worker y se reutilizan para todos los clientes que ese worker atiende.
+"""
+from celery import shared_task
+from django.db.models import F
+from django.utils import timezone
+import logging
+import os
+import tempfile
+
+from .models import FiscalAnalysisBatch, FiscalAnalysisSession
+from .services.intelligent_processor import get_intelligent_fiscal_processor, summarize_analysis_result
+from .services.rules_registry import InvalidFiscalYear
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def process_fiscal_batch(batch_id: str):
+    """
+    Reparte las sesiones pendientes de un lote entre los workers.
+
+    Args:
+        batch_id: UUID del lote
+    """
+    try:
+        batch = FiscalAnalysisBatch.objects.get(batch_id=batch_id)
+    except FiscalAnalysisBatch.DoesNotExist:
+        logger.error(f"Lote fiscal {batch_id} no encontrado")
+        return
+
+    FiscalAnalysisBatch.objects.filter(pk=batch.pk, status='pending').update(
+        status='processing', updated_at=timezone.now()
+    )
+
+    session_ids = list(
+        batch.sessions.filter(status='pending').values_list('session_id', flat=True)
+    )
+    logger.info(f"Lote fiscal {batch_id}: repartiendo {len(session_ids)} clientes")
+
+    # Sesiones eliminadas antes de repartir: cuentan como fallidas para cerrar el lote
+    missing = batch.total_items - batch.sessions.count()
+    if missing > 0:
+        logger.warning(f"Lote fiscal {batch_id}: {missing} sesiones no existen")
+        _record_batch_progress(batch.pk, succeeded=False, count=missing)
+
+    for session_id in session_ids:
+        analyze_fiscal_session.delay(str(session_id), batch.pk)
+
+
+@shared_task(bind=True, max_retries=2)
+def analyze_fiscal_session(self, session_id: str, batch_pk: int = None):
+    """
+    Ejecuta el análisis fiscal completo de una sesión (individual o de un lote).
+
+    Args:
+        session_id: UUID de la sesión de análisis
+        batch_pk: Lote que repartió la sesión; si la sesión ya no existe se
+            cuenta como fallida para que el lote igual se cierre
+    """
+    try:
+        session = FiscalAnalysisSession.objects.select_related('declaration').get(session_id=session_id)
+    except FiscalAnalysisSession.DoesNotExist:
+        logger.error(f"Sesión fiscal {session_id} no encontrada")
+        if batch_pk is not None:
+            _record_batch_progress(batch_pk, succeeded=False)
+        return
+
+    if session.status in ('completed', 'error'):
+        return
+
+    FiscalAnalysisSession.objects.filter(pk=session.pk).update(status='processing', updated_at=timezone.now())
+
+    try:
+        result = run_session_analysis(session)
+
+    except InvalidFiscalYear as e:
+        # Reintentar no cambia el año de la sesión
+        result = {'success': False, 'error': str(e)}
+
+    except Exception as e:
+        logger.error(f"Error inesperado analizando sesión {session_id}: {str(e)}", exc_info=True)
+
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e, countdown=30 * (self.request.retries + 1))
+
+        result = {'success': False, 'error': f"Error después de {self.max_retries} intentos: {str(e)}"}
+
+    succeeded = save_session_result(session, result)
+
+    if session.batch_id:
+        _record_batch_progress(session.batch_id, succeeded)
+
+
+def run_session_analysis(session: FiscalAnalysisSession) -> dict:
+    """
+    Corre el pipeline fiscal para la fuente de una sesión (archivo, declaración o demo).
+
+    Args:
+        session: Sesión con `source_storage_path`, `declaration` o `use_demo`
+
+    Returns:
+        Resultado del IntelligentFiscalProcessor
+    """
+    processor = get_intelligent_fiscal_processor(session.fiscal_year)
+    request_data = session.analysis_results or {}
+    user_context = request_data.get('user_context', {})
+
+    if request_data.get('use_demo'):
+        return processor.process_complete_analysis('demo', user_context)
+
+    if session.declaration_id:
+        return processor.process_parsed_data(declaration_parsed_data(session.declaration), user_context)
+
+    if not session.source_storage_path:
+        return {'success': False, 'error': 'La sesión no tiene archivo ni declaración de origen'}
+
+    from apps.documents.services.storage_service import get_storage_service
+
+    storage_service = get_storage_service()
+    suffix = os.path.splitext(session.original_filename or '')[1] or '.xlsx'
+
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp_file:
+        tmp_path = tmp_file.name
+        tmp_file.write(storage_service.download_file(session.source_storage_path))
+
+    try:
+        return processor.process_complete_analysis(tmp_path, user_context)
+    finally:
+        os.unlink(tmp_path)
+
+
+def declaration_parsed_data(declaration) -> dict:
+    """
+    Convierte los registros de ingreso guardados de una declaración al formato del parser.
+
+    Args:
+        declaration: Instancia de Declaration
+
+    Returns:
+        Dict con 'success' y 'records'
+    """
+    records = [
+        {
+            'third_party_nit': record['third_party_nit'],
+            'third_party_name': record['third_party_name'],
+            'concept_code': record['concept_code'],
+            'concept_description': record['concept_description'],
+            'income_type': record['income_type'],
+            'tax_schedule': record['tax_schedule'] or '',
+            'gross_amount': float(record['gross_amount']),
+            'withholding_amount': float(record['withholding_amount']),
+            'period': record['period'],
+        }
+        for record in declaration.get_income_records().values(
+            'third_party_nit', 'third_party_name', 'concept_code', 'concept_description',
+            'income_type', 'tax_schedule', 'gross_amount', 'withholding_amount', 'period'
+        )
+    ]
+
+    return {
+        'success': bool(records),
+        'records': records,
+        'source': 'declaration',
+        'declaration_id': declaration.id
+    }
+
+
+def save_session_result(session: FiscalAnalysisSession, result: dict) -> bool:
+    """
+    Guarda el resultado del análisis en la sesión.
+
+    Returns:
+        True si el análisis fue exitoso
+    """
+    succeeded = bool(result.get('success'))
+    user_context = (session.analysis_results or {}).get('user_context')
+
+    session.analysis_results = result
+    if user_context is not None:
+        session.analysis_results.setdefault('user_context', user_context)
+    session.result_summary = summarize_analysis_result(result)
+    session.processing_time = result.get('processing_time')
+    session.status = 'completed' if succeeded else 'error'
+    session.save(update_fields=[
+        'analysis_results', 'result_summary', 'processing_time', 'status', 'updated_at'
+    ])
+
+    return succeeded
+
+
+def _record_batch_progress(batch_pk: int, succeeded: bool, count: int = 1):
+    """Actualiza los contadores del lote y lo cierra cuando terminan todos los clientes"""
+    counter = 'completed_items' if succeeded else 'failed_items'
+    FiscalAnalysisBatch.objects.filter(pk=batch_pk).update(
+        **{counter: F(counter) + count}, updated_at=timezone.now()
+    )
+
+    batch = FiscalAnalysisBatch.objects.filter(pk=batch_pk).first()
+    if batch is None:
+        return
+    if batch.processed_items < batch.total_items:
+        return
+
+    final_status = 'completed' if batch.failed_items == 0 else (
+        'error' if batch.completed_items == 0 else 'completed_with_errors'
+    )
+
+    # Solo el último worker en terminar cierra el lote
+    closed = FiscalAnalysisBatch.objects.filter(pk=batch_pk, finished_at__isnull=True).update(
+        status=final_status,
+        summary=build_batch_summary(batch),
+        finished_at=timezone.now(),
+        updated_at=timezone.now()
+    )
+
+    if closed:
+        logger.info(f"Lote fiscal {batch.batch_id} terminado: {final_status}")
+
+
+def build_batch_summary(batch: FiscalAnalysisBatch) -> dict:
+    """Consolida los resúmenes de las sesiones de un lote"""
+    sessions = batch.sessions.values('status', 'processing_time', 'result_summary')
+
+    summary = {
+        'total_clients': 0,
+        'completed': 0,
+        'failed': 0,
+        'requires_declaration': 0,
+        'total_estimated_payment': 0.0,
+        'total_estimated_refund': 0.0,
+        'total_processing_time': 0.0
+    }
+
+    for session in sessions:
+        result_summary = session['result_summary'] or {}
+        summary['total_clients'] += 1
+        summary['total_processing_time'] += session['processing_time'] or 0.0
+
+        if session['status'] != 'completed':
+            summary['failed'] += 1
+            continue
+
+        summary['completed'] += 1
+        summary['requires_declaration'] += 1 if result_summary.get('requires_declaration') else 0
+        summary['total_estimated_payment'] += result_summary.get('estimated_payment') or 0.0
+        summary['total_estimated_refund'] += result_summary.get('estimated_refund') or 0.0
+
+    # Sesiones eliminadas antes de analizarse
+    missing = batch.total_items - summary['total_clients']
+    if missing > 0:
+        summary['total_clients'] += missing
+        summary['failed'] += missing
+
+    return summary
@@ -0,0 +1,199 @@
+"""
+Tests para el modo asíncrono del análisis fiscal: encolado, consulta de estado,
+resultado de la sesión y la tarea `analyze_fiscal_session`.
+"""
+import uuid
+
+import pytest
+
+from apps.fiscal import tasks
+from apps.fiscal.models import FiscalAnalysisSession
+
+ANALYZE_URL = '/api/v1/fiscal/analyze/?async=true'
+
+
+def status_url(session_id):
+    return f'/api/v1/fiscal/sessions/{session_id}/status/'
+
+
+def detail_url(session_id):
+    return f'/api/v1/fiscal/sessions/{session_id}/'
+
+
+@pytest.fixture
+def enqueued(monkeypatch):
+    """Reemplaza `delay` para registrar las sesiones encoladas sin ejecutarlas"""
+    calls = []
+    monkeypatch.setattr(tasks.analyze_fiscal_session, 'delay', lambda session_id: calls.append(session_id))
+    return calls
+
+
+@pytest.fixture
+def make_session(user):
+    def create(**fields):
+        values = {'status': 'pending', 'analysis_results': {'use_demo': True}, **fields}
+        return FiscalAnalysisSession.objects.create(user=user, session_id=uuid.uuid4(), **values)
+    return create
+
+
+@pytest.mark.django_db
+class TestEnqueueAnalysis:
+    """Tests para POST /api/v1/fiscal/analyze/?async=true."""
+
+    def test_enqueue_waits_for_commit(self, api_client, enqueued, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks() as callbacks:
+            response = api_client.post(
+                ANALYZE_URL, {'use_demo': True, 'fiscal_year': 2023}, format='json'
+            )
+            # La tarea no se encola antes de confirmar la sesión
+            assert enqueued == []
+
+        assert response.status_code == 202
+        data = response.json()
+        assert data['status'] == 'pending'
+        assert data['status_url'] == status_url(data['session_id'])
+        assert data['result_url'] == detail_url(data['session_id'])
+
+        session = FiscalAnalysisSession.objects.get(session_id=data['session_id'])
+        assert session.fiscal_year == 2023
+        assert session.original_filename == 'demo'
+        assert session.analysis_results['use_demo'] is True
+
+        assert len(callbacks) == 1
+        callbacks[0]()
+        assert enqueued == [data['session_id']]
+
+    def test_demo_mode_end_to_end(self, api_client, django_capture_on_commit_callbacks):
+        """Con Celery en modo eager la sesión demo termina y se lee el resultado."""
+        with django_capture_on_commit_callbacks(execute=True):
+            session_id = api_client.post(ANALYZE_URL, {'use_demo': True}, format='json').json()['session_id']
+
+        status_data = api_client.get(status_url(session_id)).json()
+        assert status_data['finished'] is True
+        assert status_data['session']['status'] == 'completed'
+        assert status_data['session']['result_summary']['records_count'] > 0
+
+        response = api_client.get(detail_url(session_id))
+        assert response.status_code == 200
+        assert response.json()['success'] is True
+        assert 'fiscal_analysis' in response.json()
+
+
+@pytest.mark.django_db
+class TestSessionEndpoints:
+    """Tests para el estado y el resultado de una sesión."""
+
+    def test_status_polling(self, api_client, make_session):
+        session = make_session(fiscal_year=2024)
+
+        response = api_client.get(status_url(session.session_id))
+
+        assert response.status_code == 200
+        assert response.json()['finished'] is False
+        assert response.json()['session']['status'] == 'pending'
+
+    def test_pending_result_is_202(self, api_client, make_session):
+        session = make_session(status='processing')
+
+        response = api_client.get(detail_url(session.session_id))
+
+        assert response.status_code == 202
+        assert response.json() == {
+            'success': True, 'session_id': str(session.session_id), 'status': 'processing'
+        }
+
+    def test_errored_session_is_422(self, api_client, make_session):
+        session = make_session(status='error', analysis_results={'success': False, 'error': 'Archivo ilegible'})
+
+        response = api_client.get(detail_url(session.session_id))
+
+        assert response.status_code == 422
+        assert response.json()['error'] == 'Archivo ilegible'
+
+    def test_completed_result_is_200(self, api_client, make_session):
+        session = make_session(status='completed', analysis_results={
+            'success': True, 'fiscal_analysis': {'fiscal_year': 2024}, 'parser_results': {'records': []}
+        })
+
+        response = api_client.get(detail_url(session.session_id) + '?fields=fiscal_analysis')
+
+        assert response.status_code == 200
+        assert response.json() == {'success': True, 'fiscal_analysis': {'fiscal_year': 2024}}
+
+    def test_unknown_fields_are_400(self, api_client, make_session):
+        session = make_session(status='completed', analysis_results={'success': True, 'fiscal_analysis': {}})
+
+        response = api_client.get(detail_url(session.session_id) + '?fields=bogus')
+
+        assert response.status_code == 400
+        assert response.json()['unknown_fields'] == ['bogus']
+
+    def test_other_users_session(self, api_client, make_session, django_user_model):
+        session = make_session()
+        session.user = django_user_model.objects.create_user(
+            username='otro', email='otro@example.com', password='clave-segura-123'
+        )
+        session.save()
+
+        assert api_client.get(status_url(session.session_id)).status_code == 404
+        assert api_client.get(detail_url(session.session_id)).status_code == 404
+
+
+@pytest.mark.django_db
+class TestAnalyzeFiscalSessionTask:
+    """Tests para la tarea analyze_fiscal_session."""
+
+    def test_retries_then_succeeds(self, make_session, monkeypatch):
+        session = make_session()
+        attempts = []
+
+        def flaky_analysis(session):
+            attempts.append(session.session_id)
+            if len(attempts) == 1:
+                raise ConnectionError('storage no disponible')
+            return {'success': True, 'processing_time': 0.5}
+
+        monkeypatch.setattr(tasks, 'run_session_analysis', flaky_analysis)
+
+        tasks.analyze_fiscal_session.apply(args=[str(session.session_id)])
+
+        session.refresh_from_db()
+        assert len(attempts) == 2
+        assert session.status == 'completed'
+        assert session.processing_time == 0.5
+
+    def test_exhausted_retries_mark_error(self, make_session, monkeypatch):
+        session = make_session()
+        attempts = []
+
+        def failing_analysis(session):
+            attempts.append(session.session_id)
+            raise ConnectionError('storage no disponible')
+
+        monkeypatch.setattr(tasks, 'run_session_analysis', failing_analysis)
+
+        tasks.analyze_fiscal_session.apply(args=[str(session.session_id)])
+
+        session.refresh_from_db()
+        assert len(attempts) == tasks.analyze_fiscal_session.max_retries + 1
+        assert session.status == 'error'
+        assert session.analysis_results['error'] == 'Error después de 2 intentos: storage no disponible'
+        assert session.result_summary == {'error': session.analysis_results['error']}
+
+    def test_unsupported_year_is_not_retried(self, make_session):
+        session = make_session(fiscal_year=2019)
+
+        tasks.analyze_fiscal_session.apply(args=[str(session.session_id)])
+
+        session.refresh_from_db()
+        assert session.status == 'error'
+        assert 'no soportado' in session.analysis_results['error']
+
+    def test_finished_sessions_are_not_reprocessed(self, make_session, monkeypatch):
+        session = make_session(status='completed')
+        monkeypatch.setattr(tasks, 'run_session_analysis', lambda session: pytest.fail('no debe ejecutarse'))
+
+        tasks.analyze_fiscal_session.apply(args=[str(session.session_id)])
+
+        session.refresh_from_db()
+        assert session.status == 'completed'
@@ -0,0 +1,259 @@
+"""
+Tests para el análisis fiscal por lotes.
+"""
+import uuid
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from apps.common.testing import seed_declarations
+from apps.fiscal import tasks
+from apps.fiscal.models import FiscalAnalysisBatch, FiscalAnalysisSession
+from apps.fiscal.services.intelligent_processor import (
+    IntelligentFiscalProcessor, summarize_analysis_result
+)
+from apps.fiscal.views import _parse_id_list
+
+BATCHES_URL = '/api/v1/fiscal/batches/'
+
+
+class MemoryStorage:
+    """Storage en memoria para verificar subidas y borrados"""
+
+    def __init__(self):
+        self.files = {}
+
+    def upload_file(self, file_obj, blob_name, content_type=None):
+        self.files[blob_name] = file_obj.read()
+        return {'blob_name': blob_name}
+
+    def delete_file(self, blob_name):
+        return self.files.pop(blob_name, None) is not None
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    from apps.documents.services import storage_service
+
+    memory_storage = MemoryStorage()
+    monkeypatch.setattr(storage_service, 'get_storage_service', lambda: memory_storage)
+    return memory_storage
+
+
+@pytest.fixture
+def dispatched(monkeypatch):
+    """Reemplaza `delay` del lote para registrar los lotes encolados"""
+    calls = []
+    monkeypatch.setattr(tasks.process_fiscal_batch, 'delay', lambda batch_id: calls.append(batch_id))
+    return calls
+
+
+def analysis_result(payment):
+    return {
+        'success': True,
+        'processing_time': 1.5,
+        'fiscal_analysis': {'fiscal_year': 2024, 'requires_declaration': True, 'estimated_payment': payment},
+        'parser_results': {'records': [{}]},
+    }
+
+
+def exogena_file(name):
+    return SimpleUploadedFile(name, b'contenido', content_type='application/vnd.ms-excel')
+
+
+class TestBatchAnalysis:
+    """Tests para el procesamiento de clientes de un lote."""
+
+    @pytest.fixture
+    def processor(self):
+        """Fixture que retorna un procesador para 2024."""
+        return IntelligentFiscalProcessor(2024)
+
+    @pytest.fixture
+    def parsed_data(self):
+        """Registros de ingreso ya guardados de una declaración."""
+        return {
+            'success': True,
+            'source': 'declaration',
+            'records': [
+                {'third_party_nit': '900123456', 'third_party_name': 'EMPRESA ABC',
+                 'concept_code': '5001', 'concept_description': 'Salarios',
+                 'income_type': 'salary', 'tax_schedule': 'labor',
+                 'gross_amount': 120000000.0, 'withholding_amount': 9000000.0}
+            ]
+        }
+
+    def test_process_parsed_data_skips_parser(self, processor, parsed_data):
+        """Los registros de una declaración se analizan sin pasar por el parser."""
+        result = processor.process_parsed_data(parsed_data)
+
+        assert result['success'] is True
+        assert result['fiscal_analysis']['fiscal_year'] == 2024
+        assert result['fiscal_analysis']['cedulas_totals']['rentas_trabajo']['ingresos_brutos'] == 120000000.0
+
+        summary = summarize_analysis_result(result)
+        assert summary['records_count'] == 1
+        assert summary['requires_declaration'] is True
+
+    def test_empty_declaration_fails_cleanly(self, processor):
+        """Una declaración sin registros produce un error legible."""
+        result = processor.process_parsed_data({'success': False, 'records': []})
+
+        assert result['success'] is False
+        assert summarize_analysis_result(result) == {'error': result['error']}
+
+
+class TestParseIdList:
+    """Tests para _parse_id_list."""
+
+    def test_accepts_lists_text_and_multipart_values(self):
+        assert _parse_id_list(['1,2,3']) == [1, 2, 3]
+        assert _parse_id_list(['4', '5, 6']) == [4, 5, 6]
+        assert _parse_id_list('7, 8,') == [7, 8]
+        assert _parse_id_list([9, 10]) == [9, 10]
+        assert _parse_id_list(11) == [11]
+        assert _parse_id_list(None) == []
+
+    def test_rejects_non_numeric(self):
+        with pytest.raises(ValueError):
+            _parse_id_list(['1,a'])
+
+
+@pytest.mark.django_db
+class TestCreateFiscalBatch:
+    """Tests para POST /api/v1/fiscal/batches/."""
+
+    def test_files_and_declarations(self, api_client, user, storage, dispatched,
+                                    django_capture_on_commit_callbacks):
+        declarations = seed_declarations(user, declarations=2, fiscal_year=2023)
+        ids = ','.join(str(declaration.id) for declaration in declarations)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = api_client.post(BATCHES_URL, {
+                'exogena_files': [exogena_file('a.xlsx'), exogena_file('b.xlsx')],
+                'declaration_ids': ids,
+            }, format='multipart')
+
+        assert response.status_code == 202
+        batch = response.json()['batch']
+        assert batch['total_items'] == 4
+        assert batch['status'] == 'pending'
+        assert dispatched == [batch['batch_id']]
+
+        sessions = FiscalAnalysisSession.objects.filter(batch__batch_id=batch['batch_id'])
+        assert sorted(sessions.exclude(declaration=None).values_list('fiscal_year', flat=True)) == [2023, 2023]
+        assert sorted(storage.files) == sorted(
+            sessions.filter(declaration=None).values_list('source_storage_path', flat=True)
+        )
+
+    def test_rollback_deletes_uploaded_files(self, api_client, storage, dispatched, monkeypatch):
+        def fail(*args, **kwargs):
+            raise RuntimeError('base de datos caída')
+
+        monkeypatch.setattr(FiscalAnalysisSession.objects, 'bulk_create', fail)
+
+        response = api_client.post(BATCHES_URL, {
+            'exogena_files': [exogena_file('a.xlsx'), exogena_file('b.xlsx')]
+        }, format='multipart')
+
+        assert response.status_code == 500
+        assert storage.files == {}
+        assert not FiscalAnalysisBatch.objects.exists()
+        assert dispatched == []
+
+    def test_validation_errors(self, api_client, user, storage):
+        assert api_client.post(BATCHES_URL, {}, format='multipart').status_code == 400
+        assert api_client.post(BATCHES_URL, {'declaration_ids': '1,x'}, format='multipart').status_code == 400
+
+        response = api_client.post(BATCHES_URL, {'declaration_ids': '999999'}, format='multipart')
+        assert response.status_code == 404
+        assert response.json()['missing_declaration_ids'] == [999999]
+
+    def test_declaration_with_unsupported_year(self, api_client, user, storage):
+        declaration = seed_declarations(user, fiscal_year=2019)[0]
+
+        response = api_client.post(BATCHES_URL, {'declaration_ids': str(declaration.id)}, format='multipart')
+
+        assert response.status_code == 400
+        assert 'no soportado' in response.json()['error']
+        assert not FiscalAnalysisBatch.objects.exists()
+
+
+@pytest.mark.django_db
+class TestFiscalBatchProcessing:
+    """Tests para process_fiscal_batch, el cierre del lote y get_fiscal_batch."""
+
+    @pytest.fixture
+    def batch(self, user):
+        batch = FiscalAnalysisBatch.objects.create(user=user, total_items=3)
+        for number in range(3):
+            FiscalAnalysisSession.objects.create(
+                user=user, session_id=uuid.uuid4(), batch=batch, original_filename=f'cliente {number}',
+                analysis_results={'user_context': {}}, status='pending'
+            )
+        return batch
+
+    def run_batch(self, batch, monkeypatch, results):
+        results = iter(results)
+        monkeypatch.setattr(tasks, 'run_session_analysis', lambda session: next(results))
+        tasks.process_fiscal_batch.apply(args=[str(batch.batch_id)])
+        batch.refresh_from_db()
+
+    def test_all_sessions_complete(self, batch, monkeypatch):
+        self.run_batch(batch, monkeypatch, [analysis_result(100.0), analysis_result(250.0), analysis_result(0.0)])
+
+        assert batch.status == 'completed'
+        assert batch.finished_at is not None
+        assert batch.summary == {
+            'total_clients': 3, 'completed': 3, 'failed': 0, 'requires_declaration': 3,
+            'total_estimated_payment': 350.0, 'total_estimated_refund': 0.0, 'total_processing_time': 4.5
+        }
+
+    def test_failures_are_counted(self, batch, monkeypatch):
+        failure = {'success': False, 'error': 'Archivo ilegible'}
+        self.run_batch(batch, monkeypatch, [analysis_result(100.0), failure, failure])
+
+        assert batch.status == 'completed_with_errors'
+        assert (batch.completed_items, batch.failed_items) == (1, 2)
+        assert batch.summary['failed'] == 2
+
+    def test_missing_session_still_closes_batch(self, batch, monkeypatch):
+        batch.sessions.first().delete()
+
+        self.run_batch(batch, monkeypatch, [analysis_result(100.0), analysis_result(100.0)])
+
+        assert batch.status == 'completed_with_errors'
+        assert (batch.completed_items, batch.failed_items) == (2, 1)
+        assert batch.summary['total_clients'] == 3
+        assert batch.summary['failed'] == 1
+
+    def test_session_deleted_after_dispatch(self, batch, monkeypatch):
+        """Si la sesión desaparece antes de su tarea, cuenta como fallida."""
+        session_ids = [str(session_id) for session_id in batch.sessions.values_list('session_id', flat=True)]
+        FiscalAnalysisSession.objects.filter(session_id=session_ids[0]).delete()
+        monkeypatch.setattr(tasks, 'run_session_analysis', lambda session: analysis_result(10.0))
+
+        for session_id in session_ids:
+            tasks.analyze_fiscal_session.apply(args=[session_id, batch.pk])
+
+        batch.refresh_from_db()
+        assert (batch.completed_items, batch.failed_items) == (2, 1)
+        assert batch.finished_at is not None
+
+    def test_get_fiscal_batch(self, api_client, batch, monkeypatch, django_user_model):
+        self.run_batch(batch, monkeypatch, [analysis_result(1.0)] * 3)
+
+        response = api_client.get(f'{BATCHES_URL}{batch.batch_id}/')
+
+        assert response.status_code == 200
+        data = response.json()['batch']
+        assert data['progress_percentage'] == 100
+        assert [session['original_filename'] for session in data['sessions']] == [
+            'cliente 0', 'cliente 1', 'cliente 2'
+        ]
+
+        batch.user = django_user_model.objects.create_user(
+            username='otro', email='otro@example.com', password='clave-segura-123'
+        )
+        batch.save()
+        assert api_client.get(f'{BATCHES_URL}{batch.batch_id}/').status_code == 404
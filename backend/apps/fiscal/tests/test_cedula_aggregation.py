@@ -0,0 +1,108 @@
+"""
+Tests para la clasificación y agregación por cédulas en una sola pasada.
+"""
+import pytest
+
+from apps.fiscal.services.analysis_service import (
+    CEDULAS, FiscalAnalysisService, classify_cedula
+)
+
+
+# Cédula esperada de cada tipo de ingreso de los registros de prueba
+EXPECTED_CEDULAS = {
+    'salary': 'rentas_trabajo',
+    'interests': 'rentas_capital',
+    'prizes': 'ganancias_ocasionales',
+    'other': 'rentas_no_laborales',
+}
+
+
+@pytest.fixture(autouse=True)
+def clear_cedula_cache():
+    """Cada test parte de la caché de classify_cedula vacía (los conteos de aciertos dependen de ella)"""
+    classify_cedula.cache_clear()
+    yield
+    classify_cedula.cache_clear()
+
+
+class TestClassifyCedula:
+    """Tests para classify_cedula."""
+
+    @pytest.mark.parametrize('income_type, tax_schedule, concept_description, expected', [
+        ('salary', '', '', 'rentas_trabajo'),
+        ('', 'LABOR', '', 'rentas_trabajo'),
+        ('', '', 'Honorarios profesionales', 'rentas_trabajo'),
+        ('interests', '', '', 'rentas_capital'),
+        ('', 'capital', '', 'rentas_capital'),
+        ('', '', 'Arrendamiento local', 'rentas_capital'),
+        ('prizes', '', '', 'ganancias_ocasionales'),
+        ('', '', 'Premio lotería', 'ganancias_ocasionales'),
+        ('other', '', 'Otros ingresos', 'rentas_no_laborales'),
+        ('', '', 'Sin descripción conocida', 'rentas_trabajo'),
+    ])
+    def test_fixed_cases(self, income_type, tax_schedule, concept_description, expected):
+        assert classify_cedula(income_type, tax_schedule, concept_description) == expected
+
+
+class TestCedulaAggregation:
+    """Tests para FiscalAnalysisService._aggregate_by_cedulas."""
+
+    @pytest.fixture
+    def service(self):
+        """Fixture que retorna una instancia del servicio."""
+        return FiscalAnalysisService()
+
+    @pytest.fixture
+    def records(self):
+        """Registros de exógena con combinaciones repetidas."""
+        base = [
+            {'income_type': 'salary', 'tax_schedule': 'labor', 'concept_description': 'Salarios',
+             'third_party_nit': '900123456', 'gross_amount': 60000000, 'withholding_amount': 3000000},
+            {'income_type': 'interests', 'tax_schedule': '', 'concept_description': 'Rendimientos financieros',
+             'third_party_nit': '800987654', 'gross_amount': 1200000, 'withholding_amount': 84000},
+            {'income_type': 'prizes', 'tax_schedule': '', 'concept_description': 'Premio rifa',
+             'third_party_nit': '811111111', 'gross_amount': 5000000, 'withholding_amount': 1000000},
+            {'income_type': 'other', 'tax_schedule': '', 'concept_description': 'Otros ingresos',
+             'third_party_nit': '822222222', 'gross_amount': 700000.5, 'withholding_amount': 0},
+        ]
+        return [dict(record, third_party_nit=f"{record['third_party_nit']}{i % 3}")
+                for i in range(25) for record in base]
+
+    def _reference_totals(self, records):
+        """Totales calculados con pasadas separadas por cédula (cédulas fijas por tipo)."""
+        totals = {}
+        for cedula in CEDULAS:
+            cedula_records = [r for r in records if EXPECTED_CEDULAS[r['income_type']] == cedula]
+            if not cedula_records:
+                totals[cedula] = {'ingresos_brutos': 0.0, 'retenciones': 0.0,
+                                  'ingresos_netos': 0.0, 'registros_count': 0}
+                continue
+            gross = sum(r.get('gross_amount', 0) for r in cedula_records)
+            withholding = sum(r.get('withholding_amount', 0) for r in cedula_records)
+            totals[cedula] = {
+                'ingresos_brutos': gross,
+                'retenciones': withholding,
+                'ingresos_netos': gross - withholding,
+                'registros_count': len(cedula_records),
+                'third_parties': len(set(r.get('third_party_nit', '') for r in cedula_records))
+            }
+        return totals
+
+    def test_single_pass_matches_reference(self, service, records):
+        """La agregación fusionada produce los mismos totales."""
+        classification, totals = service._aggregate_by_cedulas(records)
+
+        assert totals == self._reference_totals(records)
+        for cedula, items in classification.items():
+            assert {EXPECTED_CEDULAS[r['income_type']] for r in items} <= {cedula}
+        assert list(classification) == list(CEDULAS)
+        assert sum(len(items) for items in classification.values()) == len(records)
+        assert totals['ganancias_ocasionales']['third_parties'] == 3
+
+    def test_classification_is_memoized(self, service, records):
+        """La clasificación se calcula una vez por combinación distinta."""
+        service._aggregate_by_cedulas(records)
+
+        info = classify_cedula.cache_info()
+        assert info.misses == 4
+        assert info.hits == len(records) - 4
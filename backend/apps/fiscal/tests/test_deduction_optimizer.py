@@ -0,0 +1,126 @@
+"""
+Tests para el optimizador vectorizado de escenarios de deducciones.
+"""
+import pytest
+from django.conf import settings
+
+from apps.fiscal.services.deduction_optimizer import DeductionScenarioOptimizer
+
+
+class TestDeductionScenarioOptimizer:
+    """Tests para DeductionScenarioOptimizer."""
+
+    @pytest.fixture
+    def optimizer(self):
+        """Fixture que retorna una instancia del optimizador."""
+        return DeductionScenarioOptimizer()
+
+    @pytest.fixture
+    def deductions(self):
+        """Deducciones reportadas por el usuario."""
+        return {
+            'dependientes': 20000000,
+            'medicina_prepagada': 12000000,
+            'intereses_vivienda': 30000000,
+            'afc': 15000000,
+            'pension_voluntaria': 10000000
+        }
+
+    def test_tax_batch_matches_single_evaluation(self, optimizer):
+        """El cálculo en lote coincide con el cálculo individual."""
+        bases = [0, 40000000, 80000000, 150000000, 400000000, 2000000000]
+        batch = optimizer.tax_batch(bases)
+
+        for base, tax in zip(bases, batch):
+            assert optimizer.tax_for(base) == pytest.approx(tax)
+
+        assert list(batch) == sorted(batch)
+
+    def test_evaluates_every_combination(self, optimizer, deductions):
+        """Se evalúan steps^palancas combinaciones."""
+        result = optimizer.optimize(150000000, deductions, steps=5)
+
+        assert result['success'] is True
+        assert result['evaluated_combinations'] == 5 ** 5
+
+    def test_claimable_respects_caps(self, optimizer, deductions):
+        """Ninguna palanca supera su tope legal."""
+        result = optimizer.optimize(150000000, deductions, steps=3)
+
+        for lever in result['levers']:
+            assert lever['claimable'] <= lever['cap']
+            assert lever['claimable'] <= lever['available']
+
+        for scenario in result['pareto_front']:
+            for lever in result['levers']:
+                assert scenario['deductions'][lever['key']] <= lever['claimable'] + 1e-6
+
+    def test_pareto_front_is_monotonic(self, optimizer, deductions):
+        """Más deducción en la frontera siempre implica menos impuesto."""
+        front = optimizer.optimize(150000000, deductions, steps=5)['pareto_front']
+
+        costs = [point['total_deductions'] for point in front]
+        taxes = [point['tax_amount'] for point in front]
+
+        assert costs == sorted(costs)
+        assert all(later < earlier for earlier, later in zip(taxes, taxes[1:]))
+
+    def test_batch_is_vectorized(self, optimizer, deductions, monkeypatch):
+        """Las combinaciones se evalúan en un número fijo de llamadas a tax_batch, sin importar `steps`."""
+        calls = []
+        tax_batch = optimizer.tax_batch
+
+        def counting_tax_batch(base_gravable):
+            calls.append(len(base_gravable))
+            return tax_batch(base_gravable)
+
+        monkeypatch.setattr(optimizer, 'tax_batch', counting_tax_batch)
+
+        for steps in (2, optimizer.DEFAULT_STEPS, optimizer.MAX_STEPS):
+            calls.clear()
+            result = optimizer.optimize(150000000, deductions, steps=steps)
+
+            assert result['evaluated_combinations'] == steps ** len(optimizer.LEVER_ALIASES)
+            # Lote de combinaciones, impuesto base, palancas al máximo y ahorro marginal
+            assert calls == [result['evaluated_combinations'], 1, 1, len(optimizer.LEVER_ALIASES)]
+
+    def test_fast_enough_for_interactive_use(self, optimizer, deductions):
+        """El lote completo se calcula en menos de 50 ms (si ENFORCE_LATENCY_BUDGETS)."""
+        if not getattr(settings, 'ENFORCE_LATENCY_BUDGETS', False):
+            pytest.skip('Presupuestos de latencia desactivados (ENFORCE_LATENCY_BUDGETS=False)')
+
+        optimizer.optimize(150000000, deductions, steps=optimizer.MAX_STEPS)  # calentamiento
+        result = optimizer.optimize(150000000, deductions, steps=optimizer.MAX_STEPS)
+
+        assert result['computation_ms'] < 50
+
+
+@pytest.mark.django_db
+class TestSimulateDeductionsEndpoint:
+    """Tests para POST /api/v1/fiscal/simulate-deductions/."""
+
+    URL = '/api/v1/fiscal/simulate-deductions/'
+
+    def test_simulation(self, api_client):
+        response = api_client.post(self.URL, {
+            'base_income': 150000000, 'deductions': {'intereses_vivienda': 30000000}, 'steps': 3
+        }, format='json')
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data['optimizer']['evaluated_combinations'] == 3
+        assert data['scenarios'][1]['deductions'] == 30000000
+
+    def test_invalid_payloads_return_400(self, api_client):
+        payloads = [
+            {'base_income': 150000000, 'deductions': [30000000]},
+            {'base_income': 150000000, 'deductions': {'afc': 'mucho'}},
+            {'base_income': -1, 'deductions': {}},
+            {'deductions': {}},
+            {'base_income': 150000000, 'steps': 'x'},
+        ]
+        for payload in payloads:
+            response = api_client.post(self.URL, payload, format='json')
+
+            assert response.status_code == 400, payload
+            assert response.json()['success'] is False
@@ -0,0 +1,162 @@
+"""
+Tests para la instrumentación por etapa del pipeline fiscal.
+"""
+import pytest
+from django.core.cache import cache
+from django.test import override_settings
+
+from apps.fiscal.services import instrumentation
+from apps.fiscal.services.instrumentation import (
+    PipelineProfiler, get_shared_stage_histograms, get_stage_histograms, reset_stage_histograms
+)
+
+LOCMEM_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'pipeline-metrics-tests',
+    }
+}
+
+
+class RecordingCache:
+    """Envoltura de la caché que registra las operaciones invocadas."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.calls = []
+
+    def __getattr__(self, name):
+        method = getattr(self.backend, name)
+
+        def call(*args, **kwargs):
+            self.calls.append(name)
+            return method(*args, **kwargs)
+        return call
+
+
+class TestPipelineProfiler:
+    """Tests para PipelineProfiler."""
+
+    @pytest.fixture(autouse=True)
+    def clean_histograms(self):
+        """Cada test parte de histogramas vacíos."""
+        reset_stage_histograms()
+        yield
+        reset_stage_histograms()
+
+    def test_stage_captures_time_memory_and_records(self):
+        """Cada etapa registra tiempos, pico de memoria y registros."""
+        with PipelineProfiler(trace_memory=True) as profiler:
+            with profiler.stage('parse') as stage:
+                data = [str(i) * 10 for i in range(5000)]
+                stage['records'] = len(data)
+
+        event = profiler.summary()['stages'][0]
+        assert event['stage'] == 'parse'
+        assert event['records'] == 5000
+        assert event['wall_ms'] >= 0
+        assert event['cpu_ms'] >= 0
+        assert event['peak_memory_kb'] > 0
+
+    def test_memory_not_traced_by_default(self):
+        """Sin modo debug no se activa tracemalloc."""
+        with PipelineProfiler() as profiler:
+            with profiler.stage('validate', records=3):
+                pass
+
+        assert profiler.stages[0]['peak_memory_kb'] is None
+
+    def test_histograms_aggregate_samples(self):
+        """Los histogramas reportan percentiles por etapa."""
+        profiler = PipelineProfiler()
+        for _ in range(20):
+            with profiler.stage('anomaly', records=10):
+                pass
+
+        metrics = get_stage_histograms()['stages']['anomaly']
+        assert metrics['wall_ms']['count'] == 20
+        assert metrics['wall_ms']['p50'] <= metrics['wall_ms']['p99']
+        assert metrics['records']['p95'] == 10
+        assert 'peak_memory_kb' not in metrics
+
+
+class TestSharedHistograms:
+    """Tests para la ventana compartida en la caché (web y workers)."""
+
+    @pytest.fixture(autouse=True)
+    def shared_cache(self):
+        with override_settings(CACHES=LOCMEM_CACHE):
+            cache.clear()
+            reset_stage_histograms()
+            yield
+            cache.clear()
+        reset_stage_histograms()
+
+    def test_samples_survive_other_processes(self):
+        """Las muestras de otro proceso (p. ej. un worker) se leen desde la caché."""
+        with PipelineProfiler() as profiler:
+            for _ in range(5):
+                with profiler.stage('classify', records=7):
+                    pass
+
+        # El proceso web no tiene muestras locales propias
+        reset_stage_histograms()
+
+        assert get_stage_histograms()['stages'] == {}
+        metrics = get_shared_stage_histograms()['stages']['classify']
+        assert metrics['wall_ms']['count'] == 5
+        assert metrics['records']['max'] == 7
+
+    def test_shared_window_is_bounded(self, monkeypatch):
+        """El anillo compartido conserva HISTOGRAM_WINDOW muestras por etapa del pipeline."""
+        monkeypatch.setattr(instrumentation, 'HISTOGRAM_WINDOW', 4)
+        for records in range(30):
+            with PipelineProfiler() as profiler:
+                with profiler.stage('validate', records=records):
+                    pass
+
+        metrics = get_shared_stage_histograms()['stages']['validate']
+        assert metrics['records']['count'] == 4 * len(instrumentation.PIPELINE_STAGES)
+        # Solo quedan las muestras 10..29
+        assert metrics['records']['p50'] == 19
+        assert metrics['records']['max'] == 29
+
+    def test_one_batched_write_per_run(self, monkeypatch):
+        """Las etapas no escriben en la caché; la ejecución hace un incr y un set_many."""
+        recording = RecordingCache(cache)
+        monkeypatch.setattr(instrumentation, 'cache', recording)
+        # El contador ya existe tras una ejecución previa
+        cache.set(instrumentation._shared_key('seq'), 0)
+
+        with PipelineProfiler() as profiler:
+            for stage in instrumentation.PIPELINE_STAGES:
+                with profiler.stage(stage, records=1):
+                    pass
+            assert recording.calls == []
+
+        assert recording.calls == ['incr', 'set_many']
+        assert set(get_shared_stage_histograms()['stages']) == set(instrumentation.PIPELINE_STAGES)
+
+    @pytest.mark.django_db
+    def test_endpoint_reports_shared_and_process(self, api_client, user):
+        """El endpoint expone las métricas compartidas y las del proceso."""
+        user.is_staff = True
+        user.save()
+        with PipelineProfiler() as profiler:
+            with profiler.stage('parse', records=3):
+                pass
+
+        data = api_client.get('/api/v1/fiscal/ops/pipeline-metrics/').json()
+
+        assert data['metrics']['stages']['parse']['records']['count'] == 1
+        assert data['process_metrics']['stages']['parse']['records']['count'] == 1
+
+    def test_without_shared_cache(self):
+        """Con DummyCache solo quedan las muestras del proceso, sin errores."""
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}):
+            with PipelineProfiler() as profiler:
+                with profiler.stage('anomaly', records=1):
+                    pass
+
+            assert get_shared_stage_histograms()['stages'] == {}
+        assert get_stage_histograms()['stages']['anomaly']['records']['count'] == 1
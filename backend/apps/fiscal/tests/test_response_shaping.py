@@ -0,0 +1,110 @@
+"""
+Tests para la selección de campos y el modo compacto de las respuestas fiscales.
+"""
+import json
+
+import pytest
+
+from apps.fiscal.services.intelligent_processor import IntelligentFiscalProcessor
+from apps.fiscal.services.response_shaping import (
+    UnknownFieldsError, compact_analysis_result, select_fields, shape_analysis_response
+)
+
+
+class TestResponseShaping:
+    """Tests para el modelado de respuestas del pipeline."""
+
+    @pytest.fixture
+    def result(self):
+        """Resultado completo del pipeline con registros repetidos en varias secciones."""
+        records = [
+            {'third_party_nit': f'9001234{i:02d}', 'third_party_name': f'EMPRESA {i}',
+             'concept_code': '5001', 'concept_description': 'Salarios',
+             'income_type': 'salary', 'tax_schedule': 'labor',
+             'gross_amount': 10000000.0 * (i + 1), 'withholding_amount': 0.0}
+            for i in range(40)
+        ]
+        records.append({'third_party_nit': '800555111', 'third_party_name': 'BANCO',
+                        'concept_code': '1001', 'concept_description': 'Intereses',
+                        'income_type': 'interest', 'tax_schedule': 'capital',
+                        'gross_amount': 2000000.0, 'withholding_amount': 100000.0})
+
+        processor = IntelligentFiscalProcessor(2024)
+        return processor.process_parsed_data({'success': True, 'records': records})
+
+    def test_select_nested_fields(self, result):
+        """`fields=` conserva solo las rutas pedidas más `success`."""
+        selected = select_fields(result, ['fiscal_analysis.tax_calculation', 'user_friendly_summary'])
+
+        assert set(selected) == {'success', 'fiscal_analysis', 'user_friendly_summary'}
+        assert list(selected['fiscal_analysis']) == ['tax_calculation']
+
+    def test_unknown_fields_are_reported(self, result):
+        """Las rutas que no existen se reportan todas juntas."""
+        with pytest.raises(UnknownFieldsError) as error:
+            select_fields(result, ['bogus', 'fiscal_analysis.tax_calculation', 'fiscal_analysis.nada'])
+
+        assert error.value.paths == ['bogus', 'fiscal_analysis.nada']
+
+    def test_failed_result_is_not_validated(self):
+        """Un resultado fallido solo trae `success` y `error`."""
+        failed = {'success': False, 'error': 'Archivo ilegible'}
+
+        assert select_fields(failed, ['fiscal_analysis']) == failed
+
+    def test_compact_references_records_by_index(self, result):
+        """Las cédulas listan índices que apuntan a los registros originales."""
+        records = result['parser_results']['records']
+        compacted = compact_analysis_result(result, records_url='/records/')
+
+        assert 'records' not in compacted['parser_results']
+        assert compacted['parser_results']['records_count'] == len(records)
+        assert compacted['parser_results']['records_url'] == '/records/'
+
+        classification = result['fiscal_analysis']['cedulas_classification']
+        for cedula, indices in compacted['fiscal_analysis']['cedulas_classification'].items():
+            assert [records[i] for i in indices] == classification[cedula]
+
+        # El resultado original no se modifica
+        assert 'records' in result['parser_results']
+
+    def test_compact_matches_stored_results(self, result):
+        """Un resultado leído de la base (sin identidad compartida) produce los mismos índices."""
+        stored = json.loads(json.dumps(result, default=str))
+
+        assert compact_analysis_result(stored)['fiscal_analysis'] == compact_analysis_result(result)['fiscal_analysis']
+
+    def test_compact_anomalies_reference_records(self, result):
+        """Los detalles de anomalías por registro usan `record_index` sin repetir datos."""
+        records = result['parser_results']['records']
+        anomalies = compact_analysis_result(result)['anomaly_detection']['anomalies']
+
+        referenced = [a['record_details'] for a in anomalies
+                      if isinstance(a.get('record_details'), dict) and 'record_index' in a['record_details']]
+        for details in referenced:
+            assert 'name' not in details
+            assert records[details['record_index']]
+
+    def test_compact_size_independent_of_records(self, result):
+        """El tamaño de la parte fija de la respuesta compacta no crece con los registros."""
+        shaped = shape_analysis_response(result, fields='parser_results,fiscal_analysis.tax_calculation', compact=True)
+        full = shape_analysis_response(result, fields='parser_results,fiscal_analysis.tax_calculation')
+
+        assert len(json.dumps(shaped, default=str)) < len(json.dumps(full, default=str)) / 4
+
+    @pytest.mark.django_db
+    def test_sync_analysis_rejects_compact(self, api_client):
+        """El análisis síncrono no tiene sesión ni `records_url`: el modo compacto se rechaza."""
+        response = api_client.post('/api/v1/fiscal/analyze/?compact=true', {'use_demo': True}, format='json')
+
+        assert response.status_code == 400
+        assert response.json()['success'] is False
+
+    @pytest.mark.django_db
+    def test_unknown_fields_return_400(self, api_client):
+        response = api_client.post(
+            '/api/v1/fiscal/analyze/?fields=bogus,fiscal_analysis', {'use_demo': True}, format='json'
+        )
+
+        assert response.status_code == 400
+        assert response.json()['unknown_fields'] == ['bogus']
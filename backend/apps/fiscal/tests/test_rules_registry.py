@@ -0,0 +1,97 @@
+"""
+Tests para el registro de reglas fiscales por año gravable.
+"""
+import pytest
+
+from apps.fiscal.serializers import FiscalLimitsResponseSerializer
+from apps.fiscal.services.analysis_service import get_fiscal_analysis_service
+from apps.fiscal.services.rules_registry import (
+    UVT_BY_YEAR, InvalidFiscalYear, get_fiscal_rules, load_fiscal_rules, resolve_fiscal_year
+)
+
+
+class TestFiscalRulesRegistry:
+    """Tests para el registro de reglas fiscales."""
+
+    def test_rules_loaded_once_per_process(self):
+        """El registro se construye una sola vez y se comparte."""
+        assert load_fiscal_rules() is load_fiscal_rules()
+        assert get_fiscal_rules(2024) is get_fiscal_rules(2024)
+        assert set(load_fiscal_rules()) == set(UVT_BY_YEAR)
+
+    def test_rules_are_immutable(self):
+        """Las reglas no pueden modificarse desde los servicios."""
+        rules = get_fiscal_rules(2024)
+
+        with pytest.raises(TypeError):
+            rules.fiscal_limits['limite_no_declarante'] = 0
+
+        with pytest.raises(AttributeError):
+            rules.uvt = 0
+
+    def test_known_years(self):
+        """Sin año se usa el año por defecto; los años registrados se aceptan como texto o entero."""
+        assert resolve_fiscal_year(None) == 2024
+        assert resolve_fiscal_year('2023') == 2023
+        assert resolve_fiscal_year(max(UVT_BY_YEAR)) == max(UVT_BY_YEAR)
+
+    def test_unsupported_year_is_rejected(self):
+        """Un año sin UVT registrada no se reemplaza por el más cercano."""
+        for year in (1900, min(UVT_BY_YEAR) - 1, 2100):
+            with pytest.raises(InvalidFiscalYear, match='no soportado'):
+                resolve_fiscal_year(year)
+
+    def test_invalid_year_is_rejected(self):
+        """Un año que no es entero lanza InvalidFiscalYear (un ValueError)."""
+        for value in ('abc', '2024.5', [2024]):
+            with pytest.raises(InvalidFiscalYear):
+                resolve_fiscal_year(value)
+
+        assert issubclass(InvalidFiscalYear, ValueError)
+
+    def test_income_tax_uses_containing_bracket(self):
+        """El impuesto se calcula con el tramo que contiene la base."""
+        rules = get_fiscal_rules(2024)
+        uvt = rules.uvt
+
+        assert rules.income_tax(1000 * uvt) == 0
+        assert rules.income_tax(1500 * uvt) == pytest.approx(410 * uvt * 0.19)
+        assert rules.income_tax(5000 * uvt) == pytest.approx(900 * uvt * 0.33 + 357 * uvt)
+
+    def test_services_share_year_rules(self):
+        """Los servicios del mismo año comparten las reglas del registro."""
+        service = get_fiscal_analysis_service(2023)
+
+        assert service is get_fiscal_analysis_service(2023)
+        assert service.rules is get_fiscal_rules(2023)
+        assert service.UVT == UVT_BY_YEAR[2023]
+
+
+@pytest.mark.django_db
+class TestFiscalLimitsEndpoint:
+    """Tests para GET /api/v1/fiscal/limits/."""
+
+    def test_limits_for_year(self, api_client):
+        response = api_client.get('/api/v1/fiscal/limits/?fiscal_year=2023')
+
+        assert response.status_code == 200
+        limits = response.json()['limits']
+        assert limits['uvt'] == UVT_BY_YEAR[2023]
+        assert FiscalLimitsResponseSerializer(data=limits).is_valid()
+
+    def test_unsupported_year_returns_400(self, api_client):
+        response = api_client.get('/api/v1/fiscal/limits/?fiscal_year=2100')
+
+        assert response.status_code == 400
+        assert 'no soportado' in response.json()['error']
+
+    def test_invalid_year_returns_400(self, api_client):
+        response = api_client.get('/api/v1/fiscal/limits/?fiscal_year=abc')
+
+        assert response.status_code == 400
+        assert response.json() == {'success': False, 'error': "Año gravable inválido: 'abc'"}
+
+    def test_invalid_year_on_analyze_returns_400(self, api_client):
+        response = api_client.post('/api/v1/fiscal/analyze/', {'use_demo': True, 'fiscal_year': 'abc'}, format='json')
+
+        assert response.status_code == 400
@@ -0,0 +1,69 @@
+"""
+Tests para el motor de reglas de validación compilado.
+"""
+import pytest
+
+from apps.fiscal.services.consistency_validator import ConsistencyValidator
+from apps.fiscal.services.rules_registry import get_fiscal_rules
+from apps.fiscal.services.validation_rules import (
+    VALIDATION_RULES, ValidationRule, compile_validation_rules
+)
+
+
+class TestValidationRules:
+    """Tests para las reglas declarativas del validador."""
+
+    @pytest.fixture
+    def analysis_result(self):
+        """Resultado de análisis con una deducción por encima del tope."""
+        return {
+            'success': True,
+            'potential_deductions': {
+                'deducciones_salud': 50000000,
+                'renta_exenta_trabajo': 15000000
+            },
+            'cedulas_totals': {
+                'rentas_trabajo': {'ingresos_brutos': 60000000, 'retenciones': 0},
+                'rentas_capital': {'ingresos_brutos': 0.0, 'retenciones': 0.0}
+            },
+            'tax_calculation': {'base_gravable': 45000000, 'impuesto_calculado': 0}
+        }
+
+    def test_rules_use_fiscal_year_parameters(self, analysis_result):
+        """Los topes se resuelven con la UVT del año gravable."""
+        validations = ConsistencyValidator(2023).validate_data_consistency(analysis_result)['validations']
+
+        salud = next(v for v in validations if v.get('category') == 'salud')
+        assert salud['max_allowed'] == 16 * get_fiscal_rules(2023).uvt
+        assert salud['title'] == 'Límite de Deducción por Salud Excedido'
+
+        missing = next(v for v in validations if v['type'] == 'missing_withholdings')
+        assert missing['title'] == 'Retenciones Faltantes en Rentas Trabajo'
+
+    def test_evaluation_report_covers_every_rule(self, analysis_result):
+        """El reporte incluye evaluaciones, coincidencias y tiempo por regla."""
+        result = ConsistencyValidator().validate_data_consistency(analysis_result)
+        report = {entry['rule']: entry for entry in result['rule_evaluation_report']}
+
+        assert set(report) == {rule.code for rule in VALIDATION_RULES}
+        assert report['DED-002']['matches'] == 1
+        assert report['RET-001']['evaluations'] == 2
+        assert all(entry['elapsed_us'] >= 0 for entry in report.values())
+
+    def test_new_rules_are_declarative(self, analysis_result):
+        """Una regla nueva se agrega como datos, sin código de validación."""
+        rule = ValidationRule(
+            code='TEST-001',
+            type='high_income',
+            severity='info',
+            title='Ingresos Altos',
+            description='Ingresos de ${total_income:,.0f}',
+            condition=lambda f: f['total_income'] > f['patrimonio_bruto_limite'],
+            params={'patrimonio_bruto_limite': 'patrimonio_bruto_limite'},
+        )
+        compiled = compile_validation_rules(get_fiscal_rules(2024), VALIDATION_RULES + (rule,))
+
+        validations, _ = compiled.evaluate(analysis_result)
+
+        assert validations[-1]['type'] == 'high_income'
+        assert validations[-1]['description'] == 'Ingresos de $60,000,000'
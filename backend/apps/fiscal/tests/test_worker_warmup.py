@@ -0,0 +1,46 @@
+"""
+Tests para el calentamiento de los workers de Celery.
+"""
+import logging
+
+from apps.documents.parsers.excel_parser import CONCEPT_MAPPING, ExogenaParser
+from apps.fiscal.services import warmup
+from apps.fiscal.services.intelligent_processor import get_intelligent_fiscal_processor
+
+
+class TestWarmUpWorker:
+    """Tests para la precarga de módulos y servicios."""
+
+    def test_builds_services_once(self):
+        """Los servicios quedan construidos y se reutilizan."""
+        result = warmup.warm_up_worker([2023, 2024])
+
+        assert result['fiscal_years'] == [2023, 2024]
+        assert result['total_ms'] >= result['services_ms']
+        processor = get_intelligent_fiscal_processor(2024)
+        assert processor is get_intelligent_fiscal_processor(2024)
+        assert processor.consistency_validator.compiled_rules
+
+    def test_parser_tables_are_shared(self):
+        """Cada parser nuevo reutiliza las tablas del módulo."""
+        assert ExogenaParser().concept_mapping is CONCEPT_MAPPING
+        assert ExogenaParser().column_aliases is ExogenaParser().column_aliases
+
+
+class TestFirstTaskLatency:
+    """Tests para el registro de la primera tarea del proceso."""
+
+    def test_only_first_task_is_logged(self, monkeypatch, caplog):
+        monkeypatch.setattr(warmup, '_worker_state', {
+            'warmed_up': True, 'warmup_ms': 12.5, 'first_task_done': False, 'task_starts': {}
+        })
+
+        with caplog.at_level(logging.INFO, logger='apps.fiscal.services.warmup'):
+            for task_id in ('a', 'b'):
+                warmup.record_task_start(task_id)
+                warmup.record_task_end(task_id, 'apps.fiscal.tasks.process_fiscal_batch')
+
+        events = [record.getMessage() for record in caplog.records if 'celery_first_task' in record.getMessage()]
+        assert len(events) == 1
+        assert '"warmed_up": true' in events[0]
+        assert 'process_fiscal_batch' in events[0]
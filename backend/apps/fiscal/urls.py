@@ -10,6 +10,12 @@ urlpatterns = [
     # Endpoint principal de análisis
     path('analyze/', views.analyze_fiscal_data, name='analyze'),
     
+    # Sesiones de análisis asíncrono
+    path('sessions/<uuid:session_id>/', views.get_analysis_session, name='session_detail'),
+    path('sessions/<uuid:session_id>/status/', views.get_analysis_session_status, name='session_status'),
+    path('sessions/<uuid:session_id>/records/', views.get_analysis_session_records, name='session_records'),
+    path('sessions/<uuid:session_id>/export/', views.export_analysis_session, name='session_export'),
+    
     # Testing y debugging
     path('test-parser/', views.test_parser_only, name='test_parser'),
     
@@ -19,6 +25,13 @@ urlpatterns = [
     # Simulaciones
     path('simulate-deductions/', views.simulate_deductions, name='simulate_deductions'),
     
+    # Análisis por lotes (contadores)
+    path('batches/', views.create_fiscal_batch, name='create_batch'),
+    path('batches/<uuid:batch_id>/', views.get_fiscal_batch, name='batch_detail'),
+    
+    # Operación
+    path('ops/pipeline-metrics/', views.pipeline_metrics, name='pipeline_metrics'),
+    
     # Health check
     path('health/', views.health_check, name='health_check'),
 ]
@@ -3,19 +3,62 @@ Vistas de la API para análisis fiscal inteligente
 """
 import logging
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import ParseError, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from rest_framework import status
+from django.conf import settings
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 import json
 
 from .services.intelligent_processor import get_intelligent_fiscal_processor
+from .services.response_shaping import UnknownFieldsError
+from .services.rules_registry import InvalidFiscalYear
 
 logger = logging.getLogger(__name__)
 
 
+def _flag_requested(request, name: str) -> bool:
+    """Indica si la solicitud activó un flag booleano (query string o cuerpo)"""
+    flag = request.query_params.get(name) or request.data.get(name)
+    return str(flag).lower() in ('1', 'true', 'yes')
+
+
+def _debug_requested(request) -> bool:
+    """Indica si la solicitud pidió instrumentación y tiene permiso para verla"""
+    if not _flag_requested(request, 'debug'):
+        return False
+    
+    return settings.DEBUG or getattr(request.user, 'is_staff', False)
+
+
+def _shape_result(request, result: dict, records_url: str = None) -> dict:
+    """
+    Aplica `?fields=` y `?compact=true` al resultado del pipeline
+    (UnknownFieldsError si alguna ruta de `fields` no existe)
+    """
+    from .services.response_shaping import shape_analysis_response
+    
+    return shape_analysis_response(
+        result,
+        fields=request.query_params.get('fields'),
+        compact=_flag_requested(request, 'compact'),
+        records_url=records_url
+    )
+
+
+def _unknown_fields_response(error: UnknownFieldsError) -> Response:
+    """400 con las rutas de `fields` que no existen en el resultado"""
+    return Response({
+        'success': False,
+        'error': str(error),
+        'unknown_fields': error.paths
+    }, status=status.HTTP_400_BAD_REQUEST)
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def analyze_fiscal_data(request):
@@ -23,6 +66,11 @@ def analyze_fiscal_data(request):
     Endpoint principal para análisis fiscal inteligente
     
     POST /api/v1/fiscal/analyze/
+    POST /api/v1/fiscal/analyze/?async=true  (crea una sesión y responde 202)
+    POST /api/v1/fiscal/analyze/?fields=fiscal_analysis,user_friendly_summary
+    
+    El modo compacto (`?compact=true`) solo aplica al resultado de una sesión
+    asíncrona, que expone los registros paginados en `records_url`.
     """
     try:
         logger.info(f"🚀 Iniciando análisis fiscal para usuario: {request.user}")
@@ -39,22 +87,45 @@ def analyze_fiscal_data(request):
                 'error': 'Se requiere archivo de exógena o usar datos demo'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Obtener procesador inteligente
-        processor = get_intelligent_fiscal_processor()
+        # Modo asíncrono: la tarea de Celery procesa y el cliente consulta el estado
+        if _flag_requested(request, 'async'):
+            return _enqueue_analysis_session(request, file_data, user_context)
+        
+        # Sin sesión no hay `records_url` donde consultar los registros omitidos
+        if _flag_requested(request, 'compact'):
+            return Response({
+                'success': False,
+                'error': 'El modo compacto solo aplica al resultado de una sesión asíncrona (?async=true)'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Obtener procesador inteligente del año gravable
+        processor = get_intelligent_fiscal_processor(data.get('fiscal_year'))
+        
+        # Instrumentación por etapa en la respuesta (solo staff o DEBUG)
+        debug = _debug_requested(request)
         
         # Procesar datos
         if data.get('use_demo', False):
-            result = processor.process_complete_analysis('demo', user_context)
+            result = processor.process_complete_analysis('demo', user_context, debug=debug)
         else:
-            result = processor.process_complete_analysis(file_data, user_context)
+            result = processor.process_complete_analysis(file_data, user_context, debug=debug)
         
         if result['success']:
             logger.info(f"✅ Análisis completado exitosamente en {result['processing_time']:.2f}s")
-            return Response(result, status=status.HTTP_200_OK)
+            return Response(_shape_result(request, result), status=status.HTTP_200_OK)
         else:
             logger.error(f"❌ Error en análisis: {result.get('error', 'Error desconocido')}")
             return Response(result, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
         
+    except InvalidFiscalYear as e:
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+        
+    except UnknownFieldsError as e:
+        return _unknown_fields_response(e)
+        
     except Exception as e:
         logger.error(f"❌ Error crítico en endpoint de análisis: {str(e)}")
         return Response({
@@ -63,6 +134,251 @@ def analyze_fiscal_data(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+def _enqueue_analysis_session(request, file_data, user_context) -> Response:
+    """Crea una sesión de análisis pendiente y encola su procesamiento"""
+    import uuid
+    from django.db import transaction
+    from django.urls import reverse
+    from .models import FiscalAnalysisSession
+    from .services.rules_registry import resolve_fiscal_year
+    from .tasks import analyze_fiscal_session
+    
+    data = request.data
+    session_id = uuid.uuid4()
+    # Se valida antes de subir el archivo
+    fiscal_year = resolve_fiscal_year(data['fiscal_year']) if data.get('fiscal_year') else None
+    request_data = {'user_context': user_context}
+    storage_path = ''
+    
+    if file_data:
+        from apps.documents.services.storage_service import get_storage_service
+        
+        storage_path = f"fiscal_sessions/{session_id}/{file_data.name}"
+        get_storage_service().upload_file(file_data, storage_path, file_data.content_type)
+    else:
+        request_data['use_demo'] = True
+    
+    with transaction.atomic():
+        session = FiscalAnalysisSession.objects.create(
+            user=request.user,
+            session_id=session_id,
+            fiscal_year=fiscal_year,
+            original_filename=file_data.name if file_data else 'demo',
+            file_size=file_data.size if file_data else None,
+            source_storage_path=storage_path,
+            analysis_results=request_data,
+            status='pending'
+        )
+        transaction.on_commit(lambda: analyze_fiscal_session.delay(str(session_id)))
+    
+    logger.info(f"📥 Análisis encolado en sesión {session_id}")
+    
+    return Response({
+        'success': True,
+        'session_id': str(session.session_id),
+        'status': session.status,
+        'status_url': reverse('fiscal:session_status', args=[session.session_id]),
+        'result_url': reverse('fiscal:session_detail', args=[session.session_id])
+    }, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_analysis_session_status(request, session_id):
+    """
+    Estado liviano de una sesión de análisis (para polling)
+    
+    GET /api/v1/fiscal/sessions/<session_id>/status/
+    """
+    try:
+        from .models import FiscalAnalysisSession
+        
+        session = FiscalAnalysisSession.objects.filter(
+            session_id=session_id, user=request.user
+        ).values(
+            'session_id', 'status', 'fiscal_year', 'original_filename',
+            'processing_time', 'result_summary', 'created_at', 'updated_at'
+        ).first()
+        
+        if session is None:
+            return Response({
+                'success': False,
+                'error': 'Sesión no encontrada'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        return Response({
+            'success': True,
+            'session': session,
+            'finished': session['status'] in ('completed', 'error')
+        }, status=status.HTTP_200_OK)
+        
+    except Exception as e:
+        logger.error(f"Error obteniendo estado de sesión: {str(e)}")
+        return Response({
+            'success': False,
+            'error': f'Error obteniendo estado: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_analysis_session(request, session_id):
+    """
+    Resultado completo de una sesión de análisis
+    
+    GET /api/v1/fiscal/sessions/<session_id>/?compact=true&fields=...
+    
+    Responde 202 mientras la sesión sigue en proceso y 422 si terminó con error.
+    En modo compacto los registros se consultan paginados en `records_url`.
+    """
+    try:
+        from .models import FiscalAnalysisSession
+        
+        session = FiscalAnalysisSession.objects.filter(
+            session_id=session_id, user=request.user
+        ).only('session_id', 'status', 'analysis_results').first()
+        
+        if session is None:
+            return Response({
+                'success': False,
+                'error': 'Sesión no encontrada'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        if session.status in ('pending', 'processing'):
+            return Response({
+                'success': True,
+                'session_id': str(session.session_id),
+                'status': session.status
+            }, status=status.HTTP_202_ACCEPTED)
+        
+        from django.urls import reverse
+        
+        response_status = status.HTTP_200_OK if session.status == 'completed' else status.HTTP_422_UNPROCESSABLE_ENTITY
+        records_url = reverse('fiscal:session_records', args=[session.session_id])
+        return Response(_shape_result(request, session.analysis_results, records_url), status=response_status)
+        
+    except UnknownFieldsError as e:
+        return _unknown_fields_response(e)
+        
+    except Exception as e:
+        logger.error(f"Error obteniendo sesión de análisis: {str(e)}")
+        return Response({
+            'success': False,
+            'error': f'Error obteniendo sesión: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class AnalysisRecordsPagination(PageNumberPagination):
+    """Paginación de los registros de exógena de una sesión"""
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_analysis_session_records(request, session_id):
+    """
+    Registros de exógena de una sesión, paginados
+    
+    GET /api/v1/fiscal/sessions/<session_id>/records/?page=2&page_size=100
+    
+    Cada registro incluye `record_index`, el índice que usan las respuestas compactas.
+    """
+    try:
+        from .models import FiscalAnalysisSession
+        
+        # Solo se lee la lista de registros del JSON, no el resultado completo
+        rows = list(FiscalAnalysisSession.objects.filter(
+            session_id=session_id, user=request.user, status='completed'
+        ).values_list('analysis_results__parser_results__records', flat=True)[:1])
+        
+        if not rows:
+            return Response({
+                'success': False,
+                'error': 'Sesión no encontrada o sin resultados'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        records = [dict(record, record_index=index) for index, record in enumerate(rows[0] or [])]
+        
+        paginator = AnalysisRecordsPagination()
+        page = paginator.paginate_queryset(records, request)
+        return paginator.get_paginated_response(page)
+        
+    except Exception as e:
+        logger.error(f"Error obteniendo registros de sesión: {str(e)}")
+        return Response({
+            'success': False,
+            'error': f'Error obteniendo registros: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_analysis_session(request, session_id):
+    """
+    Exporta los registros analizados de una sesión a CSV o XLSX en streaming
+    
+    GET /api/v1/fiscal/sessions/<session_id>/export/?file_format=csv|xlsx
+    
+    Limitación: los registros viven en un solo JSON (`analysis_results`), así que
+    la lista completa se carga en memoria una vez; solo la escritura del archivo
+    es en streaming. El archivo de exógena de una persona natural tiene del orden
+    de miles de registros, pero si las sesiones crecen mucho más los registros
+    deberían pasar a una tabla propia para exportarlos con un cursor como en
+    IncomeRecordViewSet.export.
+    """
+    try:
+        from apps.common.exports import get_export_format, streaming_export_response
+        from .models import FiscalAnalysisSession
+        
+        file_format = get_export_format(request)
+        
+        rows = list(FiscalAnalysisSession.objects.filter(
+            session_id=session_id, user=request.user, status='completed'
+        ).values_list('analysis_results__parser_results__records', flat=True)[:1])
+        
+        if not rows:
+            return Response({
+                'success': False,
+                'error': 'Sesión no encontrada o sin resultados'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        records = rows[0] or []
+        
+        # Columnas en el orden en que aparecen en los registros
+        columns = list(dict.fromkeys(key for record in records for key in record))
+        
+        return streaming_export_response(
+            f"analisis_fiscal_{session_id}",
+            file_format,
+            ['record_index'] + columns,
+            ([index] + [_export_value(record.get(column)) for column in columns]
+             for index, record in enumerate(records)),
+            sheet_title='Registros analizados'
+        )
+        
+    except ValidationError as e:
+        return Response({
+            'success': False,
+            'error': e.detail
+        }, status=status.HTTP_400_BAD_REQUEST)
+        
+    except Exception as e:
+        logger.error(f"Error exportando sesión de análisis: {str(e)}")
+        return Response({
+            'success': False,
+            'error': f'Error exportando sesión: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def _export_value(value):
+    """Aplana valores anidados del JSON para una celda"""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    return value
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def test_parser_only(request):
@@ -104,33 +420,26 @@ def get_fiscal_limits(request):
     """
     Obtiene límites fiscales vigentes
     
-    GET /api/v1/fiscal/limits/
+    GET /api/v1/fiscal/limits/?fiscal_year=2024
     """
     try:
-        from .services.analysis_service import FiscalAnalysisService
-        
-        service = FiscalAnalysisService()
-        
-        limits_info = {
-            'uvt_2024': service.UVT_2024,
-            'fiscal_limits': service.FISCAL_LIMITS,
-            'deduction_categories': service.DEDUCTION_CATEGORIES,
-            'tax_brackets': [
-                {
-                    'min_income': bracket[0],
-                    'max_income': bracket[1] if bracket[1] != float('inf') else None,
-                    'rate': bracket[2],
-                    'fixed_amount': bracket[3] if len(bracket) > 3 else 0
-                }
-                for bracket in service.TARIFA_RENTA
-            ]
-        }
+        from .services.rules_registry import get_fiscal_rules
+        
+        rules = get_fiscal_rules(request.query_params.get('fiscal_year'))
+        
+        limits_info = rules.as_dict()
         
         return Response({
             'success': True,
             'limits': limits_info
         }, status=status.HTTP_200_OK)
         
+    except InvalidFiscalYear as e:
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+        
     except Exception as e:
         logger.error(f"Error obteniendo límites fiscales: {str(e)}")
         return Response({
@@ -146,48 +455,75 @@ def simulate_deductions(request):
     Simula el impacto de diferentes deducciones
     
     POST /api/v1/fiscal/simulate-deductions/
+    
+    Además de los dos escenarios clásicos, evalúa en lote todas las combinaciones
+    de deducciones y retorna la frontera de Pareto (`optimizer`). El cuerpo se
+    valida con DeductionSimulationSerializer (400 si no es válido).
     """
     try:
-        data = request.data
-        base_income = data.get('base_income', 0)
-        potential_deductions = data.get('deductions', {})
+        from .serializers import DeductionSimulationSerializer
+        from .services.deduction_optimizer import get_deduction_optimizer
+        
+        serializer = DeductionSimulationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        base_income = float(data['base_income'])
+        potential_deductions = data['deductions']
+        
+        optimizer = get_deduction_optimizer(data.get('fiscal_year'))
         
-        from .services.analysis_service import FiscalAnalysisService
-        service = FiscalAnalysisService()
+        optimization = optimizer.optimize(
+            base_income,
+            potential_deductions,
+            dependents_count=data.get('dependents_count'),
+            steps=data.get('steps') or optimizer.DEFAULT_STEPS
+        )
         
         # Simular diferentes escenarios
         scenarios = []
         
         # Escenario base (sin deducciones adicionales)
-        base_tax = service._calculate_income_tax({'base_gravable': base_income})
+        base_tax = optimization['base_tax']
         scenarios.append({
             'name': 'Sin deducciones adicionales',
             'deductions': 0,
-            'tax_amount': base_tax['impuesto_calculado'],
+            'tax_amount': base_tax,
             'net_benefit': 0
         })
         
         # Escenario con deducciones
-        total_deductions = sum(potential_deductions.values())
-        adjusted_income = max(0, base_income - total_deductions)
-        adjusted_tax = service._calculate_income_tax({'base_gravable': adjusted_income})
+        total_deductions = sum(float(amount or 0) for amount in potential_deductions.values())
+        adjusted_tax = optimizer.tax_for(max(0, base_income - total_deductions))
         
         scenarios.append({
             'name': 'Con deducciones propuestas',
             'deductions': total_deductions,
-            'tax_amount': adjusted_tax['impuesto_calculado'],
-            'net_benefit': base_tax['impuesto_calculado'] - adjusted_tax['impuesto_calculado']
+            'tax_amount': adjusted_tax,
+            'net_benefit': base_tax - adjusted_tax
         })
         
         return Response({
             'success': True,
             'scenarios': scenarios,
+            'optimizer': optimization,
             'recommendations': [
                 f"Ahorro potencial: ${scenarios[1]['net_benefit']:,.0f}",
-                f"Reducción de impuesto: {(scenarios[1]['net_benefit']/base_tax['impuesto_calculado']*100):.1f}%" if base_tax['impuesto_calculado'] > 0 else "0%"
+                f"Reducción de impuesto: {(scenarios[1]['net_benefit']/base_tax*100):.1f}%" if base_tax > 0 else "0%"
             ]
         }, status=status.HTTP_200_OK)
         
+    except (ParseError, ValidationError) as e:
+        return Response({
+            'success': False,
+            'error': e.detail
+        }, status=status.HTTP_400_BAD_REQUEST)
+        
+    except (TypeError, ValueError) as e:
+        return Response({
+            'success': False,
+            'error': f'Datos de simulación inválidos: {str(e)}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+        
     except Exception as e:
         logger.error(f"Error en simulación de deducciones: {str(e)}")
         return Response({
@@ -196,6 +532,227 @@ def simulate_deductions(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+def _parse_id_list(value) -> list:
+    """
+    Normaliza una lista de IDs recibida como lista JSON o texto separado por
+    comas (multipart envía `declaration_ids=1,2,3` como ['1,2,3'])
+    """
+    if not value:
+        return []
+    if isinstance(value, (str, int)):
+        value = [value]
+    items = [part for item in value for part in str(item).split(',')]
+    return [int(item) for item in items if item.strip()]
+
+
+def _delete_uploaded_files(storage_service, storage_paths):
+    """Borra los archivos subidos de una operación que no se confirmó"""
+    for storage_path in storage_paths:
+        try:
+            storage_service.delete_file(storage_path)
+        except Exception as e:
+            logger.error(f"No se pudo borrar el archivo huérfano {storage_path}: {str(e)}")
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def create_fiscal_batch(request):
+    """
+    Crea un lote de análisis fiscales para varios clientes
+    
+    POST /api/v1/fiscal/batches/
+    
+    Acepta varios archivos (`exogena_files`) y/o IDs de declaraciones existentes
+    (`declaration_ids`). Cada cliente se analiza en su propia tarea de Celery.
+    """
+    try:
+        import uuid
+        from django.db import transaction
+        from apps.declarations.models import Declaration
+        from apps.documents.services.storage_service import get_storage_service
+        from .models import FiscalAnalysisBatch, FiscalAnalysisSession
+        from .serializers import FiscalAnalysisBatchSerializer
+        from .services.rules_registry import resolve_fiscal_year
+        from .tasks import process_fiscal_batch
+        
+        data = request.data
+        files = request.FILES.getlist('exogena_files')
+        declaration_ids = _parse_id_list(
+            data.getlist('declaration_ids') if hasattr(data, 'getlist') else data.get('declaration_ids')
+        )
+        user_context = data.get('user_context', {}) or {}
+        fiscal_year = data.get('fiscal_year')
+        
+        if not files and not declaration_ids:
+            return Response({
+                'success': False,
+                'error': 'Se requieren archivos de exógena o IDs de declaraciones'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        max_items = getattr(settings, 'FISCAL_BATCH_MAX_ITEMS', 500)
+        if len(files) + len(declaration_ids) > max_items:
+            return Response({
+                'success': False,
+                'error': f'El lote excede el máximo de {max_items} clientes'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        declarations = list(
+            Declaration.objects.filter(
+                id__in=declaration_ids, user=request.user, is_active=True
+            ).only('id', 'title', 'fiscal_year')
+        )
+        missing_ids = sorted(set(declaration_ids) - {declaration.id for declaration in declarations})
+        if missing_ids:
+            return Response({
+                'success': False,
+                'error': 'Declaraciones no encontradas',
+                'missing_declaration_ids': missing_ids
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        batch_year = resolve_fiscal_year(fiscal_year) if fiscal_year else None
+        if batch_year is None:
+            # Sin año del lote cada declaración usa el suyo: debe tener reglas registradas
+            for declaration in declarations:
+                resolve_fiscal_year(declaration.fiscal_year)
+        storage_service = get_storage_service()
+        uploaded_paths = []
+        
+        try:
+            with transaction.atomic():
+                batch = FiscalAnalysisBatch.objects.create(
+                    user=request.user,
+                    fiscal_year=batch_year,
+                    total_items=len(files) + len(declarations)
+                )
+                
+                sessions = []
+                for uploaded_file in files:
+                    session_id = uuid.uuid4()
+                    storage_path = f"fiscal_batches/{batch.batch_id}/{session_id}_{uploaded_file.name}"
+                    storage_service.upload_file(uploaded_file, storage_path, uploaded_file.content_type)
+                    uploaded_paths.append(storage_path)
+                    
+                    sessions.append(FiscalAnalysisSession(
+                        user=request.user,
+                        session_id=session_id,
+                        batch=batch,
+                        fiscal_year=batch_year,
+                        original_filename=uploaded_file.name,
+                        file_size=uploaded_file.size,
+                        source_storage_path=storage_path,
+                        analysis_results={'user_context': user_context},
+                        status='pending'
+                    ))
+                
+                for declaration in declarations:
+                    sessions.append(FiscalAnalysisSession(
+                        user=request.user,
+                        session_id=uuid.uuid4(),
+                        batch=batch,
+                        declaration=declaration,
+                        fiscal_year=batch_year or declaration.fiscal_year,
+                        original_filename=declaration.title,
+                        analysis_results={'user_context': user_context},
+                        status='pending'
+                    ))
+                
+                FiscalAnalysisSession.objects.bulk_create(sessions)
+                
+                transaction.on_commit(lambda: process_fiscal_batch.delay(str(batch.batch_id)))
+        except Exception:
+            # El rollback no borra lo que ya se subió al storage
+            _delete_uploaded_files(storage_service, uploaded_paths)
+            raise
+        
+        logger.info(f"Lote fiscal {batch.batch_id} creado con {batch.total_items} clientes")
+        
+        return Response({
+            'success': True,
+            'batch': FiscalAnalysisBatchSerializer(batch).data
+        }, status=status.HTTP_202_ACCEPTED)
+        
+    except (TypeError, ValueError) as e:
+        return Response({
+            'success': False,
+            'error': f'Datos del lote inválidos: {str(e)}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+        
+    except Exception as e:
+        logger.error(f"Error creando lote fiscal: {str(e)}")
+        return Response({
+            'success': False,
+            'error': f'Error creando lote: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_fiscal_batch(request, batch_id):
+    """
+    Estado y resumen de un lote de análisis
+    
+    GET /api/v1/fiscal/batches/<batch_id>/
+    """
+    try:
+        from django.db.models import Prefetch
+        from .models import FiscalAnalysisBatch, FiscalAnalysisSession
+        from .serializers import FiscalAnalysisBatchSerializer
+        
+        batch = FiscalAnalysisBatch.objects.prefetch_related(
+            Prefetch(
+                'sessions',
+                queryset=FiscalAnalysisSession.objects.defer('analysis_results').order_by('created_at', 'id')
+            )
+        ).filter(batch_id=batch_id, user=request.user).first()
+        
+        if batch is None:
+            return Response({
+                'success': False,
+                'error': 'Lote no encontrado'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        return Response({
+            'success': True,
+            'batch': FiscalAnalysisBatchSerializer(batch).data
+        }, status=status.HTTP_200_OK)
+        
+    except Exception as e:
+        logger.error(f"Error obteniendo lote fiscal: {str(e)}")
+        return Response({
+            'success': False,
+            'error': f'Error obteniendo lote: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def pipeline_metrics(request):
+    """
+    Histogramas móviles por etapa del pipeline fiscal
+    
+    GET /api/v1/fiscal/ops/pipeline-metrics/
+    
+    `metrics` reúne las muestras de todos los procesos (web y workers de Celery)
+    guardadas en la caché compartida; `process_metrics` solo las del proceso que
+    atiende la solicitud. Sin caché compartida (DummyCache) `metrics` queda vacío.
+    """
+    try:
+        from .services.instrumentation import get_shared_stage_histograms, get_stage_histograms
+        
+        return Response({
+            'success': True,
+            'metrics': get_shared_stage_histograms(),
+            'process_metrics': get_stage_histograms()
+        }, status=status.HTTP_200_OK)
+        
+    except Exception as e:
+        logger.error(f"Error obteniendo métricas del pipeline: {str(e)}")
+        return Response({
+            'success': False,
+            'error': f'Error obteniendo métricas: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @api_view(['GET'])
 def health_check(request):
     """
@@ -4,6 +4,7 @@ Celery configuration for AccountIA project.
 
 import os
 from celery import Celery
+from celery.signals import task_postrun, task_prerun, worker_process_init
 
 # Set the default Django settings module for the 'celery' program.
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.development')
@@ -17,6 +18,31 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 # Load task modules from all registered Django apps.
 app.autodiscover_tasks()
 
+
+@worker_process_init.connect
+def warm_up_worker_process(**kwargs):
+    """Precarga módulos pesados y servicios fiscales en cada proceso worker"""
+    from django.conf import settings
+
+    if not getattr(settings, 'FISCAL_WORKER_WARMUP', True):
+        return
+
+    from apps.fiscal.services.warmup import warm_up_worker
+    warm_up_worker()
+
+
+@task_prerun.connect
+def track_task_start(task_id=None, **kwargs):
+    from apps.fiscal.services.warmup import record_task_start
+    record_task_start(task_id)
+
+
+@task_postrun.connect
+def track_task_end(task_id=None, task=None, **kwargs):
+    from apps.fiscal.services.warmup import record_task_end
+    record_task_end(task_id, getattr(task, 'name', None))
+
+
 @app.task(bind=True, ignore_result=True)
 def debug_task(self):
     print(f'Request: {self.request!r}')
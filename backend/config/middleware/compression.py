@@ -0,0 +1,114 @@
+"""
+Compresión de respuestas negociada por solicitud (brotli o gzip).
+
+Reemplaza a GZipMiddleware para poder usar brotli cuando el cliente lo acepta
+y el paquete está instalado, y para no gastar CPU en respuestas pequeñas
+(umbral configurable con RESPONSE_COMPRESSION_MIN_SIZE).
+"""
+import gzip
+import logging
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él solo se usa gzip
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Tipos que vale la pena comprimir (XLSX, imágenes y PDF ya vienen comprimidos)
+COMPRESSIBLE_TYPES = re.compile(r'^(application/(json|javascript|xml)|text/)', re.IGNORECASE)
+
+
+def _accepted_encodings(header: str) -> dict:
+    """Codificaciones aceptadas con su peso `q` (`gzip;q=0` significa no)"""
+    encodings = {}
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        if not name:
+            continue
+        quality = 1.0
+        match = re.search(r'q=([0-9.]+)', params)
+        if match:
+            try:
+                quality = float(match.group(1))
+            except ValueError:
+                quality = 0.0
+        encodings[name.strip().lower()] = quality
+    return encodings
+
+
+def choose_encoding(accept_encoding: str):
+    """Elige 'br', 'gzip' o None según Accept-Encoding y lo disponible"""
+    encodings = _accepted_encodings(accept_encoding or '')
+    candidates = ['br', 'gzip'] if brotli is not None else ['gzip']
+
+    best, best_quality = None, 0.0
+    for name in candidates:
+        quality = encodings.get(name, encodings.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+def compress(content: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(content, quality=BROTLI_QUALITY)
+    return gzip.compress(content, compresslevel=GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """
+    Comprime respuestas JSON/texto mayores al umbral con brotli o gzip.
+
+    No toca respuestas en streaming (exportaciones), ya codificadas, con
+    estado distinto de 200 ni de tipos ya comprimidos.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, 'RESPONSE_COMPRESSION_MIN_SIZE', DEFAULT_MIN_SIZE)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if response.status_code != 200 or response.streaming or response.has_header('Content-Encoding'):
+            return response
+
+        if not COMPRESSIBLE_TYPES.match(response.get('Content-Type', '')):
+            return response
+
+        # La respuesta cambia según Accept-Encoding aunque no se comprima esta vez
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        if len(response.content) < self.min_size:
+            return response
+
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+
+        # Un ETag fuerte deja de ser válido al cambiar los bytes (igual que GZipMiddleware)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+
+        return response
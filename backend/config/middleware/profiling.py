@@ -0,0 +1,76 @@
+"""
+Perfilado de solicitudes muestreado (ver apps.common.profiling).
+
+Para las solicitudes elegidas mide consultas SQL, tiempo de base de datos y
+tiempos de vista, serializador y render; los registra como evento estructurado
+(`request_profile {...}`) y, si está activado, los expone en `Server-Timing`.
+"""
+import json
+import logging
+import time
+
+from django.db import connection
+
+from apps.common.profiling import finish_profile, get_profiling_config, should_profile, start_profile
+
+logger = logging.getLogger('apps.common.profiling')
+
+
+class RequestProfilingMiddleware:
+    """
+    Perfila una muestra de las solicitudes. Las no muestreadas solo pagan la
+    lectura de la configuración (memorizada por proceso).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not should_profile(request):
+            return self.get_response(request)
+
+        profile = start_profile()
+        request._request_profile = profile
+        try:
+            with connection.execute_wrapper(profile.execute_wrapper):
+                response = self.get_response(request)
+        finally:
+            finish_profile(profile)
+
+        # Vistas que no retornan TemplateResponse (sin render diferido)
+        view_start = getattr(request, '_profile_view_start', None)
+        if view_start is not None and 'view' not in profile.stages:
+            profile.add_stage('view', (time.perf_counter() - view_start) * 1000)
+
+        event = {
+            'method': request.method,
+            'path': request.path,
+            'view': getattr(request.resolver_match, 'view_name', None),
+            'status': response.status_code,
+            **profile.as_dict(),
+        }
+        logger.info(f"request_profile {json.dumps(event, default=str)}")
+
+        if get_profiling_config()['server_timing']:
+            response['Server-Timing'] = profile.server_timing()
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if getattr(request, '_request_profile', None) is not None:
+            request._profile_view_start = time.perf_counter()
+        return None
+
+    def process_template_response(self, request, response):
+        """Respuestas DRF: la vista terminó y el render viene a continuación"""
+        profile = getattr(request, '_request_profile', None)
+        view_start = getattr(request, '_profile_view_start', None)
+        if profile is None or view_start is None:
+            return response
+
+        render_start = time.perf_counter()
+        profile.add_stage('view', (render_start - view_start) * 1000)
+        response.add_post_render_callback(
+            lambda rendered: profile.add_stage('render', (time.perf_counter() - render_start) * 1000)
+        )
+        return response
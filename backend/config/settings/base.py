@@ -48,6 +48,8 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'config.middleware.compression.CompressionMiddleware',  # brotli/gzip sobre el umbral
+    'config.middleware.profiling.RequestProfilingMiddleware',  # perfilado muestreado (Server-Timing)
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -128,6 +130,15 @@ AUTH_USER_MODEL = 'users.User'
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_RENDERER_CLASSES': [
+        'apps.common.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'apps.common.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_AUTHENTICATION_CLASSES': [
@@ -157,10 +168,35 @@ CORS_ALLOW_CREDENTIALS = True
 # Redis/Celery
 REDIS_URL = os.getenv('REDIS_URL', 'redis://redis:6379/0')
 
+# Compresión de respuestas: tamaño mínimo (bytes) para comprimir
+RESPONSE_COMPRESSION_MIN_SIZE = int(os.getenv('RESPONSE_COMPRESSION_MIN_SIZE', 1024))
+
+# Perfilado de solicitudes (valores iniciales; se cambian en caliente en /api/v1/common/ops/profiling/)
+REQUEST_PROFILING_ENABLED = os.getenv('REQUEST_PROFILING_ENABLED', 'False').lower() == 'true'
+REQUEST_PROFILING_SAMPLE_RATE = float(os.getenv('REQUEST_PROFILING_SAMPLE_RATE', 0.01))
+REQUEST_PROFILING_SERVER_TIMING = os.getenv('REQUEST_PROFILING_SERVER_TIMING', 'True').lower() == 'true'
+
+# Firebase: verificación local de ID tokens (vacío = modo MVP sin validación)
+FIREBASE_PROJECT_ID = os.getenv('FIREBASE_PROJECT_ID', '')
+FIREBASE_TOKEN_CACHE_TTL = int(os.getenv('FIREBASE_TOKEN_CACHE_TTL', 300))
+
+# Cache (Redis): respuestas de lectura y resúmenes cacheados
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('REDIS_CACHE_URL', REDIS_URL),
+        'KEY_PREFIX': 'accountia',
+        'TIMEOUT': 60 * 15,
+    }
+}
+
 # Celery Configuration
 CELERY_BROKER_URL = REDIS_URL
 CELERY_RESULT_BACKEND = REDIS_URL
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
-CELERY_TIMEZONE = TIME_ZONE
\ No newline at end of file
+CELERY_TIMEZONE = TIME_ZONE
+
+# Precarga de parsers, reglas y servicios fiscales al iniciar cada proceso worker
+FISCAL_WORKER_WARMUP = os.getenv('FISCAL_WORKER_WARMUP', 'True').lower() == 'true'
@@ -16,6 +16,8 @@ MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'config.middleware.development.CORSMiddleware',  # CORS mejorado
     'django.middleware.security.SecurityMiddleware',
+    'config.middleware.compression.CompressionMiddleware',  # brotli/gzip sobre el umbral
+    'config.middleware.profiling.RequestProfilingMiddleware',  # perfilado muestreado (Server-Timing)
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -56,6 +58,15 @@ REST_FRAMEWORK = {
         'config.utils.development.DevelopmentPermission',  # Permite todo en desarrollo
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'apps.common.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'apps.common.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
@@ -0,0 +1,50 @@
+"""
+Settings para la suite de tests (pytest-django).
+Base de datos SQLite en memoria, sin caché y Celery en modo eager.
+"""
+from .development_simple import *
+
+# Base de datos en memoria: se crea con las migraciones en cada corrida
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+}
+
+# Sin caché: los presupuestos de consultas miden el peor caso (cache miss)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    }
+}
+
+# Tareas en el mismo proceso
+CELERY_TASK_ALWAYS_EAGER = True
+CELERY_BROKER_URL = 'memory://'
+CELERY_RESULT_BACKEND = 'cache+memory://'
+
+# Hash de contraseñas rápido para crear usuarios
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# Archivos subidos en un directorio temporal
+MEDIA_ROOT = os.path.join('/tmp', 'accountia-test-media')
+
+# Solo advertencias en la salida de los tests
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'root': {
+        'handlers': ['console'],
+        'level': 'WARNING',
+    },
+}
+
+# Presupuestos de latencia (p95) de apps.common.testing; desactivables en
+# máquinas lentas o compartidas con ENFORCE_LATENCY_BUDGETS=False
+ENFORCE_LATENCY_BUDGETS = os.getenv('ENFORCE_LATENCY_BUDGETS', 'True').lower() in ('true', '1', 'yes')
@@ -44,6 +44,7 @@ urlpatterns = [
     path('api/v1/', include('apps.declarations.urls')),  # Declaraciones
     path('api/v1/', include('apps.documents.urls')),     # Documentos - HABILITADO PARA TESTING
     path('api/v1/fiscal/', include('apps.fiscal.urls')),  # Análisis fiscal inteligente - NUEVO
+    path('api/v1/common/', include('apps.common.urls')),  # Operación (métricas de caché)
     # path('api/v1/ai/', include('apps.ai_core.urls')),  # Pendiente de implementar
     # path('api/v1/payments/', include('apps.payments.urls')),  # Pendiente de implementar
 ]
@@ -0,0 +1,42 @@
+"""
+Fixtures compartidas y resumen de los presupuestos de rendimiento.
+"""
+import pytest
+
+
+@pytest.fixture
+def user(db):
+    from django.contrib.auth import get_user_model
+
+    return get_user_model().objects.create_user(
+        username='contador',
+        email='contador@accountia.co',
+        password='test-password',
+        first_name='Ana',
+        last_name='Contadora'
+    )
+
+
+@pytest.fixture
+def api_client(user):
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def pytest_terminal_summary(terminalreporter):
+    """Tabla de consultas y latencias medidas con apps.common.testing"""
+    from apps.common.testing import recorded_measurements
+
+    if not recorded_measurements:
+        return
+
+    terminalreporter.section('presupuestos de rendimiento')
+    terminalreporter.write_line(f"{'endpoint':<60} {'consultas':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for measurement in recorded_measurements:
+        terminalreporter.write_line(
+            f"{measurement.label[:60]:<60} {measurement.queries:>9} "
+            f"{measurement.p50_ms:>8.1f} {measurement.p95_ms:>8.1f}"
+        )
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+AccountIA - Benchmark de serialización y compresión de respuestas JSON.
+
+Genera respuestas de análisis reales (IntelligentFiscalProcessor sobre registros
+sintéticos) y compara:
+  - tiempo de render con el JSONRenderer de DRF vs ORJSONRenderer
+  - tamaño del payload sin comprimir, con gzip y con brotli (si está instalado)
+
+Uso:
+    python scripts/benchmark_json_rendering.py [--records 500 2000 10000] [--repeat 5]
+"""
+
+import argparse
+import contextlib
+import io
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Configurar Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.development_simple')
+
+# Agregar el directorio del proyecto al path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from apps.common.renderers import ORJSONRenderer  # noqa: E402
+from apps.fiscal.services.intelligent_processor import IntelligentFiscalProcessor  # noqa: E402
+from config.middleware.compression import brotli, compress  # noqa: E402
+
+INCOME_TYPES = [
+    ('salary', 'labor', 'Salarios'),
+    ('fees', 'labor', 'Honorarios'),
+    ('interest', 'capital', 'Rendimientos financieros'),
+    ('dividends', 'dividends', 'Dividendos'),
+    ('rent', 'capital', 'Arrendamientos'),
+]
+
+
+def build_parsed_data(records_count: int) -> dict:
+    """Registros de exógena sintéticos con la forma que producen los parsers"""
+    rng = random.Random(records_count)
+    records = []
+    for index in range(records_count):
+        income_type, tax_schedule, description = rng.choice(INCOME_TYPES)
+        gross_amount = round(rng.uniform(100000, 50000000), 2)
+        records.append({
+            'third_party_nit': str(800000000 + index),
+            'third_party_name': f'TERCERO {index:05d} S.A.S.',
+            'concept_code': str(5000 + index % 60),
+            'concept_description': description,
+            'income_type': income_type,
+            'tax_schedule': tax_schedule,
+            'gross_amount': gross_amount,
+            'withholding_amount': round(gross_amount * 0.04, 2),
+        })
+    return {'success': True, 'source': 'benchmark', 'records': records}
+
+
+def time_render(renderer, data, repeat: int):
+    """(mediana en ms, bytes) de renderizar `data`"""
+    timings = []
+    content = b''
+    for _ in range(repeat):
+        start = time.perf_counter()
+        content = renderer.render(data, 'application/json', {})
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), content
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--records', type=int, nargs='+', default=[500, 2000, 10000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    processor = IntelligentFiscalProcessor(2024)
+
+    print(f"{'registros':>9} | {'DRF ms':>8} | {'orjson ms':>9} | {'x':>5} | "
+          f"{'JSON KB':>8} | {'gzip KB':>8} | {'br KB':>8}")
+    print('-' * 74)
+
+    for records_count in args.records:
+        # El pipeline imprime su progreso; se silencia para que solo quede la tabla
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = processor.process_parsed_data(build_parsed_data(records_count))
+
+        drf_ms, drf_content = time_render(JSONRenderer(), result, args.repeat)
+        orjson_ms, orjson_content = time_render(ORJSONRenderer(), result, args.repeat)
+
+        gzip_size = len(compress(orjson_content, 'gzip'))
+        br_size = f"{len(compress(orjson_content, 'br')) / 1024:8.1f}" if brotli is not None else f"{'n/d':>8}"
+
+        print(f"{records_count:>9} | {drf_ms:8.1f} | {orjson_ms:9.1f} | {drf_ms / orjson_ms:5.1f} | "
+              f"{len(drf_content) / 1024:8.1f} | {gzip_size / 1024:8.1f} | {br_size}")
+
+
+if __name__ == '__main__':
+    main()
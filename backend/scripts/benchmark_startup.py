@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+AccountIA - Presupuesto de tiempo de arranque del proceso web.
+
+Arranca un intérprete nuevo con `-X importtime`, ejecuta django.setup() y carga
+el URLconf completo (lo mismo que hace un pod web o un comando de gestión antes
+de atender la primera solicitud) y reporta:
+  - tiempo total de arranque (mediana de varias corridas)
+  - los paquetes de primer nivel con más tiempo de importación acumulado
+  - si se importó alguna dependencia pesada que solo se usa al procesar archivos
+
+Sale con código 1 si se supera el presupuesto o si se cargó una dependencia
+pesada, para poder usarlo en CI.
+
+Uso:
+    python scripts/benchmark_startup.py [--budget-ms 1000] [--runs 3] [--top 15]
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+
+DEFAULT_BUDGET_MS = 1000
+
+# Solo deben cargarse cuando se procesa un archivo
+HEAVY_MODULES = ('pandas', 'numpy', 'openpyxl', 'xlrd')
+
+STARTUP_CODE = """
+import contextlib, io, sys, time
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    import django
+    django.setup()
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+elapsed_ms = (time.perf_counter() - start) * 1000
+loaded = [name for name in {heavy!r} if name in sys.modules]
+print(f"STARTUP {{elapsed_ms:.1f}} {{','.join(loaded)}}")
+"""
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$')
+
+
+def run_startup(settings_module: str):
+    """Un arranque en un proceso nuevo: (ms, módulos pesados, líneas de importtime)"""
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings_module}
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_CODE.format(heavy=HEAVY_MODULES)],
+        capture_output=True, text=True, check=True, cwd=project_root, env=env
+    )
+
+    marker = next(line for line in result.stdout.splitlines() if line.startswith('STARTUP '))
+    _, elapsed_ms, loaded = (marker.split(' ') + [''])[:3]
+    return float(elapsed_ms), [name for name in loaded.split(',') if name], result.stderr.splitlines()
+
+
+def top_level_import_times(importtime_lines):
+    """Tiempo acumulado (µs) por paquete de primer nivel"""
+    totals = defaultdict(int)
+    for line in importtime_lines:
+        match = IMPORTTIME_LINE.match(line)
+        # Solo las importaciones de primer nivel (sin indentación) para no contar dos veces
+        if match and len(match.group(3)) == 1:
+            totals[match.group(4).split('.')[0]] += int(match.group(2))
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--settings', default=os.getenv('DJANGO_SETTINGS_MODULE', 'config.settings.development_simple'))
+    args = parser.parse_args()
+
+    timings = []
+    heavy_loaded = set()
+    importtime_lines = []
+    for _ in range(args.runs):
+        elapsed_ms, loaded, importtime_lines = run_startup(args.settings)
+        timings.append(elapsed_ms)
+        heavy_loaded.update(loaded)
+
+    median_ms = statistics.median(timings)
+
+    print(f"Settings: {args.settings}")
+    print(f"Arranque (django.setup + URLconf): mediana {median_ms:.0f} ms "
+          f"(min {min(timings):.0f}, max {max(timings):.0f}) - presupuesto {args.budget_ms:.0f} ms")
+    print()
+    print(f"{'paquete':<30} | {'import ms':>9}")
+    print('-' * 42)
+    for package, micros in top_level_import_times(importtime_lines)[:args.top]:
+        print(f"{package:<30} | {micros / 1000:9.1f}")
+    print()
+
+    failed = False
+    if heavy_loaded:
+        print(f"ERROR: dependencias pesadas cargadas al arrancar: {', '.join(sorted(heavy_loaded))}")
+        failed = True
+    if median_ms > args.budget_ms:
+        print(f"ERROR: el arranque supera el presupuesto ({median_ms:.0f} ms > {args.budget_ms:.0f} ms)")
+        failed = True
+    if not failed:
+        print('OK: dentro del presupuesto y sin dependencias pesadas')
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+AccountIA - Benchmark del calentamiento de los workers de Celery.
+
+Lanza procesos nuevos (como un worker recién creado) y mide la latencia de la
+primera "tarea" (análisis fiscal de registros sintéticos) sin calentamiento y
+después de `warm_up_worker`, además del tiempo del calentamiento.
+
+Uso:
+    python scripts/benchmark_worker_warmup.py [--records 500] [--runs 3]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+
+
+def build_parsed_data(records_count: int) -> dict:
+    """Registros de exógena sintéticos con la forma que producen los parsers"""
+    records = []
+    for index in range(records_count):
+        gross_amount = 1000000 + index * 1000
+        records.append({
+            'third_party_nit': str(800000000 + index),
+            'third_party_name': f'TERCERO {index:05d} S.A.S.',
+            'concept_code': str(5001 + index % 10),
+            'concept_description': 'Pagos por salarios',
+            'income_type': 'salary',
+            'tax_schedule': 'labor',
+            'gross_amount': gross_amount,
+            'withholding_amount': round(gross_amount * 0.04, 2),
+        })
+    return {'success': True, 'source': 'benchmark', 'records': records}
+
+
+def run_child(warm: bool, records_count: int):
+    """Un proceso nuevo: calentamiento opcional y primera tarea"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.development_simple')
+    sys.path.insert(0, str(project_root))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        import django
+        django.setup()
+    logging.disable(logging.INFO)
+
+    warmup_ms = None
+    if warm:
+        from apps.fiscal.services.warmup import warm_up_worker
+        warmup_ms = warm_up_worker()['total_ms']
+
+    parsed_data = build_parsed_data(records_count)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        from apps.fiscal.services.intelligent_processor import get_intelligent_fiscal_processor
+        get_intelligent_fiscal_processor(2024).process_parsed_data(parsed_data)
+    first_task_ms = (time.perf_counter() - start) * 1000
+
+    # Segunda tarea del mismo proceso como referencia (estado estable)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        get_intelligent_fiscal_processor(2024).process_parsed_data(parsed_data)
+    steady_ms = (time.perf_counter() - start) * 1000
+
+    print(json.dumps({'warmup_ms': warmup_ms, 'first_task_ms': first_task_ms, 'steady_ms': steady_ms}))
+
+
+def measure(warm: bool, records_count: int, runs: int) -> dict:
+    results = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, __file__, '--child', 'warm' if warm else 'cold', '--records', str(records_count)],
+            capture_output=True, text=True, check=True, cwd=project_root
+        )
+        results.append(json.loads(output.stdout.strip().splitlines()[-1]))
+
+    return {
+        key: statistics.median(result[key] for result in results) if results[0][key] is not None else None
+        for key in ('warmup_ms', 'first_task_ms', 'steady_ms')
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--records', type=int, default=500)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--child', choices=['cold', 'warm'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return run_child(args.child == 'warm', args.records)
+
+    print(f"{'modo':>6} | {'warm-up ms':>10} | {'1ª tarea ms':>11} | {'estable ms':>10}")
+    print('-' * 48)
+    for mode in ('cold', 'warm'):
+        result = measure(mode == 'warm', args.records, args.runs)
+        warmup = f"{result['warmup_ms']:10.1f}" if result['warmup_ms'] is not None else f"{'-':>10}"
+        print(f"{mode:>6} | {warmup} | {result['first_task_ms']:11.1f} | {result['steady_ms']:10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -137,8 +137,9 @@ export const useDeclarationManagement = (): UseDeclarationManagementReturn => {
       }
       setError(null);
       
-      const response = await declarationService.list();
-      setDeclarations(response.results);
+      // El listado es paginado por cursor: se recorren todas las páginas
+      const allDeclarations = await declarationService.listAll();
+      setDeclarations(allDeclarations);
     } catch (err: any) {
       console.error('Error fetching declarations:', err);
       
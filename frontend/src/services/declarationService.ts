@@ -78,11 +78,11 @@ export interface DeclarationStats {
   last_declaration: Declaration | null;
 }
 
+// El listado usa paginación por cursor: no trae `count`, solo el enlace `next`
 export interface DeclarationListResponse {
   results: Declaration[];
-  count: number;
-  next?: string;
-  previous?: string;
+  next: string | null;
+  page_size: number;
 }
 
 export interface DashboardStats {
@@ -131,17 +131,17 @@ class DeclarationService {
   private readonly baseUrl = ''; // Las URLs base ya están manejadas por api.ts
 
   /**
-   * Obtiene todas las declaraciones del usuario
+   * Obtiene una página de declaraciones del usuario
    */
   async list(params?: {
-    page?: number;
+    cursor?: string;
     page_size?: number;
     fiscal_year?: number;
     status?: string;
   }): Promise<DeclarationListResponse> {
     try {
       const queryParams = new URLSearchParams();
-      if (params?.page) queryParams.append('page', params.page.toString());
+      if (params?.cursor) queryParams.append('cursor', params.cursor);
       if (params?.page_size) queryParams.append('page_size', params.page_size.toString());
       if (params?.fiscal_year) queryParams.append('fiscal_year', params.fiscal_year.toString());
       if (params?.status) queryParams.append('status', params.status);
@@ -351,6 +351,36 @@ class DeclarationService {
     }
   }
 
+  /**
+   * Obtiene todas las declaraciones del usuario siguiendo el cursor `next`
+   */
+  async listAll(params?: {
+    page_size?: number;
+    fiscal_year?: number;
+    status?: string;
+  }): Promise<Declaration[]> {
+    const firstPage = await this.list({ page_size: 100, ...params });
+    const declarations = [...firstPage.results];
+
+    let next = firstPage.next;
+    while (next) {
+      try {
+        // `next` es una URL absoluta que ya incluye los filtros y el cursor
+        const page: DeclarationListResponse = await api.get<DeclarationListResponse>(next);
+        declarations.push(...page.results);
+        next = page.next;
+      } catch (error: any) {
+        console.error('Error listing declarations:', error);
+        throw new Error(
+          error.response?.data?.error ||
+          'Error obteniendo declaraciones'
+        );
+      }
+    }
+
+    return declarations;
+  }
+
   /**
    * Obtiene estadísticas del dashboard (método legacy)
    */
@@ -358,10 +388,10 @@ class DeclarationService {
     try {
       // Usar el nuevo endpoint de stats y adaptar la respuesta
       const stats = await this.getStats();
-      const declarations = await this.list({ page_size: 100 });
+      const declarations = await this.listAll();
       
       const currentYear = new Date().getFullYear() - 1;
-      const currentYearDeclaration = declarations.results.find(
+      const currentYearDeclaration = declarations.find(
         d => d.fiscal_year === currentYear
       );
       
@@ -410,11 +440,7 @@ class DeclarationService {
    */
   async getAllDeclarationsForYear(year: number): Promise<Declaration[]> {
     try {
-      const response = await this.list({ 
-        fiscal_year: year, 
-        page_size: 100 // Asumiendo que no habrá más de 100 declaraciones por año
-      });
-      return response.results;
+      return await this.listAll({ fiscal_year: year });
     } catch (error) {
       console.error('Error getting declarations for year:', error);
       return [];
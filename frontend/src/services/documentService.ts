@@ -13,6 +13,7 @@ export interface Document {
   upload_status: 'pending' | 'uploading' | 'uploaded' | 'processing' | 'processed' | 'error';
   processing_errors: string[];
   processed_data?: any;
+  processed_summary?: Record<string, any>;
   storage_path?: string;
   uploaded_by: string;
   created_at: string;
@@ -213,8 +214,9 @@ class DocumentService {
    */
   async getByDeclaration(declarationId: string): Promise<Document[]> {
     try {
+      // processed_data solo viene si se pide explícitamente (la revisión de datos lo usa)
       const response = await api.get<any>(
-        `${this.baseUrl}/declarations/${declarationId}/documents/`
+        `${this.baseUrl}/declarations/${declarationId}/documents/?include=processed_data`
       );
       
       // DEBUG: Verificar estructura de respuesta